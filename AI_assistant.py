@@ -56,6 +56,7 @@ from core.translator import Translator
 from core.text_monitor import TextMonitor
 from utils.i18n import I18n
 from core.term_vector_db import TermVectorDB
+from core.context_packer import pack_knowledge_context
 import time
 from modelscope.hub.snapshot_download import snapshot_download
 
@@ -107,6 +108,9 @@ class AIAssistant:
         else:
             self.app = None
 
+        # 最近一次知识库问答的上下文打包统计
+        self.last_context_report = None
+
         # 初始化配置
         self.settings = Settings()
         # 初始化国际化
@@ -167,13 +171,46 @@ class AIAssistant:
             from core.knowledge_base import KnowledgeBase
             self.knowledge_base = KnowledgeBase(self.vector_db, self.settings)
 
+        # 初始化知识库问答语义答案缓存
+        if not hasattr(self, 'answer_cache'):
+            from core.answer_cache import SemanticAnswerCache
+            self.answer_cache = SemanticAnswerCache(
+                threshold=self.settings.get('kb_answer_cache_threshold', 0.95),
+                max_entries=self.settings.get('kb_answer_cache_size', 500)
+            )
+
         # 初始化术语库 - 使用专用向量数据库
         if not hasattr(self, 'term_base'):
             from core.term_base import TermBase
             self.term_base = TermBase(self.term_vector_db, self.settings)
 
+        # 数据文件热加载（外部修改术语/知识/向量文件后无需重启）
+        if not hasattr(self, 'data_watcher') and self.settings.get('hot_reload_enabled', True):
+            from core.hot_reload import create_data_watcher
+            self.data_watcher = create_data_watcher(
+                term_base=self.term_base,
+                knowledge_base=self.knowledge_base,
+                vector_dbs=(self.vector_db, self.term_vector_db),
+                interval=self.settings.get('hot_reload_interval', 2.0)
+            )
+            self.data_watcher.start()
+
+        # 初始化翻译记忆库
+        if not hasattr(self, 'translation_memory'):
+            from core.translation_memory import TranslationMemory
+            self.translation_memory = TranslationMemory(
+                self.settings.get('tm_path', 'data/translation_memory/tm.db'),
+                max_memory_entries=self.settings.get('tm_memory_cache_size', 2000),
+                fuzzy_threshold=self.settings.get('tm_fuzzy_threshold', 0.85),
+                max_examples=self.settings.get('tm_fuzzy_max_examples', 2)
+            )
+            # 使用知识库的向量模型（BGE-M3）检索相似原文，缺少向量的原文在后台补建
+            if self.settings.get('tm_fuzzy_enabled', True) and self.translation_memory.set_encoder(self.vector_db):
+                self.translation_memory.start_indexing()
+
         # 初始化翻译引擎
         self.translator = Translator(self.ai_engine, self.term_base, self.settings)
+        self.translator.translation_memory = self.translation_memory
 
         # 初始化文本监控
         self.text_monitor = TextMonitor(self.translator)
@@ -917,9 +954,13 @@ class AIAssistant:
 
     def shutdown(self):
         """关闭应用，保存配置"""
+        if hasattr(self, 'data_watcher'):
+            self.data_watcher.stop()
         self.settings.save()
         self.knowledge_base.save()
         self.term_base.save()
+        if hasattr(self, 'translation_memory'):
+            self.translation_memory.close()
 
     def chat(self, message, history=None, system_prompt=None):
         """处理聊天请求"""
@@ -1008,9 +1049,78 @@ class AIAssistant:
             traceback.print_exc()
             return f"抱歉，处理您的请求时出现错误: {str(e)}"
 
+    def _get_llm_tokenizer(self):
+        """获取已加载的LLM分词器，用于按token计算提示词长度"""
+        chat_engine = getattr(getattr(self, 'ai_engine', None), 'chat_engine', None)
+        return getattr(chat_engine, 'tokenizer', None)
+
+    def _get_answer_model_id(self):
+        """获取当前回答模型的标识，用于区分语义答案缓存"""
+        model_path = None
+        if hasattr(self, 'ai_engine') and self.ai_engine:
+            model_path = getattr(self.ai_engine, 'model_path', None)
+        return f"{self.settings.get('model_name', '')}|{model_path or self.settings.get('model_path', '')}"
+
+    def _encode_question(self, message):
+        """编码用户问题，供直达答案和语义答案缓存共用"""
+        if not getattr(self, 'knowledge_base', None) or not self.knowledge_base.vector_db:
+            return None
+        try:
+            return self.knowledge_base.vector_db.encode_text(message)
+        except Exception as e:
+            print(f"[ERROR] 编码问题失败: {e}")
+            return None
+
+    def _answer_cache_enabled(self):
+        """语义答案缓存是否可用（查询和写入共用同一开关）"""
+        return bool(getattr(self, 'answer_cache', None)) and self.settings.get('kb_answer_cache_enabled', True)
+
+    def _lookup_answer_cache(self, embedding, model_id=None):
+        """查询语义答案缓存，返回命中的答案；model_id 默认为当前本地模型"""
+        if embedding is None or not self._answer_cache_enabled():
+            return None
+        try:
+            cached = self.answer_cache.lookup(embedding, self.knowledge_base.generation,
+                                              model_id or self._get_answer_model_id())
+            if cached:
+                print(f"[INFO] 语义答案缓存命中 (相似度: {cached['similarity']:.4f}, 原问题: {cached['question']})")
+                return cached['answer']
+            return None
+        except Exception as e:
+            print(f"[ERROR] 查询语义答案缓存失败: {e}")
+            return None
+
+    def _store_answer_cache(self, message, embedding, answer, model_id=None):
+        """写入语义答案缓存，缓存关闭时不写入"""
+        if embedding is None or not answer or not self._answer_cache_enabled():
+            return None
+        try:
+            return self.answer_cache.store(message, embedding, answer, self.knowledge_base.generation,
+                                           model_id or self._get_answer_model_id())
+        except Exception as e:
+            print(f"[ERROR] 写入语义答案缓存失败: {e}")
+            return None
+
     def chat_with_knowledge(self, message, history=None, system_prompt=None):
         """使用知识库辅助的聊天请求"""
         try:
+            self.last_context_report = None
+            question_embedding = self._encode_question(message)
+
+            # 问答组高置信度命中时直接返回标准答案，不调用LLM
+            if question_embedding is not None:
+                direct = self.knowledge_base.match_direct_answer(message, question_embedding)
+                if direct:
+                    return direct['answer']
+
+            # 单轮问答再查语义答案缓存，命中时跳过LLM生成
+            cache_embedding = None
+            if not history and not system_prompt:
+                cached_answer = self._lookup_answer_cache(question_embedding)
+                if cached_answer:
+                    return cached_answer
+                cache_embedding = question_embedding
+
             # 首先尝试从知识库获取相关信息
             knowledge_text = ""
             if hasattr(self, 'knowledge_base') and self.knowledge_base:
@@ -1018,26 +1128,15 @@ class AIAssistant:
                     # 搜索相关知识
                     knowledge_results = self.knowledge_base.search(message, top_k=5)
                     if knowledge_results:
-                        knowledge_items = []
-                        for result in knowledge_results:
-                            if isinstance(result, dict):
-                                # 处理字典类型的结果
-                                content = result.get('content', '')
-                                metadata = result.get('metadata', {})
-
-                                # 如果是问答对类型，格式化显示
-                                if metadata.get('type') == 'qa_group':
-                                    question = metadata.get('question', '')
-                                    answer = metadata.get('answer', '')
-                                    knowledge_items.append(f"问题：{question}\n答案：{answer}")
-                                else:
-                                    knowledge_items.append(content)
-                            else:
-                                # 处理字符串类型的结果
-                                knowledge_items.append(str(result))
-
-                        if knowledge_items:
-                            knowledge_text = "\n\n".join(knowledge_items[:3])  # 最多使用3个知识条目
+                        # 按token预算打包知识片段
+                        knowledge_text, self.last_context_report = pack_knowledge_context(
+                            knowledge_results,
+                            tokenizer=self._get_llm_tokenizer(),
+                            token_budget=self.settings.get('kb_context_token_budget', 1024),
+                            query=message,
+                            compressor=getattr(self.knowledge_base, 'compressor', None),
+                            query_vector=question_embedding
+                        )
                 except Exception as e:
                     print(f"知识库搜索失败: {e}")
 
@@ -1062,7 +1161,13 @@ class AIAssistant:
                 enhanced_message = "知识库中没有相关的答案"
 
             # 调用普通聊天方法
-            return self.chat(enhanced_message, history, system_prompt)
+            answer = self.chat(enhanced_message, history, system_prompt)
+
+            # 仅缓存基于知识库内容生成的正常回答
+            if knowledge_text and answer and not answer.startswith("抱歉，处理您的请求时出现错误"):
+                self._store_answer_cache(message, cache_embedding, answer)
+
+            return answer
 
         except Exception as e:
             print(f"知识库辅助对话出错: {e}")
@@ -59,10 +59,54 @@ class Settings:
             "kb_threshold": 0.7,               # 知识库搜索相似度阈值
             "kb_temperature": 0.6,             # 知识库问答专用温度参数
             "enable_knowledge": True,          # 是否启用知识库问答
+            "kb_storage_backend": "sqlite",    # 知识条目存储后端: sqlite / json
+            "kb_query_cache_size": 256,        # 知识库检索结果缓存条数(0为关闭)
+            "kb_rerank_enabled": False,        # 是否启用交叉编码器重排序
+            "kb_rerank_model_path": os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "BAAI", "bge-reranker-v2-m3"),
+            "kb_rerank_top_n": 20,             # 参与重排序的候选数上限
+            "kb_rerank_keep": 3,               # 重排序后保留的片段数
+            "kb_rerank_min_score": 0.0,        # 重排序最低相关度(0~1)
+            "kb_rerank_timeout": 2.0,          # 单次重排序超时(秒)，超时回退向量排序
+            "kb_rerank_latency_budget_ms": 800,  # 重排序延迟预算(毫秒)，据此自适应裁剪候选数
+            "kb_answer_cache_enabled": True,   # 是否启用知识库问答语义答案缓存
+            "kb_answer_cache_threshold": 0.95, # 命中缓存所需的问题向量余弦相似度
+            "kb_answer_cache_size": 500,       # 语义答案缓存条数上限
+            "kb_direct_answer_enabled": True,  # 问答组高置信度命中时直接返回标准答案
+            "kb_direct_answer_threshold": 0.92,  # 直达答案所需的问题相似度
+            "kb_context_token_budget": 1024,   # 知识库问答提示词中知识内容的token预算
+            "kb_compression_enabled": True,    # 是否对知识片段做抽取式压缩
+            "kb_compression_top_sentences": 8, # 压缩时保留的最相关句子数
+            "kb_compression_neighbours": 1,    # 每个保留句子前后各保留的相邻句数
+            "kb_chunk_max_tokens": 512,        # 文档切分时每个片段的最大token数(按向量模型分词器计算)
+            "kb_chunk_overlap_tokens": 64,     # 相邻文档片段之间的重叠token数
+            "kb_import_batch_size": 16,        # 导入文档时批量编码的片段数
+            "kb_backfill_batch_size": 32,      # 后台向量补建每批编码的条目数(每批写一次检查点)
 
             # 术语库设置
             "term_path": "data/terms",
             "term_vector_path": "data/term_vectors",
+            "term_backfill_batch_size": 32,    # 术语向量后台补建每批编码的条目数
+            "term_fuzzy_match_enabled": True,  # 术语匹配接口是否报告模糊匹配(词形变化/大小写/连字符/少量拼写错误)，翻译只用精确匹配
+            "term_fuzzy_min_score": 0.75,      # 模糊术语匹配的最低置信度
+
+            # 数据文件热加载
+            "hot_reload_enabled": True,        # 术语/知识/向量数据文件被外部修改后自动重新加载
+            "hot_reload_interval": 2.0,        # 数据文件轮询间隔(秒)
+
+            # 翻译记忆库
+            "tm_enabled": True,                # 是否启用翻译记忆库(相同原文直接复用已验证的译文)
+            "tm_path": "data/translation_memory/tm.db",  # 翻译记忆库数据库路径
+            "tm_memory_cache_size": 2000,      # 翻译记忆库内存缓存条数上限
+            "tm_fuzzy_enabled": True,          # 是否用向量检索相似原文，把已有译文作为示例放入提示词
+            "tm_fuzzy_threshold": 0.85,        # 相似译文示例所需的原文向量余弦相似度
+            "tm_fuzzy_max_examples": 2,        # 每次翻译最多使用的相似译文示例数
+
+            # 分句翻译
+            "segment_translation_enabled": True,  # 长文本按句子拆分翻译(逐句查翻译记忆库，未命中的句子分批翻译)
+            "segment_min_chars": 200,          # 超过该字符数的文本才分句翻译
+            "segment_batch_chars": 800,        # 每批交给模型的原文最大字符数
+            "segment_batch_size": 8,           # 每批最多句子数
+            "segment_workers": 1,              # 同时翻译的批数(本地模型保持1，外部API可以调大)
 
             # 更新设置
             "auto_check_updates": True,
@@ -79,13 +79,14 @@ class AIEngine:
             traceback.print_exc()
             return f"生成回复时出错: {str(e)}"
     
-    def translate_text(self, text, source_lang=None, target_lang='en', use_termbase=True):
+    def translate_text(self, text, source_lang=None, target_lang='en', use_termbase=True, examples=None):
         """翻译文本，转发到翻译引擎"""
         return self.translation_engine.translate_text(
             text=text,
             source_lang=source_lang,
             target_lang=target_lang,
-            use_termbase=use_termbase
+            use_termbase=use_termbase,
+            examples=examples
         )
     
     def translate(self, text, source_lang=None, target_lang='en', use_termbase=True):
@@ -0,0 +1,158 @@
+"""
+知识库问答语义答案缓存
+
+缓存 (问题向量, 知识库版本号, 模型标识, 答案)。新问题与已缓存问题的余弦相似度
+超过阈值且知识库版本、模型一致时直接返回缓存答案，跳过LLM生成。
+"""
+
+import time
+import threading
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """基于问题向量相似度的答案缓存（线程安全）"""
+
+    def __init__(self, threshold=0.95, max_entries=500):
+        self.threshold = threshold
+        self.max_entries = max(1, int(max_entries))
+
+        self._lock = threading.Lock()
+        self._entries = []      # [{id, question, answer, generation, model_id, created_at, last_hit_at, hits}]
+        self._vectors = []      # 与 _entries 一一对应的归一化问题向量
+        self._matrix = None     # 懒构建的向量矩阵
+        self._next_id = 1
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _remove_at(self, index):
+        del self._entries[index]
+        del self._vectors[index]
+        self._matrix = None
+
+    def lookup(self, embedding, generation, model_id):
+        """
+        查找语义相近的已缓存答案
+
+        Returns:
+            dict: 命中的缓存条目副本(含 similarity)，未命中返回None
+        """
+        if embedding is None:
+            return None
+        query = self._normalize(embedding)
+
+        with self._lock:
+            if not self._entries:
+                self.misses += 1
+                return None
+            if self._matrix is None:
+                self._matrix = np.vstack(self._vectors)
+            if self._matrix.shape[1] != query.shape[0]:
+                self.misses += 1
+                return None
+
+            similarities = self._matrix @ query
+            # 只在相同知识库版本和模型下匹配
+            best_index, best_sim = -1, -1.0
+            for index in np.argsort(-similarities):
+                sim = float(similarities[index])
+                if sim < self.threshold:
+                    break
+                entry = self._entries[index]
+                if entry['generation'] == generation and entry['model_id'] == model_id:
+                    best_index, best_sim = int(index), sim
+                    break
+
+            if best_index < 0:
+                self.misses += 1
+                return None
+
+            entry = self._entries[best_index]
+            entry['hits'] += 1
+            entry['last_hit_at'] = time.time()
+            self.hits += 1
+            result = dict(entry)
+            result['similarity'] = round(best_sim, 4)
+            return result
+
+    def store(self, question, embedding, answer, generation, model_id):
+        """写入一条缓存，并清理已过期版本的条目"""
+        if embedding is None or not answer:
+            return None
+        vector = self._normalize(embedding)
+
+        with self._lock:
+            # 旧知识库版本的条目永远不会再命中，直接清理
+            stale = [i for i, e in enumerate(self._entries) if e['generation'] != generation]
+            for index in reversed(stale):
+                self._remove_at(index)
+                self.evictions += 1
+
+            # 超出容量时淘汰最久未命中的条目
+            while len(self._entries) >= self.max_entries:
+                lru_index = min(range(len(self._entries)),
+                                key=lambda i: self._entries[i]['last_hit_at'])
+                self._remove_at(lru_index)
+                self.evictions += 1
+
+            now = time.time()
+            entry = {
+                'id': self._next_id,
+                'question': question,
+                'answer': answer,
+                'generation': generation,
+                'model_id': model_id,
+                'created_at': now,
+                'last_hit_at': now,
+                'hits': 0
+            }
+            self._next_id += 1
+            self._entries.append(entry)
+            self._vectors.append(vector)
+            self._matrix = None
+            return entry['id']
+
+    def remove(self, entry_id):
+        """删除指定缓存条目"""
+        with self._lock:
+            for index, entry in enumerate(self._entries):
+                if entry['id'] == entry_id:
+                    self._remove_at(index)
+                    return True
+        return False
+
+    def clear(self):
+        with self._lock:
+            self._entries = []
+            self._vectors = []
+            self._matrix = None
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def list_entries(self, limit=100):
+        """按命中次数列出缓存条目，供管理界面查看"""
+        with self._lock:
+            entries = sorted(self._entries, key=lambda e: e['hits'], reverse=True)
+            return [dict(e) for e in entries[:limit]]
+
+    def get_stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'threshold': self.threshold,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0
+            }
@@ -0,0 +1,109 @@
+"""
+知识上下文抽取式压缩
+
+在检索和提示词构建之间，把知识片段切分为句子，与问题向量做一次批量相似度计算，
+只保留得分最高的句子及其前后相邻句，按原文顺序重组。问答对片段保持原样，
+保证严格模式下答案可以直接引用原文。
+"""
+
+import numpy as np
+
+from core.text_segmenter import split_sentences
+
+
+class ExtractiveCompressor:
+    """基于句向量相似度的抽取式上下文压缩"""
+
+    def __init__(self, vector_db, top_sentences=8, neighbours=1, min_sentences=4):
+        self.vector_db = vector_db
+        self.top_sentences = top_sentences
+        self.neighbours = neighbours
+        # 句子数少于该值的片段不压缩
+        self.min_sentences = min_sentences
+
+    @staticmethod
+    def _normalize_rows(matrix):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def compress(self, query, chunks, query_vector=None):
+        """
+        压缩知识片段
+
+        Args:
+            query (str): 用户问题
+            chunks (list): [{'text': str, 'score': float, 'compressible': bool}]
+            query_vector: 已计算的问题向量，可选
+
+        Returns:
+            tuple: (压缩后的片段列表, 统计报告)
+        """
+        report = {'sentences_in': 0, 'sentences_kept': 0,
+                  'chars_in': sum(len(c['text']) for c in chunks), 'chars_out': 0,
+                  'compressed': False}
+
+        # 收集可压缩片段的全部句子
+        chunk_sentences = {}
+        flat = []  # [(片段序号, 句子序号, 句子)]
+        for ci, chunk in enumerate(chunks):
+            if not chunk.get('compressible', True):
+                continue
+            sentences = split_sentences(chunk['text'])
+            if len(sentences) < self.min_sentences:
+                continue
+            chunk_sentences[ci] = sentences
+            flat.extend((ci, si, s.strip()) for si, s in enumerate(sentences))
+        report['sentences_in'] = len(flat)
+
+        if not flat or len(flat) <= self.top_sentences:
+            report['chars_out'] = report['chars_in']
+            return chunks, report
+
+        try:
+            # 问题与所有句子一次批量编码
+            texts = [s for _, _, s in flat]
+            if query_vector is None:
+                vectors = self.vector_db.encode_texts([query] + texts)
+                query_vector, sentence_vectors = vectors[0], vectors[1:]
+            else:
+                sentence_vectors = self.vector_db.encode_texts(texts)
+            if query_vector is None or any(v is None for v in sentence_vectors):
+                raise ValueError("句子向量编码失败")
+
+            matrix = self._normalize_rows(np.vstack([np.asarray(v, dtype=np.float32).reshape(-1)
+                                                     for v in sentence_vectors]))
+            query_vector = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+            query_vector = query_vector / (np.linalg.norm(query_vector) or 1.0)
+            scores = matrix @ query_vector
+        except Exception as e:
+            print(f"[WARNING] 上下文压缩失败，使用原始片段: {e}")
+            report['chars_out'] = report['chars_in']
+            return chunks, report
+
+        # 选出得分最高的句子，并保留相邻句以维持上下文连贯
+        keep = set()
+        for index in np.argsort(-scores)[:self.top_sentences]:
+            ci, si, _ = flat[index]
+            for offset in range(-self.neighbours, self.neighbours + 1):
+                if 0 <= si + offset < len(chunk_sentences[ci]):
+                    keep.add((ci, si + offset))
+
+        compressed = []
+        for ci, chunk in enumerate(chunks):
+            if ci not in chunk_sentences:
+                compressed.append(chunk)
+                continue
+            kept = [s for si, s in enumerate(chunk_sentences[ci]) if (ci, si) in keep]
+            if not kept:
+                continue
+            new_chunk = dict(chunk)
+            new_chunk['text'] = ''.join(kept).strip()
+            compressed.append(new_chunk)
+
+        report['sentences_kept'] = len(keep)
+        report['chars_out'] = sum(len(c['text']) for c in compressed)
+        report['compressed'] = True
+        print(f"[INFO] 上下文压缩: 句子 {report['sentences_in']} -> {report['sentences_kept']}，"
+              f"字符 {report['chars_in']} -> {report['chars_out']}")
+        return compressed, report
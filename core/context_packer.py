@@ -0,0 +1,175 @@
+"""
+知识上下文打包
+
+把检索到的知识片段按token预算装入提示词：
+- 按相关度从高到低选取片段
+- 超出剩余预算的片段在句子边界截断；首句本身超出预算时按token硬截断该句
+- 去除与已选片段重复的句子
+- 统计每次请求节省的token数
+"""
+
+import re
+
+from core.text_segmenter import split_sentences, make_token_counter
+
+# 参与句子去重的最短长度，避免"答案："之类的短句被误判为重复
+_MIN_DEDUPE_CHARS = 8
+# 已有片段时，剩余预算至少这么多token才硬截断超长首句，避免追加无意义的残句
+_MIN_TRUNCATED_TOKENS = 16
+
+
+def knowledge_results_to_chunks(results):
+    """
+    将知识库检索结果转换为待打包的片段
+
+    Returns:
+        list: [{'text': 片段文本, 'score': 相关度, 'compressible': 是否允许压缩}]
+    """
+    chunks = []
+    for result in results or []:
+        if isinstance(result, dict):
+            metadata = result.get('metadata') or {}
+            # 问答对类型只保留问题和答案，且不做压缩
+            is_qa = metadata.get('type') == 'qa_group'
+            if is_qa:
+                text = f"问题：{metadata.get('question', '')}\n答案：{metadata.get('answer', '')}"
+            else:
+                text = result.get('content', '')
+            score = result.get('rerank_score', result.get('similarity', 0.0))
+        else:
+            text, score, is_qa = str(result), 0.0, False
+        if text and text.strip():
+            chunks.append({'text': text.strip(), 'score': float(score or 0.0), 'compressible': not is_qa})
+    return chunks
+
+
+class ContextPacker:
+    """按token预算打包知识片段"""
+
+    def __init__(self, tokenizer=None, token_budget=1024, separator="\n\n"):
+        self.count_tokens = make_token_counter(tokenizer)
+        self.token_budget = token_budget
+        self.separator = separator
+        self._separator_tokens = self.count_tokens(separator) if separator.strip() else 1
+
+    @staticmethod
+    def _sentence_key(sentence):
+        return re.sub(r'\s+', '', sentence)
+
+    def _truncate(self, text, max_tokens):
+        """截取不超过 max_tokens 的最长前缀（按字符二分查找）"""
+        if max_tokens <= 0:
+            return ''
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count_tokens(text[:middle]) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low].strip()
+
+    def pack(self, chunks):
+        """
+        打包知识片段
+
+        Args:
+            chunks (list): [{'text': str, 'score': float}]
+
+        Returns:
+            tuple: (打包后的片段文本列表, 统计报告)
+        """
+        ranked = sorted(chunks, key=lambda c: c.get('score', 0.0), reverse=True)
+        original_tokens = sum(self.count_tokens(c['text']) for c in ranked)
+
+        remaining = self.token_budget
+        packed = []
+        seen_sentences = set()
+        trimmed = 0
+        duplicates = 0
+
+        for chunk in ranked:
+            if remaining <= 0:
+                break
+
+            # 整段已被已选片段包含时直接跳过
+            if any(chunk['text'] in selected for selected in packed):
+                duplicates += 1
+                continue
+
+            cost = self._separator_tokens if packed else 0
+            kept = []
+            truncated = False
+            for sentence in split_sentences(chunk['text']):
+                key = self._sentence_key(sentence)
+                if len(key) >= _MIN_DEDUPE_CHARS and key in seen_sentences:
+                    duplicates += 1
+                    continue
+                tokens = self.count_tokens(sentence)
+                if cost + tokens > remaining:
+                    if not kept and (not packed or remaining - cost >= _MIN_TRUNCATED_TOKENS):
+                        # 首句本身超出剩余预算时截断该句，避免高相关片段整段被丢弃
+                        head = self._truncate(sentence, remaining - cost)
+                        if head:
+                            kept.append(head)
+                            cost += self.count_tokens(head)
+                    truncated = True
+                    break
+                kept.append(sentence)
+                cost += tokens
+                if len(key) >= _MIN_DEDUPE_CHARS:
+                    seen_sentences.add(key)
+
+            if not kept:
+                continue
+
+            packed.append(''.join(kept).strip())
+            remaining -= cost
+            if truncated:
+                trimmed += 1
+
+        packed_tokens = self.token_budget - remaining
+        report = {
+            'token_budget': self.token_budget,
+            'chunks_in': len(chunks),
+            'chunks_used': len(packed),
+            'chunks_trimmed': trimmed,
+            'duplicates_removed': duplicates,
+            'original_tokens': original_tokens,
+            'packed_tokens': packed_tokens,
+            'tokens_saved': max(0, original_tokens - packed_tokens)
+        }
+        return packed, report
+
+    def pack_text(self, chunks):
+        """打包并拼接为一段文本，返回 (文本, 统计报告)"""
+        packed, report = self.pack(chunks)
+        return self.separator.join(packed), report
+
+
+def pack_knowledge_context(results, tokenizer=None, token_budget=1024,
+                           query=None, compressor=None, query_vector=None):
+    """
+    将知识库检索结果按token预算打包为提示词上下文
+
+    提供 compressor 和 query 时先做抽取式压缩，再按预算打包。
+
+    Returns:
+        tuple: (文本, 统计报告)
+    """
+    chunks = knowledge_results_to_chunks(results)
+    packer = ContextPacker(tokenizer=tokenizer, token_budget=token_budget)
+    original_tokens = sum(packer.count_tokens(c['text']) for c in chunks)
+
+    compression = None
+    if compressor is not None and query:
+        chunks, compression = compressor.compress(query, chunks, query_vector=query_vector)
+
+    text, report = packer.pack_text(chunks)
+    # 节省量按压缩前的原始片段计算
+    report['original_tokens'] = original_tokens
+    report['tokens_saved'] = max(0, original_tokens - report['packed_tokens'])
+    report['compression'] = compression
+    print(f"[INFO] 知识上下文打包: {report['chunks_used']}/{report['chunks_in']} 个片段，"
+          f"{report['original_tokens']} -> {report['packed_tokens']} tokens，节省 {report['tokens_saved']} tokens")
+    return text, report
@@ -0,0 +1,105 @@
+"""
+按token长度切分文档
+
+以向量模型分词器的token数衡量片段长度：
+- 小段落合并到同一片段，避免大量低价值碎片
+- 超长段落在中英文句子边界拆分，单句仍超长时按字符硬切
+- 相邻片段之间保留可配置的重叠句子
+- 以生成器方式逐段输出，大文档可以流式导入
+"""
+
+import re
+
+from core.text_segmenter import split_sentences, make_token_counter
+
+
+class TokenAwareChunker:
+    """按token长度切分文档的分块器"""
+
+    def __init__(self, tokenizer=None, max_tokens=512, overlap_tokens=64):
+        self.count_tokens = make_token_counter(tokenizer)
+        self.max_tokens = max(16, int(max_tokens))
+        self.overlap_tokens = max(0, min(int(overlap_tokens), self.max_tokens // 2))
+
+    @staticmethod
+    def iter_paragraphs(source):
+        """按空行切分段落，source 可以是字符串或逐行迭代的文件对象"""
+        if isinstance(source, str):
+            for para in re.split(r'\n\s*\n', source):
+                if para.strip():
+                    yield para.strip()
+            return
+
+        lines = []
+        for line in source:
+            if line.strip():
+                lines.append(line.rstrip('\r\n'))
+            elif lines:
+                yield '\n'.join(lines).strip()
+                lines = []
+        if lines:
+            yield '\n'.join(lines).strip()
+
+    def _hard_split(self, sentence):
+        """单句超过上限时按字符比例硬切"""
+        tokens = self.count_tokens(sentence)
+        pieces = max(2, -(-tokens // self.max_tokens))
+        size = max(1, -(-len(sentence) // pieces))
+        for start in range(0, len(sentence), size):
+            piece = sentence[start:start + size]
+            yield piece, self.count_tokens(piece)
+
+    def _iter_units(self, paragraph):
+        """把段落展开为句子级 (文本, token数) 单元，段落末句后接空行"""
+        sentences = split_sentences(paragraph)
+        for i, sentence in enumerate(sentences):
+            if i == len(sentences) - 1:
+                sentence = sentence.rstrip() + '\n\n'
+            sentence_tokens = self.count_tokens(sentence)
+            if sentence_tokens <= self.max_tokens:
+                yield sentence, sentence_tokens
+            else:
+                yield from self._hard_split(sentence)
+
+    def _overlap_tail(self, units):
+        """取上一片段末尾不超过重叠预算的单元"""
+        if not self.overlap_tokens:
+            return []
+        tail, total = [], 0
+        for text, tokens in reversed(units):
+            if total + tokens > self.overlap_tokens:
+                break
+            tail.insert(0, (text, tokens))
+            total += tokens
+        return tail
+
+    def iter_chunks(self, source):
+        """
+        逐个生成文档片段
+
+        Args:
+            source: 文档字符串或逐行迭代的文件对象
+
+        Yields:
+            str: 片段文本
+        """
+        current, current_tokens = [], 0
+        fresh = False  # 当前片段是否含有重叠部分之外的新内容
+
+        for paragraph in self.iter_paragraphs(source):
+            for text, tokens in self._iter_units(paragraph):
+                if current and current_tokens + tokens > self.max_tokens:
+                    if fresh:
+                        yield ''.join(t for t, _ in current).strip()
+                    current = self._overlap_tail(current)
+                    current_tokens = sum(n for _, n in current)
+                    # 重叠部分加上新单元仍超限时放弃重叠
+                    if current_tokens + tokens > self.max_tokens:
+                        current, current_tokens = [], 0
+                    fresh = False
+                current.append((text, tokens))
+                current_tokens += tokens
+                fresh = True
+
+        if current and fresh:
+            yield ''.join(t for t, _ in current).strip()
@@ -0,0 +1,312 @@
+"""
+Word 文档翻译任务
+
+逐段调用 translate() 翻译 Word 文档时，重复的表格单元格会被反复翻译，重新生成的文档也丢失了字体、
+加粗等格式。本任务：
+- 收集正文、表格（含嵌套表格和合并单元格）、页眉页脚中的全部段落，拆成句子后全文去重
+- 通过分句翻译流水线查翻译记忆库并批量翻译未命中的句子
+- 译文按句子写回原文档的文本块（run，含超链接中的文本块），保留段落样式和各文本块的字符格式，
+  图片等非文本内容不受影响
+- 定期保存检查点，中断后重新运行同一文档时跳过已翻译的句子
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import traceback
+from datetime import datetime
+
+from docx import Document
+from docx.text.run import Run
+
+from core.segment_pipeline import split_segments, render_segments
+
+_W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+# 段落中包含文本块的行内容器（paragraph.runs 只返回段落直属的文本块）
+_INLINE_CONTAINERS = {f'{{{_W_NS}}}{tag}' for tag in ('hyperlink', 'smartTag', 'ins', 'fldSimple')}
+
+
+def iter_docx_paragraphs(document):
+    """按文档顺序遍历正文、表格和页眉页脚中的段落，合并单元格只返回一次"""
+    seen_cells = set()
+
+    def walk(container):
+        for paragraph in container.paragraphs:
+            yield paragraph
+        for table in container.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    # 合并单元格会在每个被合并的位置重复返回
+                    if cell._tc in seen_cells:
+                        continue
+                    seen_cells.add(cell._tc)
+                    yield from walk(cell)
+
+    yield from walk(document)
+    for section in document.sections:
+        for part in (section.header, section.footer):
+            # 链接到上一节的页眉页脚与上一节共用内容
+            if not part.is_linked_to_previous:
+                yield from walk(part)
+
+
+def _iter_run_elements(element):
+    """按文档顺序返回段落中的文本块元素，包括超链接等行内容器中的文本块"""
+    for child in element:
+        if child.tag == f'{{{_W_NS}}}r':
+            yield child
+        elif child.tag in _INLINE_CONTAINERS:
+            yield from _iter_run_elements(child)
+
+
+def _text_runs(paragraph):
+    """段落中包含文字、且不含图片的文本块（按文档顺序）"""
+    runs = []
+    for element in _iter_run_elements(paragraph._p):
+        run = Run(element, paragraph)
+        if not run.text:
+            continue
+        if element.findall(f'{{{_W_NS}}}drawing') or element.findall(f'{{{_W_NS}}}pict'):
+            continue
+        runs.append(run)
+    return runs
+
+
+def _file_digest(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DocxTranslationJob:
+    """可断点续跑的 Word 文档翻译任务"""
+
+    def __init__(self, input_path, output_path, pipeline, target_lang=None, checkpoint_path=None,
+                 checkpoint_interval=20, progress_callback=None):
+        """
+        Args:
+            input_path (str): 原文档路径
+            output_path (str): 译文文档路径
+            pipeline: SegmentPipeline 实例
+            target_lang (str): 目标语言，决定句间是否保留空格
+            checkpoint_path (str): 检查点文件路径，默认为译文路径加 .checkpoint.json
+            checkpoint_interval (int): 每翻译多少句保存一次检查点
+            progress_callback: progress_callback(progress) ，每完成一句调用
+        """
+        self.input_path = input_path
+        self.output_path = output_path
+        self.pipeline = pipeline
+        self.target_lang = target_lang
+        self.checkpoint_path = checkpoint_path or output_path + '.checkpoint.json'
+        self.checkpoint_interval = max(1, int(checkpoint_interval))
+        self.progress_callback = progress_callback
+
+        self._lock = threading.RLock()
+        self._digest = None
+        # 已完成的译文 {原句: 译文}
+        self.translations = {}
+        self.progress = {
+            'status': 'pending',
+            'paragraphs': 0,
+            'total': 0,
+            'translated': 0,
+            'resumed': 0,
+            'failed': 0,
+            'started_at': None,
+            'finished_at': None,
+            'last_checkpoint': None,
+            'output_path': output_path,
+            'error': None
+        }
+
+    # ---------- 检查点 ----------
+
+    def _load_checkpoint(self):
+        """加载检查点，原文档已变化时丢弃"""
+        if not os.path.exists(self.checkpoint_path):
+            return {}
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('source_digest') != self._digest or data.get('target_lang') != self.target_lang:
+                print("[INFO] 原文档或目标语言已变化，忽略旧的翻译检查点")
+                return {}
+            translations = data.get('translations', {})
+            print(f"[INFO] 从检查点恢复 {len(translations)} 句译文")
+            return translations
+        except Exception as e:
+            print(f"[WARNING] 加载文档翻译检查点失败，将重新翻译: {e}")
+            return {}
+
+    def save_checkpoint(self):
+        """写入检查点（临时文件替换，避免写到一半损坏）"""
+        with self._lock:
+            data = {
+                'source_path': os.path.abspath(self.input_path),
+                'source_digest': self._digest,
+                'target_lang': self.target_lang,
+                'translations': dict(self.translations),
+                'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+        try:
+            os.makedirs(os.path.dirname(self.checkpoint_path) or '.', exist_ok=True)
+            temp_path = self.checkpoint_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.checkpoint_path)
+            self.progress['last_checkpoint'] = data['updated_at']
+            return True
+        except Exception as e:
+            print(f"[ERROR] 保存文档翻译检查点失败: {e}")
+            return False
+
+    # ---------- 执行 ----------
+
+    def iter_run(self):
+        """
+        执行翻译并逐句产生进度
+
+        Yields:
+            dict: 进度（get_progress 的内容），最后一次的 status 为 completed 或 failed
+        """
+        self.progress.update(status='running', started_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                             finished_at=None, error=None)
+        try:
+            self._digest = _file_digest(self.input_path)
+            document = Document(self.input_path)
+
+            # 收集段落并拆成句子
+            paragraphs = []
+            for paragraph in iter_docx_paragraphs(document):
+                runs = _text_runs(paragraph)
+                text = ''.join(run.text for run in runs)
+                if text.strip():
+                    paragraphs.append((runs, split_segments(text)))
+            sentences = list(dict.fromkeys(piece.strip() for _, pieces in paragraphs
+                                           for piece, translate in pieces if translate))
+
+            sentence_set = set(sentences)
+            self.translations = {source: target for source, target in self._load_checkpoint().items()
+                                 if source in sentence_set}
+            pending = [source for source in sentences if source not in self.translations]
+            self.progress.update(paragraphs=len(paragraphs), total=len(sentences),
+                                 resumed=len(self.translations), translated=len(self.translations), failed=0)
+            print(f"[INFO] 开始翻译文档 {os.path.basename(self.input_path)}: {len(paragraphs)} 个段落，"
+                  f"{len(sentences)} 个不重复句子，待翻译 {len(pending)} 句")
+            yield self.get_progress()
+
+            unsaved = 0
+            for event in self.pipeline.run_units(pending):
+                if event['event'] != 'segment':
+                    continue
+                if event['origin'] == 'failed':
+                    self.progress['failed'] += 1
+                else:
+                    with self._lock:
+                        self.translations[event['source']] = event['translation']
+                    self.progress['translated'] += 1
+                    unsaved += 1
+                    if unsaved >= self.checkpoint_interval:
+                        self.save_checkpoint()
+                        unsaved = 0
+                progress = self.get_progress()
+                if self.progress_callback:
+                    self.progress_callback(progress)
+                yield progress
+            if unsaved:
+                self.save_checkpoint()
+
+            # 写回原文档
+            for runs, pieces in paragraphs:
+                self._write_paragraph(runs, pieces)
+            os.makedirs(os.path.dirname(os.path.abspath(self.output_path)), exist_ok=True)
+            document.save(self.output_path)
+
+            # 全部翻译成功后删除检查点；有失败的句子时保留，再次运行只重试失败的句子
+            if not self.progress['failed'] and os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+            self.progress.update(status='completed', finished_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            print(f"[INFO] 文档翻译完成: {self.output_path}（失败 {self.progress['failed']} 句）")
+        except Exception as e:
+            print(f"[ERROR] 文档翻译失败: {e}")
+            traceback.print_exc()
+            self.progress.update(status='failed', error=str(e),
+                                 finished_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            # 已完成的译文写入检查点，重新运行时继续
+            if self._digest and self.translations:
+                self.save_checkpoint()
+        progress = self.get_progress()
+        if self.progress_callback:
+            self.progress_callback(progress)
+        yield progress
+
+    def run(self):
+        """
+        执行翻译
+
+        Returns:
+            str: 译文文档路径
+
+        Raises:
+            RuntimeError: 翻译失败
+        """
+        start = time.time()
+        for _ in self.iter_run():
+            pass
+        if self.progress['status'] != 'completed':
+            raise RuntimeError(f"文档翻译失败: {self.progress['error']}")
+        print(f"[INFO] 文档翻译耗时 {time.time() - start:.1f} 秒")
+        return self.output_path
+
+    def _write_paragraph(self, runs, pieces):
+        """
+        把段落译文按句子写回各自的文本块，保留每个文本块的字符格式
+
+        整句位于一个文本块内时译文写入该文本块；跨多个文本块的句子（如句中一个词加粗）
+        译文写入其所在的第一个文本块，其余文本块中属于该句的部分清空。未翻译的片段按原文保留。
+        """
+        translations = {index: self.translations[piece.strip()] for index, (piece, translate) in enumerate(pieces)
+                        if translate and piece.strip() in self.translations}
+        if not translations or not runs:
+            return False
+
+        # 各文本块在段落文本中的结束位置
+        ends = []
+        position = 0
+        for run in runs:
+            position += len(run.text)
+            ends.append(position)
+
+        rendered = render_segments(pieces, translations, self.target_lang)
+        outputs = [[] for _ in runs]
+        start = 0
+        current = 0  # 片段起点所在的文本块
+        for index, ((text, _), output) in enumerate(zip(pieces, rendered)):
+            end = start + len(text)
+            while current < len(runs) - 1 and ends[current] <= start:
+                current += 1
+            if index in translations or output != text:
+                outputs[current].append(output)
+            else:
+                # 原文片段跨文本块时按原位置切分
+                run_index, offset = current, start
+                while offset < end:
+                    stop = min(end, ends[run_index]) if run_index < len(runs) - 1 else end
+                    outputs[run_index].append(text[offset - start:stop - start])
+                    offset = stop
+                    run_index += 1
+            start = end
+
+        for run, parts in zip(runs, outputs):
+            run.text = ''.join(parts)
+        return True
+
+    def get_progress(self):
+        """获取进度"""
+        progress = dict(self.progress)
+        progress['percent'] = round(progress['translated'] / progress['total'] * 100, 1) if progress['total'] else 100.0
+        return progress
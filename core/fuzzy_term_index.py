@@ -0,0 +1,243 @@
+"""
+模糊术语匹配
+
+精确匹配漏掉的英文词形变化（valves/valve）、大小写与连字符差异以及少量拼写错误，
+通过字符 n-gram 倒排索引召回候选，再用编辑距离校验：
+- 术语和文本片段先做归一化：小写、连字符/下划线转空格、简单英文词干化
+- 候选只来自与查询共享 n-gram 的术语，查询代价与术语库规模无关
+- 每个模糊匹配带有置信度，供接口展示和阈值过滤
+"""
+
+import re
+
+from core.reverse_term_index import IncrementalTermIndex, build_reverse_entries, parse_multiple_terms
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]+(?:['’][A-Za-z]+)?")
+_SEPARATOR_PATTERN = re.compile(r"[\s\-_/]+")
+
+# 参与模糊匹配的最短归一化长度，更短的术语只做精确匹配
+MIN_FUZZY_LENGTH = 4
+# 术语最多包含的单词数，决定文本滑动窗口的大小
+MAX_TERM_WORDS = 6
+
+
+def light_stem(word):
+    """简单英文词干化：去除常见复数、进行时和过去式词尾"""
+    if len(word) <= 3 or not word.isascii() or not word.isalpha():
+        return word
+    if word.endswith('ies') and len(word) > 4:
+        return word[:-3] + 'y'
+    if word.endswith(('sses', 'shes', 'ches', 'xes', 'zes')):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    if word.endswith('ing') and len(word) > 5:
+        return word[:-3]
+    if word.endswith('ed') and len(word) > 4:
+        return word[:-2]
+    return word
+
+
+def normalize_term(text):
+    """归一化术语或文本片段：小写、统一分隔符、逐词词干化"""
+    words = _SEPARATOR_PATTERN.split(text.lower().strip())
+    return ' '.join(light_stem(word) for word in words if word)
+
+
+def ngrams(text, n=3):
+    """带首尾填充的字符 n-gram 集合"""
+    padded = f" {text} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def bounded_edit_distance(a, b, limit):
+    """Levenshtein 距离，超过 limit 时提前返回 limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + (char_a != char_b))
+            row_min = min(row_min, current[j])
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def build_direction_entries(term_key, term_data, source_lang, target_lang):
+    """
+    生成某个翻译方向上需要在原文中匹配的术语条目
+
+    正向（术语库的源语言→目标语言）匹配术语键，反向匹配外语译名。
+
+    Returns:
+        list: [(匹配用的术语文本, 条目)]
+    """
+    if not isinstance(term_data, dict):
+        return []
+    metadata = term_data.get('metadata', {})
+    if metadata.get('source_lang', 'zh') == source_lang and metadata.get('target_lang', 'en') == target_lang:
+        targets = parse_multiple_terms(term_data.get('target_term', term_data.get('definition', '')))
+        if not targets:
+            return []
+        source_term = term_data.get('source_term') or term_key
+        return [(source_term, {
+            'source_term': source_term,
+            'target_term': targets[0],
+            'definition': term_data.get('definition', ''),
+            'all_targets': targets
+        })]
+    return [(entry['source_term'], entry)
+            for _, entry in build_reverse_entries(term_key, term_data, source_lang, target_lang)]
+
+
+class FuzzyTermIndex(IncrementalTermIndex):
+    """基于字符 n-gram 倒排索引的模糊术语匹配"""
+
+    def __init__(self, source_lang='en', target_lang='zh', n=3, min_score=0.75):
+        super().__init__(source_lang, target_lang)
+        self.n = n
+        self.min_score = min_score
+        self._reset()
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def _reset(self):
+        # n-gram -> 归一化术语集合
+        self._postings = {}
+        # 归一化术语 -> {术语键: (原始术语文本, 条目)}
+        self._patterns = {}
+        # 术语键 -> 它贡献的归一化术语列表
+        self._by_term = {}
+        # 归一化术语 -> n-gram 数量
+        self._gram_counts = {}
+        self.max_words = 1
+
+    def _add(self, term, term_data):
+        keys = []
+        for text, entry in build_direction_entries(term, term_data, self.source_lang, self.target_lang):
+            norm = normalize_term(text)
+            # 只收录拉丁字母术语，中文术语的变体问题不在此处理
+            if len(norm) < MIN_FUZZY_LENGTH or not norm.isascii():
+                continue
+            if norm not in self._patterns:
+                self._patterns[norm] = {}
+                grams = ngrams(norm, self.n)
+                self._gram_counts[norm] = len(grams)
+                for gram in grams:
+                    self._postings.setdefault(gram, set()).add(norm)
+            self._patterns[norm][term] = (text, entry)
+            self.max_words = min(MAX_TERM_WORDS, max(self.max_words, norm.count(' ') + 1))
+            keys.append(norm)
+        if keys:
+            self._by_term[term] = keys
+
+    def _remove(self, term):
+        for norm in self._by_term.pop(term, []):
+            bucket = self._patterns.get(norm)
+            if bucket is None:
+                continue
+            bucket.pop(term, None)
+            if not bucket:
+                del self._patterns[norm]
+                self._gram_counts.pop(norm, None)
+                for gram in ngrams(norm, self.n):
+                    posting = self._postings.get(gram)
+                    if posting is not None:
+                        posting.discard(norm)
+                        if not posting:
+                            del self._postings[gram]
+
+    def lookup(self, text, min_score=None):
+        """
+        查找与文本片段最相近的术语
+
+        Returns:
+            tuple: (条目, 置信度, 原始术语文本)，没有足够相近的术语时返回 None
+        """
+        min_score = self.min_score if min_score is None else min_score
+        norm = normalize_term(text)
+        if len(norm) < MIN_FUZZY_LENGTH:
+            return None
+
+        with self._lock:
+            # 词干化后完全一致视为词形变化
+            bucket = self._patterns.get(norm)
+            if bucket:
+                term_text, entry = next(iter(bucket.values()))
+                confidence = 1.0 if term_text.lower() == text.lower() else 0.95
+                return (entry, confidence, term_text) if confidence >= min_score else None
+
+            # 通过共享 n-gram 召回候选
+            grams = ngrams(norm, self.n)
+            shared = {}
+            for gram in grams:
+                for candidate in self._postings.get(gram, ()):
+                    shared[candidate] = shared.get(candidate, 0) + 1
+
+            best = None
+            for candidate, count in shared.items():
+                # Dice 系数粗筛，再用编辑距离校验
+                if 2.0 * count / (len(grams) + self._gram_counts[candidate]) < 0.5:
+                    continue
+                longest = max(len(norm), len(candidate))
+                limit = int(longest * (1 - min_score / 0.9))
+                distance = bounded_edit_distance(norm, candidate, limit)
+                if distance > limit:
+                    continue
+                confidence = round(0.9 * (1 - distance / longest), 3)
+                if best is None or confidence > best[1]:
+                    term_text, entry = next(iter(self._patterns[candidate].values()))
+                    best = (entry, confidence, term_text)
+        if best is not None and best[1] >= min_score:
+            return best
+        return None
+
+    def find(self, text, exclude_spans=None, min_score=None):
+        """
+        在文本中查找模糊匹配的术语
+
+        Args:
+            text (str): 原文
+            exclude_spans: 已被精确匹配占用的 [(起始, 结束)]
+            min_score (float): 最低置信度
+
+        Returns:
+            list: [(起始位置, 结束位置, 条目, 置信度, 原始术语文本)]，互不重叠
+        """
+        if not text or not self._patterns:
+            return []
+        exclude_spans = sorted(exclude_spans or [])
+
+        def overlaps_excluded(start, end):
+            return any(s < end and start < e for s, e in exclude_spans)
+
+        tokens = [(m.start(), m.end()) for m in _TOKEN_PATTERN.finditer(text)]
+        candidates = []
+        for i in range(len(tokens)):
+            for j in range(i, min(len(tokens), i + self.max_words)):
+                start, end = tokens[i][0], tokens[j][1]
+                if overlaps_excluded(start, end):
+                    break
+                result = self.lookup(text[start:end], min_score=min_score)
+                if result is not None:
+                    entry, confidence, term_text = result
+                    candidates.append((start, end, entry, confidence, term_text))
+
+        # 置信度高、覆盖长的优先，选出互不重叠的匹配
+        candidates.sort(key=lambda c: (-c[3], -(c[1] - c[0]), c[0]))
+        selected = []
+        for candidate in candidates:
+            if all(candidate[1] <= s or e <= candidate[0] for s, e, *_ in selected):
+                selected.append(candidate)
+        selected.sort(key=lambda c: c[0])
+        return selected
@@ -0,0 +1,193 @@
+"""
+数据文件热加载
+
+术语库、知识库和向量库的数据文件被外部修改（术语员直接编辑 terms.json、同事替换 items.json）后，
+运行中的服务无需重启即可使用新数据：
+- 后台线程按间隔轮询文件的修改时间和大小，连续两次检查一致（文件已写完）才触发重新加载
+- 重新加载在监视线程中完成解析和索引建立，最后整体替换内存数据并递增版本号，
+  进行中的查询继续使用旧数据，不会被阻塞
+- 程序自身保存文件后调用 note_local_write，避免把自己的写入当作外部修改
+"""
+
+import os
+import time
+import threading
+import traceback
+import weakref
+
+# 活动的监视器，供 note_local_write 通知
+_watchers = weakref.WeakSet()
+_watchers_lock = threading.Lock()
+
+
+def file_signature(path):
+    """文件的 (修改时间, 大小)，文件不存在时返回 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def note_local_write(path):
+    """程序自身写入文件后调用，所有监视器把当前状态作为基准，不触发重新加载"""
+    with _watchers_lock:
+        watchers = list(_watchers)
+    for watcher in watchers:
+        watcher.acknowledge(path)
+
+
+class FileWatcher:
+    """轮询式文件监视器"""
+
+    def __init__(self, interval=2.0):
+        self.interval = interval
+        self._lock = threading.Lock()
+        # 绝对路径 -> 监视状态
+        self._entries = {}
+        self._thread = None
+        self._stop_event = threading.Event()
+        # 成功重新加载的次数
+        self.generation = 0
+        with _watchers_lock:
+            _watchers.add(self)
+
+    def watch(self, path, callback, name=None):
+        """
+        监视文件
+
+        Args:
+            path (str): 文件路径
+            callback: callback(path) ，文件变化且写完后在监视线程中调用
+            name (str): 显示名称
+        """
+        key = os.path.abspath(path)
+        with self._lock:
+            self._entries[key] = {
+                'name': name or os.path.basename(path),
+                'callback': callback,
+                'baseline': file_signature(key),
+                'pending': None,
+                'last_reload': None,
+                'last_error': None,
+                'reloads': 0
+            }
+
+    def acknowledge(self, path):
+        """把文件当前状态记为基准（程序自身的写入）"""
+        key = os.path.abspath(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['baseline'] = file_signature(key)
+                entry['pending'] = None
+
+    def poll(self):
+        """
+        检查一次所有文件，触发已写完的变化
+
+        Returns:
+            list: 本次重新加载的文件名称
+        """
+        ready = []
+        with self._lock:
+            for key, entry in self._entries.items():
+                signature = file_signature(key)
+                if signature == entry['baseline']:
+                    entry['pending'] = None
+                elif signature is None:
+                    # 文件被删除（或正在替换），不触发加载
+                    entry['baseline'] = None
+                    entry['pending'] = None
+                elif signature != entry['pending']:
+                    # 刚发现变化，等下一次检查确认文件已写完
+                    entry['pending'] = signature
+                else:
+                    entry['baseline'] = signature
+                    entry['pending'] = None
+                    ready.append((key, entry))
+
+        reloaded = []
+        for key, entry in ready:
+            print(f"[INFO] 检测到 {entry['name']} 已被修改，开始重新加载")
+            start = time.time()
+            try:
+                if entry['callback'](key) is False:
+                    raise RuntimeError("数据文件加载失败，继续使用当前数据")
+                entry['last_error'] = None
+                entry['reloads'] += 1
+                self.generation += 1
+                reloaded.append(entry['name'])
+                print(f"[INFO] {entry['name']} 重新加载完成，耗时 {time.time() - start:.2f} 秒")
+            except Exception as e:
+                entry['last_error'] = str(e)
+                print(f"[ERROR] 重新加载 {entry['name']} 失败: {e}")
+                traceback.print_exc()
+            entry['last_reload'] = time.time()
+        return reloaded
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"[ERROR] 文件监视检查失败: {e}")
+                traceback.print_exc()
+
+    def start(self):
+        """启动后台监视线程，已在运行时不重复启动"""
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='data-file-watcher', daemon=True)
+        self._thread.start()
+        print(f"[INFO] 数据文件热加载已启动，监视 {len(self._entries)} 个文件，间隔 {self.interval} 秒")
+        return True
+
+    def stop(self, timeout=None):
+        """停止后台监视线程"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def get_status(self):
+        """获取监视状态"""
+        with self._lock:
+            files = [{
+                'name': entry['name'],
+                'path': key,
+                'reloads': entry['reloads'],
+                'last_reload': entry['last_reload'],
+                'last_error': entry['last_error']
+            } for key, entry in self._entries.items()]
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'interval': self.interval,
+            'generation': self.generation,
+            'files': files
+        }
+
+
+def create_data_watcher(term_base=None, knowledge_base=None, vector_dbs=(), interval=2.0):
+    """
+    为术语库、知识库和向量库的数据文件建立监视器（不自动启动）
+
+    Args:
+        term_base: TermBase 实例，监视 terms.json
+        knowledge_base: KnowledgeBase 实例，监视 items.json
+        vector_dbs: VectorDB 实例列表，监视各自的 vectors.json
+        interval (float): 轮询间隔（秒）
+    """
+    watcher = FileWatcher(interval)
+    if term_base is not None and hasattr(term_base, 'reload_from_disk'):
+        watcher.watch(os.path.join(term_base.term_path, 'terms.json'),
+                      lambda path: term_base.reload_from_disk(), '术语库')
+    if knowledge_base is not None and hasattr(knowledge_base, 'reload_from_disk'):
+        watcher.watch(os.path.join(knowledge_base.knowledge_path, 'items.json'),
+                      lambda path: knowledge_base.reload_from_disk(path), '知识库')
+    for vector_db in vector_dbs:
+        if vector_db is not None and hasattr(vector_db, 'reload'):
+            watcher.watch(os.path.join(vector_db.vector_path, 'vectors.json'),
+                          lambda path, db=vector_db: db.reload(),
+                          f"{type(vector_db).__name__}")
+    return watcher
@@ -3,8 +3,18 @@ import json
 import re
 from datetime import datetime
 import time
+from contextlib import nullcontext
 import numpy as np
 
+from core.knowledge_store import KnowledgeStore, KnowledgeItemMapping
+from core.query_cache import QueryResultCache
+from core.reranker import CrossEncoderReranker
+from core.qa_index import QAQuestionIndex
+from core.context_compressor import ExtractiveCompressor
+from core.document_chunker import TokenAwareChunker
+from core.vector_backfill import VectorBackfillJob
+from core.hot_reload import note_local_write
+
 class KnowledgeBase:
     """知识库管理类"""
 
@@ -17,14 +27,80 @@ class KnowledgeBase:
         # 知识条目
         self.items = {}  # {name: {'content': str, 'vector_id': str, 'metadata': dict}}
 
+        # 存储后端: sqlite(默认，单行增量写入) 或 json(旧版 items.json 整体重写)
+        self.storage_backend = self._get_setting('kb_storage_backend', 'sqlite')
+        self.store = None
+
+        # 知识库版本号，任何增删改/导入都会递增，用于缓存失效
+        self.generation = 0
+        # 检索结果缓存（桌面端、AI助手和Web端共用同一个知识库实例）
+        self.query_cache = QueryResultCache(self._get_setting('kb_query_cache_size', 256))
+
+        # 抽取式上下文压缩（检索之后、构建提示词之前）
+        self.compressor = None
+        if self._get_setting('kb_compression_enabled', True):
+            self.compressor = ExtractiveCompressor(
+                vector_db,
+                top_sentences=self._get_setting('kb_compression_top_sentences', 8),
+                neighbours=self._get_setting('kb_compression_neighbours', 1)
+            )
+
+        # 可选的交叉编码器重排序器
+        self.reranker = None
+        if self._get_setting('kb_rerank_enabled', False):
+            self.reranker = CrossEncoderReranker(
+                self._get_setting('kb_rerank_model_path', os.path.join('BAAI', 'bge-reranker-v2-m3')),
+                latency_budget_ms=self._get_setting('kb_rerank_latency_budget_ms', 800),
+                timeout=self._get_setting('kb_rerank_timeout', 2.0)
+            )
+            # 后台加载模型，首个查询不承担加载耗时
+            self.reranker.start_loading()
+
         # 加载知识条目
         self.load()
 
+        # 问答组问题索引（主问题和相似问各自一个向量，用于直接返回答案）
+        # SQLite后端把问题向量逐行存入知识库存储，JSON后端保存为 qa_questions.json
+        self.qa_index = QAQuestionIndex(os.path.join(self.knowledge_path, 'qa_questions.json'), store=self.store)
+
+        # 后台向量补建任务（缺少向量的条目在变更时登记，按批补建并写检查点）
+        self.vector_backfill = VectorBackfillJob(
+            '知识库',
+            os.path.join(self.knowledge_path, 'vector_backfill.json'),
+            list_keys=lambda: list(self.items.keys()),
+            load_text=self._backfill_text,
+            store_vectors=self._store_backfill_vectors,
+            encode_texts=lambda texts: self.vector_db.encode_texts(texts),
+            save=self._save_backfill,
+            is_ready=lambda: bool(self.vector_db) and self.vector_db.check_model_ready(),
+            batch_size=self._get_setting('kb_backfill_batch_size', 32)
+        )
+
     def ensure_dir_exists(self, path):
         """确保目录存在"""
         if not os.path.exists(path):
             os.makedirs(path)
 
+    def _get_setting(self, key, default=None):
+        """读取配置项，兼容未提供settings的情况"""
+        if self.settings is not None and hasattr(self.settings, 'get'):
+            try:
+                return self.settings.get(key, default)
+            except Exception:
+                return default
+        return default
+
+    def _bump_generation(self):
+        """知识库内容变更后递增版本号，使旧的检索缓存失效"""
+        self.generation += 1
+        self.query_cache.invalidate()
+
+    def _batch(self):
+        """批量写入上下文，SQLite后端下整批只提交一次"""
+        if self.store is not None:
+            return self.store.batch()
+        return nullcontext()
+
     def add_item(self, name, content, metadata=None):
         """添加知识条目"""
         if metadata is None:
@@ -49,6 +125,7 @@ class KnowledgeBase:
             'vector_id': vector_id,
             'metadata': metadata
         }
+        self._bump_generation()
 
         return True
 
@@ -90,6 +167,10 @@ class KnowledgeBase:
             'vector_id': vector_id,
             'metadata': metadata
         }
+        if metadata.get('type') == 'qa_group':
+            self._index_qa_item(name, metadata.get('question', ''), metadata.get('similar_questions', ''))
+            self.qa_index.save()
+        self._bump_generation()
 
         return True
 
@@ -104,6 +185,10 @@ class KnowledgeBase:
 
         # 删除知识条目
         del self.items[name]
+        self.vector_backfill.discard(name)
+        if self.qa_index.remove_item(name):
+            self.qa_index.save()
+        self._bump_generation()
 
         return True
 
@@ -119,12 +204,129 @@ class KnowledgeBase:
         """列出所有知识条目"""
         return list(self.items.keys())
 
-    def search(self, query, top_k=5):
-        """增强的知识库搜索方法，支持查询变体和关键词提取"""
+    def _encode_qa_questions(self, name, question, similar_questions=''):
+        """编码问答组的主问题和每个相似问，返回 (问题列表, 向量列表)，无法编码时返回None"""
+        questions = QAQuestionIndex.split_questions(question, similar_questions)
+        if not questions or not self.vector_db or not self.vector_db.check_model_ready():
+            return None
+        try:
+            return questions, self.vector_db.encode_texts(questions)
+        except Exception as e:
+            print(f"[ERROR] 建立问答问题索引失败 '{name}': {e}")
+            return None
+
+    def _index_qa_item(self, name, question, similar_questions=''):
+        """为问答组的主问题和每个相似问分别建立向量索引"""
+        encoded = self._encode_qa_questions(name, question, similar_questions)
+        if encoded is None:
+            return False
+        self.qa_index.add_item(name, *encoded)
+        return True
+
+    def _qa_item_questions(self, item):
+        """取问答组的主问题和相似问，返回 (主问题, 相似问)"""
+        metadata = item.get('metadata') or {}
+        question = metadata.get('question', '')
+        similar_questions = metadata.get('similar_questions', '')
+        # 旧数据未保存相似问时，从原文重新解析
+        if not similar_questions and item.get('content'):
+            parsed = self._parse_qa_content(item['content'])
+            if parsed:
+                question = question or parsed[0]['question']
+                similar_questions = parsed[0]['similar_questions']
+        return question, similar_questions
+
+    def build_qa_index(self):
+        """为尚未建立问题索引的问答组补建索引"""
+        added = 0
+        for name, item in self.items.items():
+            metadata = item.get('metadata') or {}
+            if metadata.get('type') != 'qa_group' or self.qa_index.has_item(name):
+                continue
+            if self._index_qa_item(name, *self._qa_item_questions(item)):
+                added += 1
+        if added:
+            self.qa_index.save()
+            print(f"[INFO] 已为 {added} 个问答组补建问题索引")
+        return added
+
+    def _prune_qa_index(self):
+        """移除条目已删除、不再是问答组或问题已变化的问题索引"""
+        removed = 0
+        for name in self.qa_index.item_names():
+            item = self.items.get(name)
+            if item and (item.get('metadata') or {}).get('type') == 'qa_group' and \
+                    QAQuestionIndex.split_questions(*self._qa_item_questions(item)) == \
+                    self.qa_index.get_questions(name):
+                continue
+            if self.qa_index.remove_item(name):
+                removed += 1
+        if removed:
+            self.qa_index.save()
+            print(f"[INFO] 已移除 {removed} 个过期的问答问题索引")
+        return removed
+
+    def match_direct_answer(self, query, query_vector=None, threshold=None):
+        """
+        问答组直达答案：问题与某个主问题/相似问高度相似时直接返回标准答案
+
+        Returns:
+            dict: {'item', 'question', 'answer', 'similarity'}，未命中返回None
+        """
+        if not self._get_setting('kb_direct_answer_enabled', True) or len(self.qa_index) == 0:
+            return None
+        if threshold is None:
+            threshold = self._get_setting('kb_direct_answer_threshold', 0.92)
+        try:
+            if query_vector is None:
+                query_vector = self.vector_db.encode_text(query)
+            hits = self.qa_index.search(query_vector, top_k=1)
+            if not hits or hits[0]['similarity'] < threshold:
+                return None
+
+            hit = hits[0]
+            item = self.items.get(hit['item'])
+            answer = ((item or {}).get('metadata') or {}).get('answer', '')
+            if not answer:
+                return None
+
+            print(f"[INFO] 问答组直达答案命中: {hit['item']} (相似度: {hit['similarity']:.4f}, 匹配问题: {hit['question']})")
+            return {
+                'item': hit['item'],
+                'question': hit['question'],
+                'answer': answer,
+                'similarity': hit['similarity']
+            }
+        except Exception as e:
+            print(f"[ERROR] 问答组直达答案匹配失败: {e}")
+            return None
+
+    def get_search_cache_stats(self):
+        """获取检索结果缓存统计"""
+        stats = self.query_cache.get_stats()
+        stats['generation'] = self.generation
+        return stats
+
+    def clear_search_cache(self):
+        """清空检索结果缓存"""
+        self.query_cache.clear()
+
+    def search(self, query, top_k=5, min_similarity=0.4, rerank=True):
+        """增强的知识库搜索方法，支持查询变体、关键词提取和可选的重排序"""
         try:
             print(f"知识库搜索查询: {query}")
             start_time = time.time()
 
+            # 先查检索结果缓存
+            use_rerank = bool(rerank and self.reranker is not None)
+            cache_key = self.query_cache.make_key(query, top_k, self.generation,
+                                                  min_similarity=min_similarity,
+                                                  rerank=use_rerank)
+            cached_results = self.query_cache.get(cache_key)
+            if cached_results is not None:
+                print(f"[INFO] 知识库检索缓存命中，返回 {len(cached_results)} 条结果")
+                return cached_results
+
             # 确保知识库已初始化
             if not hasattr(self, 'vector_db') or self.vector_db is None:
                 print("[ERROR] 知识库向量数据库未初始化")
@@ -156,7 +358,7 @@ class KnowledgeBase:
             for variant in query_variants:
                 print(f"[DEBUG] 尝试搜索变体: '{variant}'")
                 # 降低相似度阈值以提高召回率
-                results = self.vector_db.search(variant, top_k=15, min_similarity=0.4)
+                results = self.vector_db.search(variant, top_k=15, min_similarity=min_similarity)
 
                 if results:
                     # 去重并合并结果
@@ -170,6 +372,16 @@ class KnowledgeBase:
             # 重新按相似度排序
             all_results.sort(key=lambda x: x.get('similarity', 0), reverse=True)
 
+            # 交叉编码器重排序，只保留真正相关的少数片段
+            reranked = False
+            if use_rerank:
+                all_results, reranked = self.reranker.rerank(
+                    query, all_results,
+                    top_n=self._get_setting('kb_rerank_top_n', 20),
+                    keep=min(top_k, self._get_setting('kb_rerank_keep', 3)),
+                    min_score=self._get_setting('kb_rerank_min_score', 0.0)
+                )
+
             # 最多返回top_k个结果
             final_results = all_results[:top_k]
 
@@ -177,6 +389,9 @@ class KnowledgeBase:
             elapsed = time.time() - start_time
             print(f"知识库搜索完成，耗时: {elapsed:.2f}秒，找到 {len(final_results)} 条结果")
 
+            # 重排序超时或忙碌回退的结果不缓存，下次仍有机会重排；模型缺失或加载失败时照常缓存
+            if not use_rerank or reranked or not self.reranker.is_available():
+                self.query_cache.put(cache_key, final_results)
             return final_results
         except Exception as e:
             print(f"[ERROR] 知识库搜索失败: {e}")
@@ -211,6 +426,10 @@ class KnowledgeBase:
         # 简单分词
         keywords = [w for w in jieba.cut(query) if len(w) > 1]
 
+        # SQLite后端直接使用FTS5索引
+        if self.store is not None:
+            return self.store.search_keywords(keywords, limit=top_k)
+
         # 按关键词匹配度评分
         scored_items = []
         for title, item in self.items.items():
@@ -318,23 +537,27 @@ class KnowledgeBase:
             if not os.path.exists(file_path):
                 return False, f"文件不存在: {file_path}"
 
-            # 读取文件内容
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
             # 获取文件名作为基础标题
             base_title = os.path.basename(file_path)
             print(f"正在导入文件: {base_title}")
 
-            # 首先尝试解析为问答格式
-            qa_groups = self._parse_qa_content(content)
-
-            if qa_groups:
-                # 按问答格式处理
-                return self._import_qa_format(qa_groups, base_title, file_path)
-            else:
-                # 按普通文档格式处理
-                return self._import_document_format(content, base_title, file_path)
+            # 先读取文件开头判断是否为问答格式，普通文档无需整体读入内存
+            with open(file_path, 'r', encoding='utf-8') as f:
+                head = f.read(64 * 1024)
+                is_qa = bool(re.search(r'^\s*问题[:：]', head, re.M) and re.search(r'^\s*答案[:：]', head, re.M))
+
+                if is_qa:
+                    # 首先尝试解析为问答格式
+                    content = head + f.read()
+                    qa_groups = self._parse_qa_content(content)
+                    if qa_groups:
+                        # 按问答格式处理
+                        return self._import_qa_format(qa_groups, base_title, file_path)
+                    return self._import_document_format(content, base_title, file_path)
+
+                # 按普通文档格式处理，逐行流式切分
+                f.seek(0)
+                return self._import_document_format(f, base_title, file_path)
 
         except Exception as e:
             import traceback
@@ -345,85 +568,148 @@ class KnowledgeBase:
         """导入问答格式内容"""
         success_count = 0
         failed_count = 0
+        batch_size = self._get_setting('kb_import_batch_size', 16)
 
-        # 处理每个问答组
-        for i, qa_group in enumerate(qa_groups):
-            # 为每个QA组创建唯一标题
-            title = f"{base_title}_QA_{i+1}"
+        for start in range(0, len(qa_groups), batch_size):
+            added, failed = self._import_qa_groups(qa_groups[start:start + batch_size], start, base_title, file_path)
+            success_count += added
+            failed_count += failed
+        self._bump_generation()
 
-            # 检查是否已存在同名条目
-            if title in self.items:
-                # 添加时间戳确保唯一性
-                title = f"{title}_{int(time.time())}"
+        # 保存知识库
+        self.save()
+        self.qa_index.save()
 
-            # 尝试生成向量
-            vector_id = None
-            if hasattr(self, 'vector_db') and self.vector_db and self.vector_db.check_model_ready():
-                try:
-                    # 使用问题部分生成向量(主问题+相似问)，提高检索精度
-                    index_text = qa_group['question'] + "\n" + qa_group['similar_questions']
-                    vector = self.vector_db.encode_text(index_text)
+        return True, f"已导入 {success_count} 个问答组 (其中 {failed_count} 个无向量索引)"
+
+    def _encode_import_texts(self, texts):
+        """批量编码导入的文本，返回与输入等长的向量列表（失败项为None）"""
+        if hasattr(self, 'vector_db') and self.vector_db and self.vector_db.check_model_ready():
+            try:
+                return self.vector_db.encode_texts(texts)
+            except Exception as e:
+                print(f"向量处理出错: {e}")
+        return [None] * len(texts)
 
-                    if vector is not None:
+    def _import_qa_groups(self, qa_groups, offset, base_title, file_path):
+        """编码并写入一批问答组，返回 (有向量数, 无向量数)"""
+        success_count = 0
+        failed_count = 0
+
+        # 在写入事务之外编码，避免编码期间占用存储锁阻塞其他读取
+        # 使用问题部分生成向量(主问题+相似问)，提高检索精度
+        vectors = self._encode_import_texts([qa_group['question'] + "\n" + qa_group['similar_questions']
+                                             for qa_group in qa_groups])
+        question_vectors = [
+            self._encode_qa_questions(base_title, qa_group['question'], qa_group['similar_questions'])
+            if vector is not None else None
+            for qa_group, vector in zip(qa_groups, vectors)
+        ]
+
+        indexed = []
+        with self._batch():
+            for i, (qa_group, vector, encoded) in enumerate(zip(qa_groups, vectors, question_vectors), offset):
+                # 为每个QA组创建唯一标题
+                title = f"{base_title}_QA_{i+1}"
+
+                # 检查是否已存在同名条目
+                if title in self.items:
+                    # 添加时间戳确保唯一性
+                    title = f"{title}_{int(time.time())}"
+
+                vector_id = None
+                if vector is not None:
+                    try:
                         # 添加到向量数据库(存储完整内容)
                         vector_id = self.vector_db.add(qa_group['full_text'], vector, {
                             'title': title,
                             'type': 'qa_group',
                             'source': file_path
                         })
-                except Exception as e:
-                    print(f"向量处理出错: {e}")
-
-            # 添加到知识条目
-            self.items[title] = {
-                'content': qa_group['full_text'],  # 存储完整内容
-                'vector_id': vector_id,
-                'metadata': {
-                    'imported_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'source': file_path,
-                    'type': 'qa_group',
-                    'question': qa_group['question'],
-                    'answer': qa_group['answer']
+                    except Exception as e:
+                        print(f"向量处理出错: {e}")
+
+                # 添加到知识条目
+                self.items[title] = {
+                    'content': qa_group['full_text'],  # 存储完整内容
+                    'vector_id': vector_id,
+                    'metadata': {
+                        'imported_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                        'source': file_path,
+                        'type': 'qa_group',
+                        'question': qa_group['question'],
+                        'similar_questions': qa_group['similar_questions'],
+                        'answer': qa_group['answer']
+                    }
                 }
-            }
 
-            if vector_id:
-                success_count += 1
-            else:
-                failed_count += 1
+                if vector_id:
+                    if encoded is not None:
+                        indexed.append((title, encoded))
+                    success_count += 1
+                else:
+                    # 登记到后台向量补建
+                    self.vector_backfill.mark_dirty(title)
+                    failed_count += 1
 
-        # 保存知识库
-        self.save()
+        # 主问题和相似问分别建立索引，用于直达答案
+        for title, (questions, question_vectors) in indexed:
+            self.qa_index.add_item(title, questions, question_vectors)
 
-        return True, f"已导入 {success_count} 个问答组 (其中 {failed_count} 个无向量索引)"
+        return success_count, failed_count
 
     def _import_document_format(self, content, base_title, file_path):
-        """导入普通文档格式内容"""
+        """导入普通文档格式内容，content 可以是字符串或逐行读取的文件对象"""
         success_count = 0
         failed_count = 0
+        batch_size = self._get_setting('kb_import_batch_size', 16)
 
-        # 将文档分块处理
-        chunks = self.chunk_document(content, max_chunk_size=1000)
+        # 将文档按token长度分块（生成器，边切分边导入）
+        chunks = self.iter_document_chunks(content)
 
+        # 每批片段单独提交一次，编码在事务之外进行
+        batch = []
         for i, chunk in enumerate(chunks):
             if not chunk.strip():
                 continue
+            batch.append((i, chunk))
+            if len(batch) >= batch_size:
+                added, failed = self._import_document_chunks(batch, base_title, file_path)
+                success_count += added
+                failed_count += failed
+                batch = []
+        if batch:
+            added, failed = self._import_document_chunks(batch, base_title, file_path)
+            success_count += added
+            failed_count += failed
+        self._bump_generation()
 
-            # 为每个块创建唯一标题
-            title = f"{base_title}_CHUNK_{i+1}"
+        # 保存知识库
+        self.save()
 
-            # 检查是否已存在同名条目
-            if title in self.items:
-                # 添加时间戳确保唯一性
-                title = f"{title}_{int(time.time())}"
+        return True, f"已导入 {success_count} 个文档片段 (其中 {failed_count} 个无向量索引)"
 
-            # 尝试生成向量
-            vector_id = None
-            if hasattr(self, 'vector_db') and self.vector_db and self.vector_db.check_model_ready():
-                try:
-                    vector = self.vector_db.encode_text(chunk)
+    def _import_document_chunks(self, batch, base_title, file_path):
+        """批量编码并写入一批文档片段，返回 (有向量数, 无向量数)"""
+        success_count = 0
+        failed_count = 0
+
+        # 批量生成向量（在写入事务之外编码，避免编码期间占用存储锁）
+        vectors = self._encode_import_texts([chunk for _, chunk in batch])
+
+        with self._batch():
+            for (i, chunk), vector in zip(batch, vectors):
+                # 为每个块创建唯一标题
+                title = f"{base_title}_CHUNK_{i+1}"
 
-                    if vector is not None:
+                # 检查是否已存在同名条目
+                if title in self.items:
+                    # 添加时间戳确保唯一性
+                    title = f"{title}_{int(time.time())}"
+
+                vector_id = None
+                if vector is not None:
+                    try:
                         # 添加到向量数据库
                         vector_id = self.vector_db.add(chunk, vector, {
                             'title': title,
@@ -431,31 +717,30 @@ class KnowledgeBase:
                             'source': file_path,
                             'chunk_index': i
                         })
-                except Exception as e:
-                    print(f"向量处理出错: {e}")
-
-            # 添加到知识条目
-            self.items[title] = {
-                'content': chunk,
-                'vector_id': vector_id,
-                'metadata': {
-                    'imported_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'source': file_path,
-                    'type': 'document_chunk',
-                    'chunk_index': i,
-                    'title': f"文档片段 {i+1}"
+                    except Exception as e:
+                        print(f"向量处理出错: {e}")
+
+                # 添加到知识条目
+                self.items[title] = {
+                    'content': chunk,
+                    'vector_id': vector_id,
+                    'metadata': {
+                        'imported_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                        'source': file_path,
+                        'type': 'document_chunk',
+                        'chunk_index': i,
+                        'title': f"文档片段 {i+1}"
+                    }
                 }
-            }
-
-            if vector_id:
-                success_count += 1
-            else:
-                failed_count += 1
 
-        # 保存知识库
-        self.save()
+                if vector_id:
+                    success_count += 1
+                else:
+                    # 登记到后台向量补建
+                    self.vector_backfill.mark_dirty(title)
+                    failed_count += 1
 
-        return True, f"已导入 {success_count} 个文档片段 (其中 {failed_count} 个无向量索引)"
+        return success_count, failed_count
 
     def _parse_qa_content(self, content):
         """解析问答格式内容为多个QA组"""
@@ -502,31 +787,24 @@ class KnowledgeBase:
 
         return qa_groups
 
-    def chunk_document(self, content, max_chunk_size=1000):
+    def _get_embedding_tokenizer(self):
+        """获取向量模型的分词器，用于按token长度切分文档"""
+        model = getattr(self.vector_db, 'model', None) if self.vector_db else None
+        return getattr(model, 'tokenizer', None) or getattr(self.vector_db, 'tokenizer', None)
+
+    def iter_document_chunks(self, content, max_tokens=None, overlap_tokens=None):
+        """按向量模型token长度逐个生成文档片段，content 可以是字符串或文件对象"""
+        chunker = TokenAwareChunker(
+            tokenizer=self._get_embedding_tokenizer(),
+            max_tokens=max_tokens or self._get_setting('kb_chunk_max_tokens', 512),
+            overlap_tokens=overlap_tokens if overlap_tokens is not None
+            else self._get_setting('kb_chunk_overlap_tokens', 64)
+        )
+        return chunker.iter_chunks(content)
+
+    def chunk_document(self, content, max_tokens=None, overlap_tokens=None):
         """将文档分成小块"""
-        if len(content) <= max_chunk_size:
-            return [content]
-
-        # 按段落分割
-        paragraphs = re.split(r'\n\s*\n', content)
-
-        chunks = []
-        current_chunk = ""
-
-        for para in paragraphs:
-            if len(current_chunk) + len(para) <= max_chunk_size:
-                current_chunk += para + "\n\n"
-            else:
-                # 如果当前段落加上当前块超过最大块大小
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = para + "\n\n"
-
-        # 添加最后一个块
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-
-        return chunks
+        return list(self.iter_document_chunks(content, max_tokens, overlap_tokens))
 
     def get_relevant_knowledge(self, query, max_items=3):
         """获取与查询相关的知识条目"""
@@ -549,6 +827,18 @@ class KnowledgeBase:
         # 保存向量数据库
         self.vector_db.save()
 
+        # 同步向量补建检查点
+        if hasattr(self, 'vector_backfill'):
+            self.vector_backfill.flush()
+
+        return self._save_items()
+
+    def _save_items(self):
+        """保存知识条目"""
+        # SQLite后端的条目在修改时已逐行写入，无需整体重写
+        if self.store is not None:
+            return True
+
         # 保存知识条目索引
         save_path = os.path.join(self.knowledge_path, 'items.json')
         try:
@@ -562,6 +852,7 @@ class KnowledgeBase:
 
             with open(save_path, 'w', encoding='utf-8') as f:
                 json.dump(serializable_items, f, ensure_ascii=False, indent=4)
+            note_local_write(save_path)
             return True
         except Exception as e:
             print(f"保存知识条目失败: {e}")
@@ -571,6 +862,12 @@ class KnowledgeBase:
         """加载知识条目"""
         knowledge_file = os.path.join(self.knowledge_path, 'items.json')
 
+        if self.storage_backend == 'sqlite':
+            if self._load_sqlite(knowledge_file):
+                return True
+            # SQLite不可用时回退到JSON文件
+            self.storage_backend = 'json'
+
         if os.path.exists(knowledge_file):
             try:
                 with open(knowledge_file, 'r', encoding='utf-8') as f:
@@ -603,14 +900,82 @@ class KnowledgeBase:
 
         return False
 
-    def _validate_items(self):
-        """验证知识条目的完整性"""
+    def _load_sqlite(self, knowledge_file):
+        """打开SQLite知识库，首次使用时从 items.json 迁移"""
+        db_file = os.path.join(self.knowledge_path, 'knowledge.db')
+        try:
+            self.store = KnowledgeStore(db_file)
+            if self.store.count() == 0 and os.path.exists(knowledge_file):
+                self.store.migrate_from_json(knowledge_file)
+            self.items = KnowledgeItemMapping(self.store)
+            print(f"已打开知识库存储: {db_file} ({self.store.count()} 个知识条目)")
+            return True
+        except Exception as e:
+            print(f"[ERROR] 打开SQLite知识库失败，回退到JSON存储: {e}")
+            import traceback
+            traceback.print_exc()
+            self.store = None
+            self.items = {}
+            return False
+
+    def reload_from_disk(self, knowledge_file=None):
+        """
+        items.json 被外部替换后重新加载
+
+        SQLite后端在一个事务内写入文件中的条目并删除文件中已不存在的条目（提交前读取仍看到旧数据）；
+        JSON后端在调用线程中解析和校验完成后整体替换条目字典。两种情况都同步问答问题索引，
+        并递增版本号使检索缓存失效。
+        """
+        knowledge_file = knowledge_file or os.path.join(self.knowledge_path, 'items.json')
+        try:
+            if self.store is not None:
+                removed = self.store.replace_from_json(knowledge_file)
+            else:
+                with open(knowledge_file, 'r', encoding='utf-8') as f:
+                    items = json.load(f)
+                if not isinstance(items, dict):
+                    raise ValueError(f"知识库文件格式不正确: {type(items).__name__}")
+                self._validate_items(items)
+                removed = {name: (item or {}).get('vector_id') for name, item in self.items.items()
+                           if name not in items}
+                self.items = items
+        except Exception as e:
+            print(f"[ERROR] 重新加载知识库失败，继续使用当前数据: {e}")
+            return False
+
+        # 清理已删除条目的向量
+        for name, vector_id in removed.items():
+            if hasattr(self, 'vector_backfill'):
+                self.vector_backfill.discard(name)
+            if vector_id and self.vector_db:
+                try:
+                    self.vector_db.delete(vector_id)
+                except Exception as e:
+                    print(f"[WARNING] 删除知识条目 '{name}' 的向量失败: {e}")
+
+        # 移除已删除或问题有变化的问答组索引，再补建缺失的索引
+        self._prune_qa_index()
+        self.build_qa_index()
+
+        self._bump_generation()
+        # 新条目中缺少向量的交给后台补建
+        if hasattr(self, 'vector_backfill'):
+            self.vector_backfill.rescan()
+            if self.vector_db and self.vector_db.check_model_ready():
+                self.vector_backfill.start()
+        print(f"[INFO] 知识库已重新加载，共 {len(self.items)} 个知识条目")
+        return True
+
+    def _validate_items(self, items=None):
+        """验证知识条目的完整性（默认校验当前条目）"""
+        if items is None:
+            items = self.items
         invalid_items = []
-        for name, item in self.items.items():
+        for name, item in items.items():
             # 检查是否为字典
             if not isinstance(item, dict):
                 print(f"警告: 知识条目 '{name}' 格式不正确，尝试修复")
-                self.items[name] = {'content': str(item), 'metadata': {}}
+                items[name] = {'content': str(item), 'metadata': {}}
                 continue
 
             # 检查是否有content字段
@@ -621,7 +986,7 @@ class KnowledgeBase:
         # 移除无效条目
         for name in invalid_items:
             print(f"移除无效知识条目: {name}")
-            del self.items[name]
+            del items[name]
 
     def add_entry(self, title, content, vectors=None):
         """添加知识条目"""
@@ -713,8 +1078,16 @@ class KnowledgeBase:
             traceback.print_exc()
             return []
 
-    def ensure_vectors(self):
-        """确保所有知识条目都有对应的向量"""
+    def ensure_vectors(self, wait=False, rescan=False):
+        """
+        确保所有知识条目都有对应的向量
+
+        缺少向量的条目由后台补建任务按批处理，可断点续跑。
+
+        Args:
+            wait (bool): 是否等待补建完成
+            rescan (bool): 是否重新全量扫描缺少向量的条目
+        """
         # 检查向量数据库和模型是否可用
         if not hasattr(self, 'vector_db') or not self.vector_db:
             print("错误: 向量数据库未初始化，无法创建向量")
@@ -765,48 +1138,82 @@ class KnowledgeBase:
             print(f"向量模型测试失败: {e}")
             return False
 
-        # 遍历所有知识条目
-        vectorized_count = 0
-        error_count = 0
-        for name, item in self.items.items():
-            if 'vector_id' not in item or item.get('vector_id') is None:
-                try:
-                    # 使用内容创建向量
-                    content = item.get('content', '')
-                    if not content and isinstance(item, dict) and 'metadata' in item:
-                        # 对于问答组类型，使用答案作为向量化内容
-                        if item['metadata'].get('type') == 'qa_group':
-                            content = item['metadata'].get('answer', '')
-
-                    if content:
-                        # 生成向量并保存ID
-                        vector = self.vector_db.encode_text(content)
-                        if vector is not None:
-                            vector_id = self.vector_db.add(content, vector)
-                            if vector_id:
-                                self.items[name]['vector_id'] = vector_id
-                                vectorized_count += 1
-                        else:
-                            print(f"为知识条目 '{name}' 生成向量失败")
-                            error_count += 1
-                except Exception as e:
-                    print(f"为知识条目 '{name}' 创建向量时出错: {e}")
-                    error_count += 1
-
-        # 保存更新的知识条目和向量
-        if vectorized_count > 0:
-            print(f"已创建 {vectorized_count} 个知识条目的向量")
-            if error_count > 0:
-                print(f"处理失败 {error_count} 个知识条目")
-            self.save()
-            self.vector_db.save()
-            return True
-        elif error_count > 0:
-            print(f"所有 {error_count} 个知识条目处理失败")
-            return False
-        else:
-            print("所有知识条目均已有向量，无需处理")
-            return True
+        # 补建问答组问题索引
+        try:
+            self.build_qa_index()
+        except Exception as e:
+            print(f"[ERROR] 补建问答问题索引失败: {e}")
+
+        # 缺少向量的条目交给后台补建任务，按批处理并写检查点
+        if rescan:
+            self.vector_backfill.rescan()
+        self.vector_backfill.start()
+        if wait:
+            self.vector_backfill.wait()
+            return self.vector_backfill.get_progress()['error'] is None
+        return True
+
+    def _backfill_text(self, name):
+        """返回条目需要编码的文本，已有向量或已删除时返回None"""
+        item = self.items.get(name)
+        if not isinstance(item, dict) or item.get('vector_id'):
+            return None
+
+        metadata = item.get('metadata') or {}
+        if metadata.get('type') == 'qa_group':
+            # 与导入时一致，使用主问题+相似问生成向量
+            text = f"{metadata.get('question', '')}\n{metadata.get('similar_questions', '')}".strip()
+            return text or metadata.get('answer', '') or item.get('content', '')
+        return item.get('content', '')
+
+    def _store_backfill_vectors(self, encoded):
+        """写入一批补建的向量，返回成功的条目名"""
+        added = []
+        for name, text, vector in encoded:
+            item = self.items.get(name)
+            if not isinstance(item, dict) or item.get('vector_id'):
+                continue
+            metadata = item.get('metadata') or {}
+            vector_id = self.vector_db.add(item.get('content') or text, vector, {
+                'title': name,
+                'type': metadata.get('type', 'knowledge')
+            })
+            if vector_id:
+                added.append((name, item, vector_id))
+
+        if not added:
+            return []
+
+        # 先落盘向量，再写入条目引用，避免条目指向不存在的向量
+        self.vector_db.save()
+        # 问题向量在写入事务之外编码
+        indexed = []
+        for name, item, _ in added:
+            metadata = item.get('metadata') or {}
+            if metadata.get('type') == 'qa_group':
+                encoded = self._encode_qa_questions(name, metadata.get('question', ''),
+                                                    metadata.get('similar_questions', ''))
+                if encoded is not None:
+                    indexed.append((name, encoded))
+        with self._batch():
+            for name, item, vector_id in added:
+                # 重新赋值整个条目，SQLite后端返回的是副本
+                item['vector_id'] = vector_id
+                self.items[name] = item
+        for name, (questions, question_vectors) in indexed:
+            self.qa_index.add_item(name, questions, question_vectors)
+        self._bump_generation()
+        return [name for name, _, _ in added]
+
+    def _save_backfill(self):
+        """补建每批完成后保存条目和问答索引"""
+        saved = self._save_items()
+        self.qa_index.save()
+        return saved
+
+    def get_vector_backfill_progress(self):
+        """获取后台向量补建进度"""
+        return self.vector_backfill.get_progress()
 
     def debug_knowledge_files(self):
         """调试知识库文件路径和内容"""
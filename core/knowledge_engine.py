@@ -9,6 +9,7 @@ from .base_engine import BaseEngine
 from .engine import Message, MessageRole
 from .models import MessageResponse, GenerationConfig
 from .knowledge_base import KnowledgeBase
+from .context_packer import ContextPacker
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -36,6 +37,7 @@ class KnowledgeEngine(BaseEngine):
         self.kb_top_k = model_config.get("kb_top_k", 15)
         self.kb_threshold = model_config.get("kb_threshold", 0.7)
         self.enable_knowledge = model_config.get("enable_knowledge", True)
+        self.kb_context_token_budget = model_config.get("kb_context_token_budget", 1024)
 
         # 知识库对象
         self.knowledge_base = knowledge_base
@@ -127,24 +129,35 @@ class KnowledgeEngine(BaseEngine):
 
         return False
 
-    def _extract_relevant_knowledge(self, knowledge_items: List[Dict]) -> str:
+    def _extract_relevant_knowledge(self, knowledge_items: List[Dict], question: Optional[str] = None) -> str:
         """提取相关知识内容
 
         参数:
             knowledge_items: 知识条目列表
+            question: 用户问题，提供时先做抽取式压缩
 
         返回:
             str: 提取的知识内容
         """
-        # 直接合并所有检索到的知识条目内容，保持原始格式和内容
-        knowledge_parts = [f"条目: {item['name'] if 'name' in item else '未命名条目'}\n内容: {item['content']}"
-                           for item in knowledge_items]
-
-        # 记录提取的知识条目数量
-        logger.info(f"提取了 {len(knowledge_parts)} 条知识条目")
-
-        # 合并所有知识条目
-        combined_knowledge = "\n\n".join(knowledge_parts)
+        # 保持原始格式，按相关度和token预算打包知识条目
+        chunks = [{
+            'text': f"条目: {item['name'] if 'name' in item else '未命名条目'}\n内容: {item['content']}",
+            'score': item.get('rerank_score', item.get('similarity', 0.0)),
+            'compressible': (item.get('metadata') or {}).get('type') != 'qa_group'
+        } for item in knowledge_items]
+
+        # 抽取式压缩：只保留与问题最相关的句子
+        compressor = getattr(self.knowledge_base, 'compressor', None)
+        if compressor is not None and question:
+            chunks, _ = compressor.compress(question, chunks)
+
+        packer = ContextPacker(tokenizer=getattr(self, 'tokenizer', None),
+                               token_budget=self.kb_context_token_budget)
+        combined_knowledge, report = packer.pack_text(chunks)
+
+        # 记录提取的知识条目数量和节省的token
+        logger.info(f"提取了 {report['chunks_used']}/{report['chunks_in']} 条知识条目，"
+                    f"{report['original_tokens']} -> {report['packed_tokens']} tokens，节省 {report['tokens_saved']} tokens")
         return combined_knowledge
 
     def _prepare_prompt(self, messages: List[Message], knowledge_content: Optional[str] = None) -> Union[str, List[Dict[str, str]]]:
@@ -242,7 +255,7 @@ class KnowledgeEngine(BaseEngine):
             return "未在知识库中找到相关信息"
 
         # 创建并格式化检索到的知识文本
-        knowledge_content = self._extract_relevant_knowledge(knowledge_items)
+        knowledge_content = self._extract_relevant_knowledge(knowledge_items, question)
 
         # 构建严格的知识库问答消息
         strict_prompt = f"""请严格按照以下知识库内容回答问题，不要添加任何额外的解释、扩展或补充说明：
@@ -300,6 +313,10 @@ class KnowledgeEngine(BaseEngine):
                 self.kb_threshold = new_settings['kb_threshold']
                 logger.info(f"更新知识库阈值: {self.kb_threshold}")
 
+            if 'kb_context_token_budget' in new_settings:
+                self.kb_context_token_budget = new_settings['kb_context_token_budget']
+                logger.info(f"更新知识上下文token预算: {self.kb_context_token_budget}")
+
             if 'enable_knowledge' in new_settings:
                 self.enable_knowledge = new_settings['enable_knowledge']
                 logger.info(f"更新知识库启用状态: {self.enable_knowledge}")
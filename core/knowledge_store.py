@@ -0,0 +1,420 @@
+"""
+知识条目SQLite存储后端
+
+以单表+FTS5全文索引的形式保存知识条目，替代整体重写的 items.json：
+- WAL 模式，读写互不阻塞
+- 单条新增/修改/删除只写一行
+- FTS5 表可直接作为关键词检索索引（不可用时自动退化为 LIKE 查询）
+- 支持从旧版 items.json 一次性迁移
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from collections.abc import MutableMapping
+
+
+class KnowledgeStore:
+    """基于SQLite的知识条目存储"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+
+        # FTS5 状态
+        self.fts_enabled = False
+        self.fts_tokenizer = None
+
+        self._init_schema()
+
+    def _init_schema(self):
+        """创建数据表和全文索引"""
+        with self._lock:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS items (
+                    name TEXT PRIMARY KEY,
+                    content TEXT,
+                    vector_id TEXT,
+                    metadata TEXT NOT NULL DEFAULT '{}',
+                    updated_at REAL
+                )
+            """)
+
+            # trigram 分词器对中文更友好(SQLite >= 3.34)，否则退回 unicode61
+            for tokenizer in ('trigram', 'unicode61'):
+                try:
+                    self._conn.execute(
+                        f"CREATE VIRTUAL TABLE IF NOT EXISTS items_fts "
+                        f"USING fts5(body, tokenize='{tokenizer}')"
+                    )
+                    self.fts_enabled = True
+                    self.fts_tokenizer = tokenizer
+                    break
+                except sqlite3.OperationalError:
+                    continue
+
+            if not self.fts_enabled:
+                print("[WARNING] 当前SQLite不支持FTS5，关键词检索将使用LIKE查询")
+
+            # 问答组问题向量（float32 字节），每个问题一行，按条目增删
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS qa_questions (
+                    item TEXT NOT NULL,
+                    question TEXT NOT NULL,
+                    vector BLOB NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_qa_questions_item ON qa_questions(item)")
+
+            self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # 事务控制
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def batch(self):
+        """
+        批量写入上下文，退出时统一提交一次
+
+        整个上下文期间持有存储锁，其他线程的读取会等待，向量编码等耗时操作应在进入之前完成
+        """
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            except Exception:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._conn.rollback()
+                raise
+            else:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._conn.commit()
+
+    def _commit(self):
+        if self._batch_depth == 0:
+            self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # 单条读写
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _index_text(name, item):
+        """拼接用于关键词检索的文本"""
+        metadata = item.get('metadata') or {}
+        parts = [name, item.get('content') or '']
+        if metadata.get('type') == 'qa_group':
+            parts.append(metadata.get('question', ''))
+            parts.append(metadata.get('similar_questions', ''))
+            parts.append(metadata.get('answer', ''))
+        return '\n'.join(p for p in parts if p)
+
+    def upsert(self, name, item):
+        """新增或更新一个知识条目（单行写入）"""
+        metadata = item.get('metadata') or {}
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO items (name, content, vector_id, metadata, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    content = excluded.content,
+                    vector_id = excluded.vector_id,
+                    metadata = excluded.metadata,
+                    updated_at = excluded.updated_at
+                """,
+                (name, item.get('content'), item.get('vector_id'),
+                 json.dumps(metadata, ensure_ascii=False), time.time())
+            )
+            if self.fts_enabled:
+                rowid = self._conn.execute(
+                    "SELECT rowid FROM items WHERE name = ?", (name,)
+                ).fetchone()[0]
+                self._conn.execute("DELETE FROM items_fts WHERE rowid = ?", (rowid,))
+                self._conn.execute(
+                    "INSERT INTO items_fts (rowid, body) VALUES (?, ?)",
+                    (rowid, self._index_text(name, item))
+                )
+            self._commit()
+
+    def get(self, name):
+        """读取一个知识条目，不存在时返回None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, vector_id, metadata FROM items WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            return None
+        return self._row_to_item(row)
+
+    def delete(self, name):
+        """删除一个知识条目，返回是否存在"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT rowid FROM items WHERE name = ?", (name,)
+            ).fetchone()
+            if row is None:
+                return False
+            if self.fts_enabled:
+                self._conn.execute("DELETE FROM items_fts WHERE rowid = ?", (row[0],))
+            self._conn.execute("DELETE FROM items WHERE rowid = ?", (row[0],))
+            self._commit()
+            return True
+
+    def exists(self, name):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM items WHERE name = ?", (name,)
+            ).fetchone() is not None
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def names(self, offset=0, limit=None):
+        """按插入顺序返回条目名称"""
+        sql = "SELECT name FROM items ORDER BY rowid"
+        params = ()
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = (limit, offset)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+    def iter_items(self):
+        """按插入顺序返回 (name, item) 列表"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, content, vector_id, metadata FROM items ORDER BY rowid"
+            ).fetchall()
+        return [(row[0], self._row_to_item(row[1:])) for row in rows]
+
+    @staticmethod
+    def _row_to_item(row):
+        content, vector_id, metadata = row
+        try:
+            metadata = json.loads(metadata) if metadata else {}
+        except (TypeError, ValueError):
+            metadata = {}
+        item = {'vector_id': vector_id, 'metadata': metadata}
+        if content is not None:
+            item['content'] = content
+        return item
+
+    # ------------------------------------------------------------------
+    # 问答组问题向量
+    # ------------------------------------------------------------------
+
+    def replace_qa_questions(self, item, rows):
+        """替换一个条目的问题向量，rows 为 [(问题, float32向量字节)]"""
+        with self._lock:
+            self._conn.execute("DELETE FROM qa_questions WHERE item = ?", (item,))
+            self._conn.executemany(
+                "INSERT INTO qa_questions (item, question, vector) VALUES (?, ?, ?)",
+                [(item, question, vector) for question, vector in rows]
+            )
+            self._commit()
+
+    def delete_qa_questions(self, item):
+        """删除一个条目的问题向量"""
+        with self._lock:
+            self._conn.execute("DELETE FROM qa_questions WHERE item = ?", (item,))
+            self._commit()
+
+    def iter_qa_questions(self):
+        """按写入顺序返回 (条目, 问题, 向量字节) 列表"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT item, question, vector FROM qa_questions ORDER BY rowid"
+            ).fetchall()
+
+    def count_qa_questions(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM qa_questions").fetchone()[0]
+
+    # ------------------------------------------------------------------
+    # 关键词检索
+    # ------------------------------------------------------------------
+
+    def search_keywords(self, keywords, limit=15):
+        """
+        按关键词检索条目名称
+
+        Args:
+            keywords (list): 关键词列表
+            limit (int): 最多返回条数
+
+        Returns:
+            list: 按相关度排序的条目名称
+        """
+        keywords = [k.strip() for k in keywords if k and k.strip()]
+        if not keywords:
+            return []
+
+        scores = {}
+        # trigram 分词器要求检索词至少3个字符，较短的词使用 LIKE
+        if self.fts_enabled and self.fts_tokenizer == 'trigram':
+            fts_terms = [k for k in keywords if len(k) >= 3]
+            like_terms = [k for k in keywords if len(k) < 3]
+        elif self.fts_enabled:
+            fts_terms, like_terms = keywords, []
+        else:
+            fts_terms, like_terms = [], keywords
+
+        with self._lock:
+            if fts_terms:
+                match_expr = ' OR '.join('"' + k.replace('"', '""') + '"' for k in fts_terms)
+                try:
+                    rows = self._conn.execute(
+                        """
+                        SELECT items.name, bm25(items_fts) AS rank
+                        FROM items_fts JOIN items ON items.rowid = items_fts.rowid
+                        WHERE items_fts MATCH ?
+                        ORDER BY rank LIMIT ?
+                        """,
+                        (match_expr, limit * 2)
+                    ).fetchall()
+                    for name, rank in rows:
+                        # bm25 越小越相关，取负值作为得分
+                        scores[name] = scores.get(name, 0.0) - rank
+                except sqlite3.OperationalError as e:
+                    print(f"[WARNING] FTS5检索失败，改用LIKE查询: {e}")
+                    like_terms = keywords
+
+            table, column = ('items_fts', 'body') if self.fts_enabled else ('items', 'content')
+            key_column = 'items.name'
+            join = ' JOIN items ON items.rowid = items_fts.rowid' if self.fts_enabled else ''
+            for keyword in like_terms:
+                pattern = '%' + keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                rows = self._conn.execute(
+                    f"SELECT {key_column} FROM {table}{join} "
+                    f"WHERE {table}.{column} LIKE ? ESCAPE '\\' LIMIT ?",
+                    (pattern, limit * 2)
+                ).fetchall()
+                for (name,) in rows:
+                    scores[name] = scores.get(name, 0.0) + 1.0
+
+        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        return [name for name, _ in ranked[:limit]]
+
+    # ------------------------------------------------------------------
+    # 迁移
+    # ------------------------------------------------------------------
+
+    def migrate_from_json(self, json_path):
+        """
+        从旧版 items.json 迁移知识条目
+
+        Args:
+            json_path (str): items.json 路径
+
+        Returns:
+            int: 迁移的条目数量
+        """
+        if not os.path.exists(json_path):
+            return 0
+
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        migrated = 0
+        with self.batch():
+            for name, item in data.items():
+                if not isinstance(item, dict):
+                    item = {'content': str(item), 'metadata': {}}
+                self.upsert(name, item)
+                migrated += 1
+
+        print(f"[INFO] 已从 {json_path} 迁移 {migrated} 个知识条目到 {self.db_path}")
+        return migrated
+
+    def replace_from_json(self, json_path):
+        """
+        用 items.json 的内容整体替换知识条目（热重载）
+
+        在一个事务内写入文件中的条目，并删除文件中已不存在的条目及其问题向量，
+        提交前其他线程读取仍看到旧数据。
+
+        Returns:
+            dict: 被删除的条目 {名称: 向量ID}
+        """
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"知识库文件格式不正确: {type(data).__name__}")
+
+        removed = {}
+        with self.batch():
+            for name in self.names():
+                if name not in data:
+                    item = self.get(name)
+                    removed[name] = item.get('vector_id') if item else None
+                    self.delete(name)
+                    self.delete_qa_questions(name)
+            for name, item in data.items():
+                if not isinstance(item, dict):
+                    item = {'content': str(item), 'metadata': {}}
+                self.upsert(name, item)
+
+        print(f"[INFO] 已从 {json_path} 重新加载 {len(data)} 个知识条目，删除 {len(removed)} 个")
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class KnowledgeItemMapping(MutableMapping):
+    """以字典接口访问SQLite中的知识条目，读写均为单行操作"""
+
+    def __init__(self, store):
+        self._store = store
+
+    @property
+    def store(self):
+        return self._store
+
+    def __getitem__(self, name):
+        item = self._store.get(name)
+        if item is None:
+            raise KeyError(name)
+        return item
+
+    def __setitem__(self, name, item):
+        self._store.upsert(name, item)
+
+    def __delitem__(self, name):
+        if not self._store.delete(name):
+            raise KeyError(name)
+
+    def __contains__(self, name):
+        return self._store.exists(name)
+
+    def __iter__(self):
+        return iter(self._store.names())
+
+    def __len__(self):
+        return self._store.count()
+
+    def keys(self):
+        return self._store.names()
+
+    def items(self):
+        return self._store.iter_items()
+
+    def values(self):
+        return [item for _, item in self._store.iter_items()]
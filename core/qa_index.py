@@ -0,0 +1,202 @@
+"""
+问答组问题索引
+
+把每个问答组的主问题和每个相似问分别作为独立向量建立索引，均指向同一个知识条目。
+检索时按条目取最大相似度（max-sim聚合），用于高置信度问题直接返回标准答案。
+使用SQLite知识库存储时，问题向量随条目增删逐行写入存储；JSON后端仍整体保存为 qa_questions.json。
+"""
+
+import os
+import json
+import threading
+import numpy as np
+
+
+class QAQuestionIndex:
+    """问答组问题向量索引"""
+
+    def __init__(self, index_path, store=None):
+        """
+        Args:
+            index_path (str): JSON索引文件路径（SQLite存储为空时从该文件迁移）
+            store: KnowledgeStore 实例，None 表示使用JSON文件
+        """
+        self.index_path = index_path
+        self.store = store
+        self._lock = threading.RLock()
+        self._rows = []         # [{'item': 条目名称, 'question': 问题文本}]
+        self._vectors = []      # 与 _rows 对应的归一化向量
+        self._matrix = None     # 懒构建的向量矩阵
+        self._items = set()
+        self.load()
+
+    @staticmethod
+    def split_questions(question, similar_questions=''):
+        """拆分主问题和相似问（按换行、分号、竖线分隔）"""
+        questions = []
+        for text in [question] + (similar_questions or '').replace('；', '\n').replace(';', '\n') \
+                .replace('｜', '\n').replace('|', '\n').split('\n'):
+            text = (text or '').strip()
+            if text and text not in questions:
+                questions.append(text)
+        return questions
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def __len__(self):
+        return len(self._rows)
+
+    def has_item(self, item_name):
+        return item_name in self._items
+
+    def item_names(self):
+        """已建立索引的条目名称"""
+        with self._lock:
+            return set(self._items)
+
+    def get_questions(self, item_name):
+        """条目已索引的问题列表"""
+        with self._lock:
+            return [row['question'] for row in self._rows if row['item'] == item_name]
+
+    def add_item(self, item_name, questions, vectors):
+        """为一个知识条目添加问题向量（会替换该条目已有的问题）"""
+        rows = [(question, self._normalize(vector)) for question, vector in zip(questions, vectors)
+                if vector is not None]
+        # 先写存储再更新内存，避免同时持有两把锁
+        if self.store is not None:
+            self.store.replace_qa_questions(item_name, [(question, vector.tobytes()) for question, vector in rows])
+        with self._lock:
+            self._remove_rows(item_name)
+            for question, vector in rows:
+                self._rows.append({'item': item_name, 'question': question})
+                self._vectors.append(vector)
+                self._items.add(item_name)
+            self._matrix = None
+
+    def remove_item(self, item_name):
+        with self._lock:
+            if item_name not in self._items:
+                return False
+            self._remove_rows(item_name)
+        if self.store is not None:
+            self.store.delete_qa_questions(item_name)
+        return True
+
+    def _remove_rows(self, item_name):
+        if item_name not in self._items:
+            return
+        keep = [i for i, row in enumerate(self._rows) if row['item'] != item_name]
+        self._rows = [self._rows[i] for i in keep]
+        self._vectors = [self._vectors[i] for i in keep]
+        self._items.discard(item_name)
+        self._matrix = None
+
+    def search(self, query_vector, top_k=3):
+        """
+        检索最相近的问答条目
+
+        Returns:
+            list: [{'item': 条目名称, 'question': 命中的问题, 'similarity': 最大相似度}]
+        """
+        if query_vector is None:
+            return []
+        query = self._normalize(query_vector)
+
+        with self._lock:
+            if not self._rows:
+                return []
+            if self._matrix is None:
+                self._matrix = np.vstack(self._vectors)
+            if self._matrix.shape[1] != query.shape[0]:
+                print(f"[WARNING] 问题索引向量维度不匹配: {self._matrix.shape[1]} vs {query.shape[0]}")
+                return []
+
+            similarities = self._matrix @ query
+            best = {}
+            for index in np.argsort(-similarities):
+                row = self._rows[index]
+                if row['item'] in best:
+                    continue
+                best[row['item']] = {
+                    'item': row['item'],
+                    'question': row['question'],
+                    'similarity': float(similarities[index])
+                }
+                if len(best) >= top_k:
+                    break
+            return list(best.values())
+
+    def save(self):
+        """保存JSON索引；SQLite存储的问题向量在增删时已逐行写入，无需整体重写"""
+        if self.store is not None:
+            return True
+        with self._lock:
+            try:
+                data = {
+                    'rows': self._rows,
+                    'vectors': [v.tolist() for v in self._vectors]
+                }
+                tmp_path = f"{self.index_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.index_path)
+                return True
+            except Exception as e:
+                print(f"[ERROR] 保存问答问题索引失败: {e}")
+                return False
+
+    def load(self):
+        if self.store is not None:
+            return self._load_store()
+        if not os.path.exists(self.index_path):
+            return False
+        with self._lock:
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._rows = data.get('rows', [])
+                self._vectors = [np.asarray(v, dtype=np.float32) for v in data.get('vectors', [])]
+                self._items = {row['item'] for row in self._rows}
+                self._matrix = None
+                print(f"[INFO] 已加载问答问题索引: {len(self._rows)} 个问题")
+                return True
+            except Exception as e:
+                print(f"[ERROR] 加载问答问题索引失败: {e}")
+                self._rows, self._vectors, self._items = [], [], set()
+                return False
+
+    def _load_store(self):
+        """从SQLite存储加载问题向量，存储为空时从旧版JSON索引迁移"""
+        try:
+            if self.store.count_qa_questions() == 0 and os.path.exists(self.index_path):
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                grouped = {}
+                for row, vector in zip(data.get('rows', []), data.get('vectors', [])):
+                    grouped.setdefault(row['item'], []).append(
+                        (row['question'], self._normalize(vector).tobytes()))
+                with self.store.batch():
+                    for item_name, rows in grouped.items():
+                        self.store.replace_qa_questions(item_name, rows)
+                print(f"[INFO] 已从 {self.index_path} 迁移 {len(grouped)} 个问答组的问题索引")
+
+            rows = self.store.iter_qa_questions()
+            with self._lock:
+                self._rows = [{'item': item, 'question': question} for item, question, _ in rows]
+                self._vectors = [np.frombuffer(vector, dtype=np.float32) for _, _, vector in rows]
+                self._items = {row['item'] for row in self._rows}
+                self._matrix = None
+            if rows:
+                print(f"[INFO] 已加载问答问题索引: {len(rows)} 个问题")
+            return True
+        except Exception as e:
+            print(f"[ERROR] 加载问答问题索引失败: {e}")
+            with self._lock:
+                self._rows, self._vectors, self._items = [], [], set()
+                self._matrix = None
+            return False
@@ -0,0 +1,83 @@
+"""
+知识库检索结果缓存
+
+按 (规范化查询, top_k, 阈值, 知识库版本号) 缓存检索结果。
+知识库每次增删改或导入都会递增版本号，旧版本的缓存自然失效，无需TTL。
+"""
+
+import re
+import copy
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_query(query):
+    """规范化查询文本：全半角统一、大小写折叠、空白合并"""
+    if not query:
+        return ''
+    text = unicodedata.normalize('NFKC', str(query))
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text.casefold()
+
+
+class QueryResultCache:
+    """带容量上限的LRU检索结果缓存（线程安全）"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max(0, int(max_entries))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(query, top_k, generation, **params):
+        """构造缓存键，params 为影响检索结果的其他参数（如阈值）"""
+        return (normalize_query(query), top_k, generation, tuple(sorted(params.items())))
+
+    def get(self, key):
+        """命中时返回结果副本，否则返回None"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._entries[key])
+            self.misses += 1
+            return None
+
+    def put(self, key, results):
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._entries[key] = copy.deepcopy(results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """清空缓存条目（统计数据保留）"""
+        with self._lock:
+            self._entries.clear()
+
+    def clear(self):
+        """清空缓存并重置统计"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def get_stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0
+            }
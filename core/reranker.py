@@ -0,0 +1,218 @@
+"""
+知识检索交叉编码器重排序
+
+在向量召回之后，用本地交叉编码器（如 bge-reranker）对候选片段做一次批量打分，
+只保留真正相关的少数片段送入LLM提示词。
+- 全部候选在一次批量前向计算中完成打分
+- 按历史耗时自适应缩减候选数，保证延迟预算
+- 模型在后台线程加载，加载期间和单次查询超时、模型不可用时回退到原始向量排序
+"""
+
+import os
+import math
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+
+class CrossEncoderReranker:
+    """本地交叉编码器重排序器"""
+
+    def __init__(self, model_path, device=None, max_length=512,
+                 latency_budget_ms=800, timeout=2.0):
+        self.model_path = model_path
+        self.device = device
+        self.max_length = max_length
+        self.latency_budget_ms = latency_budget_ms
+        self.timeout = timeout
+
+        self.model = None
+        self.tokenizer = None
+        self.backend = None  # 'sentence_transformers' / 'transformers'
+        self._load_failed = False
+        self._load_lock = threading.Lock()
+
+        # 单线程执行器：模型加载和打分都在其中执行，超时的计算在后台继续，期间新查询直接回退
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='reranker')
+        # 执行器中有任务时持有，由执行任务的线程释放
+        self._busy = threading.Lock()
+
+        # 每个候选对的平均耗时(毫秒)，用于按预算裁剪候选数
+        self._ms_per_pair = None
+
+        # 统计
+        self.calls = 0
+        self.fallbacks = 0
+        self.total_latency_ms = 0.0
+
+    def is_available(self):
+        return self.model is not None or (not self._load_failed and os.path.exists(self.model_path))
+
+    def load(self):
+        """加载重排序模型，优先使用 sentence_transformers.CrossEncoder"""
+        with self._load_lock:
+            if self.model is not None:
+                return True
+            if self._load_failed:
+                return False
+            if not os.path.exists(self.model_path):
+                print(f"[WARNING] 重排序模型路径不存在: {self.model_path}")
+                self._load_failed = True
+                return False
+
+            try:
+                from sentence_transformers import CrossEncoder
+                self.model = CrossEncoder(self.model_path, max_length=self.max_length, device=self.device)
+                self.backend = 'sentence_transformers'
+            except Exception as e:
+                print(f"[INFO] CrossEncoder加载失败，尝试transformers: {e}")
+                try:
+                    import torch
+                    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+                    self.tokenizer = AutoTokenizer.from_pretrained(self.model_path)
+                    self.model = AutoModelForSequenceClassification.from_pretrained(self.model_path)
+                    device = self.device or ('cuda' if torch.cuda.is_available() else 'cpu')
+                    self.model.to(device)
+                    self.model.eval()
+                    self.device = device
+                    self.backend = 'transformers'
+                except Exception as e2:
+                    print(f"[ERROR] 加载重排序模型失败: {e2}")
+                    self.model = None
+                    self._load_failed = True
+                    return False
+
+            print(f"[INFO] 已加载重排序模型: {self.model_path} ({self.backend})")
+            return True
+
+    def start_loading(self):
+        """在后台线程加载模型，首个查询无需同步等待加载"""
+        if self.model is not None or self._load_failed:
+            return
+        if not self._busy.acquire(False):
+            return
+        try:
+            self._executor.submit(self._background_load)
+        except Exception:
+            self._busy.release()
+            raise
+
+    def _background_load(self):
+        try:
+            self.load()
+        finally:
+            self._busy.release()
+
+    def score(self, query, passages):
+        """对 (query, passage) 对进行一次批量打分，返回0~1之间的相关度"""
+        if not passages:
+            return []
+        pairs = [(query, passage) for passage in passages]
+
+        if self.backend == 'sentence_transformers':
+            # 单标签CrossEncoder默认已做sigmoid激活
+            scores = self.model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+            return [float(x) for x in scores]
+        else:
+            import torch
+            inputs = self.tokenizer(
+                [q for q, _ in pairs], [p for _, p in pairs],
+                padding=True, truncation=True,
+                max_length=self.max_length, return_tensors='pt'
+            ).to(self.device)
+            with torch.no_grad():
+                logits = self.model(**inputs).logits.view(-1).float().cpu().tolist()
+
+        # bge-reranker 输出原始logit，映射到0~1便于设置阈值
+        return [1.0 / (1.0 + math.exp(-x)) for x in logits]
+
+    def _budget_candidates(self, top_n, keep):
+        """根据历史耗时计算本次可处理的候选数"""
+        if not self._ms_per_pair or not self.latency_budget_ms:
+            return top_n
+        affordable = int(self.latency_budget_ms / self._ms_per_pair)
+        return max(keep, min(top_n, affordable))
+
+    def _timed_score(self, query, passages):
+        try:
+            # 尚未加载时在执行器中加载，加载耗时同样受超时限制
+            if not self.load():
+                raise RuntimeError(f"重排序模型不可用: {self.model_path}")
+            start = time.time()
+            scores = self.score(query, passages)
+            elapsed_ms = (time.time() - start) * 1000
+            per_pair = elapsed_ms / max(1, len(passages))
+            self._ms_per_pair = per_pair if self._ms_per_pair is None else 0.7 * self._ms_per_pair + 0.3 * per_pair
+            return scores, elapsed_ms
+        finally:
+            self._busy.release()
+
+    def rerank(self, query, candidates, top_n=20, keep=3, min_score=0.0):
+        """
+        对候选结果重排序
+
+        Args:
+            query (str): 用户查询
+            candidates (list): 向量检索结果，每项为包含 content 的字典
+            top_n (int): 参与重排序的候选数上限
+            keep (int): 重排序后保留的结果数
+            min_score (float): 最低相关度，低于该值的结果被丢弃
+
+        Returns:
+            tuple: (结果列表, 是否完成重排序)
+        """
+        if not candidates:
+            return candidates, False
+
+        self.calls += 1
+        if self._load_failed and self.model is None:
+            self.fallbacks += 1
+            return candidates, False
+        # 上一次计算（或模型加载）尚未结束时直接回退，不排队等待
+        if not self._busy.acquire(False):
+            self.fallbacks += 1
+            return candidates, False
+
+        n = self._budget_candidates(top_n, keep)
+        head = candidates[:n]
+        passages = [c.get('content', '') for c in head]
+
+        try:
+            future = self._executor.submit(self._timed_score, query, passages)
+        except Exception:
+            self._busy.release()
+            raise
+        try:
+            scores, elapsed_ms = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            print(f"[WARNING] 重排序超时({self.timeout}秒)，使用向量检索排序")
+            self.fallbacks += 1
+            return candidates, False
+        except Exception as e:
+            print(f"[ERROR] 重排序失败，使用向量检索排序: {e}")
+            self.fallbacks += 1
+            return candidates, False
+
+        self.total_latency_ms += elapsed_ms
+        reranked = []
+        for candidate, score in zip(head, scores):
+            item = dict(candidate)
+            item['rerank_score'] = round(float(score), 4)
+            reranked.append(item)
+        reranked.sort(key=lambda x: x['rerank_score'], reverse=True)
+        reranked = [r for r in reranked if r['rerank_score'] >= min_score][:keep]
+
+        print(f"[INFO] 重排序完成: {len(head)} 个候选 -> {len(reranked)} 个结果，耗时 {elapsed_ms:.0f}ms")
+        return reranked, True
+
+    def get_stats(self):
+        completed = self.calls - self.fallbacks
+        return {
+            'model_path': self.model_path,
+            'loaded': self.model is not None,
+            'backend': self.backend,
+            'calls': self.calls,
+            'fallbacks': self.fallbacks,
+            'avg_latency_ms': round(self.total_latency_ms / completed, 1) if completed else 0.0,
+            'ms_per_pair': round(self._ms_per_pair, 2) if self._ms_per_pair else None
+        }
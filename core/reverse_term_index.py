@@ -0,0 +1,199 @@
+"""
+反向术语索引（外语 -> 中文）
+
+术语库以中文术语为键、外语术语（可多个，逗号分隔）为值。外语→中文翻译时需要
+按外语术语匹配，本模块常驻维护这份反向映射：
+- 术语增删改时通过 TermBase 的变更通知增量更新，不再每次请求全量重建
+- 匹配自动机忽略大小写，并对英文单词检查词边界（避免 "neck" 命中 "necking"）
+- 自动机只在索引变化后的首次查询时重建
+"""
+
+import re
+import threading
+
+from core.term_matcher import AhoCorasickMatcher
+
+_WORD_CHAR = re.compile(r'[A-Za-z0-9_]')
+
+
+def parse_multiple_terms(term_string):
+    """
+    解析逗号分隔的多个术语，第一个为最高优先级
+
+    Args:
+        term_string: 术语字符串，如 "Neck,Crystal neck,Growth neck"
+
+    Returns:
+        list: ["Neck", "Crystal neck", "Growth neck"]
+    """
+    if not term_string:
+        return []
+    return [term.strip() for term in term_string.split(',') if term.strip()]
+
+
+def build_reverse_entries(chinese_term, term_data, source_lang, target_lang):
+    """
+    为一个术语生成反向映射条目
+
+    Returns:
+        list: [(外语术语小写, 条目)]，术语方向不符时为空
+    """
+    if not isinstance(term_data, dict):
+        return []
+
+    metadata = term_data.get('metadata', {})
+    # 检查原始术语的语言方向
+    original_source_lang = metadata.get('source_lang', 'zh')  # 原始：中文
+    original_target_lang = metadata.get('target_lang', 'en')  # 原始：外语
+
+    # 当前翻译是外语→中文，且原术语库是中文→外语
+    if source_lang != original_target_lang or target_lang != original_source_lang:
+        return []
+
+    foreign_terms = parse_multiple_terms(term_data.get('target_term', term_data.get('definition', '')))
+    entries = []
+    for i, foreign_term in enumerate(foreign_terms):
+        entries.append((foreign_term.lower(), {
+            'source_term': foreign_term,      # 在文本中匹配的外语术语
+            'target_term': chinese_term,      # 要替换成的中文术语
+            'definition': chinese_term,
+            'priority': i,                    # 优先级（0最高）
+            'primary_term': foreign_terms[0],  # 主要术语（用于恢复）
+            'all_terms': foreign_terms,       # 所有术语
+            'metadata': {
+                'source_lang': source_lang,
+                'target_lang': target_lang,
+                'original_source_lang': original_source_lang,
+                'original_target_lang': original_target_lang
+            }
+        }))
+    return entries
+
+
+def is_word_boundary(text, start, end):
+    """匹配两端如果是英文/数字字符，则要求相邻字符不是单词字符"""
+    if _WORD_CHAR.match(text[start]) and start > 0 and _WORD_CHAR.match(text[start - 1]):
+        return False
+    if _WORD_CHAR.match(text[end - 1]) and end < len(text) and _WORD_CHAR.match(text[end]):
+        return False
+    return True
+
+
+class IncrementalTermIndex:
+    """
+    随术语库变更增量维护的索引基类
+
+    子类实现 _reset/_add/_remove，通过 TermBase.add_listener 注册 on_term_changed。
+    """
+
+    def __init__(self, source_lang='en', target_lang='zh'):
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self._lock = threading.RLock()
+        # 已同步到的术语库版本号，None 表示需要整体重建
+        self.term_version = None
+
+    def _reset(self):
+        raise NotImplementedError
+
+    def _add(self, term, term_data):
+        raise NotImplementedError
+
+    def _remove(self, term):
+        raise NotImplementedError
+
+    def _invalidate(self):
+        """索引内容变化后调用，子类用于清除派生的匹配器"""
+
+    def rebuild(self, terms, term_version=None):
+        """从完整术语库重建索引"""
+        with self._lock:
+            self._reset()
+            for term, term_data in terms.items():
+                self._add(term, term_data)
+            self._invalidate()
+            self.term_version = term_version
+        direction = f" ({self.source_lang}→{self.target_lang})" if self.source_lang else ""
+        print(f"[INFO] {type(self).__name__} 已重建{direction}，共 {len(self)} 个术语")
+
+    def on_term_changed(self, event, term, term_data, term_version):
+        """TermBase 变更通知：add/update/delete 增量更新，reload 时标记需要重建"""
+        with self._lock:
+            if event == 'reload':
+                self.term_version = None
+                return
+            if self.term_version is None or term_version != self.term_version + 1:
+                # 尚未建立索引或漏掉了中间的变更，等下次查询时整体重建
+                self.term_version = None
+                return
+            self._remove(term)
+            if event in ('add', 'update') and term_data is not None:
+                self._add(term, term_data)
+            self._invalidate()
+            self.term_version = term_version
+
+
+class ReverseTermIndex(IncrementalTermIndex):
+    """常驻的反向术语索引，随术语库变更增量维护"""
+
+    def __init__(self, source_lang='en', target_lang='zh'):
+        super().__init__(source_lang, target_lang)
+        self._reset()
+        self._matcher = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _reset(self):
+        # 外语术语小写 -> {中文术语: 条目}，同一外语术语可能对应多个中文术语
+        self._entries = {}
+        # 中文术语 -> 它贡献的外语术语小写列表，用于增量删除
+        self._by_term = {}
+
+    def _invalidate(self):
+        self._matcher = None
+
+    def _add(self, chinese_term, term_data):
+        keys = []
+        for key, entry in build_reverse_entries(chinese_term, term_data, self.source_lang, self.target_lang):
+            self._entries.setdefault(key, {})[chinese_term] = entry
+            keys.append(key)
+        if keys:
+            self._by_term[chinese_term] = keys
+
+    def _remove(self, chinese_term):
+        for key in self._by_term.pop(chinese_term, []):
+            bucket = self._entries.get(key)
+            if bucket is not None:
+                bucket.pop(chinese_term, None)
+                if not bucket:
+                    del self._entries[key]
+
+    def lookup(self, foreign_term):
+        """按外语术语精确查找（忽略大小写），返回优先级最高的条目"""
+        bucket = self._entries.get(foreign_term.lower())
+        if not bucket:
+            return None
+        return min(bucket.values(), key=lambda entry: entry['priority'])
+
+    def _get_matcher(self):
+        with self._lock:
+            if self._matcher is None:
+                patterns = [(key, key) for key in self._entries]
+                self._matcher = AhoCorasickMatcher(patterns, case_sensitive=False)
+            return self._matcher
+
+    def find(self, text):
+        """
+        在文本中查找外语术语（最左最长、互不重叠、英文词边界）
+
+        Returns:
+            list: [(起始位置, 结束位置, 条目)]
+        """
+        matcher = self._get_matcher()
+        matches = []
+        for start, end, key in matcher.find(text, accept=lambda t, s, e, _: is_word_boundary(t, s, e)):
+            entry = self.lookup(key)
+            if entry is not None:
+                matches.append((start, end, entry))
+        return matches
@@ -0,0 +1,304 @@
+"""
+分句翻译流水线
+
+长文本整段交给模型翻译时容易超出 max_new_tokens，也无法利用翻译记忆库。本模块按句子处理：
+分句 -> 相同句子去重 -> 查翻译记忆库 -> 只把未命中的句子分批交给模型 -> 按原格式拼接
+- 分句时保留原文的换行、缩进和句间空白，拼接后版式与原文一致
+- 多个短句合并为带编号的一批翻译，译文编号对不上时逐句重译
+- 以事件的形式逐句返回结果，界面可以实时显示长文本的翻译进度
+"""
+
+import re
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# 句子结束标点：中文标点后直接断句，英文标点后需有空白（避免 3.5、e.g. 被拆开）
+_BOUNDARY_RE = re.compile(r'((?<=[。！？])[ \t]*|(?<=[.!?])[ \t]+)')
+# 含字母或汉字的片段才需要翻译（纯数字、符号原样保留）
+_WORD_RE = re.compile(r'[^\W\d_]')
+# 批量翻译的编号格式
+_NUMBER_RE = re.compile(r'^\s*<(\d+)>\s?(.*)$')
+# 句子间不需要空格的目标语言
+_NO_SPACE_LANGS = {'zh', 'ja'}
+# 每批最多放入提示词的相似译文示例数
+_MAX_BATCH_EXAMPLES = 3
+
+
+def needs_translation(text):
+    """片段是否含字母或汉字（纯数字、符号不需要翻译）"""
+    return bool(_WORD_RE.search(text or ''))
+
+
+def split_segments(text):
+    """
+    把文本拆分为片段，拼接全部片段可还原原文
+
+    Returns:
+        list: [(片段文本, 是否需要翻译)]
+    """
+    pieces = []
+    for line in text.splitlines(keepends=True):
+        body = line.rstrip('\r\n')
+        ending = line[len(body):]
+        stripped = body.strip()
+        if not stripped:
+            pieces.append((line, False))
+            continue
+
+        start = len(body) - len(body.lstrip())
+        if start:
+            pieces.append((body[:start], False))
+        for index, part in enumerate(_BOUNDARY_RE.split(stripped)):
+            if not part:
+                continue
+            # 奇数位置是分隔的空白
+            pieces.append((part, index % 2 == 0 and needs_translation(part)))
+        trailing = body[start + len(stripped):] + ending
+        if trailing:
+            pieces.append((trailing, False))
+    return pieces
+
+
+def render_segments(pieces, translations, target_lang=None):
+    """
+    逐片段生成输出文本，拼接结果与 assemble_segments 相同
+
+    句间补的空格计入后一句译文，中文/日文去掉的句间空白输出为空字符串。
+
+    Returns:
+        list: 与 pieces 等长的输出文本列表
+    """
+    no_space = target_lang in _NO_SPACE_LANGS
+    parts = []
+    previous_translated = False
+    for index, (text, translate) in enumerate(pieces):
+        if translate and index in translations:
+            prefix = ' ' if previous_translated and not no_space else ''
+            parts.append(prefix + translations[index])
+            previous_translated = True
+            continue
+
+        if no_space and previous_translated and not text.strip() and '\n' not in text \
+                and index + 1 in translations:
+            # 两句译文之间的空白，中文/日文不需要
+            parts.append('')
+            continue
+        parts.append(text)
+        previous_translated = False
+    return parts
+
+
+def assemble_segments(pieces, translations, target_lang=None):
+    """
+    按原格式拼接译文
+
+    Args:
+        pieces: split_segments 的结果
+        translations: {片段序号: 译文}，缺少的片段保留原文
+        target_lang: 目标语言；中文/日文句间去掉空格，其他语言在紧挨的句子间补空格
+    """
+    return ''.join(render_segments(pieces, translations, target_lang))
+
+
+def number_segments(texts):
+    """把多个句子合并为带编号的文本，供一次翻译"""
+    return '\n'.join(f"<{number}> {text}" for number, text in enumerate(texts, 1))
+
+
+def parse_numbered(text, count):
+    """
+    解析带编号的译文
+
+    Returns:
+        list: 与输入句子等长的译文列表，编号缺失或重复时返回 None
+    """
+    results = {}
+    current = None
+    for line in (text or '').splitlines():
+        match = _NUMBER_RE.match(line)
+        if match:
+            current = int(match.group(1))
+            if current in results or not 1 <= current <= count:
+                return None
+            results[current] = match.group(2).strip()
+        elif current is not None and line.strip():
+            # 模型把一句译文拆成多行时并回同一句
+            results[current] = f"{results[current]} {line.strip()}".strip()
+    if len(results) != count or not all(results.values()):
+        return None
+    return [results[number] for number in range(1, count + 1)]
+
+
+class SegmentPipeline:
+    """分句翻译流水线"""
+
+    def __init__(self, translate_batch, translation_memory=None, memory_key=None, batch_chars=800, batch_size=8,
+                 workers=1):
+        """
+        Args:
+            translate_batch: translate_batch(texts, examples) -> 与输入等长的译文列表（失败项为 None）
+            translation_memory: TranslationMemory 实例，None 表示不使用记忆库
+            memory_key: memory_key(segment) -> (源语言, 目标语言, 术语指纹, 模型标识)，返回 None 时不查记忆库
+            batch_chars (int): 每批原文的最大字符数
+            batch_size (int): 每批的最大句子数
+            workers (int): 同时翻译的批数（本地模型为 1，外部 API 可并发）
+        """
+        self.translate_batch = translate_batch
+        self.translation_memory = translation_memory
+        self.memory_key = memory_key
+        self.batch_chars = max(1, int(batch_chars))
+        self.batch_size = max(1, int(batch_size))
+        self.workers = max(1, int(workers))
+
+    def run(self, text, target_lang=None):
+        """
+        逐句翻译并生成进度事件
+
+        Yields:
+            dict: 'start' 事件包含全部片段；每句完成时产生 'segment' 事件；
+                  最后产生 'done' 事件，包含拼接后的译文和统计
+        """
+        pieces = split_segments(text)
+        # 相同句子只翻译一次：句子 -> 片段序号列表
+        unique = {}
+        for index, (piece, translate) in enumerate(pieces):
+            if translate:
+                unique.setdefault(piece.strip(), []).append(index)
+        segments = list(unique.items())
+
+        yield {
+            'event': 'start',
+            'pieces': [{'text': piece, 'translate': translate} for piece, translate in pieces],
+            'segments': sum(len(positions) for _, positions in segments),
+            'unique': len(segments)
+        }
+
+        translations = {}
+        stats = {'memory': 0, 'model': 0, 'failed': 0, 'batches': 0}
+        for event in self._translate_unique([source for source, _ in segments], stats):
+            positions = segments[event['id']][1]
+            # 失败的句子不记入译文，拼接时保留原文和原有空白
+            if event['origin'] != 'failed':
+                for position in positions:
+                    translations[position] = event['translation']
+            yield dict(event, positions=positions)
+
+        yield {
+            'event': 'done',
+            'text': assemble_segments(pieces, translations, target_lang),
+            'stats': dict(stats, segments=sum(len(positions) for _, positions in segments), unique=len(segments))
+        }
+
+    def run_units(self, texts):
+        """
+        把每段文本作为一个整体翻译（不再分句），相同文本只翻译一次
+
+        Yields:
+            dict: 'start'、每段完成时的 'segment'，最后是 'done'（translations 为 {原文: 译文}，不含失败的文本）
+        """
+        sources = list(dict.fromkeys(text.strip() for text in texts if text and text.strip()))
+        yield {'event': 'start', 'segments': len(texts), 'unique': len(sources)}
+
+        translations = {}
+        stats = {'memory': 0, 'model': 0, 'failed': 0, 'batches': 0}
+        for event in self._translate_unique(sources, stats):
+            if event['origin'] != 'failed':
+                translations[event['source']] = event['translation']
+            yield event
+
+        yield {'event': 'done', 'translations': translations,
+               'stats': dict(stats, segments=len(texts), unique=len(sources))}
+
+    def translate(self, text, target_lang=None):
+        """翻译整段文本，返回拼接后的译文"""
+        result = text
+        for event in self.run(text, target_lang):
+            if event['event'] == 'done':
+                result = event['text']
+        return result
+
+    def _translate_unique(self, sources, stats):
+        """查翻译记忆库后分批翻译未命中的文本，每完成一条产生一个 'segment' 事件"""
+        completed = 0
+
+        def finish(segment_id, source, translation, origin):
+            nonlocal completed
+            completed += 1
+            if translation is None:
+                stats['failed'] += 1
+            return {
+                'event': 'segment',
+                'id': segment_id,
+                'source': source,
+                'translation': translation if translation is not None else source,
+                'origin': origin,
+                'completed': completed,
+                'unique': len(sources)
+            }
+
+        # 先查翻译记忆库，命中的句子立即返回
+        misses = []
+        for segment_id, source in enumerate(sources):
+            key = self._memory_key(source)
+            hit, examples = self.translation_memory.match(source, *key) if key else (None, [])
+            if hit:
+                stats['memory'] += 1
+                yield finish(segment_id, source, hit['target_text'], hit['match'])
+            else:
+                misses.append((segment_id, source, key, examples))
+
+        def handle(batch, results):
+            stats['batches'] += 1
+            for (segment_id, source, key, _), translation in zip(batch, results):
+                if translation and translation.strip() and translation.strip() != source:
+                    translation = translation.strip()
+                    stats['model'] += 1
+                    if key:
+                        self.translation_memory.store(source, translation, *key)
+                    yield finish(segment_id, source, translation, 'model')
+                else:
+                    yield finish(segment_id, source, None, 'failed')
+
+        batches = list(self._batches(misses))
+        if self.workers > 1 and len(batches) > 1:
+            executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='segment-translate')
+            try:
+                futures = {executor.submit(self._call_batch, batch): batch for batch in batches}
+                for future in as_completed(futures):
+                    yield from handle(futures[future], future.result())
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            for batch in batches:
+                yield from handle(batch, self._call_batch(batch))
+
+    def _call_batch(self, batch):
+        """翻译一批文本，出错时整批记为失败"""
+        examples = []
+        for _, _, _, segment_examples in batch:
+            examples.extend(example for example in segment_examples if example not in examples)
+        try:
+            results = self.translate_batch([source for _, source, _, _ in batch], examples[:_MAX_BATCH_EXAMPLES])
+        except Exception as e:
+            print(f"[ERROR] 批量翻译失败: {e}")
+            traceback.print_exc()
+            return [None] * len(batch)
+        return list(results) + [None] * (len(batch) - len(results))
+
+    def _memory_key(self, source):
+        if self.translation_memory is None or self.memory_key is None:
+            return None
+        return self.memory_key(source)
+
+    def _batches(self, misses):
+        """按字符数和句子数把未命中的句子分批"""
+        batch, chars = [], 0
+        for item in misses:
+            length = len(item[1])
+            if batch and (chars + length > self.batch_chars or len(batch) >= self.batch_size):
+                yield batch
+                batch, chars = [], 0
+            batch.append(item)
+            chars += length
+        if batch:
+            yield batch
@@ -3,6 +3,17 @@ import json
 import re
 from datetime import datetime
 import uuid
+import threading
+from contextlib import contextmanager
+
+from core.vector_backfill import VectorBackfillJob
+from core.reverse_term_index import ReverseTermIndex
+from core.fuzzy_term_index import FuzzyTermIndex
+from core.term_lookup_index import TermLookupIndex
+from core.term_statistics import TermStatistics
+from core.vector_id_index import VectorIdIndex
+from core.term_importers import STREAMING_EXTENSIONS, import_term_file
+from core.hot_reload import note_local_write
 
 class TermBase:
     """术语库管理类"""
@@ -13,70 +24,394 @@ class TermBase:
         self.term_path = os.path.join('data', 'terms')
         self.ensure_dir_exists(self.term_path)
 
+        # 写入锁：增删改、变更通知、批量事务和热加载替换都在锁内进行（可重入，监听器可回调术语库）
+        self._lock = threading.RLock()
+        # 术语库版本号，任何增删改/加载都会递增，用于术语匹配自动机等缓存失效
+        self.version = 0
+        # 术语变更监听器 listener(event, term, term_data, version)，event 为 add/update/delete/reload
+        self._listeners = []
+        # 反向术语索引 {(source_lang, target_lang): ReverseTermIndex}
+        self.reverse_indexes = {}
+        # 模糊匹配索引 {(source_lang, target_lang): FuzzyTermIndex}
+        self.fuzzy_indexes = {}
+        # 术语列表查询索引（排序、筛选、搜索、游标翻页），首次使用时建立
+        self.lookup_index = None
+        # 增量维护的统计数据（语言对、分类、最近新增、最后更新时间），首次使用时建立
+        self.statistics = None
+        # 向量ID -> 术语键的反向索引，向量检索结果按它解析，首次使用时建立
+        self.vector_id_index = None
+        # 批量写入状态：嵌套深度、待生成向量的术语、撤销记录、是否有待保存的修改
+        self._bulk_depth = 0
+        self._bulk_pending = []
+        self._bulk_undo = {}
+        self._bulk_dirty = False
+
         # 术语条目
         self.terms = {}  # {term: {'definition': str, 'vector_id': str, 'metadata': dict}}
 
         # 加载术语条目
         self.load()
 
+        # 后台术语向量补建任务（缺少向量的术语在变更时登记，按批补建并写检查点）
+        batch_size = settings.get('term_backfill_batch_size', 32) if hasattr(settings, 'get') else 32
+        self.vector_backfill = VectorBackfillJob(
+            '术语库',
+            os.path.join(self.term_path, 'vector_backfill.json'),
+            list_keys=lambda: list(self.terms.keys()),
+            load_text=self._backfill_text,
+            store_vectors=self._store_backfill_vectors,
+            encode_texts=lambda texts: self.vector_db.encode_texts(texts),
+            save=self.save,
+            is_ready=lambda: bool(getattr(self.vector_db, 'model', None)),
+            batch_size=batch_size
+        )
+
         # 当向量模型加载完成后初始化术语向量
         if hasattr(vector_db, 'model') and vector_db.model:
             self.ensure_term_vectors()
         else:
             print("向量模型尚未加载，将在模型加载完成后初始化术语向量")
 
+    @property
+    def terms(self):
+        return self._terms
+
+    @terms.setter
+    def terms(self, value):
+        # 整体替换术语字典（加载、清空）时通知监听器重建
+        self._terms = value
+        self._notify_change('reload')
+
+    def add_listener(self, listener):
+        """注册术语变更监听器"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """移除术语变更监听器"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify_change(self, event, term=None, term_data=None):
+        """递增版本号并通知监听器"""
+        with self._lock:
+            self.version += 1
+            for listener in list(self._listeners):
+                try:
+                    listener(event, term, term_data, self.version)
+                except Exception as e:
+                    print(f"[WARNING] 术语变更通知失败: {e}")
+
+    def notify_term_changed(self, term):
+        """术语条目在外部被直接修改或删除后调用，通知索引和缓存更新"""
+        with self._lock:
+            if term in self.terms:
+                self._notify_change('update', term, self.terms[term])
+            else:
+                self._notify_change('delete', term)
+
+    def _get_term_index(self, indexes, factory, source_lang, target_lang):
+        """
+        获取随术语变更增量维护的索引，首次使用或术语库整体变化后重建
+
+        创建、注册和重建都持有写入锁，重建时术语字典不会被其他线程修改
+        """
+        key = (source_lang, target_lang)
+        with self._lock:
+            index = indexes.get(key)
+            if index is None:
+                index = factory(source_lang, target_lang)
+                indexes[key] = index
+                self.add_listener(index.on_term_changed)
+            if index.term_version != self.version:
+                index.rebuild(self.terms, self.version)
+            return index
+
+    def get_reverse_index(self, source_lang='en', target_lang='zh'):
+        """获取反向术语索引（外语→中文）"""
+        return self._get_term_index(self.reverse_indexes, ReverseTermIndex, source_lang, target_lang)
+
+    def get_fuzzy_index(self, source_lang='en', target_lang='zh'):
+        """获取模糊术语匹配索引（词形变化、大小写/连字符差异、少量拼写错误）"""
+        min_score = self.settings.get('term_fuzzy_min_score', 0.75) if hasattr(self.settings, 'get') else 0.75
+        return self._get_term_index(
+            self.fuzzy_indexes,
+            lambda src, tgt: FuzzyTermIndex(src, tgt, min_score=min_score),
+            source_lang, target_lang
+        )
+
+    def _get_shared_index(self, attr, factory):
+        """获取不区分翻译方向的增量索引，首次使用或术语库整体变化后重建（持有写入锁）"""
+        with self._lock:
+            index = getattr(self, attr)
+            if index is None:
+                index = factory()
+                setattr(self, attr, index)
+                self.add_listener(index.on_term_changed)
+            if index.term_version != self.version:
+                index.rebuild(self.terms, self.version)
+            return index
+
+    def get_lookup_index(self):
+        """获取术语列表查询索引"""
+        return self._get_shared_index('lookup_index', TermLookupIndex)
+
+    def get_statistics(self):
+        """获取增量维护的术语库统计"""
+        return self._get_shared_index('statistics', TermStatistics)
+
+    def get_vector_id_index(self):
+        """获取向量ID到术语键的反向索引"""
+        return self._get_shared_index('vector_id_index', VectorIdIndex)
+
+    def resolve_vector_ids(self, vector_ids):
+        """把向量检索返回的向量ID解析为术语键（保持顺序、去重，跳过已失效的ID）"""
+        return self.get_vector_id_index().resolve(vector_ids, self.terms)
+
+    def _set_vector_id(self, term, term_data, vector_id):
+        """记录术语的向量ID并同步反向索引"""
+        term_data['vector_id'] = vector_id
+        if self.vector_id_index is not None and self.terms.get(term) is term_data:
+            self.vector_id_index.set_vector_id(term, vector_id)
+
+    @staticmethod
+    def _new_index_like(index):
+        """创建与现有索引同类型、同参数的空索引"""
+        if isinstance(index, FuzzyTermIndex):
+            return FuzzyTermIndex(index.source_lang, index.target_lang, n=index.n, min_score=index.min_score)
+        if index.source_lang is None:
+            return type(index)()
+        return type(index)(index.source_lang, index.target_lang)
+
+    def replace_terms(self, terms):
+        """
+        整体替换术语字典（热加载使用）
+
+        新字典的各项索引先在调用线程中建好，再一次性替换术语字典和索引并递增版本号，
+        替换前进行中的查询继续使用旧的术语和索引。整个过程持有写入锁，替换期间的增删改会等待。
+        """
+        with self._lock:
+            new_version = self.version + 1
+            # (所属容器, 键或属性名, 旧索引, 新索引)
+            replacements = []
+            for attr in ('lookup_index', 'statistics', 'vector_id_index'):
+                index = getattr(self, attr)
+                if index is not None:
+                    replacements.append((None, attr, index, self._new_index_like(index)))
+            for indexes in (self.reverse_indexes, self.fuzzy_indexes):
+                for key, index in list(indexes.items()):
+                    replacements.append((indexes, key, index, self._new_index_like(index)))
+            for _, _, _, index in replacements:
+                index.rebuild(terms, new_version)
+
+            for container, key, old_index, new_index in replacements:
+                self.remove_listener(old_index.on_term_changed)
+            self._terms = terms
+            for container, key, old_index, new_index in replacements:
+                if container is None:
+                    setattr(self, key, new_index)
+                else:
+                    container[key] = new_index
+            self._notify_change('reload')
+            # 新索引已与本次版本同步，通知之后再注册，避免被 reload 事件标记为需要重建
+            for container, key, old_index, new_index in replacements:
+                self.add_listener(new_index.on_term_changed)
+
+            # 外部新增的术语没有向量，交给后台补建
+            missing = [term for term, term_data in terms.items()
+                       if isinstance(term_data, dict) and not term_data.get('vector_id')]
+            if hasattr(self, 'vector_backfill'):
+                for term in missing:
+                    self.vector_backfill.mark_dirty(term)
+                self.vector_backfill.flush()
+                if missing and getattr(self.vector_db, 'model', None):
+                    self.vector_backfill.start()
+
+    def reload_from_disk(self):
+        """
+        术语文件被外部修改后重新加载，解析失败时保留当前术语
+
+        读取文件和替换术语字典在同一次持锁内完成，其间不会有新增的术语被替换掉。
+        """
+        with self._lock:
+            if self._bulk_depth:
+                print("[WARNING] 批量写入进行中，跳过术语库热加载")
+                return False
+            load_path = os.path.join(self.term_path, 'terms.json')
+            try:
+                with open(load_path, 'r', encoding='utf-8') as f:
+                    terms = json.load(f)
+                if not isinstance(terms, dict):
+                    raise ValueError(f"术语文件格式不正确: {type(terms).__name__}")
+            except Exception as e:
+                print(f"[ERROR] 重新加载术语库失败，继续使用当前术语: {e}")
+                return False
+
+            self.replace_terms(terms)
+            print(f"[INFO] 术语库已重新加载，共 {len(terms)} 个术语 (版本 {self.version})")
+            return True
+
+    def verify_statistics(self, rebuild=False):
+        """
+        校验增量统计与术语库是否一致
+
+        Args:
+            rebuild (bool): 发现差异时是否按术语库重建
+
+        Returns:
+            dict: 有差异的统计项，一致时为空
+        """
+        with self._lock:
+            statistics = self.get_statistics()
+            drift = statistics.verify(self.terms)
+            if drift:
+                print(f"[WARNING] 术语库统计与术语数据不一致: {', '.join(drift)}")
+                if rebuild:
+                    statistics.rebuild(self.terms, self.version)
+            return drift
+
+    @contextmanager
+    def bulk(self):
+        """
+        批量写入事务
+
+        事务内 add_term 和 save 只修改内存，不落盘也不逐条生成向量；正常退出时批量生成向量，
+        并只保存一次（先写向量文件，再以临时文件校验后替换的方式写术语文件）。事务内抛出异常时
+        撤销本次新增/覆盖的术语，不写入磁盘。支持嵌套，只有最外层负责提交。
+        整个事务持有写入锁，其他线程的增删改和热加载等待事务结束。
+        """
+        with self._lock:
+            self._bulk_depth += 1
+            outermost = self._bulk_depth == 1
+            if outermost:
+                self._bulk_pending, self._bulk_undo, self._bulk_dirty = [], {}, False
+            succeeded = False
+            try:
+                yield self
+                succeeded = True
+            except BaseException:
+                if outermost:
+                    self._rollback_bulk()
+                raise
+            finally:
+                self._bulk_depth -= 1
+                if outermost:
+                    try:
+                        if succeeded:
+                            self._commit_bulk()
+                    finally:
+                        self._bulk_pending, self._bulk_undo = [], {}
+
+    def _rollback_bulk(self):
+        """撤销批量事务中的术语修改"""
+        print(f"[WARNING] 批量写入失败，撤销 {len(self._bulk_undo)} 个术语的修改")
+        for term, previous in self._bulk_undo.items():
+            if previous is None:
+                self.terms.pop(term, None)
+            else:
+                self.terms[term] = previous
+            self.notify_term_changed(term)
+        self._bulk_dirty = False
+
+    def _commit_bulk(self):
+        """批量生成向量并一次性保存"""
+        pending = [term for term in dict.fromkeys(self._bulk_pending)
+                   if isinstance(self.terms.get(term), dict) and not self.terms[term].get('vector_id')]
+        if pending and getattr(self.vector_db, 'model', None):
+            batch_size = self.vector_backfill.batch_size
+            print(f"[INFO] 批量生成 {len(pending)} 个术语向量")
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                try:
+                    texts = [self.terms[term].get('source_term', term) for term in batch]
+                    vectors = self.vector_db.encode_texts(texts)
+                    self._store_backfill_vectors([(term, text, vector)
+                                                  for term, text, vector in zip(batch, texts, vectors)
+                                                  if vector is not None])
+                except Exception as e:
+                    print(f"[WARNING] 批量生成术语向量失败，将由后台补建: {e}")
+                    break
+
+        # 向量未生成的术语登记到后台补建
+        for term in pending:
+            if not self.terms[term].get('vector_id'):
+                self.vector_backfill.mark_dirty(term)
+
+        # save 先写向量文件再写术语文件，术语不会指向未落盘的向量
+        if self._bulk_dirty or pending:
+            self._bulk_dirty = False
+            if not self.save():
+                raise RuntimeError("批量写入术语库失败")
+
     def ensure_dir_exists(self, path):
         """确保目录存在"""
         if not os.path.exists(path):
             os.makedirs(path)
 
-    def add_term(self, source_term, target_term, source_lang="zh", target_lang="en"):
-        """添加术语条目"""
-        if not source_term or not target_term:
-            print("[ERROR] 添加术语失败: 源术语或目标术语不能为空")
-            return False
-
-        # 生成唯一ID
-        term_id = str(uuid.uuid4())
-
-        # 创建术语数据
-        metadata = {
-            'id': term_id,
-            'source_lang': source_lang,
-            'target_lang': target_lang,
-            'type': 'term',
-            'added_time': datetime.now().isoformat()
-        }
+    def add_term(self, source_term, target_term, source_lang="zh", target_lang="en", metadata=None):
+        """添加术语条目，metadata 为附加的元数据（如分类、描述）"""
+        with self._lock:
+            if not source_term or not target_term:
+                print("[ERROR] 添加术语失败: 源术语或目标术语不能为空")
+                return False
 
-        term_data = {
-            'source_term': source_term,
-            'target_term': target_term,
-            'definition': target_term,  # 兼容旧版结构
-            'vector_id': None,  # 稍后生成向量
-            'metadata': metadata
-        }
+            # 生成唯一ID
+            term_id = str(uuid.uuid4())
+
+            # 创建术语数据
+            extra_metadata = metadata if isinstance(metadata, dict) else {}
+            metadata = {
+                'id': term_id,
+                'source_lang': source_lang,
+                'target_lang': target_lang,
+                'type': 'term',
+                'added_time': datetime.now().isoformat()
+            }
+            metadata.update({key: value for key, value in extra_metadata.items() if key not in metadata})
+
+            term_data = {
+                'source_term': source_term,
+                'target_term': target_term,
+                'definition': target_term,  # 兼容旧版结构
+                'vector_id': None,  # 稍后生成向量
+                'metadata': metadata
+            }
+
+            # 批量写入事务中只修改内存，向量和保存在事务提交时统一处理
+            if self._bulk_depth:
+                self._bulk_undo.setdefault(source_term, self.terms.get(source_term))
+                self.terms[source_term] = term_data
+                self._notify_change('add', source_term, term_data)
+                self._bulk_pending.append(source_term)
+                self._bulk_dirty = True
+                return True
+
+            # 添加到术语库
+            self.terms[source_term] = term_data
+            self._notify_change('add', source_term, term_data)
 
-        # 添加到术语库
-        self.terms[source_term] = term_data
+            # 保存术语库
+            save_result = self.save()
 
-        # 保存术语库
-        save_result = self.save()
+            # 尝试生成向量
+            if self.vector_db and hasattr(self.vector_db, 'model') and self.vector_db.model:
+                try:
+                    vector = self.vector_db.get_embedding(source_term)
+                    if vector is not None:
+                        vector_id = str(uuid.uuid4())
+                        self.vector_db.add_vector(vector_id, source_term, vector, metadata)
+                        self._set_vector_id(source_term, term_data, vector_id)
+                        self.save()
+                        print(f"[INFO] 术语 '{source_term}' 向量生成成功")
+                except Exception as e:
+                    print(f"[WARNING] 术语 '{source_term}' 向量生成失败: {e}")
 
-        # 尝试生成向量
-        if self.vector_db and hasattr(self.vector_db, 'model') and self.vector_db.model:
-            try:
-                vector = self.vector_db.get_embedding(source_term)
-                if vector is not None:
-                    vector_id = str(uuid.uuid4())
-                    self.vector_db.add_vector(vector_id, source_term, vector, metadata)
-                    term_data['vector_id'] = vector_id
-                    self.terms[source_term] = term_data
-                    self.save()
-                    print(f"[INFO] 术语 '{source_term}' 向量生成成功")
-            except Exception as e:
-                print(f"[WARNING] 术语 '{source_term}' 向量生成失败: {e}")
+            # 向量未生成时登记到后台补建
+            if not term_data.get('vector_id'):
+                self.vector_backfill.mark_dirty(source_term)
+                self.vector_backfill.flush()
 
-        return save_result
+            return save_result
 
     def get_term(self, term):
         """获取术语定义"""
@@ -86,50 +421,84 @@ class TermBase:
 
     def update_term(self, term, definition, metadata=None):
         """更新术语条目"""
-        if term not in self.terms:
-            return False
+        with self._lock:
+            if term not in self.terms:
+                return False
 
-        if metadata is None:
-            metadata = self.terms[term]['metadata']
+            if metadata is None:
+                metadata = self.terms[term]['metadata']
 
-        # 获取文本向量
-        ai_engine = self.settings.get_ai_engine()
-        if not ai_engine:
-            return False
+            # 获取文本向量
+            ai_engine = self.settings.get_ai_engine()
+            if not ai_engine:
+                return False
 
-        vector = ai_engine.get_vector_embedding(term + " " + definition)
-        if vector is None:
-            return False
+            vector = ai_engine.get_vector_embedding(term + " " + definition)
+            if vector is None:
+                return False
 
-        # 删除旧向量
-        old_vector_id = self.terms[term]['vector_id']
-        self.vector_db.delete(old_vector_id)
+            # 删除旧向量
+            old_vector_id = self.terms[term]['vector_id']
+            self.vector_db.delete(old_vector_id)
 
-        # 添加新向量
-        vector_id = self.vector_db.add(term + " " + definition, vector, metadata)
+            # 添加新向量
+            vector_id = self.vector_db.add(term + " " + definition, vector, metadata)
 
-        # 更新术语条目
-        self.terms[term] = {
-            'definition': definition,
-            'vector_id': vector_id,
-            'metadata': metadata
-        }
+            # 更新术语条目
+            self.terms[term] = {
+                'definition': definition,
+                'vector_id': vector_id,
+                'metadata': metadata
+            }
+            self._notify_change('update', term, self.terms[term])
 
-        return True
+            return True
+
+    def update_term_fields(self, term, target_term=None, metadata=None):
+        """
+        修改术语译文和元数据（分类、描述、语言等）并保存
+
+        修改、变更通知和保存都持有写入锁，不会与批量导入或热加载交错。
+
+        Args:
+            term (str): 术语键
+            target_term (str): 新的目标术语，None 表示不修改
+            metadata (dict): 需要更新的元数据字段
+
+        Returns:
+            dict: 修改后的术语数据；术语不存在、格式错误或保存失败时返回None
+        """
+        with self._lock:
+            term_data = self.terms.get(term)
+            if not isinstance(term_data, dict):
+                return None
+            if target_term is not None:
+                term_data['target_term'] = target_term
+                term_data['definition'] = target_term  # 兼容旧版结构
+            term_metadata = term_data.setdefault('metadata', {})
+            term_metadata.update(metadata or {})
+            term_metadata['updated_time'] = datetime.now().isoformat()
+            self._notify_change('update', term, term_data)
+            if not self.save():
+                return None
+            return term_data
 
     def delete_term(self, term):
         """删除术语条目"""
-        if term not in self.terms:
-            return False
+        with self._lock:
+            if term not in self.terms:
+                return False
 
-        # 删除向量
-        vector_id = self.terms[term]['vector_id']
-        self.vector_db.delete(vector_id)
+            # 删除向量
+            vector_id = self.terms[term]['vector_id']
+            self.vector_db.delete(vector_id)
 
-        # 删除术语条目
-        del self.terms[term]
+            # 删除术语条目
+            del self.terms[term]
+            self._notify_change('delete', term)
+            self.vector_backfill.discard(term)
 
-        return True
+            return True
 
     def list_terms(self):
         """列出所有术语条目"""
@@ -164,13 +533,8 @@ class TermBase:
             print("在向量数据库中搜索...")
             vector_results = self.vector_db.search(query_vector, top_k)
 
-            # 转换结果为术语条目
-            items = []
-            for vector_id, _, _ in vector_results:
-                for term_key, term_info in self.terms.items():
-                    if term_info.get('vector_id') == vector_id:
-                        items.append(term_key)
-                        break
+            # 按向量ID反向索引转换为术语条目
+            items = self.resolve_vector_ids(result.get('vector_id') for result in vector_results)
 
             # 如果向量搜索没有足够结果，补充文本搜索
             if len(items) < top_k:
@@ -225,26 +589,17 @@ class TermBase:
             with open(file_path, 'r', encoding='utf-8') as f:
                 term_data = json.load(f)
 
-            for term, definition in term_data.items():
-                metadata = {
-                    'source': file_path,
-                    'imported_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                self.add_term(term, definition, metadata)
-
-        elif file_ext in ['.txt', '.csv']:
-            # 假设格式为 "术语,定义"
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-
-            for line in lines:
-                if ',' in line:
-                    term, definition = line.strip().split(',', 1)
+            with self.bulk():
+                for term, definition in term_data.items():
                     metadata = {
                         'source': file_path,
                         'imported_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                     }
-                    self.add_term(term, definition, metadata)
+                    self.add_term(term, definition, metadata=metadata)
+
+        elif file_ext in STREAMING_EXTENSIONS:
+            # 逐行流式解析，分块写入批量事务
+            import_term_file(self, file_path)
         else:
             raise ValueError(f"不支持的文件类型: {file_ext}")
 
@@ -281,15 +636,11 @@ class TermBase:
                         max_terms = 5  # 最多返回5个相关术语
                         vector_results = ai_engine.vector_db.search(text_vector, max_terms)
 
-                        # 记录已添加的术语ID，避免重复
-                        added_term_ids = set([term.get('id') for term in result if 'id' in term])
-
-                        # 将向量结果转换为术语
-                        for vector_id, _, score in vector_results:
-                            for term_id, term_data in self.terms.items():
-                                if term_id not in added_term_ids and term_data.get('vector_id') == vector_id:
-                                    result.append(term_data)
-                                    added_term_ids.add(term_id)
+                        # 按向量ID反向索引转换为术语，跳过文本匹配已找到的术语
+                        for term_id in self.resolve_vector_ids(item.get('vector_id') for item in vector_results):
+                            term_data = self.terms[term_id]
+                            if not any(term_data is existing for existing in result):
+                                result.append(term_data)
                 except Exception as e:
                     print(f"向量搜索术语失败: {e}")
                     # 继续使用文本匹配的结果
@@ -314,91 +665,104 @@ class TermBase:
 
     def save(self):
         """保存术语库"""
-        print("\n===== 保存术语库 =====")
-        try:
-            import os
-            import json
-            import uuid
-            from datetime import datetime
-
-            # 确保目录存在
-            if not os.path.exists(self.term_path):
-                os.makedirs(self.term_path)
-                print(f"创建术语库目录: {self.term_path}")
-
-            # 保存术语条目索引
-            save_path = os.path.join(self.term_path, 'terms.json')
-
-            # 创建备份
-            if os.path.exists(save_path):
-                backup_path = save_path + '.bak'
-                try:
-                    import shutil
-                    shutil.copy2(save_path, backup_path)
-                    print(f"[INFO] 已创建备份文件: {backup_path}")
-                except Exception as e:
-                    print(f"[WARNING] 创建备份文件失败: {e}")
+        with self._lock:
+            if self._bulk_depth:
+                # 批量写入事务中推迟到提交时保存
+                self._bulk_dirty = True
+                return True
+
+            print("\n===== 保存术语库 =====")
+            try:
+                import os
+                import json
+                import uuid
+                from datetime import datetime
 
-            print(f"[INFO] 保存术语库文件: {save_path}")
+                # 确保目录存在
+                if not os.path.exists(self.term_path):
+                    os.makedirs(self.term_path)
+                    print(f"创建术语库目录: {self.term_path}")
 
-            # 去除向量数据，只保存必要信息
-            serializable_terms = {}
-            for term, term_data in self.terms.items():
-                try:
-                    # 创建可序列化的副本，确保包含所有必要字段
-                    serializable_terms[term] = {
-                        'source_term': term_data.get('source_term', term),
-                        'target_term': term_data.get('target_term', term_data.get('definition', '')),
-                        'definition': term_data.get('definition', term_data.get('target_term', '')),
-                        'vector_id': term_data.get('vector_id'),
-                        'metadata': {
-                            'id': term_data.get('metadata', {}).get('id', str(uuid.uuid4())),
-                            'source_lang': term_data.get('metadata', {}).get('source_lang', 'zh'),
-                            'target_lang': term_data.get('metadata', {}).get('target_lang', 'en'),
-                            'type': 'term',
-                            'added_time': term_data.get('metadata', {}).get('added_time', datetime.now().isoformat())
+                # 保存术语条目索引
+                save_path = os.path.join(self.term_path, 'terms.json')
+
+                # 创建备份
+                if os.path.exists(save_path):
+                    backup_path = save_path + '.bak'
+                    try:
+                        import shutil
+                        shutil.copy2(save_path, backup_path)
+                        print(f"[INFO] 已创建备份文件: {backup_path}")
+                    except Exception as e:
+                        print(f"[WARNING] 创建备份文件失败: {e}")
+
+                print(f"[INFO] 保存术语库文件: {save_path}")
+
+                # 去除向量数据，只保存必要信息
+                serializable_terms = {}
+                for term, term_data in self.terms.items():
+                    try:
+                        # 保留全部元数据（分类、描述、更新时间等），只补齐必要字段
+                        metadata = dict(term_data.get('metadata') or {})
+                        metadata.setdefault('id', str(uuid.uuid4()))
+                        metadata.setdefault('source_lang', 'zh')
+                        metadata.setdefault('target_lang', 'en')
+                        metadata['type'] = 'term'
+                        metadata.setdefault('added_time', datetime.now().isoformat())
+                        # 创建可序列化的副本，确保包含所有必要字段
+                        serializable_terms[term] = {
+                            'source_term': term_data.get('source_term', term),
+                            'target_term': term_data.get('target_term', term_data.get('definition', '')),
+                            'definition': term_data.get('definition', term_data.get('target_term', '')),
+                            'vector_id': term_data.get('vector_id'),
+                            'metadata': metadata
                         }
-                    }
-                    print(f"[INFO] 处理术语: {term} => {serializable_terms[term]['target_term']}")
-                except Exception as e:
-                    print(f"[WARNING] 序列化术语 '{term}' 时出错: {e}")
+                    except Exception as e:
+                        print(f"[WARNING] 序列化术语 '{term}' 时出错: {e}")
+
+                # 先保存向量数据库，避免术语文件中的向量ID指向尚未写入的向量
+                if hasattr(self, 'vector_db') and self.vector_db:
+                    if self.vector_db.save() is False:
+                        print("[ERROR] 保存术语向量数据库失败，术语文件未写入")
+                        return False
+                    print("[INFO] 术语向量数据库已保存")
+
+                # 写入临时文件
+                temp_path = save_path + '.tmp'
+                try:
+                    with open(temp_path, 'w', encoding='utf-8') as f:
+                        json.dump(serializable_terms, f, ensure_ascii=False, indent=2)
 
-            # 写入临时文件
-            temp_path = save_path + '.tmp'
-            try:
-                with open(temp_path, 'w', encoding='utf-8') as f:
-                    json.dump(serializable_terms, f, ensure_ascii=False, indent=2)
+                    # 验证临时文件可以被正确读取
+                    with open(temp_path, 'r', encoding='utf-8') as f:
+                        test_load = json.load(f)
 
-                # 验证临时文件可以被正确读取
-                with open(temp_path, 'r', encoding='utf-8') as f:
-                    test_load = json.load(f)
+                    # 如果验证成功，替换原文件
+                    if os.path.exists(save_path):
+                        os.remove(save_path)
+                    os.rename(temp_path, save_path)
+                    note_local_write(save_path)
 
-                # 如果验证成功，替换原文件
-                if os.path.exists(save_path):
-                    os.remove(save_path)
-                os.rename(temp_path, save_path)
+                    print(f"[INFO] 成功保存 {len(serializable_terms)} 个术语条目到 {save_path}")
+                except Exception as e:
+                    print(f"[ERROR] 保存术语库失败: {e}")
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                    return False
+
+                # 同步向量补建检查点
+                if hasattr(self, 'vector_backfill'):
+                    self.vector_backfill.flush()
+
+                print("===== 术语库保存完成 =====\n")
+                return True
 
-                print(f"[INFO] 成功保存 {len(serializable_terms)} 个术语条目到 {save_path}")
             except Exception as e:
                 print(f"[ERROR] 保存术语库失败: {e}")
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
+                import traceback
+                traceback.print_exc()
                 return False
 
-            # 保存向量数据库
-            if hasattr(self, 'vector_db') and self.vector_db:
-                self.vector_db.save()
-                print("[INFO] 术语向量数据库已保存")
-
-            print("===== 术语库保存完成 =====\n")
-            return True
-
-        except Exception as e:
-            print(f"[ERROR] 保存术语库失败: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
-
     def load(self):
         """加载术语库"""
         # 加载术语条目索引
@@ -445,14 +809,21 @@ class TermBase:
             self.terms = {}
             return True
 
-    def import_terminology_file(self, file_path):
-        """导入术语库文件，支持terminology.json嵌套结构"""
+    def import_terminology_file(self, file_path, progress_callback=None):
+        """导入术语库文件，支持terminology.json嵌套结构，以及流式导入CSV/TSV/TXT/XLSX/TBX"""
         try:
             print(f"开始导入术语文件: {file_path}")
             # 确保文件存在
             if not os.path.exists(file_path):
                 return False, f"文件不存在: {file_path}"
 
+            if os.path.splitext(file_path)[1].lower() in STREAMING_EXTENSIONS:
+                result = import_term_file(self, file_path, progress_callback=progress_callback)
+                self.ensure_term_vectors()
+                message = (f"新增{result['imported']}个术语, 更新{result['updated']}个术语"
+                           + (f", {result['failed']}个错误" if result['failed'] else ""))
+                return True, ("导入完成: " if result['failed'] else "导入成功: ") + message
+
             # 读取术语库文件
             with open(file_path, 'r', encoding='utf-8') as f:
                 try:
@@ -488,81 +859,80 @@ class TermBase:
             updated_count = 0
             errors = []
 
-            # 根据术语库JSON格式进行处理
-            if isinstance(terminology_data, dict):
-                # 检查是否是terminology.json格式的嵌套结构
-                if "中文" in terminology_data and isinstance(terminology_data["中文"], dict):
-                    print("检测到terminology.json格式的嵌套术语结构")
-                    for source_lang, target_langs in terminology_data.items():
-                        if isinstance(target_langs, dict):
-                            for target_lang, terms in target_langs.items():
-                                if isinstance(terms, dict):
-                                    print(f"处理 {source_lang} 到 {target_lang} 的术语，共 {len(terms)} 项")
-                                    # 遍历所有术语对
-                                    for source_term, target_term in terms.items():
-                                        try:
-                                            # 添加术语(源语言是中文，目标语言是英文等)
-                                            success = self.add_term(
-                                                source_term,
-                                                target_term,
-                                                source_lang,
-                                                target_lang
-                                            )
-
-                                            if success:
-                                                term_id = f"{source_term}_{source_lang}_{target_lang}"
-                                                if term_id in self.terms:
-                                                    updated_count += 1
+            # 批量写入：整个文件只保存一次，向量按批生成
+            with self.bulk():
+                # 根据术语库JSON格式进行处理
+                if isinstance(terminology_data, dict):
+                    # 检查是否是terminology.json格式的嵌套结构
+                    if "中文" in terminology_data and isinstance(terminology_data["中文"], dict):
+                        print("检测到terminology.json格式的嵌套术语结构")
+                        for source_lang, target_langs in terminology_data.items():
+                            if isinstance(target_langs, dict):
+                                for target_lang, terms in target_langs.items():
+                                    if isinstance(terms, dict):
+                                        print(f"处理 {source_lang} 到 {target_lang} 的术语，共 {len(terms)} 项")
+                                        # 遍历所有术语对
+                                        for source_term, target_term in terms.items():
+                                            try:
+                                                # 添加术语(源语言是中文，目标语言是英文等)
+                                                success = self.add_term(
+                                                    source_term,
+                                                    target_term,
+                                                    source_lang,
+                                                    target_lang
+                                                )
+
+                                                if success:
+                                                    term_id = f"{source_term}_{source_lang}_{target_lang}"
+                                                    if term_id in self.terms:
+                                                        updated_count += 1
+                                                    else:
+                                                        imported_count += 1
                                                 else:
-                                                    imported_count += 1
-                                            else:
-                                                errors.append(f"添加术语失败: {source_term}")
-                                        except Exception as e:
-                                            errors.append(f"处理术语出错 '{source_term}': {str(e)}")
-                # 检查术语数据格式 - 标准格式
-                elif all(isinstance(v, str) for v in terminology_data.values()):
-                    # 简单的 "术语":"定义" 格式
-                    for source_term, target_term in terminology_data.items():
-                        try:
-                            success = self.add_term(source_term, target_term)
-                            if success:
-                                imported_count += 1
-                            else:
-                                errors.append(f"添加术语失败: {source_term}")
-                        except Exception as e:
-                            errors.append(f"处理术语出错 '{source_term}': {str(e)}")
-                else:
-                    # 标准格式: {source_lang: {target_lang: {source_term: target_term}}}
-                    for source_lang, target_langs in terminology_data.items():
-                        if isinstance(target_langs, dict):
-                            for target_lang, terms in target_langs.items():
-                                if isinstance(terms, dict):
-                                    # 遍历所有术语对
-                                    for source_term, target_term in terms.items():
-                                        try:
-                                            # 添加术语
-                                            success = self.add_term(
-                                                source_term,
-                                                target_term,
-                                                source_lang,
-                                                target_lang
-                                            )
-
-                                            if success:
-                                                term_id = f"{source_term}_{source_lang}_{target_lang}"
-                                                if term_id in self.terms:
-                                                    updated_count += 1
+                                                    errors.append(f"添加术语失败: {source_term}")
+                                            except Exception as e:
+                                                errors.append(f"处理术语出错 '{source_term}': {str(e)}")
+                    # 检查术语数据格式 - 标准格式
+                    elif all(isinstance(v, str) for v in terminology_data.values()):
+                        # 简单的 "术语":"定义" 格式
+                        for source_term, target_term in terminology_data.items():
+                            try:
+                                success = self.add_term(source_term, target_term)
+                                if success:
+                                    imported_count += 1
+                                else:
+                                    errors.append(f"添加术语失败: {source_term}")
+                            except Exception as e:
+                                errors.append(f"处理术语出错 '{source_term}': {str(e)}")
+                    else:
+                        # 标准格式: {source_lang: {target_lang: {source_term: target_term}}}
+                        for source_lang, target_langs in terminology_data.items():
+                            if isinstance(target_langs, dict):
+                                for target_lang, terms in target_langs.items():
+                                    if isinstance(terms, dict):
+                                        # 遍历所有术语对
+                                        for source_term, target_term in terms.items():
+                                            try:
+                                                # 添加术语
+                                                success = self.add_term(
+                                                    source_term,
+                                                    target_term,
+                                                    source_lang,
+                                                    target_lang
+                                                )
+
+                                                if success:
+                                                    term_id = f"{source_term}_{source_lang}_{target_lang}"
+                                                    if term_id in self.terms:
+                                                        updated_count += 1
+                                                    else:
+                                                        imported_count += 1
                                                 else:
-                                                    imported_count += 1
-                                            else:
-                                                errors.append(f"添加术语失败: {source_term}")
-                                        except Exception as e:
-                                            errors.append(f"处理术语出错 '{source_term}': {str(e)}")
-
-            # 保存术语库
-            self.save()
+                                                    errors.append(f"添加术语失败: {source_term}")
+                                            except Exception as e:
+                                                errors.append(f"处理术语出错 '{source_term}': {str(e)}")
 
-            # 为术语生成向量表示
+            # 未能生成向量的术语由后台补建
             self.ensure_term_vectors()
 
             # 返回导入结果
@@ -576,10 +946,17 @@ class TermBase:
             traceback.print_exc()
             return False, f"导入失败: {str(e)}"
 
-    def ensure_term_vectors(self):
-        """确保所有术语都有向量表示"""
+    def ensure_term_vectors(self, wait=False, rescan=False):
+        """
+        确保所有术语都有向量表示
+
+        缺少向量的术语由后台补建任务按批处理，可断点续跑。
+
+        Args:
+            wait (bool): 是否等待补建完成
+            rescan (bool): 是否重新全量扫描缺少向量的术语
+        """
         print("开始为术语生成向量表示...")
-        vectorized_count = 0
 
         # 确保将向量存储到术语专用向量库
         vector_db = self.vector_db  # 这里应该是术语专用的向量数据库
@@ -598,39 +975,42 @@ class TermBase:
             if not hasattr(vector_db, 'model') or not vector_db.model:
                 return False
 
-        # 遍历所有术语
-        for term_id, term_data in self.terms.items():
-            # 如果术语没有向量ID
-            if not term_data.get('vector_id'):
-                try:
-                    # 对术语内容生成向量
-                    source_term = term_data.get('source_term', '')
-                    if source_term:
-                        # 生成向量
-                        vector = vector_db.get_embedding(source_term)
-                        if vector is not None:
-                            # 添加到专用向量数据库
-                            metadata = term_data.get('metadata', {})
-                            metadata['type'] = 'term'  # 标记为术语向量
-                            vector_id = vector_db.add(source_term, vector, metadata)
-
-                            # 更新术语数据
-                            term_data['vector_id'] = vector_id
-                            self.terms[term_id] = term_data
-                            vectorized_count += 1
-                            if vectorized_count % 20 == 0:
-                                print(f"已处理 {vectorized_count} 个术语向量")
-                except Exception as e:
-                    print(f"为术语 '{term_id}' 生成向量时出错: {e}")
-
-        # 保存更新后的术语和向量
-        if vectorized_count > 0:
-            print(f"成功为 {vectorized_count} 个术语生成向量表示")
-            self.save()
-            vector_db.save()  # 保存术语向量数据库
-
+        # 缺少向量的术语交给后台补建任务，按批处理并写检查点
+        if rescan:
+            self.vector_backfill.rescan()
+        self.vector_backfill.start()
+        if wait:
+            self.vector_backfill.wait()
+            return self.vector_backfill.get_progress()['error'] is None
         return True
 
+    def _backfill_text(self, term_id):
+        """返回术语需要编码的文本，已有向量或已删除时返回None"""
+        term_data = self.terms.get(term_id)
+        if not isinstance(term_data, dict) or term_data.get('vector_id'):
+            return None
+        return term_data.get('source_term', '')
+
+    def _store_backfill_vectors(self, encoded):
+        """写入一批补建的术语向量，返回成功的术语"""
+        with self._lock:
+            stored = []
+            for term_id, source_term, vector in encoded:
+                term_data = self.terms.get(term_id)
+                if not isinstance(term_data, dict) or term_data.get('vector_id'):
+                    continue
+                metadata = term_data.get('metadata', {})
+                metadata['type'] = 'term'  # 标记为术语向量
+                vector_id = self.vector_db.add(source_term, vector, metadata)
+                if vector_id:
+                    self._set_vector_id(term_id, term_data, vector_id)
+                    stored.append(term_id)
+            return stored
+
+    def get_vector_backfill_progress(self):
+        """获取术语向量后台补建进度"""
+        return self.vector_backfill.get_progress()
+
     def format_term_for_translation(self, term_data):
         """格式化术语用于翻译"""
         # 确保术语数据包含必要的字段
@@ -658,17 +1038,14 @@ class TermBase:
             return []
 
         try:
-            # 先确保所有术语都有向量
-            self.ensure_term_vectors()
-
             # 获取查询文本的向量
             query_vector = self.vector_db.get_embedding(query)
             if query_vector is None:
                 print("无法获取查询向量")
                 return []
 
-            # 在向量数据库中搜索
-            results = self.vector_db.search(query, top_k=top_k, min_similarity=0.3)
+            # 在向量数据库中搜索（直接使用已生成的查询向量）
+            results = self.vector_db.search(query_vector, top_k=top_k, min_similarity=0.3)
 
             # 过滤结果，只保留术语类型
             term_results = []
@@ -0,0 +1,121 @@
+"""
+术语库流式导出
+
+导出内容按页从术语列表查询索引读取并逐块生成，内存占用与术语库大小无关：
+- 通过游标翻页读取术语，导出期间术语库被修改也不会中断
+- 支持 CSV、JSONL、TXT 和 TBX 格式
+- 可选 gzip 压缩，同样逐块压缩输出
+"""
+
+import io
+import csv
+import json
+import zlib
+from datetime import datetime
+from xml.sax.saxutils import escape, quoteattr
+
+# 支持的导出格式 -> (MIME 类型, 扩展名)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'txt': ('text/plain', 'txt'),
+    'tbx': ('application/x-tbx+xml', 'tbx'),
+}
+CSV_FIELDS = ['source_term', 'target_term', 'source_lang', 'target_lang', 'category', 'description']
+JSONL_FIELDS = CSV_FIELDS + ['created_at', 'updated_at']
+
+
+def iter_export_terms(lookup_index, source_lang='', target_lang='', page_size=500):
+    """按源术语顺序逐页读取术语（接口格式的条目）"""
+    cursor = None
+    while True:
+        page = lookup_index.query(source_lang=source_lang, target_lang=target_lang, sort='source_term',
+                                  cursor=cursor, limit=page_size)
+        yield from page['terms']
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+
+def _iter_csv(terms):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    yield buffer.getvalue()
+    for term in terms:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(term)
+        yield buffer.getvalue()
+
+
+def _iter_jsonl(terms):
+    for term in terms:
+        yield json.dumps({key: term.get(key, '') for key in JSONL_FIELDS}, ensure_ascii=False) + '\n'
+
+
+def _iter_txt(terms):
+    for term in terms:
+        yield f"{term['source_term']}\t{term['target_term']}\n"
+
+
+def _iter_tbx(terms):
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<martif type="TBX" xml:lang="zh">\n'
+           '<martifHeader><fileDesc><sourceDesc>'
+           f'<p>Exported {escape(datetime.now().isoformat())}</p>'
+           '</sourceDesc></fileDesc></martifHeader>\n'
+           '<text><body>\n')
+    for number, term in enumerate(terms, 1):
+        parts = [f'<termEntry id="t{number}">']
+        if term.get('category'):
+            parts.append(f'<descrip type="subjectField">{escape(term["category"])}</descrip>')
+        if term.get('description'):
+            parts.append(f'<descrip type="definition">{escape(term["description"])}</descrip>')
+        parts.append(f'<langSet xml:lang={quoteattr(term["source_lang"])}>'
+                     f'<tig><term>{escape(term["source_term"])}</term></tig></langSet>')
+        parts.append(f'<langSet xml:lang={quoteattr(term["target_lang"])}>'
+                     f'<tig><term>{escape(term["target_term"])}</term></tig></langSet>')
+        parts.append('</termEntry>\n')
+        yield ''.join(parts)
+    yield '</body></text>\n</martif>\n'
+
+
+_WRITERS = {'csv': _iter_csv, 'jsonl': _iter_jsonl, 'txt': _iter_txt, 'tbx': _iter_tbx}
+
+
+def iter_export_bytes(terms, format_type, compress=False, chunk_size=64 * 1024):
+    """
+    把术语逐块编码为导出文件内容
+
+    Args:
+        terms: 术语条目的迭代器
+        format_type (str): csv / jsonl / txt / tbx
+        compress (bool): 是否 gzip 压缩
+        chunk_size (int): 缓冲到多少字节后输出一块
+
+    Yields:
+        bytes: 导出文件的数据块
+    """
+    if format_type not in _WRITERS:
+        raise ValueError(f"不支持的导出格式: {format_type}")
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = []
+    buffered = 0
+    for text in _WRITERS[format_type](terms):
+        data = text.encode('utf-8')
+        buffer.append(data)
+        buffered += len(data)
+        if buffered >= chunk_size:
+            chunk = b''.join(buffer)
+            buffer, buffered = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+
+    chunk = b''.join(buffer)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
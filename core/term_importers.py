@@ -0,0 +1,254 @@
+"""
+术语文件流式导入
+
+CSV/TSV/TXT、XLSX 和 TBX/XML 术语文件逐行解析，不把整个文件读入内存：
+- CSV/TSV/TXT 用 csv 模块逐行读取，XLSX 用 openpyxl 只读模式的行迭代器，TBX 用 iterparse 并及时释放已处理的节点
+- 解析结果分块写入 TermBase.bulk()，整个文件只做一次持久化，向量按批生成
+- 逐行记录错误（只保留前若干条），并通过回调报告进度
+"""
+
+import os
+import csv
+import xml.etree.ElementTree as ET
+
+# 支持流式导入的扩展名
+STREAMING_EXTENSIONS = {'.csv', '.tsv', '.txt', '.xlsx', '.tbx', '.xml'}
+# 错误信息最多保留的条数
+MAX_ERRORS = 100
+
+_XML_LANG = '{http://www.w3.org/XML/1998/namespace}lang'
+
+# 表头别名 -> 字段名
+_HEADER_ALIASES = {
+    'source_term': 'source_term', 'source': 'source_term', 'term': 'source_term',
+    '源术语': 'source_term', '术语': 'source_term', '原文': 'source_term',
+    'target_term': 'target_term', 'target': 'target_term', 'translation': 'target_term',
+    'definition': 'target_term', '目标术语': 'target_term', '译文': 'target_term', '翻译': 'target_term',
+    'source_lang': 'source_lang', '源语言': 'source_lang',
+    'target_lang': 'target_lang', '目标语言': 'target_lang',
+    'category': 'category', '分类': 'category',
+    'description': 'description', '描述': 'description', '说明': 'description',
+}
+# 无表头时各列的含义
+_POSITIONAL_FIELDS = ('source_term', 'target_term', 'source_lang', 'target_lang')
+
+
+def _cell_text(value):
+    return '' if value is None else str(value).strip()
+
+
+def _header_fields(row):
+    """识别表头，返回各列对应的字段名；不是表头时返回 None"""
+    fields = [_HEADER_ALIASES.get(_cell_text(cell).lower()) for cell in row]
+    if 'source_term' in fields and 'target_term' in fields:
+        return fields
+    return None
+
+
+def _iter_table_records(rows, source_lang, target_lang):
+    """
+    把表格行转换为术语记录
+
+    Yields:
+        tuple: (行号, 记录, 错误信息)，记录和错误信息二者只有一个不为 None
+    """
+    fields = None
+    header_checked = False
+    for row_num, row in enumerate(rows, 1):
+        if not row or all(_cell_text(cell) == '' for cell in row):
+            continue
+        if not header_checked:
+            # 第一个非空行可能是表头
+            header_checked = True
+            fields = _header_fields(row)
+            if fields is not None:
+                continue
+        record = {'source_lang': source_lang, 'target_lang': target_lang}
+        for field, cell in zip(fields or _POSITIONAL_FIELDS, row):
+            if field and _cell_text(cell):
+                record[field] = _cell_text(cell)
+        if not record.get('source_term') or not record.get('target_term'):
+            yield row_num, None, f"第{row_num}行: 源术语或目标术语为空"
+        else:
+            yield row_num, record, None
+
+
+def iter_delimited_records(file_path, delimiter=',', source_lang='zh', target_lang='en', encoding='utf-8-sig'):
+    """逐行解析 CSV/TSV 文件"""
+    with open(file_path, 'r', encoding=encoding, newline='') as f:
+        yield from _iter_table_records(csv.reader(f, delimiter=delimiter), source_lang, target_lang)
+
+
+def iter_text_records(file_path, source_lang='zh', target_lang='en', encoding='utf-8-sig'):
+    """逐行解析文本文件：每行一个术语对，用制表符或逗号分隔"""
+    def rows():
+        with open(file_path, 'r', encoding=encoding) as f:
+            for line in f:
+                line = line.rstrip('\r\n')
+                separator = '\t' if '\t' in line else ','
+                yield line.split(separator, 1) if separator in line else [line]
+
+    yield from _iter_table_records(rows(), source_lang, target_lang)
+
+
+def iter_xlsx_records(file_path, source_lang='zh', target_lang='en', sheet_name=None):
+    """用 openpyxl 只读模式逐行解析 XLSX 文件（第一个工作表或指定工作表）"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError("导入 XLSX 术语表需要安装 openpyxl: pip install openpyxl")
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        yield from _iter_table_records(sheet.iter_rows(values_only=True), source_lang, target_lang)
+    finally:
+        workbook.close()
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+def _first_term(lang_element):
+    for element in lang_element.iter():
+        if _local_name(element.tag) == 'term' and element.text and element.text.strip():
+            return ''.join(element.itertext()).strip()
+    return ''
+
+
+def iter_tbx_records(file_path, source_lang='zh', target_lang='en'):
+    """
+    用 iterparse 流式解析 TBX（termEntry/langSet 或 TBX v3 的 conceptEntry/langSec）
+
+    每个术语条目取源语言和目标语言的第一个术语；条目缺少这两种语言时，
+    按文件中出现的前两种语言作为源和目标。
+    """
+    row_num = 0
+    # 当前打开的节点，处理完的条目从父节点上摘除
+    stack = []
+    for event, element in ET.iterparse(file_path, events=('start', 'end')):
+        if event == 'start':
+            stack.append(element)
+            continue
+        stack.pop()
+        if _local_name(element.tag) not in ('termEntry', 'conceptEntry'):
+            continue
+        row_num += 1
+        terms = {}
+        category = ''
+        for child in element.iter():
+            name = _local_name(child.tag)
+            if name in ('langSet', 'langSec'):
+                lang = (child.get(_XML_LANG) or child.get('lang') or '').lower()
+                term = _first_term(child)
+                if lang and term and lang not in terms:
+                    terms[lang] = term
+            elif name == 'descrip' and child.get('type') == 'subjectField' and child.text:
+                category = child.text.strip()
+        # 释放已处理的节点，保证内存占用不随文件增长
+        element.clear()
+        if stack:
+            stack[-1].remove(element)
+
+        source = _match_lang(terms, source_lang)
+        target = _match_lang(terms, target_lang)
+        langs = list(terms)
+        if (source is None or target is None) and len(langs) >= 2:
+            source, target = langs[0], langs[1]
+        if source is None or target is None or source == target:
+            yield row_num, None, f"第{row_num}个条目: 缺少源语言或目标语言术语"
+            continue
+        record = {
+            'source_term': terms[source],
+            'target_term': terms[target],
+            'source_lang': source.split('-')[0],
+            'target_lang': target.split('-')[0],
+        }
+        if category:
+            record['category'] = category
+        yield row_num, record, None
+
+
+def _match_lang(terms, lang):
+    """按语言代码匹配（zh 可匹配 zh-CN）"""
+    lang = (lang or '').lower()
+    for key in terms:
+        if key == lang or key.split('-')[0] == lang:
+            return key
+    return None
+
+
+def iter_term_records(file_path, source_lang='zh', target_lang='en'):
+    """按扩展名选择流式解析器"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == '.csv':
+        return iter_delimited_records(file_path, ',', source_lang, target_lang)
+    if ext == '.tsv':
+        return iter_delimited_records(file_path, '\t', source_lang, target_lang)
+    if ext == '.txt':
+        return iter_text_records(file_path, source_lang, target_lang)
+    if ext == '.xlsx':
+        return iter_xlsx_records(file_path, source_lang, target_lang)
+    if ext in ('.tbx', '.xml'):
+        return iter_tbx_records(file_path, source_lang, target_lang)
+    raise ValueError(f"不支持流式导入的文件类型: {ext}")
+
+
+def import_term_records(term_base, records, chunk_size=1000, progress_callback=None):
+    """
+    把术语记录分块写入术语库
+
+    Args:
+        term_base: TermBase 实例
+        records: iter_term_records 等生成的 (行号, 记录, 错误信息)
+        chunk_size (int): 每处理多少行报告一次进度
+        progress_callback: progress_callback(result) ，result 为当前统计
+
+    Returns:
+        dict: {'processed', 'imported', 'updated', 'failed', 'errors'(前 MAX_ERRORS 条)}
+    """
+    result = {'processed': 0, 'imported': 0, 'updated': 0, 'failed': 0, 'errors': []}
+
+    def fail(message):
+        result['failed'] += 1
+        if len(result['errors']) < MAX_ERRORS:
+            result['errors'].append(message)
+
+    with term_base.bulk():
+        for row_num, record, error in records:
+            result['processed'] += 1
+            if error:
+                fail(error)
+            else:
+                try:
+                    source_term = record['source_term']
+                    existed = source_term in term_base.terms
+                    extra = {key: record[key] for key in ('category', 'description') if record.get(key)}
+                    if term_base.add_term(source_term, record['target_term'], record['source_lang'],
+                                          record['target_lang'], metadata=extra or None):
+                        result['updated' if existed else 'imported'] += 1
+                    else:
+                        fail(f"第{row_num}行: 添加术语失败")
+                except Exception as e:
+                    fail(f"第{row_num}行: {str(e)}")
+
+            if result['processed'] % chunk_size == 0:
+                print(f"[INFO] 术语导入进度: 已处理 {result['processed']} 行，"
+                      f"新增 {result['imported']}，更新 {result['updated']}，失败 {result['failed']}")
+                if progress_callback:
+                    progress_callback(dict(result))
+
+    if progress_callback:
+        progress_callback(dict(result))
+    return result
+
+
+def import_term_file(term_base, file_path, source_lang='zh', target_lang='en', chunk_size=1000,
+                     progress_callback=None):
+    """流式导入术语文件"""
+    print(f"[INFO] 开始流式导入术语文件: {file_path}")
+    records = iter_term_records(file_path, source_lang, target_lang)
+    result = import_term_records(term_base, records, chunk_size, progress_callback)
+    print(f"[INFO] 术语文件导入完成: 新增 {result['imported']}，更新 {result['updated']}，失败 {result['failed']}")
+    return result
@@ -0,0 +1,261 @@
+"""
+术语列表查询索引
+
+术语管理接口的列表、筛选和翻页原本每次请求都把全部术语转换一遍再过滤切片，
+本模块常驻维护以下索引，随 TermBase 的变更通知增量更新：
+- 按源术语、添加时间排序的有序列表，以及按语言对、分类（及二者组合）划分的有序列表
+- 字符/二元组倒排索引，用于子串搜索；源术语有序列表兼作前缀搜索
+- 游标翻页：从游标位置二分定位，每页代价为 O(每页条数 + log N)
+"""
+
+import json
+import base64
+from bisect import bisect_left, bisect_right, insort
+
+from core.reverse_term_index import IncrementalTermIndex
+
+# 支持的排序字段
+SORT_FIELDS = ('source_term', 'created_at')
+
+
+def make_term_item(source_term, term_data):
+    """把术语库条目转换为接口返回的格式"""
+    if isinstance(term_data, dict):
+        metadata = term_data.get('metadata', {})
+        return {
+            'id': metadata.get('id', str(hash(source_term))),
+            'source_term': source_term,
+            'target_term': term_data.get('target_term', term_data.get('definition', '')),
+            'source_lang': metadata.get('source_lang', 'zh'),
+            'target_lang': metadata.get('target_lang', 'en'),
+            'type': metadata.get('type', 'term'),
+            'created_at': metadata.get('added_time', ''),
+            'updated_at': metadata.get('updated_time', ''),
+            'category': metadata.get('category', ''),
+            'description': metadata.get('description', ''),
+            'usage_count': metadata.get('usage_count', 0)
+        }
+    # 兼容旧格式
+    return {
+        'id': str(hash(source_term)),
+        'source_term': source_term,
+        'target_term': str(term_data),
+        'source_lang': 'zh',
+        'target_lang': 'en',
+        'type': 'term',
+        'created_at': '',
+        'updated_at': '',
+        'category': '',
+        'description': '',
+        'usage_count': 0
+    }
+
+
+def encode_cursor(position):
+    """把排序位置 (排序值, 术语键) 编码为游标字符串"""
+    raw = json.dumps(list(position), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """解析游标，格式错误时抛出 ValueError"""
+    try:
+        sort_value, key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        return str(sort_value), str(key)
+    except Exception:
+        raise ValueError(f"无效的游标: {cursor}")
+
+
+def _search_grams(text):
+    """搜索用的单字和相邻二元组"""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class TermLookupIndex(IncrementalTermIndex):
+    """术语列表的排序、筛选和搜索索引"""
+
+    def __init__(self):
+        super().__init__(None, None)
+        self._reset()
+
+    def __len__(self):
+        return len(self._items)
+
+    def _reset(self):
+        # 术语键 -> 接口格式的条目
+        self._items = {}
+        # 术语 ID -> 术语键
+        self._by_id = {}
+        # (排序字段, 筛选条件) -> [(排序值, 术语键)]，保持有序
+        self._lists = {}
+        # 单字/二元组 -> 术语键集合
+        self._grams = {}
+
+    @staticmethod
+    def _sort_value(item, field):
+        if field == 'source_term':
+            return item['source_term'].casefold()
+        return item.get(field) or ''
+
+    @staticmethod
+    def _filter_keys(item):
+        pair = (item['source_lang'], item['target_lang'])
+        category = item['category']
+        return (None, ('pair', pair), ('category', category), ('pair_category', pair + (category,)))
+
+    @staticmethod
+    def _search_text(item):
+        return f"{item['source_term']}\n{item['target_term']}".lower()
+
+    def _add(self, term, term_data):
+        item = make_term_item(term, term_data)
+        self._items[term] = item
+        self._by_id[item['id']] = term
+        for field in SORT_FIELDS:
+            position = (self._sort_value(item, field), term)
+            for filter_key in self._filter_keys(item):
+                insort(self._lists.setdefault((field, filter_key), []), position)
+        for gram in _search_grams(self._search_text(item)):
+            self._grams.setdefault(gram, set()).add(term)
+
+    def _remove(self, term):
+        item = self._items.pop(term, None)
+        if item is None:
+            return
+        if self._by_id.get(item['id']) == term:
+            del self._by_id[item['id']]
+        for field in SORT_FIELDS:
+            position = (self._sort_value(item, field), term)
+            for filter_key in self._filter_keys(item):
+                entries = self._lists.get((field, filter_key))
+                if not entries:
+                    continue
+                index = bisect_left(entries, position)
+                if index < len(entries) and entries[index] == position:
+                    del entries[index]
+                if not entries:
+                    del self._lists[(field, filter_key)]
+        for gram in _search_grams(self._search_text(item)):
+            keys = self._grams.get(gram)
+            if keys is not None:
+                keys.discard(term)
+                if not keys:
+                    del self._grams[gram]
+
+    def get_item(self, term):
+        """按术语键获取接口格式的条目"""
+        return self._items.get(term)
+
+    def find_key(self, term_id):
+        """按术语 ID 查找术语键"""
+        return self._by_id.get(term_id)
+
+    def _search_keys(self, query):
+        """子串搜索：用最稀有的二元组召回候选，再校验子串"""
+        query = query.lower()
+        grams = [query] if len(query) == 1 else [query[i:i + 2] for i in range(len(query) - 1)]
+        postings = sorted((self._grams.get(gram, set()) for gram in set(grams)), key=len)
+        if not postings or not postings[0]:
+            return []
+        candidates = postings[0].intersection(*postings[1:])
+        return [key for key in candidates if query in self._search_text(self._items[key])]
+
+    def _prefix_keys(self, prefix):
+        """前缀搜索：在按源术语排序的列表上二分定位"""
+        entries = self._lists.get(('source_term', None), [])
+        prefix = prefix.casefold()
+        start = bisect_left(entries, (prefix,))
+        keys = []
+        for sort_value, key in entries[start:]:
+            if not sort_value.startswith(prefix):
+                break
+            keys.append(key)
+        return keys
+
+    def query(self, search='', source_lang='', target_lang='', category=None, sort='created_at',
+              descending=False, cursor=None, offset=0, limit=20, prefix=False):
+        """
+        查询术语列表
+
+        Args:
+            search (str): 搜索词，匹配源术语或目标术语的子串（prefix=True 时为源术语前缀）
+            source_lang, target_lang (str): 语言筛选，为空表示不限
+            category (str): 分类筛选，None 表示不限
+            sort (str): 排序字段，source_term 或 created_at
+            descending (bool): 是否倒序
+            cursor (str): 上一页返回的 next_cursor，提供时忽略 offset
+            offset (int): 按偏移量翻页（兼容页码分页）
+            limit (int): 每页条数
+
+        Returns:
+            dict: {'terms': 条目列表, 'total': 符合条件的总数, 'next_cursor': 下一页游标或None}
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"不支持的排序字段: {sort}")
+        limit = max(1, int(limit))
+
+        with self._lock:
+            # 选择最贴近筛选条件的有序列表，剩余条件逐条检查
+            if source_lang and target_lang and category is not None:
+                filter_key = ('pair_category', (source_lang, target_lang, category))
+            elif source_lang and target_lang:
+                filter_key = ('pair', (source_lang, target_lang))
+            elif category is not None:
+                filter_key = ('category', category)
+            else:
+                filter_key = None
+
+            def accept(item):
+                if source_lang and item['source_lang'] != source_lang:
+                    return False
+                if target_lang and item['target_lang'] != target_lang:
+                    return False
+                return category is None or item['category'] == category
+
+            if search:
+                keys = self._prefix_keys(search) if prefix else self._search_keys(search)
+                entries = sorted((self._sort_value(self._items[key], sort), key)
+                                 for key in keys if accept(self._items[key]))
+                exact = True
+            else:
+                entries = self._lists.get((sort, filter_key), [])
+                # 只筛选了单个语言时有序列表比条件宽，需要逐条检查
+                exact = bool(source_lang) == bool(target_lang)
+
+            if cursor:
+                position = decode_cursor(cursor)
+                index = bisect_left(entries, position) - 1 if descending else bisect_right(entries, position)
+            else:
+                offset = max(0, int(offset or 0))
+                if exact:
+                    index = len(entries) - 1 - offset if descending else offset
+                    offset = 0
+                else:
+                    index = len(entries) - 1 if descending else 0
+
+            step = -1 if descending else 1
+            page = []
+            last_position = None
+            has_next = False
+            while 0 <= index < len(entries):
+                position = entries[index]
+                index += step
+                item = self._items[position[1]]
+                if not exact and not accept(item):
+                    continue
+                if offset:
+                    offset -= 1
+                    continue
+                if len(page) == limit:
+                    has_next = True
+                    break
+                page.append(dict(item))
+                last_position = position
+
+            total = len(entries) if exact else sum(1 for _, key in entries if accept(self._items[key]))
+
+        return {
+            'terms': page,
+            'total': total,
+            'next_cursor': encode_cursor(last_position) if has_next and last_position else None
+        }
@@ -0,0 +1,337 @@
+"""
+术语匹配自动机
+
+基于 Aho–Corasick 多模式匹配，一次扫描文本即可找出全部术语：
+- 按术语库版本构建一次自动机并缓存，术语库不变时重复使用
+- 结果为"最左最长、互不重叠"的匹配，并给出位置
+- 可选忽略大小写（外语术语匹配）
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class AhoCorasickMatcher:
+    """Aho–Corasick 多模式匹配器（数组存储的状态机）"""
+
+    def __init__(self, patterns, case_sensitive=True):
+        """
+        Args:
+            patterns: 可迭代的 (模式串, 附带数据)；同一模式串重复出现时保留第一个
+            case_sensitive (bool): 是否区分大小写
+        """
+        self.case_sensitive = case_sensitive
+        # 每个状态的转移表、失败链接、本状态结束的模式长度与数据、输出链接
+        self._goto = [{}]
+        self._fail = [0]
+        self._length = [0]
+        self._payload = [None]
+        self._output = [0]
+        self.pattern_count = 0
+        # 最长模式串长度，增量匹配时决定重新扫描的范围
+        self.max_length = 0
+
+        for pattern, payload in patterns:
+            self._add(pattern, payload)
+        self._build()
+
+    def _normalize(self, text):
+        if self.case_sensitive:
+            return text
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            return lowered
+        # 个别字符小写后长度变化时逐字符处理，保证位置与原文一致
+        return ''.join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+    def _add(self, pattern, payload):
+        if not pattern:
+            return
+        state = 0
+        for char in self._normalize(pattern):
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._length.append(0)
+                self._payload.append(None)
+                self._output.append(0)
+            state = next_state
+        if not self._length[state]:
+            self._length[state] = len(pattern)
+            self._payload[state] = payload
+            self.pattern_count += 1
+            self.max_length = max(self.max_length, len(pattern))
+
+    def _build(self):
+        """广度优先计算失败链接和输出链接"""
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                # 输出链接指向失败链上最近的模式结束状态
+                fail_state = self._fail[next_state]
+                self._output[next_state] = fail_state if self._length[fail_state] else self._output[fail_state]
+
+    def iter_all(self, text):
+        """逐个生成所有匹配 (起始位置, 结束位置, 数据)，允许重叠"""
+        goto, fail, length, payload, output = self._goto, self._fail, self._length, self._payload, self._output
+        state = 0
+        for index, char in enumerate(self._normalize(text)):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            match_state = state if length[state] else output[state]
+            while match_state:
+                end = index + 1
+                yield end - length[match_state], end, payload[match_state]
+                match_state = output[match_state]
+
+    def find(self, text, accept=None):
+        """
+        查找最左最长、互不重叠的匹配
+
+        Args:
+            text (str): 待匹配文本
+            accept: accept(text, start, end, payload) -> bool，可选的匹配过滤（如单词边界）
+
+        Returns:
+            list: [(起始位置, 结束位置, 数据)]，按位置排序
+        """
+        if not text or not self.pattern_count:
+            return []
+
+        # 记录每个起始位置上最长的匹配
+        best = {}
+        for start, end, payload in self.iter_all(text):
+            if accept is not None and not accept(text, start, end, payload):
+                continue
+            current = best.get(start)
+            if current is None or end > current[0]:
+                best[start] = (end, payload)
+
+        matches = []
+        position = 0
+        for start in sorted(best):
+            if start < position:
+                continue
+            end, payload = best[start]
+            matches.append((start, end, payload))
+            position = end
+        return matches
+
+
+def merge_edits(edit, position, removed, added):
+    """
+    合并连续的文本编辑
+
+    Args:
+        edit: 已合并的编辑 (起始位置, 删除长度, 插入长度)，None 表示尚无编辑
+        position, removed, added: 在当前文本上发生的新编辑
+
+    Returns:
+        tuple: 相对最初文本的合并编辑 (起始位置, 删除长度, 插入长度)
+    """
+    if edit is None:
+        return position, removed, added
+    start, old_removed, old_added = edit
+    new_start = min(start, position)
+    # 合并前区域在当前文本中的右端，以及它对应到最初文本中的右端
+    current_end = max(start + old_added, position + removed)
+    base_end = current_end - (old_added - old_removed)
+    return new_start, base_end - new_start, current_end + added - removed - new_start
+
+
+class IncrementalTermMatcher:
+    """
+    增量术语匹配
+
+    保存上一次的匹配结果，文本编辑后只重新扫描编辑区域及其两侧最长术语长度的范围，
+    其余匹配按偏移量平移复用，结果与整体重新匹配一致。
+    """
+
+    def __init__(self, matcher, text=''):
+        self.matcher = matcher
+        self.text = ''
+        self.matches = []
+        self.reset(text)
+
+    def reset(self, text):
+        """整体重新匹配"""
+        self.text = text
+        self.matches = self.matcher.find(text)
+        return self.matches
+
+    def can_update(self, text, position, removed, added):
+        """编辑信息与前后文本长度一致时才能增量更新"""
+        return (0 <= position and position + removed <= len(self.text)
+                and len(text) == len(self.text) - removed + added)
+
+    def _scan(self, text, start, end):
+        """从 start 开始贪心匹配，返回起点在 [start, end) 内的匹配"""
+        lookahead = min(len(text), end + self.matcher.max_length)
+        found = self.matcher.find(text[start:lookahead])
+        return [(s + start, e + start, payload) for s, e, payload in found if s + start < end]
+
+    def update(self, text, position, removed, added):
+        """
+        应用一次文本编辑
+
+        Args:
+            text (str): 编辑后的完整文本
+            position (int): 编辑起始位置
+            removed (int): 删除的字符数
+            added (int): 插入的字符数
+
+        Returns:
+            list: 更新后的全部匹配 [(起始位置, 结束位置, 数据)]
+        """
+        if not self.can_update(text, position, removed, added):
+            # 编辑信息与文本对不上时整体重新匹配
+            return self.reset(text)
+
+        span = max(1, self.matcher.max_length)
+        delta = added - removed
+
+        # 左侧：终点不超过 left 的匹配与本次编辑无关，直接保留
+        left = max(0, position - span)
+        keep_left = [m for m in self.matches if m[1] <= left]
+        scan_start = keep_left[-1][1] if keep_left else 0
+        dropped = [m for m in self.matches if m[1] > left and m[0] < position + removed]
+        scan_start = max(scan_start, min([left] + [m[0] for m in dropped]))
+
+        # 右侧：编辑区之后的旧匹配平移到新坐标
+        shifted = [(s + delta, e + delta, payload) for s, e, payload in self.matches if s >= position + removed]
+
+        scan_end = min(len(text), position + added + span)
+        while True:
+            scanned = self._scan(text, scan_start, scan_end)
+            boundary = max([scan_end] + [e for _, e, _ in scanned])
+            # 旧匹配跨越边界说明旧的贪心状态在边界处不同，继续向右扫描
+            spanning = [e for s, e, _ in shifted if s < boundary < e]
+            if not spanning or boundary >= len(text):
+                break
+            scan_end = max(spanning)
+
+        self.text = text
+        self.matches = keep_left + scanned + [m for m in shifted if m[0] >= boundary]
+        return self.matches
+
+
+class TermMatcherCache:
+    """按术语库版本缓存匹配器，术语库变化时自动重建"""
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(terms, version):
+        # 未提供版本号时用条目数和最后插入的键近似判断是否变化
+        last_key = next(reversed(terms), None) if terms else None
+        return version, len(terms), last_key
+
+    def peek(self, terms, variant, version=None, case_sensitive=True):
+        """只查缓存，不构建；术语库已变化或尚未构建时返回 None"""
+        key = (id(terms), variant, case_sensitive)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is terms and entry[1] == self._signature(terms, version):
+                return entry[2]
+        return None
+
+    def get(self, terms, variant, build_patterns, version=None, case_sensitive=True):
+        """
+        获取术语匹配器
+
+        Args:
+            terms (dict): 术语字典
+            variant: 匹配器变体标识（如匹配方向），同一术语字典可缓存多个变体
+            build_patterns: build_patterns(terms) -> 可迭代的 (模式串, 数据)
+            version: 术语库版本号，变化时重建
+            case_sensitive (bool): 是否区分大小写
+        """
+        key = (id(terms), variant, case_sensitive)
+        signature = self._signature(terms, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is terms and entry[1] == signature:
+                self._entries.move_to_end(key)
+                return entry[2]
+
+        matcher = AhoCorasickMatcher(build_patterns(terms), case_sensitive=case_sensitive)
+        print(f"[INFO] 构建术语匹配自动机: {variant}，{matcher.pattern_count} 个术语")
+        with self._lock:
+            self._entries[key] = (terms, signature, matcher)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return matcher
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# 所有翻译路径共用的匹配器缓存
+matcher_cache = TermMatcherCache()
+
+
+def iter_source_term_patterns(terms):
+    """正向匹配模式：源术语 -> 术语键，跳过没有目标术语的条目"""
+    for term_key, term_info in terms.items():
+        if not isinstance(term_info, dict):
+            continue
+        source_term = term_info.get('source_term', term_key)
+        target_term = term_info.get('target_term', '')
+        if source_term and target_term:
+            yield source_term, term_key
+
+
+def find_source_terms(text, terms, version=None):
+    """
+    在文本中查找源术语（最左最长、互不重叠）
+
+    Returns:
+        list: [{'source', 'target', 'definition', 'position', 'length', 'spans'}]，每个术语一项
+    """
+    if not text or not terms:
+        return []
+    matcher = matcher_cache.get(terms, 'source', iter_source_term_patterns, version=version)
+    return group_matches(matcher.find(text), lambda term_key: terms.get(term_key))
+
+
+def group_matches(matches, resolve):
+    """把同一术语的多次命中合并为一项，resolve(数据) -> 术语信息"""
+    grouped = OrderedDict()
+    for start, end, payload in matches:
+        # 数据为字典时按对象身份分组
+        key = id(payload) if isinstance(payload, dict) else payload
+        if key in grouped:
+            grouped[key]['spans'].append((start, end))
+            continue
+        term_info = resolve(payload)
+        if not isinstance(term_info, dict):
+            continue
+        grouped[key] = {
+            'source': term_info.get('source_term', payload),
+            'target': term_info.get('target_term', ''),
+            'definition': term_info.get('definition', ''),
+            'position': start,
+            'length': end - start,
+            'spans': [(start, end)]
+        }
+        if 'all_targets' in term_info:
+            grouped[key]['all_targets'] = term_info['all_targets']
+    return list(grouped.values())
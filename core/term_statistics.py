@@ -0,0 +1,152 @@
+"""
+术语库统计
+
+统计接口原本每次请求都遍历全部术语并解析添加时间，本模块常驻维护汇总数据，
+随 TermBase 的变更通知增量更新：
+- 按语言对、分类计数
+- 按小时分桶的添加数量，最近 N 天新增只需累加固定数量的桶
+- 最后更新时间用有序列表维护，删除术语后仍然准确
+"""
+
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+
+from core.reverse_term_index import IncrementalTermIndex
+
+# 未填写分类的术语在统计中的名称
+UNCATEGORIZED = '未分类'
+# 时间分桶格式（精确到小时）
+BUCKET_FORMAT = '%Y-%m-%dT%H'
+
+
+def parse_time_bucket(time_text):
+    """把 ISO 时间字符串转换为小时分桶键，无法解析时返回 None"""
+    if not time_text:
+        return None
+    try:
+        parsed = datetime.fromisoformat(time_text.replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        # 带时区的时间统一转换为本地时间
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.strftime(BUCKET_FORMAT)
+
+
+def _increment(counter, key, delta):
+    value = counter.get(key, 0) + delta
+    if value > 0:
+        counter[key] = value
+    else:
+        counter.pop(key, None)
+
+
+class TermStatistics(IncrementalTermIndex):
+    """增量维护的术语库统计数据"""
+
+    def __init__(self):
+        super().__init__(None, None)
+        self._reset()
+
+    def __len__(self):
+        return self.total_terms
+
+    def _reset(self):
+        self.total_terms = 0
+        self.language_pairs = {}
+        self.categories = {}
+        # 非空分类名 -> 术语数（分类列表接口使用）
+        self.category_names = {}
+        # 小时分桶键 -> 添加数量
+        self.added_buckets = {}
+        # 各术语的更新时间，有序
+        self._update_times = []
+        # 术语键 -> 它对各项统计的贡献，用于增量删除
+        self._contributions = {}
+
+    @staticmethod
+    def _contribution(term_data):
+        if not isinstance(term_data, dict):
+            return None
+        metadata = term_data.get('metadata', {})
+        added_time = metadata.get('added_time', '')
+        return {
+            'pair': f"{metadata.get('source_lang', 'zh')}-{metadata.get('target_lang', 'en')}",
+            'category': metadata.get('category', UNCATEGORIZED) or UNCATEGORIZED,
+            'category_name': (metadata.get('category', '') or '').strip(),
+            'bucket': parse_time_bucket(added_time),
+            'updated': metadata.get('updated_time', added_time) or ''
+        }
+
+    def _apply(self, contribution, delta):
+        _increment(self.language_pairs, contribution['pair'], delta)
+        _increment(self.categories, contribution['category'], delta)
+        if contribution['category_name']:
+            _increment(self.category_names, contribution['category_name'], delta)
+        if contribution['bucket']:
+            _increment(self.added_buckets, contribution['bucket'], delta)
+        if contribution['updated']:
+            if delta > 0:
+                insort(self._update_times, contribution['updated'])
+            else:
+                index = bisect_left(self._update_times, contribution['updated'])
+                if index < len(self._update_times) and self._update_times[index] == contribution['updated']:
+                    del self._update_times[index]
+
+    def _add(self, term, term_data):
+        self.total_terms += 1
+        contribution = self._contribution(term_data)
+        self._contributions[term] = contribution
+        if contribution is not None:
+            self._apply(contribution, 1)
+
+    def _remove(self, term):
+        if term not in self._contributions:
+            return
+        self.total_terms -= 1
+        contribution = self._contributions.pop(term)
+        if contribution is not None:
+            self._apply(contribution, -1)
+
+    def recent_additions(self, days=7, now=None):
+        """最近 days 天内添加的术语数（按小时分桶累加）"""
+        now = now or datetime.now()
+        with self._lock:
+            return sum(self.added_buckets.get((now - timedelta(hours=hour)).strftime(BUCKET_FORMAT), 0)
+                       for hour in range(days * 24 + 1))
+
+    def snapshot(self, recent_days=7):
+        """返回统计接口使用的统计数据"""
+        with self._lock:
+            return {
+                'total_terms': self.total_terms,
+                'language_pairs': dict(self.language_pairs),
+                'categories': dict(self.categories),
+                'recent_additions': self.recent_additions(recent_days),
+                'last_updated': self._update_times[-1] if self._update_times else None
+            }
+
+    def list_categories(self):
+        """返回全部非空分类名（排序）"""
+        with self._lock:
+            return sorted(self.category_names)
+
+    def verify(self, terms):
+        """
+        与完整术语库重新计算的结果比较，检查增量统计是否漂移
+
+        Returns:
+            dict: 有差异的统计项 {名称: {'current': 当前值, 'expected': 重新计算的值}}，一致时为空
+        """
+        expected = TermStatistics()
+        for term, term_data in terms.items():
+            expected._add(term, term_data)
+
+        drift = {}
+        with self._lock:
+            for name in ('total_terms', 'language_pairs', 'categories', 'category_names', 'added_buckets',
+                         '_update_times'):
+                current, correct = getattr(self, name), getattr(expected, name)
+                if current != correct:
+                    drift[name.lstrip('_')] = {'current': current, 'expected': correct}
+        return drift
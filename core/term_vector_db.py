@@ -1,9 +1,9 @@
 import os
-import json
 import numpy as np
 import uuid
 from datetime import datetime
 from core.vector_db import VectorDB
+from core.vector_matrix import VectorMatrix
 
 class TermVectorDB(VectorDB):
     """术语库专用向量数据库，继承自通用向量数据库"""
@@ -27,13 +27,144 @@ class TermVectorDB(VectorDB):
                 'texts': [],
                 'metadata': []
             }
-        
+
         print(f"[INFO] 术语向量数据库初始化，路径: {self.vector_path}")
     
+    def load(self):
+        """加载向量数据（与 reload 相同，向量ID取自集合元数据），检索矩阵在下次检索时重建"""
+        with self._write_lock:
+            self._matrix = None
+            if not os.path.exists(os.path.join(self.vector_path, 'vectors.json')):
+                return super().load()
+            try:
+                collections, vectors = self._read_vector_file()
+            except Exception as e:
+                print(f"[ERROR] 读取术语向量文件失败: {e}")
+                return super().load()
+            self._install_vector_data(collections, vectors)
+            print(f"[INFO] 已加载术语向量数据，包含 {len(vectors)} 个向量项目")
+            return True
+
+    def reload(self):
+        """向量文件被外部修改后重新加载：解析和建立检索矩阵完成后再整体替换"""
+        try:
+            collections, vectors = self._read_vector_file()
+            matrix, items = self._build_matrix(vectors, collections)
+        except Exception as e:
+            print(f"[ERROR] 重新加载术语向量失败，继续使用当前数据: {e}")
+            return False
+        with self._write_lock:
+            self._install_vector_data(collections, vectors)
+            self._matrix, self._matrix_items = matrix, items
+        print(f"[INFO] 术语向量已重新加载，检索矩阵共 {len(matrix)} 个向量")
+        return True
+
+    def clear(self):
+        """清空向量数据"""
+        self._matrix = None
+        return super().clear()
+
+    @staticmethod
+    def _build_matrix(vectors, collections):
+        """
+        从 vectors 和 collections 建立检索矩阵
+
+        Returns:
+            tuple: (VectorMatrix, {向量ID: (文本, 元数据)})
+        """
+        matrix = VectorMatrix()
+        items = {}
+
+        def add(vector_id, content, vector, metadata):
+            if matrix.add(vector_id, vector):
+                items[vector_id] = (content, metadata)
+
+        for vector_id, vector_data in vectors.items():
+            if isinstance(vector_data, dict) and 'vector' in vector_data:
+                add(vector_id, vector_data.get('content', vector_data.get('text', '')),
+                    vector_data['vector'], vector_data.get('metadata', {}))
+        # 重新加载后 vectors 中只有临时ID，集合元数据里保存着添加时的向量ID
+        for coll_name, coll_data in collections.items():
+            if not isinstance(coll_data, dict):
+                continue
+            metadata_list = coll_data.get('metadata', [])
+            for i, (vector, text) in enumerate(zip(coll_data.get('vectors', []), coll_data.get('texts', []))):
+                metadata = metadata_list[i] if i < len(metadata_list) and metadata_list[i] else {}
+                vector_id = metadata.get('id') or f"v_{coll_name}_{i}"
+                if vector_id not in matrix:
+                    add(vector_id, text, vector, metadata)
+        return matrix, items
+
+    def _get_matrix(self):
+        """获取检索矩阵及其条目，首次使用或重新加载后从 vectors 和 collections 建立"""
+        with self._write_lock:
+            if self._matrix is None:
+                self._matrix, self._matrix_items = self._build_matrix(self.vectors, self.collections)
+                print(f"[INFO] 术语向量检索矩阵已建立，共 {len(self._matrix)} 个向量")
+            return self._matrix, self._matrix_items
+
+    def _matrix_update(self, vector_id, content=None, vector=None, metadata=None):
+        """向量增删后同步已建立的检索矩阵（vector 为 None 表示删除）"""
+        with self._write_lock:
+            if self._matrix is None:
+                return
+            if vector is None:
+                self._matrix.remove(vector_id)
+                self._matrix_items.pop(vector_id, None)
+            elif self._matrix.add(vector_id, vector):
+                self._matrix_items[vector_id] = (content, metadata)
+
+    def search_vectors(self, query_vector, top_k=15, min_similarity=None):
+        """
+        用查询向量检索，一次矩阵乘法计算全部相似度
+
+        Returns:
+            list: [{'vector_id', 'content', 'similarity', 'metadata'}]，按相似度从高到低排序
+        """
+        matrix, items = self._get_matrix()
+        results = []
+        for vector_id, similarity in matrix.search(query_vector, top_k, min_similarity):
+            content, metadata = items.get(vector_id, ('', {}))
+            results.append({
+                'vector_id': vector_id,
+                'content': content,
+                'similarity': similarity,
+                'metadata': metadata
+            })
+        return results
+
     def search(self, query, top_k=15, min_similarity=0.3):
-        """术语库专用搜索，降低相似度阈值以提高召回率"""
-        return super().search(query, top_k, min_similarity)
-    
+        """术语库专用搜索，降低相似度阈值以提高召回率；query 可以是文本或查询向量"""
+        try:
+            if isinstance(query, str):
+                if not hasattr(self, 'model') or self.model is None:
+                    print("[ERROR] 向量模型未加载，无法执行搜索")
+                    return []
+                query = self.get_embedding(query)
+                if query is None:
+                    print("[ERROR] 无法获取查询向量")
+                    return []
+            return self.search_vectors(query, top_k, min_similarity)
+        except Exception as e:
+            print(f"[ERROR] 术语向量搜索失败: {e}")
+            import traceback
+            traceback.print_exc()
+            return []
+
+    def add_to_collection(self, text, collection_name=None, vector=None, metadata=None):
+        """添加文本向量到指定集合，并同步检索矩阵"""
+        vector_id = super().add_to_collection(text, collection_name, vector, metadata)
+        if vector_id:
+            stored = self.vectors[vector_id]
+            self._matrix_update(vector_id, text, stored['vector'], stored['metadata'])
+        return vector_id
+
+    def delete(self, vector_id):
+        """删除向量（同时从集合和检索矩阵中删除）"""
+        if vector_id not in self.vectors:
+            return False
+        return self.remove_vector(vector_id)
+
     def add(self, text, vector, metadata=None):
         """添加术语向量时自动标记类型"""
         if metadata is None:
@@ -45,32 +176,6 @@ class TermVectorDB(VectorDB):
             
         return super().add(text, vector, metadata)
 
-    def load_vectors(self):
-        """加载向量数据"""
-        if os.path.exists(self.vector_file):
-            try:
-                with open(self.vector_file, 'r', encoding='utf-8') as f:
-                    vectors = json.load(f)
-                print(f"[INFO] 术语向量库加载成功，包含 {len(vectors)} 个向量")
-                return vectors
-            except Exception as e:
-                print(f"[ERROR] 加载术语向量库失败: {e}")
-                return {}
-        else:
-            print("[INFO] 术语向量库文件不存在，将创建新文件")
-            return {}
-    
-    def save_vectors(self):
-        """保存向量数据"""
-        try:
-            with open(self.vector_file, 'w', encoding='utf-8') as f:
-                json.dump(self.vectors, f, ensure_ascii=False, indent=2)
-            print(f"[INFO] 术语向量库保存成功，共 {len(self.vectors)} 个向量")
-            return True
-        except Exception as e:
-            print(f"[ERROR] 保存术语向量库失败: {e}")
-            return False
-    
     def get_embedding(self, text):
         """获取文本的向量嵌入"""
         if not hasattr(self, 'model') or self.model is None:
@@ -88,30 +193,36 @@ class TermVectorDB(VectorDB):
             return None
     
     def add_vector(self, vector_id, content, vector, metadata=None):
-        """添加向量"""
+        """添加指定ID的向量（写入默认集合，随 save 一起写入向量文件）"""
         if not vector_id or vector is None:
             print("[ERROR] 添加向量失败: ID或向量为空")
             return False
         
-        # 确保metadata是字典
-        if metadata is None:
-            metadata = {}
+        # 复制元数据，避免改写调用方（术语条目）的元数据
+        metadata = dict(metadata or {})
+        metadata['id'] = vector_id
+        metadata.setdefault('type', 'term')
         
         # 添加时间戳
         metadata['added_time'] = datetime.now().isoformat()
         
-        # 创建向量数据
-        vector_data = {
-            'content': content,
-            'vector': vector.tolist() if hasattr(vector, 'tolist') else vector,
-            'metadata': metadata
-        }
-        
-        # 添加到向量库
-        self.vectors[vector_id] = vector_data
-        
-        # 保存向量库
-        return self.save_vectors()
+        vector_list = vector.tolist() if hasattr(vector, 'tolist') else vector
+        with self._write_lock:
+            collection = self.collections.setdefault(self.default_collection, {
+                'vectors': [],
+                'texts': [],
+                'metadata': []
+            })
+            collection['vectors'].append(vector_list)
+            collection['texts'].append(content)
+            collection['metadata'].append(metadata)
+            self.vectors[vector_id] = {
+                'content': content,
+                'vector': vector_list,
+                'metadata': metadata
+            }
+        self._matrix_update(vector_id, content, vector, metadata)
+        return True
     
     def remove_vector(self, vector_id):
         """删除向量"""
@@ -119,11 +230,17 @@ class TermVectorDB(VectorDB):
             print(f"[ERROR] 删除向量失败: 向量ID '{vector_id}' 不存在")
             return False
         
-        # 删除向量
-        del self.vectors[vector_id]
-        
-        # 保存向量库
-        return self.save_vectors()
+        # 删除向量（集合中的同一向量一并删除，避免保存后重新加载时恢复）
+        with self._write_lock:
+            del self.vectors[vector_id]
+            collection = self.collections.get(self.default_collection) or {}
+            for index, metadata in enumerate(collection.get('metadata', [])):
+                if (metadata or {}).get('id') == vector_id:
+                    for key in ('vectors', 'texts', 'metadata'):
+                        del collection[key][index]
+                    break
+        self._matrix_update(vector_id)
+        return True
     
     def search_similar(self, query, top_k=15):
         """搜索相似向量"""
@@ -139,25 +256,13 @@ class TermVectorDB(VectorDB):
                 print("[ERROR] 生成查询向量失败")
                 return []
             
-            # 计算相似度
-            results = []
-            
-            for vector_id, vector_data in self.vectors.items():
-                vector = np.array(vector_data['vector'])
-                similarity = self.cosine_similarity(query_vector, vector)
-                
-                results.append({
-                    'id': vector_id,
-                    'content': vector_data['content'],
-                    'similarity': float(similarity),
-                    'metadata': vector_data.get('metadata', {})
-                })
-            
-            # 按相似度排序
-            results.sort(key=lambda x: x['similarity'], reverse=True)
-            
-            # 返回top_k个结果
-            return results[:top_k]
+            # 矩阵检索，返回 top_k 个结果
+            return [{
+                'id': result['vector_id'],
+                'content': result['content'],
+                'similarity': result['similarity'],
+                'metadata': result['metadata']
+            } for result in self.search_vectors(query_vector, top_k)]
         
         except Exception as e:
             print(f"[ERROR] 搜索相似术语失败: {e}")
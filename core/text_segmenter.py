@@ -0,0 +1,52 @@
+"""
+文本分句工具
+
+按中英文标点切分句子，每个句子保留其结尾标点和后随空白，
+因此 ''.join(split_sentences(text)) 可以还原原文（首部空白除外）。
+"""
+
+import re
+
+# 中文句末标点（可跟随引号/括号）、英文句点后接空白、或换行
+_SENTENCE_PATTERN = re.compile(
+    r'.*?(?:[。！？!?；;…]+[”’"」』）)]*|\.(?=\s)|\n+|$)\s*',
+    re.S
+)
+
+_CJK_PATTERN = re.compile(r'[㐀-鿿豈-﫿]')
+_WORD_PATTERN = re.compile(r'[A-Za-z0-9_]+')
+
+
+def split_sentences(text):
+    """将文本切分为句子列表"""
+    if not text:
+        return []
+    return [m.group(0) for m in _SENTENCE_PATTERN.finditer(text) if m.group(0).strip()]
+
+
+def estimate_tokens(text):
+    """无分词器时粗略估算token数：汉字按1个，英文单词按1.3个，其他符号按0.5个"""
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    words = _WORD_PATTERN.findall(text)
+    other = len(re.sub(r'[\s㐀-鿿豈-﫿A-Za-z0-9_]', '', text))
+    return cjk + int(len(words) * 1.3 + 0.5) + (other + 1) // 2
+
+
+def make_token_counter(tokenizer=None):
+    """根据分词器生成token计数函数，分词器不可用时使用估算"""
+    if tokenizer is not None:
+        def count(text):
+            if not text:
+                return 0
+            try:
+                return len(tokenizer.encode(text, add_special_tokens=False))
+            except TypeError:
+                return len(tokenizer.encode(text))
+        try:
+            count('测试 test')
+            return count
+        except Exception as e:
+            print(f"[WARNING] 分词器不可用，改用估算token数: {e}")
+    return estimate_tokens
@@ -2,6 +2,8 @@ import logging
 from typing import Dict, List, Optional
 from langdetect import detect
 from .base_engine import BaseEngine
+from .term_matcher import find_source_terms
+from .translation_memory import format_examples
 import os
 
 # 配置日志 - 设置为DEBUG级别以显示所有日志
@@ -143,7 +145,8 @@ class TranslationEngine(BaseEngine):
             traceback.print_exc()
             return f"生成翻译时出错: {str(e)}"
 
-    def translate_text(self, text: str, source_lang: str = None, target_lang: str = 'en', use_termbase: bool = True):
+    def translate_text(self, text: str, source_lang: str = None, target_lang: str = 'en', use_termbase: bool = True,
+                       examples: List = None):
         """
         翻译文本，可选是否使用术语库
 
@@ -152,6 +155,7 @@ class TranslationEngine(BaseEngine):
             source_lang: 源语言，None表示自动检测
             target_lang: 目标语言
             use_termbase: 是否使用术语库
+            examples: 翻译记忆库中的相似译文示例 [{'source_text', 'target_text'}]
 
         Returns:
             翻译后的文本
@@ -244,8 +248,8 @@ class TranslationEngine(BaseEngine):
                     processed_text = processed_text.replace(term['source'], term['target'])
                 logger.info(f"术语替换完成，共替换 {len(matched_terms)} 个术语")
 
-            # 构建极简翻译提示
-            prompt = f"请将以下文本翻译成{target_lang}：\n{processed_text}"
+            # 构建极简翻译提示（有相似译文时作为示例放在前面）
+            prompt = f"{format_examples(examples)}请将以下文本翻译成{target_lang}：\n{processed_text}"
 
             messages = [
                 {"role": "system", "content": prompt},
@@ -297,32 +301,12 @@ class TranslationEngine(BaseEngine):
         elif target_lang and target_lang.lower() in ['en-us', 'en-gb', 'english', '英文']:
             target_lang = 'en'
 
-        matched_terms = []
-
-        # 排序术语列表，优先匹配长术语（避免子字符串问题）
-        sorted_term_items = sorted(
-            [(k, v) for k, v in terms.items()],
-            key=lambda x: len(x[0]),
-            reverse=True
-        )
-
-        for term_key, term_info in sorted_term_items:
-            # 获取源术语和目标术语
-            source_term = term_info.get('source_term', term_key)
-            target_term = term_info.get('target_term', '')
-
-            # 跳过无效术语
-            if not source_term or not target_term:
-                continue
-
-            # 简化匹配逻辑：如果源术语在文本中，则认为匹配成功
-            if source_term in text:
-                logger.info(f"匹配到术语: '{source_term}' => '{target_term}'")
-                matched_terms.append({
-                    'source': source_term,
-                    'target': target_term,
-                    'definition': term_info.get('definition', '')
-                })
+        # 使用按术语库版本缓存的 Aho–Corasick 自动机，一次扫描找出最左最长的术语匹配
+        term_owner = getattr(self, 'term_base', None)
+        version = getattr(term_owner, 'version', None) if getattr(term_owner, 'terms', None) is terms else None
+        matched_terms = find_source_terms(text, terms, version=version)
+        for term in matched_terms:
+            logger.info(f"匹配到术语: '{term['source']}' => '{term['target']}'")
 
         logger.info(f"术语匹配完成，共匹配到 {len(matched_terms)} 个术语")
         return matched_terms
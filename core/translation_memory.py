@@ -0,0 +1,672 @@
+"""
+翻译记忆库
+
+设备报警文本、界面字符串、重复出现的操作步骤会被反复翻译。本模块缓存已通过质量验证的译文，
+翻译前先查记忆库，命中时跳过LLM生成：
+- 键为 (规范化原文, 源语言, 目标语言, 术语指纹, 模型标识)；术语指纹是该句命中的术语对的摘要，
+  只有影响这句话的术语被修改时才失效，并且在程序重启后依然有效
+- SQLite 持久化（WAL 模式），前面加一层内存 LRU
+- 支持 TMX 导入导出；导入的人工译文不区分术语和模型，作为通配条目参与匹配
+- 只有数字或占位符不同的句子，直接替换已有译文中的对应数字/占位符，不调用LLM
+- 设置向量编码器后，为原文建立向量索引，相似度超过阈值的已有译文作为示例放入提示词
+- 统计内存命中、数据库命中、数字替换命中、相似示例命中和未命中次数
+"""
+
+import os
+import re
+import time
+import hashlib
+import sqlite3
+import threading
+import traceback
+import unicodedata
+from array import array
+from collections import Counter
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape, quoteattr
+
+# 人工译文（TMX 导入）的术语指纹和模型标识，匹配任何术语和模型
+ANY = '*'
+# 不使用术语库时的术语指纹
+NO_TERMS = '-'
+
+_XML_LANG = '{http://www.w3.org/XML/1998/namespace}lang'
+
+# 可直接替换的变量：术语占位符 [T1]、格式占位符 {0}/{name}/%s、数字（含小数点、千分位和时间）
+_VARIABLE_RE = re.compile(r'\[T\d+\]|\{[^{}\s]*\}|%(?:\d+\$)?[sdfi]|\d+(?:[.,:]\d+)*')
+_SLOT = '\ufffc'
+
+
+def normalize_segment(text):
+    """规范化原文：全半角统一、空白合并（保留大小写）"""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', str(text))
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def term_fingerprint(matched_terms):
+    """
+    计算术语指纹
+
+    Args:
+        matched_terms: 术语匹配结果（含 source/target），None 表示未使用术语库
+
+    Returns:
+        str: 命中的术语对的摘要；未使用术语库时为 NO_TERMS，没有命中术语时为空字符串
+    """
+    if matched_terms is None:
+        return NO_TERMS
+    pairs = sorted({(str(term.get('source', '')), str(term.get('target', '')))
+                    for term in matched_terms if isinstance(term, dict)})
+    if not pairs:
+        return ''
+    digest = hashlib.sha1('\n'.join(f"{source}\t{target}" for source, target in pairs).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def segment_pattern(text):
+    """
+    把原文中的数字和占位符替换为变量槽
+
+    Returns:
+        tuple: (模式文本, 变量列表)
+    """
+    text = normalize_segment(text)
+    return _VARIABLE_RE.sub(_SLOT, text), _VARIABLE_RE.findall(text)
+
+
+def patch_variables(source_text, target_text, new_source_text):
+    """
+    新原文与已有原文只有数字/占位符不同时，替换已有译文中对应的数字/占位符
+
+    同一个旧值对应多个新值、或旧值在译文中出现的次数与原文不一致（译文改写了数字）时无法确定对应关系，返回 None。
+
+    Returns:
+        str: 替换后的译文，无法替换时返回 None
+    """
+    pattern, old_vars = segment_pattern(source_text)
+    new_pattern, new_vars = segment_pattern(new_source_text)
+    if not old_vars or pattern != new_pattern:
+        return None
+
+    mapping = {}
+    for old, new in zip(old_vars, new_vars):
+        if mapping.setdefault(old, new) != new:
+            return None
+    changed = {old: new for old, new in mapping.items() if old != new}
+    if not changed:
+        return target_text
+
+    source_counts = Counter(old_vars)
+    target_counts = Counter(_VARIABLE_RE.findall(target_text))
+    if any(target_counts[old] != source_counts[old] for old in changed):
+        return None
+    return _VARIABLE_RE.sub(lambda match: changed.get(match.group(0), match.group(0)), target_text)
+
+
+class TranslationMemory:
+    """SQLite + 内存 LRU 两级翻译记忆库（线程安全）"""
+
+    def __init__(self, db_path, max_memory_entries=2000, fuzzy_threshold=0.85, max_examples=2):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self.max_memory_entries = max(0, int(max_memory_entries))
+        self.fuzzy_threshold = fuzzy_threshold
+        self.max_examples = max(0, int(max_examples))
+        self._memory = OrderedDict()
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._init_schema()
+
+        # 向量编码器（需提供 encode_text，批量编码可选 encode_texts）和按语言对划分的向量矩阵
+        self._encoder = None
+        self._matrices = {}
+        self._index_thread = None
+
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.pattern_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def _init_schema(self):
+        with self._lock:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS segments (
+                    source_key TEXT NOT NULL,
+                    source_lang TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    term_fingerprint TEXT NOT NULL,
+                    model_id TEXT NOT NULL,
+                    source_text TEXT NOT NULL,
+                    target_text TEXT NOT NULL,
+                    origin TEXT NOT NULL DEFAULT 'mt',
+                    updated_at REAL,
+                    pattern_key TEXT,
+                    PRIMARY KEY (source_key, source_lang, target_lang, term_fingerprint, model_id)
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS segment_vectors (
+                    source_key TEXT NOT NULL,
+                    source_lang TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (source_key, source_lang, target_lang)
+                )
+            """)
+
+            # 旧版本数据库没有 pattern_key 列，补充并计算
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(segments)")}
+            if 'pattern_key' not in columns:
+                self._conn.execute("ALTER TABLE segments ADD COLUMN pattern_key TEXT")
+                keys = [row[0] for row in self._conn.execute("SELECT DISTINCT source_key FROM segments")]
+                self._conn.executemany("UPDATE segments SET pattern_key = ? WHERE source_key = ?",
+                                       [(_pattern_key(key), key) for key in keys])
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_segments_pattern ON segments (pattern_key, source_lang, target_lang)")
+            self._conn.commit()
+
+    @contextmanager
+    def batch(self):
+        """批量写入上下文，退出时统一提交一次"""
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            except Exception:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._conn.rollback()
+                raise
+            else:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._conn.commit()
+
+    def _commit(self):
+        if self._batch_depth == 0:
+            self._conn.commit()
+
+    def _remember(self, key, value):
+        if self.max_memory_entries == 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def lookup(self, source_text, source_lang, target_lang, fingerprint=NO_TERMS, model_id=''):
+        """
+        查询译文
+
+        人工译文（通配条目）优先，其次是术语指纹和模型都相同的机器译文。
+
+        Returns:
+            dict: {'target_text', 'origin'}，未命中返回 None
+        """
+        source_key = normalize_segment(source_text)
+        with self._lock:
+            hit = self._lookup_exact(source_key, source_lang, target_lang, fingerprint, model_id)
+            if hit is None and source_key:
+                self.misses += 1
+            return hit
+
+    def _lookup_exact(self, source_key, source_lang, target_lang, fingerprint, model_id):
+        """精确匹配（内存 LRU -> 数据库），未命中返回 None，不计入未命中次数"""
+        if not source_key:
+            return None
+        key = (source_key, source_lang, target_lang, fingerprint, model_id)
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return dict(self._memory[key])
+
+            row = self._conn.execute(
+                """
+                SELECT target_text, origin FROM segments
+                WHERE source_key = ? AND source_lang = ? AND target_lang = ?
+                  AND ((term_fingerprint = ? AND model_id = ?) OR (term_fingerprint = ? AND model_id = ?))
+                ORDER BY CASE WHEN model_id = ? THEN 0 ELSE 1 END, updated_at DESC
+                LIMIT 1
+                """,
+                (source_key, source_lang, target_lang, fingerprint, model_id, ANY, ANY, ANY)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value = {'target_text': row[0], 'origin': row[1]}
+            self._remember(key, value)
+            self.db_hits += 1
+            return dict(value)
+
+    def _lookup_pattern(self, source_text, source_lang, target_lang, fingerprint, model_id):
+        """只有数字/占位符不同的已有译文，替换后返回；无法替换时返回 None"""
+        pattern_key = _pattern_key(normalize_segment(source_text))
+        if pattern_key is None:
+            return None
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT source_text, target_text, origin FROM segments
+                WHERE pattern_key = ? AND source_lang = ? AND target_lang = ?
+                  AND ((term_fingerprint = ? AND model_id = ?) OR (term_fingerprint = ? AND model_id = ?))
+                ORDER BY CASE WHEN model_id = ? THEN 0 ELSE 1 END, updated_at DESC
+                LIMIT 20
+                """,
+                (pattern_key, source_lang, target_lang, fingerprint, model_id, ANY, ANY, ANY)
+            ).fetchall()
+        for old_source, old_target, origin in rows:
+            patched = patch_variables(old_source, old_target, source_text)
+            if patched is not None:
+                return {'target_text': patched, 'origin': origin, 'reference': old_source}
+        return None
+
+    def match(self, source_text, source_lang, target_lang, fingerprint=NO_TERMS, model_id=''):
+        """
+        翻译前查询：精确匹配 -> 数字/占位符替换 -> 相似译文示例
+
+        Returns:
+            tuple: (命中结果, 示例列表)。命中结果为 {'target_text', 'origin', 'match'}，
+                   match 为 'exact' 或 'pattern'；未命中时为 None，示例列表为
+                   [{'source_text', 'target_text', 'similarity'}]，可放入提示词
+        """
+        source_key = normalize_segment(source_text)
+        if not source_key:
+            return None, []
+
+        hit = self._lookup_exact(source_key, source_lang, target_lang, fingerprint, model_id)
+        if hit:
+            hit['match'] = 'exact'
+            return hit, []
+
+        hit = self._lookup_pattern(source_text, source_lang, target_lang, fingerprint, model_id)
+        with self._lock:
+            if hit:
+                self.pattern_hits += 1
+                hit['match'] = 'pattern'
+                return hit, []
+            self.misses += 1
+
+        examples = self.find_similar(source_text, source_lang, target_lang)
+        if examples:
+            with self._lock:
+                self.fuzzy_hits += 1
+        return None, examples
+
+    def store(self, source_text, target_text, source_lang, target_lang, fingerprint=NO_TERMS, model_id='',
+              origin='mt', index_vector=True):
+        """
+        保存一条译文（同键覆盖），返回是否保存
+
+        Args:
+            index_vector (bool): 设置了向量编码器时是否立即为原文生成向量（批量导入时关闭，稍后统一补建）
+        """
+        source_key = normalize_segment(source_text)
+        if not source_key or not target_text or not target_text.strip():
+            return False
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO segments (source_key, source_lang, target_lang, term_fingerprint, model_id,
+                                      source_text, target_text, origin, updated_at, pattern_key)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(source_key, source_lang, target_lang, term_fingerprint, model_id) DO UPDATE SET
+                    source_text = excluded.source_text,
+                    target_text = excluded.target_text,
+                    origin = excluded.origin,
+                    updated_at = excluded.updated_at
+                """,
+                (source_key, source_lang, target_lang, fingerprint, model_id,
+                 source_text, target_text, origin, time.time(), _pattern_key(source_key))
+            )
+            self._commit()
+            # 新的人工译文会改变通配匹配结果，清空该原文的内存条目
+            if model_id == ANY:
+                for key in [key for key in self._memory if key[0] == source_key]:
+                    del self._memory[key]
+            else:
+                self._remember((source_key, source_lang, target_lang, fingerprint, model_id),
+                               {'target_text': target_text, 'origin': origin})
+            self.stores += 1
+            needs_vector = (index_vector and self._encoder is not None
+                            and source_key not in self._matrices.get((source_lang, target_lang), ()))
+
+        if needs_vector:
+            # 编码较慢，在锁外进行
+            try:
+                self._store_vectors([(source_key, source_lang, target_lang,
+                                      self._encoder.encode_text(source_key))])
+            except Exception as e:
+                print(f"[WARNING] 翻译记忆库原文向量生成失败: {e}")
+        return True
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+    def clear(self):
+        """清空记忆库并重置统计"""
+        with self._lock:
+            self._conn.execute("DELETE FROM segments")
+            self._conn.execute("DELETE FROM segment_vectors")
+            self._conn.commit()
+            self._memory.clear()
+            for matrix in self._matrices.values():
+                matrix.clear()
+            self.memory_hits = self.db_hits = self.pattern_hits = self.fuzzy_hits = 0
+            self.misses = self.stores = 0
+
+    def get_stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.db_hits + self.pattern_hits
+            total = hits + self.misses
+            return {
+                'entries': self.count(),
+                'memory_size': len(self._memory),
+                'max_memory_entries': self.max_memory_entries,
+                'memory_hits': self.memory_hits,
+                'db_hits': self.db_hits,
+                'pattern_hits': self.pattern_hits,
+                'fuzzy_hits': self.fuzzy_hits,
+                'misses': self.misses,
+                'fuzzy_enabled': self._encoder is not None,
+                'indexed_segments': sum(len(matrix) for matrix in self._matrices.values()),
+                'stores': self.stores,
+                'hit_rate': round(hits / total, 4) if total else 0.0
+            }
+
+    # ------------------------------------------------------------------
+    # 相似译文（向量检索）
+    # ------------------------------------------------------------------
+
+    def set_encoder(self, encoder):
+        """
+        设置向量编码器并加载已有的原文向量
+
+        Args:
+            encoder: 提供 encode_text(text) 的对象（如知识库向量库），批量编码可选 encode_texts(texts)
+
+        Returns:
+            bool: 是否启用相似译文检索（缺少 numpy 时不启用）
+        """
+        try:
+            from core.vector_matrix import VectorMatrix
+        except ImportError as e:
+            print(f"[WARNING] 无法启用翻译记忆库相似检索: {e}")
+            return False
+
+        with self._lock:
+            self._encoder = encoder
+            self._matrices = {}
+            rows = self._conn.execute(
+                "SELECT source_key, source_lang, target_lang, vector FROM segment_vectors").fetchall()
+            for source_key, source_lang, target_lang, blob in rows:
+                matrix = self._matrices.setdefault((source_lang, target_lang), VectorMatrix())
+                matrix.add(source_key, array('f', blob))
+        print(f"[INFO] 翻译记忆库相似检索已启用，加载 {len(rows)} 个原文向量")
+        return True
+
+    def _store_vectors(self, entries):
+        """保存原文向量 [(source_key, source_lang, target_lang, vector)] 并加入矩阵"""
+        from core.vector_matrix import VectorMatrix
+
+        with self._lock:
+            for source_key, source_lang, target_lang, vector in entries:
+                if vector is None:
+                    continue
+                values = array('f', (float(value) for value in vector))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO segment_vectors (source_key, source_lang, target_lang, vector) "
+                    "VALUES (?, ?, ?, ?)",
+                    (source_key, source_lang, target_lang, values.tobytes())
+                )
+                matrix = self._matrices.setdefault((source_lang, target_lang), VectorMatrix())
+                matrix.add(source_key, values)
+            self._commit()
+
+    def index_missing(self, batch_size=32):
+        """
+        为缺少向量的原文按批生成向量
+
+        Returns:
+            int: 新生成的向量数
+        """
+        if self._encoder is None:
+            return 0
+        with self._lock:
+            missing = self._conn.execute(
+                """
+                SELECT DISTINCT s.source_key, s.source_lang, s.target_lang FROM segments s
+                LEFT JOIN segment_vectors v ON v.source_key = s.source_key
+                     AND v.source_lang = s.source_lang AND v.target_lang = s.target_lang
+                WHERE v.source_key IS NULL
+                """
+            ).fetchall()
+
+        indexed = 0
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            texts = [row[0] for row in batch]
+            if hasattr(self._encoder, 'encode_texts'):
+                vectors = self._encoder.encode_texts(texts)
+            else:
+                vectors = [self._encoder.encode_text(text) for text in texts]
+            entries = [(*row, vector) for row, vector in zip(batch, vectors) if vector is not None]
+            self._store_vectors(entries)
+            indexed += len(entries)
+        if indexed:
+            print(f"[INFO] 翻译记忆库补建 {indexed} 个原文向量")
+        return indexed
+
+    def start_indexing(self):
+        """在后台线程补建缺少的原文向量，已在运行或未设置编码器时不启动"""
+        if self._encoder is None:
+            return False
+        if self._index_thread is not None and self._index_thread.is_alive():
+            return False
+
+        def run():
+            try:
+                self.index_missing()
+            except Exception as e:
+                print(f"[ERROR] 翻译记忆库向量补建失败: {e}")
+                traceback.print_exc()
+
+        self._index_thread = threading.Thread(target=run, name='tm-vector-index', daemon=True)
+        self._index_thread.start()
+        return True
+
+    def find_similar(self, source_text, source_lang, target_lang, threshold=None, max_examples=None):
+        """
+        检索相似原文的已有译文（不区分术语和模型），作为翻译示例
+
+        Returns:
+            list: [{'source_text', 'target_text', 'similarity'}]，按相似度从高到低排序
+        """
+        threshold = self.fuzzy_threshold if threshold is None else threshold
+        max_examples = self.max_examples if max_examples is None else max_examples
+        matrix = self._matrices.get((source_lang, target_lang))
+        source_key = normalize_segment(source_text)
+        if self._encoder is None or not matrix or not source_key or max_examples <= 0:
+            return []
+
+        try:
+            query_vector = self._encoder.encode_text(source_key)
+        except Exception as e:
+            print(f"[WARNING] 翻译记忆库查询向量生成失败: {e}")
+            return []
+        if query_vector is None:
+            return []
+
+        examples = []
+        with self._lock:
+            for key, similarity in matrix.search(query_vector, max_examples + 1, threshold):
+                if key == source_key:
+                    continue
+                row = self._conn.execute(
+                    """
+                    SELECT source_text, target_text FROM segments
+                    WHERE source_key = ? AND source_lang = ? AND target_lang = ?
+                    ORDER BY CASE WHEN model_id = ? THEN 0 ELSE 1 END, updated_at DESC
+                    LIMIT 1
+                    """,
+                    (key, source_lang, target_lang, ANY)
+                ).fetchone()
+                if row is not None:
+                    examples.append({'source_text': row[0], 'target_text': row[1],
+                                     'similarity': round(similarity, 4)})
+                if len(examples) >= max_examples:
+                    break
+        return examples
+
+    # ------------------------------------------------------------------
+    # TMX 导入导出
+    # ------------------------------------------------------------------
+
+    def import_tmx(self, file_path, source_lang=None, target_lang=None):
+        """
+        流式导入 TMX 文件，导入的译文作为人工译文（匹配任何术语和模型）
+
+        Args:
+            source_lang (str): 源语言，默认取文件头的 srclang（为 *all* 时取翻译单元中的第一种语言）
+            target_lang (str): 目标语言，默认取每个翻译单元中的另一种语言
+
+        Returns:
+            dict: {'imported', 'skipped'}
+        """
+        result = {'imported': 0, 'skipped': 0}
+        header_lang = None
+        stack = []
+        with self.batch():
+            for event, element in ET.iterparse(file_path, events=('start', 'end')):
+                if event == 'start':
+                    stack.append(element)
+                    if element.tag == 'header':
+                        header_lang = _base_lang(element.get('srclang'))
+                    continue
+                stack.pop()
+                if element.tag != 'tu':
+                    continue
+
+                segments = {}
+                for tuv in element.iter('tuv'):
+                    lang = _base_lang(tuv.get(_XML_LANG) or tuv.get('lang'))
+                    seg = tuv.find('seg')
+                    if lang and seg is not None and lang not in segments:
+                        segments[lang] = ''.join(seg.itertext())
+                # 释放已处理的翻译单元
+                element.clear()
+                if stack:
+                    stack[-1].remove(element)
+
+                src = _base_lang(source_lang) or header_lang
+                if not source_lang and src not in segments and segments:
+                    # 文件头的 srclang 为 *all* 时以第一个语言为原文
+                    src = next(iter(segments))
+                if src not in segments:
+                    result['skipped'] += 1
+                    continue
+                targets = [_base_lang(target_lang)] if target_lang else [lang for lang in segments if lang != src]
+                stored = False
+                for tgt in targets:
+                    if tgt in segments and tgt != src:
+                        stored = self.store(segments[src], segments[tgt], src, tgt, ANY, ANY, origin='tmx',
+                                            index_vector=False) or stored
+                result['imported' if stored else 'skipped'] += 1
+
+        print(f"[INFO] TMX 导入完成: 导入 {result['imported']} 个翻译单元，跳过 {result['skipped']} 个")
+        if result['imported']:
+            self.start_indexing()
+        return result
+
+    def iter_tmx(self, source_lang=None, target_lang=None):
+        """
+        逐块生成 TMX 内容（同一原文和语言对只导出最近的一条译文）
+
+        Yields:
+            str: TMX 文本块
+        """
+        conditions, params = [], []
+        if source_lang:
+            conditions.append("source_lang = ?")
+            params.append(source_lang)
+        if target_lang:
+            conditions.append("target_lang = ?")
+            params.append(target_lang)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT source_text, target_text, source_lang, target_lang, MAX(updated_at), origin
+                FROM segments {where}
+                GROUP BY source_key, source_lang, target_lang
+                ORDER BY source_lang, target_lang, source_key
+                """,
+                params
+            ).fetchall()
+
+        yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+               '<tmx version="1.4">\n'
+               f'<header creationtool="TranslationMemory" creationtoolversion="1.0" datatype="plaintext" '
+               f'segtype="sentence" adminlang="en" srclang={quoteattr(source_lang or "*all*")} o-tmf="sqlite"/>\n'
+               '<body>\n')
+        for source_text, target_text, src, tgt, updated_at, origin in rows:
+            changed = datetime.fromtimestamp(updated_at or 0, timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+            yield (f'<tu changedate="{changed}"><prop type="x-origin">{escape(origin)}</prop>'
+                   f'<tuv xml:lang={quoteattr(src)}><seg>{escape(source_text)}</seg></tuv>'
+                   f'<tuv xml:lang={quoteattr(tgt)}><seg>{escape(target_text)}</seg></tuv></tu>\n')
+        yield '</body>\n</tmx>\n'
+
+    def export_tmx(self, file_path, source_lang=None, target_lang=None):
+        """导出 TMX 文件，返回导出的翻译单元数"""
+        count = 0
+        with open(file_path, 'w', encoding='utf-8') as f:
+            for chunk in self.iter_tmx(source_lang, target_lang):
+                if chunk.startswith('<tu '):
+                    count += 1
+                f.write(chunk)
+        print(f"[INFO] TMX 导出完成: {count} 个翻译单元 -> {file_path}")
+        return count
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _pattern_key(source_key):
+    """原文含数字或占位符时返回模式文本，否则返回 None"""
+    pattern, variables = segment_pattern(source_key)
+    return pattern if variables else None
+
+
+def format_examples(examples):
+    """把相似译文示例整理为提示词片段，没有示例时返回空字符串"""
+    if not examples:
+        return ''
+    lines = ["参考译文（翻译记忆库中的相似句，保持用词和风格一致）："]
+    for example in examples:
+        lines.append(f"原文: {example['source_text']}")
+        lines.append(f"译文: {example['target_text']}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def _base_lang(lang):
+    """语言代码取主语言并小写（zh-CN -> zh）"""
+    if not lang:
+        return None
+    return lang.replace('_', '-').split('-')[0].lower()
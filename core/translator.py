@@ -1,6 +1,5 @@
 import os
 import re
-from docx import Document
 from PyPDF2 import PdfReader
 import markdown
 from langdetect import detect
@@ -8,6 +7,11 @@ import json
 import logging
 from typing import Dict, List, Optional, Tuple, Any
 
+from core.term_matcher import find_source_terms
+from core.translation_memory import term_fingerprint
+from core.segment_pipeline import SegmentPipeline, number_segments, parse_numbered
+from core.docx_translation_job import DocxTranslationJob
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -26,6 +30,9 @@ class Translator:
         
         # 确保模型可用于翻译
         self.model = ai_engine
+
+        # 翻译记忆库（由外部设置），翻译前先查询，成功翻译后写入
+        self.translation_memory = None
         
         # 记录术语库加载状态
         print(f"术语库初始化状态：已加载 {len(self.terms)} 个术语")
@@ -58,7 +65,7 @@ class Translator:
             logger.error(f"加载术语库出错: {e}")
             return {}
     
-    def translate(self, text: str, use_termbase: bool = True, source_lang: Optional[str] = None, target_lang: str = "en", force_terms: bool = False, matched_terms: List = None) -> str:
+    def translate(self, text: str, use_termbase: bool = True, source_lang: Optional[str] = None, target_lang: str = "en", force_terms: bool = False, matched_terms: List = None, use_memory: bool = True, examples: List = None) -> str:
         """
         翻译文本
         
@@ -69,6 +76,8 @@ class Translator:
             target_lang: 目标语言代码
             force_terms: 是否强制使用匹配到的术语
             matched_terms: 匹配到的术语列表，如果提供则直接使用
+            use_memory: 是否查询和写入翻译记忆库（调用方已自行查询时关闭）
+            examples: 翻译记忆库中的相似译文示例，放入提示词
             
         Returns:
             翻译后的文本
@@ -109,13 +118,38 @@ class Translator:
                 # 使用专用的强制术语翻译函数
                 return self._translate_with_force_terms(text, matched_terms, source_lang, target_lang)
             
+            # 长文本分句翻译：逐句查翻译记忆库，只把未命中的句子分批交给模型
+            if self._should_segment(text):
+                translated_text = text
+                for event in self.iter_translate_segments(text, use_termbase, source_lang, target_lang, use_memory):
+                    if event['event'] == 'done':
+                        translated_text = event['text']
+                        logger.info(f"分句翻译完成: {event['stats']}")
+                return translated_text
+
+            # 先查翻译记忆库：精确命中或只有数字/占位符不同时直接返回，否则取相似译文作为示例
+            memory_key = self._get_memory_key(text, use_termbase, source_lang, target_lang) if use_memory else None
+            if memory_key:
+                cached, similar = self.translation_memory.match(text, *memory_key)
+                if cached:
+                    logger.info(f"翻译记忆库命中 ({cached['match']}, {cached['origin']})")
+                    return cached['target_text']
+                examples = examples or similar
+
             # 调用AI引擎的翻译方法
+            extra = {'examples': examples} if examples else {}
+            if examples:
+                logger.info(f"使用 {len(examples)} 条翻译记忆库相似译文作为示例")
             translated_text = self.ai_engine.translate_text(
                 text=text,
                 use_termbase=use_termbase,
                 source_lang=source_lang,
-                target_lang=target_lang
+                target_lang=target_lang,
+                **extra
             )
+
+            if memory_key and self._is_valid_translation(text, translated_text):
+                self.translation_memory.store(text, translated_text, *memory_key)
             
             logger.info(f"翻译完成 (长度: {len(translated_text)}字符)")
             logger.info(f"译文预览: {translated_text[:50]}..." if len(translated_text) > 50 else f"译文: {translated_text}")
@@ -128,6 +162,85 @@ class Translator:
             logger.error(traceback.format_exc())
             return f"翻译出错: {str(e)}"
     
+    def _get_memory_key(self, text, use_termbase, source_lang, target_lang):
+        """翻译记忆库的查询参数 (源语言, 目标语言, 术语指纹, 模型标识)，未启用时返回 None"""
+        if self.translation_memory is None:
+            return None
+        if hasattr(self.settings, 'get') and not self.settings.get('tm_enabled', True):
+            return None
+
+        matched_terms = None
+        if use_termbase:
+            terms = getattr(self.term_loader, 'terms', None) or self.terms
+            matched_terms = find_source_terms(text, terms, version=getattr(self.term_loader, 'version', None))
+
+        model_name = self.settings.get('model_name', '') if hasattr(self.settings, 'get') else ''
+        model_path = getattr(self.ai_engine, 'model_path', None) or (
+            self.settings.get('model_path', '') if hasattr(self.settings, 'get') else '')
+        return source_lang or 'auto', target_lang, term_fingerprint(matched_terms), f"{model_name}|{model_path}"
+
+    @staticmethod
+    def _is_valid_translation(text, translation):
+        """译文是否可写入翻译记忆库（非空、不是错误信息、不是原文）"""
+        if not translation or not translation.strip():
+            return False
+        if translation.startswith(("翻译出错", "生成翻译时出错", "错误：")) or translation.strip() == text.strip():
+            return False
+        return True
+
+    def _should_segment(self, text):
+        """文本是否需要分句翻译"""
+        if not hasattr(self.settings, 'get') or not self.settings.get('segment_translation_enabled', True):
+            return False
+        return len(text) >= self.settings.get('segment_min_chars', 200)
+
+    def iter_translate_segments(self, text, use_termbase=True, source_lang=None, target_lang="en", use_memory=True):
+        """
+        分句翻译长文本，逐句生成进度事件
+
+        Returns:
+            generator: SegmentPipeline.run 的事件（start / segment / done）
+        """
+        pipeline = self.create_segment_pipeline(use_termbase, source_lang, target_lang, use_memory)
+        return pipeline.run(text, target_lang)
+
+    def create_segment_pipeline(self, use_termbase=True, source_lang=None, target_lang="en", use_memory=True):
+        """创建使用本翻译器批量翻译、并查询翻译记忆库的分句翻译流水线"""
+        return SegmentPipeline(
+            lambda texts, examples: self._translate_segment_batch(texts, examples, use_termbase,
+                                                                  source_lang, target_lang),
+            translation_memory=self.translation_memory if use_memory else None,
+            memory_key=lambda segment: self._get_memory_key(segment, use_termbase, source_lang, target_lang),
+            batch_chars=self.settings.get('segment_batch_chars', 800),
+            batch_size=self.settings.get('segment_batch_size', 8),
+            workers=self.settings.get('segment_workers', 1)
+        )
+
+    def _translate_segment_batch(self, texts, examples, use_termbase, source_lang, target_lang):
+        """翻译一批句子：多句时带编号一次翻译，编号对不上时逐句重新翻译"""
+        extra = {'examples': examples} if examples else {}
+
+        def call(text):
+            try:
+                translation = self.ai_engine.translate_text(
+                    text=text,
+                    use_termbase=use_termbase,
+                    source_lang=source_lang,
+                    target_lang=target_lang,
+                    **extra
+                )
+            except Exception as e:
+                logger.error(f"分句翻译出错: {e}")
+                return None
+            return translation if self._is_valid_translation(text, translation) else None
+
+        if len(texts) > 1:
+            results = parse_numbered(call(number_segments(texts)), len(texts))
+            if results is not None:
+                return results
+            logger.warning(f"批量译文编号不完整，逐句重新翻译 {len(texts)} 句")
+        return [call(text) for text in texts]
+
     def _retry_translation(self, text, source_lang, target_lang, matched_terms=None):
         """重新尝试翻译，强调目标语言和术语使用"""
         try:
@@ -548,46 +661,27 @@ class Translator:
             
         return blocks
     
-    def translate_docx_file(self, file_path, use_termbase, target_lang):
-        """翻译Word文档"""
-        doc = Document(file_path)
-        
-        # 创建新文档
-        new_doc = Document()
-        
-        # 翻译段落
-        for para in doc.paragraphs:
-            if para.text.strip():
-                translated = self.translate(
-                    para.text, 
-                    use_termbase, 
-                    target_lang=target_lang
-                )
-                new_doc.add_paragraph(translated)
-            else:
-                new_doc.add_paragraph()
-        
-        # 翻译表格
-        for table in doc.tables:
-            new_table = new_doc.add_table(rows=len(table.rows), cols=len(table.columns))
-            
-            for i, row in enumerate(table.rows):
-                for j, cell in enumerate(row.cells):
-                    if cell.text.strip():
-                        translated = self.translate(
-                            cell.text, 
-                            use_termbase, 
-                            target_lang=target_lang
-                        )
-                        new_table.cell(i, j).text = translated
-        
+    def translate_docx_file(self, file_path, use_termbase, target_lang, source_lang=None, output_path=None,
+                            progress_callback=None):
+        """
+        翻译Word文档
+
+        相同句子只翻译一次，译文写回原文档保留格式；中断后再次调用会从检查点继续。
+
+        Returns:
+            译文文档路径
+        """
         # 获取输出文件路径
-        output_path = os.path.splitext(file_path)[0] + f"_{target_lang}.docx"
-        
-        # 保存翻译后的文档
-        new_doc.save(output_path)
-        
-        return output_path
+        output_path = output_path or os.path.splitext(file_path)[0] + f"_{target_lang}.docx"
+
+        job = DocxTranslationJob(
+            file_path,
+            output_path,
+            self.create_segment_pipeline(use_termbase, source_lang, target_lang),
+            target_lang=target_lang,
+            progress_callback=progress_callback
+        )
+        return job.run()
     
     def translate_pdf_file(self, file_path, use_termbase, target_lang):
         """翻译PDF文件"""
@@ -828,32 +922,12 @@ English Translation:
         elif target_lang and target_lang.lower() in ['en-us', 'en-gb', 'english', '英文']:
             target_lang = 'en'
         
-        matched_terms = []
-        
-        # 排序术语列表，优先匹配长术语（避免子字符串问题）
-        sorted_term_items = sorted(
-            [(k, v) for k, v in terms.items()],
-            key=lambda x: len(x[0]),
-            reverse=True
-        )
-        
-        for term_key, term_info in sorted_term_items:
-            # 获取源术语和目标术语
-            source_term = term_info.get('source_term', term_key)
-            target_term = term_info.get('target_term', '')
-            
-            # 跳过无效术语
-            if not source_term or not target_term:
-                continue
-            
-            # 简化匹配逻辑：如果源术语在文本中，则认为匹配成功
-            if source_term in text:
-                logger.info(f"匹配到术语: '{source_term}' => '{target_term}'")
-                matched_terms.append({
-                    'source': source_term,
-                    'target': target_term,
-                    'definition': term_info.get('definition', '')
-                })
+        # 使用按术语库版本缓存的 Aho–Corasick 自动机，一次扫描找出最左最长的术语匹配
+        term_owner = getattr(self, 'term_loader', None)
+        version = getattr(term_owner, 'version', None) if getattr(term_owner, 'terms', None) is terms else None
+        matched_terms = find_source_terms(text, terms, version=version)
+        for term in matched_terms:
+            logger.info(f"匹配到术语: '{term['source']}' => '{term['target']}'")
         
         logger.info(f"术语匹配完成，共匹配到 {len(matched_terms)} 个术语")
         return matched_terms 
@@ -0,0 +1,256 @@
+"""
+向量补建任务
+
+为缺少向量的知识条目/术语批量生成向量：
+- 变更时把条目标记为"待补建"，不必每次全量遍历
+- 按批编码，每批完成后保存数据并写检查点，中途崩溃或重启后从检查点继续
+- 在后台线程运行并提供进度，查询路径上不会触发补建
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+
+
+class VectorBackfillJob:
+    """可断点续跑的后台向量补建任务"""
+
+    def __init__(self, name, checkpoint_path, list_keys, load_text, store_vectors,
+                 encode_texts, save, is_ready=None, batch_size=32):
+        """
+        Args:
+            name (str): 任务名称，用于日志
+            checkpoint_path (str): 检查点文件路径
+            list_keys: 返回全部条目键的函数，首次运行时用于全量扫描
+            load_text: load_text(key) -> 需要编码的文本；条目已有向量或已删除时返回None
+            store_vectors: store_vectors([(key, text, vector)]) -> 成功写入的条目键列表
+            encode_texts: encode_texts([text]) -> 与输入等长的向量列表，失败项为None
+            save: 保存向量库和条目数据的函数，每批完成后调用
+            is_ready: 返回向量模型是否就绪的函数
+            batch_size (int): 每批编码的条目数
+        """
+        self.name = name
+        self.checkpoint_path = checkpoint_path
+        self.list_keys = list_keys
+        self.load_text = load_text
+        self.store_vectors = store_vectors
+        self.encode_texts = encode_texts
+        self.save = save
+        self.is_ready = is_ready or (lambda: True)
+        self.batch_size = max(1, int(batch_size))
+
+        self._lock = threading.RLock()
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._changed = False
+
+        self.dirty = set()
+        self.failed = set()
+        self.seeded = False
+        self.progress = {
+            'running': False,
+            'total': 0,
+            'processed': 0,
+            'vectorized': 0,
+            'failed': 0,
+            'started_at': None,
+            'finished_at': None,
+            'last_checkpoint': None,
+            'error': None
+        }
+
+        self._load_checkpoint()
+
+    # ---------- 检查点 ----------
+
+    def _load_checkpoint(self):
+        """加载检查点，恢复上次未完成的待补建集合"""
+        if not os.path.exists(self.checkpoint_path):
+            return
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.dirty = set(data.get('dirty', []))
+            self.failed = set(data.get('failed', []))
+            self.seeded = bool(data.get('seeded', False))
+            if self.dirty:
+                print(f"[INFO] {self.name}向量补建检查点: 剩余 {len(self.dirty)} 个待处理条目")
+        except Exception as e:
+            print(f"[WARNING] 加载{self.name}向量补建检查点失败，将重新扫描: {e}")
+            self.dirty, self.failed, self.seeded = set(), set(), False
+
+    def save_checkpoint(self):
+        """写入检查点（临时文件替换，避免写到一半损坏）"""
+        with self._lock:
+            data = {
+                'dirty': sorted(self.dirty),
+                'failed': sorted(self.failed),
+                'seeded': self.seeded,
+                'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+            self._changed = False
+        try:
+            os.makedirs(os.path.dirname(self.checkpoint_path) or '.', exist_ok=True)
+            temp_path = self.checkpoint_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.checkpoint_path)
+            self.progress['last_checkpoint'] = data['updated_at']
+            return True
+        except Exception as e:
+            print(f"[ERROR] 保存{self.name}向量补建检查点失败: {e}")
+            return False
+
+    def flush(self):
+        """待补建集合有变化时写入检查点，由数据保存时调用"""
+        if self._changed:
+            self.save_checkpoint()
+
+    # ---------- 待补建集合维护 ----------
+
+    def mark_dirty(self, key):
+        """标记条目需要生成向量"""
+        with self._lock:
+            self.dirty.add(key)
+            self.failed.discard(key)
+            self._changed = True
+
+    def discard(self, key):
+        """条目已删除或已有向量时移出待补建集合"""
+        with self._lock:
+            if key in self.dirty or key in self.failed:
+                self.dirty.discard(key)
+                self.failed.discard(key)
+                self._changed = True
+
+    def rescan(self):
+        """全量扫描一次，把所有缺少向量的条目加入待补建集合"""
+        keys = [key for key in self.list_keys() if self.load_text(key)]
+        with self._lock:
+            self.dirty.update(keys)
+            self.failed.clear()
+            self.seeded = True
+            self._changed = True
+        print(f"[INFO] {self.name}向量补建扫描完成: {len(keys)} 个条目缺少向量")
+        return len(keys)
+
+    # ---------- 执行 ----------
+
+    def _next_batch(self):
+        with self._lock:
+            batch = []
+            for key in self.dirty:
+                batch.append(key)
+                if len(batch) >= self.batch_size:
+                    break
+            return batch
+
+    def run(self):
+        """同步执行补建，直到待补建集合为空或被停止"""
+        if not self.is_ready():
+            print(f"[WARNING] 向量模型未就绪，{self.name}向量补建推迟")
+            return False
+
+        if not self.seeded:
+            self.rescan()
+            self.save_checkpoint()
+
+        progress = self.progress
+        progress.update({
+            'running': True,
+            'total': len(self.dirty),
+            'processed': 0,
+            'vectorized': 0,
+            'failed': 0,
+            'started_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'finished_at': None,
+            'error': None
+        })
+        print(f"[INFO] 开始{self.name}向量补建，共 {progress['total']} 个条目")
+
+        try:
+            while not self._stop_event.is_set():
+                batch = self._next_batch()
+                if not batch:
+                    break
+
+                # 已有向量或已删除的条目直接移出
+                pending = []
+                for key in batch:
+                    text = self.load_text(key)
+                    if text:
+                        pending.append((key, text))
+                    else:
+                        self.discard(key)
+
+                stored = []
+                if pending:
+                    vectors = self.encode_texts([text for _, text in pending])
+                    encoded = [(key, text, vector) for (key, text), vector in zip(pending, vectors)
+                               if vector is not None]
+                    if encoded:
+                        stored = self.store_vectors(encoded) or []
+
+                    # 先保存数据，再更新检查点，保证检查点不会领先于已落盘的数据
+                    if self.save() is False:
+                        raise RuntimeError("保存数据失败，保留检查点以便下次继续")
+
+                stored_set = set(stored)
+                with self._lock:
+                    for key, _ in pending:
+                        self.dirty.discard(key)
+                        if key not in stored_set:
+                            self.failed.add(key)
+                    self._changed = True
+                self.save_checkpoint()
+
+                progress['processed'] += len(batch)
+                progress['vectorized'] += len(stored_set)
+                progress['failed'] += len(pending) - len(stored_set)
+                print(f"[INFO] {self.name}向量补建进度: {progress['processed']}/{progress['total']}")
+        except Exception as e:
+            progress['error'] = str(e)
+            print(f"[ERROR] {self.name}向量补建失败: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+        finally:
+            progress['running'] = False
+            progress['finished_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        print(f"[INFO] {self.name}向量补建完成: 生成 {progress['vectorized']} 个，失败 {progress['failed']} 个")
+        return True
+
+    def start(self):
+        """在后台线程启动补建，已在运行时不重复启动"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self.run, name=f"{self.name}-vector-backfill", daemon=True)
+            self._thread.start()
+        return True
+
+    def stop(self, timeout=None):
+        """请求停止后台补建，当前批次完成后退出"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wait(self, timeout=None):
+        """等待后台补建结束"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_progress(self):
+        """获取补建进度"""
+        with self._lock:
+            progress = dict(self.progress)
+            progress['pending'] = len(self.dirty)
+            progress['failed_items'] = len(self.failed)
+        progress['running'] = self.is_running() or progress['running']
+        return progress
@@ -5,6 +5,9 @@ from datetime import datetime
 import time
 import traceback
 import json
+import threading
+
+from core.hot_reload import note_local_write
 
 class VectorDB:
     """向量数据库类，用于存储和检索文本的向量表示"""
@@ -36,6 +39,9 @@ class VectorDB:
         # 初始化向量模型
         self.model = model
 
+        # 写入锁，后台向量补建与前台增删可能并发
+        self._write_lock = threading.RLock()
+
         # 初始化数据结构
         self.collections = {}  # 集合字典
         self.default_collection = 'default'  # 默认集合名
@@ -84,21 +90,22 @@ class VectorDB:
         if metadata is None:
             metadata = {}
 
-        # 生成ID
-        vector_id = f"v_{collection_name}_{len(self.collections[collection_name]['vectors'])}_{int(time.time())}"
-        metadata['id'] = vector_id
-
-        # 添加到集合
-        self.collections[collection_name]['vectors'].append(vector)
-        self.collections[collection_name]['texts'].append(text)
-        self.collections[collection_name]['metadata'].append(metadata)
-
-        # 兼容旧版本 - 也添加到self.vectors
-        self.vectors[vector_id] = {
-            'text': text,
-            'vector': vector,
-            'metadata': metadata
-        }
+        with self._write_lock:
+            # 生成ID
+            vector_id = f"v_{collection_name}_{len(self.collections[collection_name]['vectors'])}_{int(time.time())}"
+            metadata['id'] = vector_id
+
+            # 添加到集合
+            self.collections[collection_name]['vectors'].append(vector)
+            self.collections[collection_name]['texts'].append(text)
+            self.collections[collection_name]['metadata'].append(metadata)
+
+            # 兼容旧版本 - 也添加到self.vectors
+            self.vectors[vector_id] = {
+                'text': text,
+                'vector': vector,
+                'metadata': metadata
+            }
 
         return vector_id
 
@@ -292,6 +299,7 @@ class VectorDB:
 
             with open(vector_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+            note_local_write(vector_file)
 
             print(f"向量数据已保存到: {vector_file}")
             return True
@@ -376,6 +384,59 @@ class VectorDB:
             traceback.print_exc()
             return False
 
+    def _read_vector_file(self):
+        """
+        读取向量文件，不修改内存数据
+
+        Returns:
+            tuple: (collections, vectors)
+        """
+        vector_file = os.path.join(self.vector_path, 'vectors.json')
+        with open(vector_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"向量数据格式不是字典: {type(data)}")
+
+        collections = data.get('collections') or {}
+        vectors = data.get('vectors') or {}
+        if not vectors:
+            # 与 load 相同：只有集合数据时从集合生成向量项目
+            for coll_name, coll_data in collections.items():
+                if isinstance(coll_data, dict) and 'vectors' in coll_data and 'texts' in coll_data:
+                    metadata = coll_data.get('metadata', [])
+                    for i, (vector, text) in enumerate(zip(coll_data['vectors'], coll_data['texts'])):
+                        item_metadata = metadata[i] if i < len(metadata) and metadata[i] else {}
+                        vector_id = item_metadata.get('id') or f"v_{coll_name}_{i}_{int(time.time())}"
+                        vectors[vector_id] = {
+                            'vector': vector,
+                            'text': text,
+                            'metadata': item_metadata
+                        }
+        return collections, vectors
+
+    def _install_vector_data(self, collections, vectors):
+        """替换内存中的集合和向量（调用方持有写入锁）"""
+        if self.default_collection not in collections:
+            collections[self.default_collection] = {
+                'vectors': [],
+                'texts': [],
+                'metadata': []
+            }
+        self.collections = collections
+        self.vectors = vectors
+
+    def reload(self):
+        """向量文件被外部修改后重新加载：先完整解析，再整体替换内存数据"""
+        try:
+            collections, vectors = self._read_vector_file()
+        except Exception as e:
+            print(f"[ERROR] 重新加载向量数据失败，继续使用当前数据: {e}")
+            return False
+        with self._write_lock:
+            self._install_vector_data(collections, vectors)
+        print(f"[INFO] 向量数据已重新加载，包含 {len(vectors)} 个向量项目")
+        return True
+
     def _reset_data_structures(self):
         """重置数据结构"""
         print("重置向量数据库...")
@@ -716,6 +777,42 @@ class VectorDB:
             traceback.print_exc()
             return None
 
+    def encode_texts(self, texts, batch_size=32):
+        """批量编码文本为向量，返回与输入等长的向量列表（失败项为None）"""
+        texts = [t if isinstance(t, str) else str(t) for t in texts]
+        if not texts:
+            return []
+        if len(texts) == 1:
+            return [self.encode_text(texts[0])]
+
+        if not self.check_model_ready():
+            print("错误: 向量模型未就绪，无法进行批量编码")
+            return [None] * len(texts)
+
+        try:
+            if getattr(self, 'model_type', None) == "bge-m3":
+                output = self.model.encode(
+                    texts,
+                    batch_size=batch_size,
+                    return_dense=True,
+                    return_sparse=False,
+                    return_colbert_vecs=False
+                )
+                vectors = output['dense'] if isinstance(output, dict) and 'dense' in output else output
+            elif getattr(self, 'model_type', None) == "sentence-transformer":
+                vectors = self.model.encode(texts, batch_size=batch_size)
+            else:
+                vectors = self.model.encode(texts)
+
+            vectors = [np.asarray(v, dtype=np.float32) for v in vectors]
+            if len(vectors) == len(texts):
+                return vectors
+            print(f"警告: 批量编码返回数量不符 ({len(vectors)} != {len(texts)})，改为逐条编码")
+        except Exception as e:
+            print(f"批量编码失败，改为逐条编码: {e}")
+
+        return [self.encode_text(text) for text in texts]
+
     def compute_similarity(self, vec1, vec2):
         """兼容性方法 - 调用cosine_similarity"""
         return self._cosine_similarity(vec1, vec2)
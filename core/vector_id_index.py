@@ -0,0 +1,78 @@
+"""
+向量ID→术语反向索引
+
+向量检索返回的是向量ID，原本需要遍历全部术语比对 vector_id 才能找到对应术语。
+本模块常驻维护 vector_id → 术语键 的映射，随 TermBase 的变更通知增量更新，
+检索结果的解析代价与返回条数成正比。
+"""
+
+from core.reverse_term_index import IncrementalTermIndex
+
+
+class VectorIdIndex(IncrementalTermIndex):
+    """向量ID到术语键的映射"""
+
+    def __init__(self):
+        super().__init__(None, None)
+        self._reset()
+
+    def __len__(self):
+        return len(self._by_vector)
+
+    def _reset(self):
+        # 向量ID -> 术语键
+        self._by_vector = {}
+        # 术语键 -> 向量ID，用于增量删除
+        self._by_term = {}
+
+    def _add(self, term, term_data):
+        vector_id = term_data.get('vector_id') if isinstance(term_data, dict) else None
+        if vector_id:
+            self._by_vector[vector_id] = term
+            self._by_term[term] = vector_id
+
+    def _remove(self, term):
+        vector_id = self._by_term.pop(term, None)
+        if vector_id is not None and self._by_vector.get(vector_id) == term:
+            del self._by_vector[vector_id]
+
+    def set_vector_id(self, term, vector_id):
+        """术语生成向量后直接登记（不改变术语库版本号）"""
+        with self._lock:
+            if self.term_version is None:
+                # 尚未建立索引，下次查询时整体重建
+                return
+            self._remove(term)
+            if vector_id:
+                self._by_vector[vector_id] = term
+                self._by_term[term] = vector_id
+
+    def get_term(self, vector_id):
+        """按向量ID查找术语键"""
+        with self._lock:
+            return self._by_vector.get(vector_id)
+
+    def resolve(self, vector_ids, terms):
+        """
+        把向量ID列表解析为术语键列表
+
+        Args:
+            vector_ids: 向量ID的可迭代对象（按相似度排序）
+            terms (dict): 当前术语字典，用于校验映射是否仍然有效
+
+        Returns:
+            list: 去重后的术语键，保持输入顺序；找不到或已失效的向量ID被跳过
+        """
+        keys = []
+        seen = set()
+        with self._lock:
+            for vector_id in vector_ids:
+                term = self._by_vector.get(vector_id)
+                if term is None or term in seen:
+                    continue
+                term_data = terms.get(term)
+                if not isinstance(term_data, dict) or term_data.get('vector_id') != vector_id:
+                    continue
+                seen.add(term)
+                keys.append(term)
+        return keys
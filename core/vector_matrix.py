@@ -0,0 +1,162 @@
+"""
+连续存储的归一化向量矩阵
+
+逐个向量构造数组再计算余弦相似度的检索方式，每次查询都要对全部向量做 Python 循环。
+本模块把向量按行存入一块连续的 float32 矩阵（预先 L2 归一化），并维护 ID↔行号映射：
+- 检索为一次矩阵乘法加 argpartition 取前 k 个
+- 追加按容量倍增扩展，均摊 O(维度)
+- 删除只把行置零并标记为空位，空位过多时压缩
+"""
+
+import threading
+
+import numpy as np
+
+# 空位超过行数的该比例时压缩矩阵
+COMPACT_RATIO = 0.5
+# 初始容量（行）
+INITIAL_CAPACITY = 64
+
+
+def normalize_vector(vector):
+    """转换为 float32 一维数组并做 L2 归一化，零向量或无法转换时返回 None"""
+    try:
+        array = np.asarray(vector, dtype=np.float32).reshape(-1)
+    except (TypeError, ValueError):
+        return None
+    norm = float(np.linalg.norm(array))
+    if array.size == 0 or norm == 0.0 or not np.isfinite(norm):
+        return None
+    return array / norm
+
+
+class VectorMatrix:
+    """按行存储归一化向量的矩阵索引"""
+
+    def __init__(self, dimension=None):
+        self._lock = threading.RLock()
+        # 向量维度，由第一个加入的向量确定
+        self.dimension = dimension
+        self._matrix = None
+        # 已使用的行数（含空位）
+        self._size = 0
+        # 行号 -> 向量ID，空位为 None
+        self._row_ids = []
+        # 向量ID -> 行号
+        self._id_to_row = {}
+
+    def __len__(self):
+        return len(self._id_to_row)
+
+    def __contains__(self, vector_id):
+        return vector_id in self._id_to_row
+
+    def clear(self):
+        """清空全部向量（保留维度）"""
+        with self._lock:
+            self._matrix = None
+            self._size = 0
+            self._row_ids = []
+            self._id_to_row = {}
+
+    def add(self, vector_id, vector):
+        """
+        添加或替换向量
+
+        Returns:
+            bool: 是否成功（零向量或维度不一致时返回 False）
+        """
+        normalized = normalize_vector(vector)
+        if normalized is None:
+            return False
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = normalized.shape[0]
+            if normalized.shape[0] != self.dimension:
+                print(f"[WARNING] 向量维度不匹配，跳过: {normalized.shape[0]} vs {self.dimension}")
+                return False
+
+            row = self._id_to_row.get(vector_id)
+            if row is None:
+                self._reserve(self._size + 1)
+                row = self._size
+                self._size += 1
+                self._row_ids.append(vector_id)
+                self._id_to_row[vector_id] = row
+            self._matrix[row] = normalized
+            return True
+
+    def remove(self, vector_id):
+        """删除向量，返回是否存在"""
+        with self._lock:
+            row = self._id_to_row.pop(vector_id, None)
+            if row is None:
+                return False
+            self._matrix[row] = 0.0
+            self._row_ids[row] = None
+            if self._size - len(self._id_to_row) > self._size * COMPACT_RATIO:
+                self._compact()
+            return True
+
+    def _reserve(self, rows):
+        """确保容量至少为 rows 行，按倍增扩展"""
+        capacity = 0 if self._matrix is None else self._matrix.shape[0]
+        if rows <= capacity:
+            return
+        new_capacity = max(INITIAL_CAPACITY, capacity * 2, rows)
+        matrix = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+        if self._size:
+            matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+
+    def _compact(self):
+        """移除空位，行号重新连续编号"""
+        alive = [row for row, vector_id in enumerate(self._row_ids) if vector_id is not None]
+        self._matrix = self._matrix[alive] if alive else None
+        self._row_ids = [self._row_ids[row] for row in alive]
+        self._id_to_row = {vector_id: row for row, vector_id in enumerate(self._row_ids)}
+        self._size = len(self._row_ids)
+
+    def search(self, query_vector, top_k=15, min_similarity=None):
+        """
+        按余弦相似度检索
+
+        Args:
+            query_vector: 查询向量
+            top_k (int): 最多返回条数
+            min_similarity (float): 相似度下限，None 表示不限
+
+        Returns:
+            list: [(向量ID, 相似度)]，按相似度从高到低排序
+        """
+        query = normalize_vector(query_vector)
+        if query is None or top_k <= 0:
+            return []
+        with self._lock:
+            if not self._id_to_row:
+                return []
+            if query.shape[0] != self.dimension:
+                print(f"[WARNING] 查询向量维度不匹配: {query.shape[0]} vs {self.dimension}")
+                return []
+
+            scores = self._matrix[:self._size] @ query
+            # 空位的得分为 0，可能占据前 k 名，多取空位数量的候选
+            count = min(self._size, top_k + self._size - len(self._id_to_row))
+            if count < self._size:
+                candidates = np.argpartition(-scores, count - 1)[:count]
+            else:
+                candidates = np.arange(self._size)
+            candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+            results = []
+            for row in candidates:
+                vector_id = self._row_ids[row]
+                if vector_id is None:
+                    continue
+                score = float(scores[row])
+                if min_similarity is not None and score < min_similarity:
+                    break
+                results.append((vector_id, score))
+                if len(results) >= top_k:
+                    break
+            return results
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试知识库问答语义答案缓存
+"""
+
+import time
+
+from core.answer_cache import SemanticAnswerCache
+
+
+def test_hit_and_threshold_miss():
+    """测试相似问题命中、低于阈值不命中"""
+    print("测试语义答案缓存")
+    print("=" * 40)
+
+    cache = SemanticAnswerCache(threshold=0.95, max_entries=10)
+    entry_id = cache.store('引晶功率是多少', [1.0, 0.0, 0.0], '约 35 kW', 1, 'qwen')
+    assert entry_id == 1
+
+    hit = cache.lookup([0.99, 0.05, 0.0], 1, 'qwen')
+    assert hit['answer'] == '约 35 kW' and hit['question'] == '引晶功率是多少'
+    assert hit['similarity'] >= 0.95 and hit['hits'] == 1
+    print("✓ 语义相近的问题命中缓存")
+
+    assert cache.lookup([0.8, 0.6, 0.0], 1, 'qwen') is None
+    assert cache.lookup([0.0, 0.0, 1.0], 1, 'qwen') is None
+    assert cache.lookup([1.0, 0.0], 1, 'qwen') is None
+    stats = cache.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 3 and stats['hit_rate'] == 0.25
+    print("✓ 相似度低于阈值或维度不同时不命中")
+
+
+def test_generation_and_model_invalidation():
+    """测试知识库版本或模型变化后不命中，旧版本条目在写入时清理"""
+    cache = SemanticAnswerCache(threshold=0.9)
+    cache.store('放肩的拉速', [0.0, 1.0], '1.2 mm/min', 3, 'qwen')
+
+    assert cache.lookup([0.0, 1.0], 4, 'qwen') is None
+    assert cache.lookup([0.0, 1.0], 3, 'ollama|llama3') is None
+    assert cache.lookup([0.0, 1.0], 3, 'qwen')['answer'] == '1.2 mm/min'
+
+    cache.store('引晶功率', [1.0, 0.0], '35 kW', 4, 'qwen')
+    assert cache.get_stats()['size'] == 1 and cache.evictions == 1
+    assert cache.lookup([0.0, 1.0], 3, 'qwen') is None
+    print("✓ 知识库版本和模型变化后缓存失效")
+
+
+def test_lru_eviction():
+    """测试超出容量时淘汰最久未命中的条目"""
+    cache = SemanticAnswerCache(threshold=0.99, max_entries=2)
+    first = cache.store('问题一', [1.0, 0.0, 0.0], '答案一', 1, 'qwen')
+    second = cache.store('问题二', [0.0, 1.0, 0.0], '答案二', 1, 'qwen')
+
+    # 命中第一条后，第二条成为最久未命中的条目
+    time.sleep(0.02)
+    assert cache.lookup([1.0, 0.0, 0.0], 1, 'qwen')['id'] == first
+    cache.store('问题三', [0.0, 0.0, 1.0], '答案三', 1, 'qwen')
+    assert cache.get_stats()['size'] == 2 and cache.evictions == 1
+    assert cache.lookup([0.0, 1.0, 0.0], 1, 'qwen') is None
+    assert cache.lookup([1.0, 0.0, 0.0], 1, 'qwen')['answer'] == '答案一'
+    assert not cache.remove(second)
+
+    assert cache.remove(first) and cache.get_stats()['size'] == 1
+    cache.clear()
+    assert cache.get_stats()['size'] == 0 and cache.list_entries() == []
+    print("✓ 超出容量时淘汰最久未命中的条目")
+
+
+def test_empty_inputs():
+    """测试空向量和空答案不写入"""
+    cache = SemanticAnswerCache()
+    assert cache.store('问题', None, '答案', 1, 'qwen') is None
+    assert cache.store('问题', [1.0], '', 1, 'qwen') is None
+    assert cache.lookup(None, 1, 'qwen') is None
+    print("✓ 空向量和空答案不写入")
+
+
+if __name__ == "__main__":
+    test_hit_and_threshold_miss()
+    test_generation_and_model_invalidation()
+    test_lru_eviction()
+    test_empty_inputs()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试知识上下文抽取式压缩
+"""
+
+from core.context_compressor import ExtractiveCompressor
+
+# 简易词表，按是否包含关键字生成向量（末位为常数，避免零向量）
+VOCAB = ['拉速', '温度', '功率', '氩气']
+
+
+class FakeVectorDB:
+    """按关键字生成向量的向量数据库，记录编码次数"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode_texts(self, texts):
+        self.calls += 1
+        return [[float(word in text) for word in VOCAB] + [0.1] for text in texts]
+
+
+PROCESS = '装料完成。抽真空。加热熔化。放肩阶段降低拉速。等径生长。收尾冷却。'
+OTHERS = '检查炉盖。检查观察窗。记录批号。清理石墨件。更换过滤器。'
+SHORT = '单晶炉需要定期检查。记录运行时间。'
+
+
+def test_select_relevant_sentences_with_neighbours():
+    """测试只保留与问题最相关的句子及其相邻句，并保持原文顺序"""
+    print("测试上下文压缩")
+    print("=" * 40)
+
+    vector_db = FakeVectorDB()
+    compressor = ExtractiveCompressor(vector_db, top_sentences=1, neighbours=1, min_sentences=4)
+    chunks = [
+        {'text': OTHERS, 'score': 0.9, 'compressible': True},
+        {'text': PROCESS, 'score': 0.8, 'compressible': True},
+    ]
+    compressed, report = compressor.compress('拉速怎么控制', chunks)
+
+    # 最相关句和前后各一句按原顺序保留，不相关的片段整段去掉
+    assert [c['text'] for c in compressed] == ['加热熔化。放肩阶段降低拉速。等径生长。']
+    assert compressed[0]['score'] == 0.8
+    assert report['compressed'] and report['sentences_in'] == 11 and report['sentences_kept'] == 3
+    assert report['chars_out'] < report['chars_in']
+    # 问题与全部句子一次批量编码
+    assert vector_db.calls == 1
+    print(f"✓ 保留相关句及相邻句: {report}")
+
+    # 不保留相邻句
+    compressor.neighbours = 0
+    compressed, _ = compressor.compress('拉速怎么控制', chunks, query_vector=[1.0, 0.0, 0.0, 0.0, 0.1])
+    assert [c['text'] for c in compressed] == ['放肩阶段降低拉速。']
+    print("✓ 使用已计算的问题向量")
+
+
+def test_short_and_qa_chunks_pass_through():
+    """测试句子较少的片段和问答片段不压缩"""
+    vector_db = FakeVectorDB()
+    compressor = ExtractiveCompressor(vector_db, top_sentences=1, neighbours=0, min_sentences=4)
+    qa = {'text': '问题：拉速是多少？\n答案：1.2 mm/min。\n补充：视情况调整。\n备注：无。', 'score': 0.95,
+          'compressible': False}
+    short = {'text': SHORT, 'score': 0.7, 'compressible': True}
+    chunks = [qa, {'text': PROCESS, 'score': 0.8, 'compressible': True}, short]
+
+    compressed, report = compressor.compress('拉速', chunks)
+    assert compressed[0] is qa and compressed[2] is short
+    assert compressed[1]['text'] == '放肩阶段降低拉速。'
+    assert report['sentences_in'] == 6
+    print("✓ 问答片段和短片段原样保留")
+
+    # 可压缩句子总数不超过保留数时不编码
+    compressed, report = ExtractiveCompressor(vector_db, top_sentences=8).compress('拉速', chunks)
+    assert compressed == chunks and not report['compressed'] and vector_db.calls == 1
+    print("✓ 句子较少时不压缩")
+
+
+class FailingVectorDB:
+    def encode_texts(self, texts):
+        return [None] * len(texts)
+
+
+def test_encoding_failure_keeps_original():
+    """测试编码失败时使用原始片段"""
+    chunks = [{'text': PROCESS, 'score': 0.8, 'compressible': True}]
+    compressed, report = ExtractiveCompressor(FailingVectorDB(), top_sentences=1).compress('拉速', chunks)
+    assert compressed == chunks and not report['compressed']
+    print("✓ 编码失败时使用原始片段")
+
+
+if __name__ == "__main__":
+    test_select_relevant_sentences_with_neighbours()
+    test_short_and_qa_chunks_pass_through()
+    test_encoding_failure_keeps_original()
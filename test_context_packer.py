@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试知识上下文打包功能
+"""
+
+from core.text_segmenter import split_sentences
+from core.context_packer import ContextPacker, knowledge_results_to_chunks
+
+
+def test_split_sentences():
+    """测试中英文分句可还原原文"""
+    text = "问题：引晶功率是多少？\n答案：一般为60kW。The pull rate is 2.5 mm/min. Check it!"
+    sentences = split_sentences(text)
+    assert ''.join(sentences) == text
+    assert sentences[0] == "问题：引晶功率是多少？\n"
+    assert "The pull rate is 2.5 mm/min. " in sentences
+    print(f"✓ 分句正常: {sentences}")
+
+
+def test_context_packer_budget():
+    """测试按相关度排序、句子边界截断和去重"""
+    print("测试知识上下文打包")
+    print("=" * 40)
+
+    results = [
+        {'content': '籽晶浸入熔体后稳定十分钟。放肩阶段逐步降低拉速。', 'similarity': 0.62, 'metadata': {}},
+        {'content': '引晶阶段需要控制熔体温度。籽晶浸入熔体后稳定十分钟。', 'similarity': 0.85, 'metadata': {}},
+        {'content': '', 'similarity': 0.5, 'metadata': {'type': 'qa_group', 'question': '引晶功率', 'answer': '60kW'}},
+    ]
+    chunks = knowledge_results_to_chunks(results)
+    assert chunks[2]['text'] == "问题：引晶功率\n答案：60kW"
+
+    packer = ContextPacker(token_budget=1000)
+    packed, report = packer.pack(chunks)
+    # 相关度最高的片段排在最前
+    assert packed[0].startswith('引晶阶段')
+    # 重复句子只保留一次
+    assert ''.join(packed).count('籽晶浸入熔体后稳定十分钟') == 1
+    assert report['duplicates_removed'] == 1
+    print(f"✓ 排序和去重正常: {report}")
+
+    # 预算不足时在句子边界截断
+    small = ContextPacker(token_budget=15)
+    packed, report = small.pack(chunks)
+    assert packed == ['引晶阶段需要控制熔体温度。']
+    assert report['packed_tokens'] <= 15
+    assert report['tokens_saved'] > 0
+    print(f"✓ 预算截断正常: {report}")
+
+
+def test_oversized_first_sentence():
+    """测试首句超出剩余预算时截断该句而不是丢弃整段"""
+    long_chunk = {'text': '引晶阶段需要先将熔体温度稳定在一千四百五十摄氏度左右再缓慢降低籽晶。随后开始放肩。', 'score': 0.9}
+    short_chunk = {'text': '放肩阶段逐步降低拉速。', 'score': 0.3}
+
+    packed, report = ContextPacker(token_budget=10).pack([long_chunk, short_chunk])
+    assert packed == ['引晶阶段需要先将熔体']
+    assert report['packed_tokens'] == 10 and report['chunks_trimmed'] == 1
+
+    # 已有片段时，剩余预算足够才截断后续片段的超长首句
+    packed, report = ContextPacker(token_budget=30).pack([dict(long_chunk, score=0.1), dict(short_chunk, score=0.9)])
+    assert packed[0] == '放肩阶段逐步降低拉速。' and packed[1] == '引晶阶段需要先将熔体温度稳定在一千四'
+    assert report['packed_tokens'] == 30
+    packed, _ = ContextPacker(token_budget=20).pack([dict(long_chunk, score=0.1), dict(short_chunk, score=0.9)])
+    assert packed == ['放肩阶段逐步降低拉速。']
+    print(f"✓ 超长首句按token截断: {report}")
+
+
+if __name__ == "__main__":
+    test_split_sentences()
+    test_context_packer_budget()
+    test_oversized_first_sentence()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试按token长度切分文档功能
+"""
+
+import io
+
+from core.document_chunker import TokenAwareChunker
+from core.text_segmenter import estimate_tokens
+
+
+def test_chunk_token_limit_and_overlap():
+    """测试片段不超过token上限且相邻片段有重叠"""
+    print("测试按token长度切分文档")
+    print("=" * 40)
+
+    paragraphs = [f"第{i}段：引晶阶段需要控制熔体温度。籽晶浸入熔体后稳定十分钟。放肩阶段逐步降低拉速。"
+                  for i in range(20)]
+    text = "\n\n".join(paragraphs)
+
+    chunker = TokenAwareChunker(max_tokens=64, overlap_tokens=16)
+    chunks = list(chunker.iter_chunks(text))
+    assert len(chunks) > 1
+    assert all(estimate_tokens(c) <= 64 for c in chunks)
+    # 相邻片段之间存在重叠内容
+    assert any(chunks[i + 1].split('。')[0] in chunks[i] for i in range(len(chunks) - 1))
+    print(f"✓ 共 {len(chunks)} 个片段，均不超过上限")
+
+    # 文件对象逐行读取与字符串结果一致
+    assert list(chunker.iter_chunks(io.StringIO(text))) == chunks
+    print("✓ 流式读取结果一致")
+
+
+def test_oversized_paragraph():
+    """测试超长段落在句子边界拆分"""
+    text = "拉晶过程需要稳定的热场。" * 40
+    chunks = list(TokenAwareChunker(max_tokens=50, overlap_tokens=0).iter_chunks(text))
+    assert all(estimate_tokens(c) <= 50 for c in chunks)
+    assert all(c.endswith('。') for c in chunks)
+    assert ''.join(chunks) == text
+    print(f"✓ 超长段落拆分为 {len(chunks)} 个片段")
+
+
+if __name__ == "__main__":
+    test_chunk_token_limit_and_overlap()
+    test_oversized_paragraph()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试 Word 文档翻译任务
+"""
+
+import os
+import tempfile
+
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from core.docx_translation_job import DocxTranslationJob
+from core.segment_pipeline import SegmentPipeline
+
+
+class FakeModel:
+    """逐句翻译的简易模型，记录翻译过的句子"""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.translated = []
+
+    def translate_batch(self, texts, examples):
+        self.translated.extend(texts)
+        return [None if text in self.fail else f"EN({text})" for text in texts]
+
+
+def _create_document(path):
+    document = Document()
+    paragraph = document.add_paragraph()
+    paragraph.add_run('引晶开始。').bold = True
+    paragraph.add_run('检查温度。')
+    document.add_paragraph('')
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = '合格'
+    table.cell(0, 1).text = '合格'
+    table.cell(1, 0).merge(table.cell(1, 1)).text = '放肩完成'
+    document.sections[0].header.paragraphs[0].text = '检查温度。'
+    document.save(path)
+
+
+def test_translate_in_place():
+    """测试去重翻译并写回原文档"""
+    print("测试 Word 文档翻译任务")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'manual.docx')
+        output = os.path.join(tmp, 'manual_en.docx')
+        _create_document(source)
+        model = FakeModel()
+
+        progress = []
+        job = DocxTranslationJob(source, output, SegmentPipeline(model.translate_batch), target_lang='en',
+                                 progress_callback=progress.append)
+        assert job.run() == output
+        assert sorted(model.translated) == sorted(['引晶开始。', '检查温度。', '合格', '放肩完成'])
+        print("✓ 重复的句子、表格单元格和合并单元格只翻译一次")
+
+        document = Document(output)
+        paragraph = document.paragraphs[0]
+        assert paragraph.text == 'EN(引晶开始。) EN(检查温度。)'
+        # 每句译文写回原句所在的文本块
+        assert paragraph.runs[0].text == 'EN(引晶开始。)' and paragraph.runs[0].bold
+        assert paragraph.runs[1].text == ' EN(检查温度。)' and not paragraph.runs[1].bold
+        table = document.tables[0]
+        assert table.cell(0, 0).text == table.cell(0, 1).text == 'EN(合格)'
+        assert table.cell(1, 0).text == 'EN(放肩完成)'
+        assert document.sections[0].header.paragraphs[0].text == 'EN(检查温度。)'
+        print("✓ 译文写回原文档并保留格式")
+
+        assert progress[-1]['status'] == 'completed' and progress[-1]['percent'] == 100.0
+        assert not os.path.exists(job.checkpoint_path)
+        print("✓ 进度报告正确，完成后删除检查点")
+
+
+def test_runs_and_hyperlinks():
+    """测试跨文本块的句子和超链接中的文本块"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'runs.docx')
+        output = os.path.join(tmp, 'runs_en.docx')
+        document = Document()
+        # 句中一个词加粗，整句跨三个文本块
+        spanning = document.add_paragraph()
+        spanning.add_run('放肩时')
+        spanning.add_run('降低').bold = True
+        spanning.add_run('拉速。')
+        spanning.add_run('等径生长。').italic = True
+        # 超链接中的文本块不在 paragraph.runs 中
+        linked = document.add_paragraph()
+        linked.add_run('引晶开始。')
+        hyperlink = OxmlElement('w:hyperlink')
+        hyperlink.set(qn('w:anchor'), 'manual')
+        hyperlink.append(linked.add_run('查看手册。')._r)
+        linked._p.append(hyperlink)
+        linked.add_run('检查温度。')
+        document.save(source)
+
+        model = FakeModel()
+        DocxTranslationJob(source, output, SegmentPipeline(model.translate_batch), target_lang='en').run()
+        assert '查看手册。' in model.translated
+
+        document = Document(output)
+        runs = document.paragraphs[0].runs
+        assert [run.text for run in runs] == ['EN(放肩时降低拉速。)', '', '', ' EN(等径生长。)']
+        assert runs[3].italic
+        print("✓ 跨文本块的句子写入首个文本块，其余句子保留各自格式")
+
+        paragraph = document.paragraphs[1]
+        texts = [''.join(t.text for t in r.iter(qn('w:t'))) for r in paragraph._p.iter(qn('w:r'))]
+        assert texts == ['EN(引晶开始。)', ' EN(查看手册。)', ' EN(检查温度。)']
+        link_text = ''.join(t.text for t in paragraph._p.find(qn('w:hyperlink')).iter(qn('w:t')))
+        assert link_text == ' EN(查看手册。)'
+        print("✓ 超链接中的文本按原顺序翻译")
+
+
+def test_resume_from_checkpoint():
+    """测试中断或部分失败后从检查点继续"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'manual.docx')
+        output = os.path.join(tmp, 'manual_en.docx')
+        _create_document(source)
+
+        # 中途停止
+        model = FakeModel()
+        job = DocxTranslationJob(source, output, SegmentPipeline(model.translate_batch, batch_size=1),
+                                 target_lang='en', checkpoint_interval=1)
+        runner = job.iter_run()
+        next(runner)
+        next(runner)
+        next(runner)
+        runner.close()
+        assert os.path.exists(job.checkpoint_path) and not os.path.exists(output)
+
+        # 再次运行只翻译剩余的句子，其中一句失败
+        model = FakeModel(fail={'放肩完成'})
+        job = DocxTranslationJob(source, output, SegmentPipeline(model.translate_batch), target_lang='en')
+        job.run()
+        assert job.progress['resumed'] == 2 and len(model.translated) == 2
+        assert job.progress['failed'] == 1 and os.path.exists(job.checkpoint_path)
+        assert Document(output).tables[0].cell(1, 0).text == '放肩完成'
+
+        # 第三次只重试失败的句子
+        model = FakeModel()
+        job = DocxTranslationJob(source, output, SegmentPipeline(model.translate_batch), target_lang='en')
+        job.run()
+        assert model.translated == ['放肩完成'] and not os.path.exists(job.checkpoint_path)
+        print("✓ 从检查点继续，只翻译剩余和失败的句子")
+
+
+if __name__ == "__main__":
+    test_translate_in_place()
+    test_runs_and_hyperlinks()
+    test_resume_from_checkpoint()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试模糊术语匹配（n-gram 倒排索引 + 编辑距离）
+"""
+
+from core.fuzzy_term_index import FuzzyTermIndex, light_stem, normalize_term, bounded_edit_distance
+
+
+def _term(target):
+    return {'target_term': target, 'metadata': {'source_lang': 'zh', 'target_lang': 'en'}}
+
+
+def test_normalize():
+    """测试归一化和词干化"""
+    assert light_stem('valves') == 'valve'
+    assert light_stem('batteries') == 'battery'
+    assert normalize_term('Check-Valves') == 'check valve'
+    assert bounded_edit_distance('crucible', 'crusible', 2) == 1
+    assert bounded_edit_distance('crucible', 'heater', 1) == 2
+    print("✓ 归一化正常")
+
+
+def test_fuzzy_find():
+    """测试词形变化、连字符和拼写错误的匹配"""
+    print("测试模糊术语匹配")
+    print("=" * 40)
+
+    index = FuzzyTermIndex('en', 'zh', min_score=0.75)
+    index.rebuild({
+        '单向阀': _term('Check valve'),
+        '坩埚': _term('Crucible'),
+        '加热器': _term('Heater'),
+    }, term_version=1)
+
+    text = "Replace the check-valves and the crusible; the heater is fine."
+    # 精确匹配已占用 heater
+    heater = text.index('heater')
+    matches = index.find(text, exclude_spans=[(heater, heater + 6)])
+    found = {text[s:e]: (entry['target_term'], confidence) for s, e, entry, confidence, _ in matches}
+    assert found['check-valves'] == ('单向阀', 0.95)
+    assert found['crusible'][0] == '坩埚' and 0.75 <= found['crusible'][1] < 0.9
+    assert 'heater' not in found
+    print(f"✓ 模糊匹配结果: {found}")
+
+    # 增量删除后不再匹配
+    index.on_term_changed('delete', '坩埚', None, 2)
+    assert all(entry['target_term'] != '坩埚' for _, _, entry, _, _ in index.find(text))
+    print("✓ 增量删除正常")
+
+
+if __name__ == "__main__":
+    test_normalize()
+    test_fuzzy_find()
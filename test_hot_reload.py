@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试数据文件热加载
+"""
+
+import os
+import json
+import tempfile
+import threading
+
+from core.hot_reload import FileWatcher, note_local_write
+from core.term_base import TermBase
+
+
+class FakeVectorDB:
+    """不生成向量的简易向量库"""
+
+    model = None
+
+    def save(self):
+        return True
+
+
+def _touch(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    # 保证修改时间变化（部分文件系统时间精度较低）
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_watcher_settles_and_ignores_local_writes():
+    """测试变化需连续两次检查一致才触发，自身写入不触发"""
+    print("测试数据文件监视")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'terms.json')
+        _touch(path, {})
+        calls = []
+        watcher = FileWatcher(interval=0.1)
+        watcher.watch(path, lambda changed: calls.append(changed), '术语库')
+
+        assert watcher.poll() == []
+        _touch(path, {'a': 1})
+        assert watcher.poll() == [] and not calls
+        assert watcher.poll() == ['术语库'] and len(calls) == 1
+        assert watcher.poll() == []
+        print("✓ 文件写完后只触发一次")
+
+        _touch(path, {'a': 2})
+        note_local_write(path)
+        watcher.poll()
+        watcher.poll()
+        assert len(calls) == 1
+        print("✓ 程序自身写入不触发重新加载")
+
+        watcher.watch(path, lambda changed: False, '术语库')
+        _touch(path, {'a': 3})
+        watcher.poll()
+        watcher.poll()
+        status = watcher.get_status()
+        assert status['files'][0]['last_error'] and status['generation'] == 1
+        print("✓ 加载失败时记录错误")
+
+
+def test_term_base_reload_swaps_indexes():
+    """测试术语库重新加载后索引已建好并整体替换"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            term_base = TermBase(FakeVectorDB(), {})
+            term_base.add_term('引晶', 'Neck')
+            old_lookup = term_base.get_lookup_index()
+            old_stats = term_base.get_statistics()
+            term_base.get_reverse_index('en', 'zh')
+            version = term_base.version
+
+            path = os.path.join('data', 'terms', 'terms.json')
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            data['放肩'] = {'source_term': '放肩', 'target_term': 'Shoulder', 'vector_id': None,
+                           'metadata': {'source_lang': 'zh', 'target_lang': 'en'}}
+            _touch(path, data)
+
+            assert term_base.reload_from_disk()
+            assert term_base.version == version + 1
+            assert term_base.lookup_index is not old_lookup
+            assert term_base.lookup_index.term_version == term_base.version
+            assert term_base.get_lookup_index().query(search='放肩')['total'] == 1
+            assert term_base.get_statistics() is not old_stats
+            assert term_base.get_statistics().total_terms == 2
+            assert term_base.reverse_indexes[('en', 'zh')].term_version == term_base.version
+            assert term_base.get_reverse_index('en', 'zh').lookup('Shoulder')
+
+            # 替换后的增量更新仍然有效
+            term_base.add_term('等径', 'Body')
+            assert term_base.get_statistics().total_terms == 3
+            print("✓ 术语库热加载替换索引正确")
+
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('{broken')
+            assert not term_base.reload_from_disk()
+            assert '等径' in term_base.terms
+            print("✓ 文件损坏时保留当前术语")
+        finally:
+            os.chdir(cwd)
+
+
+def test_term_base_reload_waits_for_writes():
+    """测试热加载与其他线程的写入互斥，事务中新增的术语不会被替换掉"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            term_base = TermBase(FakeVectorDB(), {})
+            term_base.add_term('引晶', 'Neck')
+            reloaded = []
+            reloader = threading.Thread(target=lambda: reloaded.append(term_base.reload_from_disk()))
+
+            with term_base.bulk():
+                reloader.start()
+                reloader.join(0.2)
+                # 事务未结束前热加载等待写入锁
+                assert reloader.is_alive()
+                term_base.add_term('放肩', 'Shoulder')
+            reloader.join(5)
+            assert reloaded == [True]
+            assert set(term_base.terms) == {'引晶', '放肩'}
+            print("✓ 热加载等待批量事务结束，不丢失新增术语")
+
+            # 延迟建立的索引同样等待写入结束，不在术语字典变化时遍历
+            built = []
+            reader = threading.Thread(target=lambda: built.append(term_base.get_lookup_index()))
+            with term_base.bulk():
+                reader.start()
+                reader.join(0.2)
+                assert reader.is_alive()
+                term_base.add_term('等径', 'Body')
+            reader.join(5)
+            assert built[0].term_version == term_base.version
+            assert built[0].query(search='等径')['total'] == 1
+            print("✓ 索引重建等待批量事务结束")
+
+            # 多线程并发写入时版本号逐次递增
+            version = term_base.version
+            writers = [threading.Thread(target=lambda n=n: [term_base.add_term(f'术语{n}-{i}', f'term {n}-{i}')
+                                                            for i in range(5)])
+                       for n in range(4)]
+            for writer in writers:
+                writer.start()
+            for writer in writers:
+                writer.join()
+            assert term_base.version == version + 20 and len(term_base.terms) == 23
+            print("✓ 并发写入时版本号不丢失")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    test_watcher_settles_and_ignores_local_writes()
+    test_term_base_reload_swaps_indexes()
+    test_term_base_reload_waits_for_writes()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试知识条目SQLite存储后端
+"""
+
+import os
+import json
+import tempfile
+
+from core.knowledge_store import KnowledgeStore, KnowledgeItemMapping
+
+
+def test_knowledge_store_crud():
+    """测试单条增删改查和字典接口"""
+    print("测试知识条目SQLite存储")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = KnowledgeStore(os.path.join(tmp_dir, 'knowledge.db'))
+        items = KnowledgeItemMapping(store)
+
+        items['条目A'] = {'content': '引晶阶段需要控制籽晶温度', 'vector_id': 'v_1', 'metadata': {'type': 'document_chunk'}}
+        items['条目B'] = {'content': 'The seed crystal is dipped into the melt', 'vector_id': None, 'metadata': {}}
+        assert len(items) == 2
+        assert '条目A' in items
+        assert items['条目A']['vector_id'] == 'v_1'
+        assert list(items.keys()) == ['条目A', '条目B']
+
+        # 修改不改变插入顺序
+        item = items['条目B']
+        item['vector_id'] = 'v_2'
+        items['条目B'] = item
+        assert items['条目B']['vector_id'] == 'v_2'
+        assert list(items.keys()) == ['条目A', '条目B']
+
+        del items['条目A']
+        assert '条目A' not in items
+        assert len(items) == 1
+        print("✓ 增删改查正常")
+
+        store.close()
+
+
+def test_knowledge_store_keyword_search():
+    """测试FTS5关键词检索"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = KnowledgeStore(os.path.join(tmp_dir, 'knowledge.db'))
+        with store.batch():
+            store.upsert('qa_1', {'content': None, 'vector_id': None, 'metadata': {
+                'type': 'qa_group', 'question': '什么是引晶功率', 'answer': '引晶时加热器的功率'}})
+            store.upsert('doc_1', {'content': '放肩阶段的拉速控制方法', 'vector_id': None, 'metadata': {}})
+
+        assert store.search_keywords(['引晶功率']) == ['qa_1']
+        assert store.search_keywords(['放肩']) == ['doc_1']
+        assert store.search_keywords(['不存在的词']) == []
+        print(f"✓ 关键词检索正常 (FTS5: {store.fts_enabled}, 分词器: {store.fts_tokenizer})")
+
+        store.close()
+
+
+def test_migrate_from_json():
+    """测试从 items.json 迁移"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path = os.path.join(tmp_dir, 'items.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'a.txt_QA_1': {'vector_id': 'v_default_0', 'metadata': {'type': 'qa_group', 'question': 'Q', 'answer': 'A'}},
+                'b.txt_CHUNK_1': {'vector_id': None, 'metadata': {'type': 'document_chunk'}},
+            }, f, ensure_ascii=False)
+
+        store = KnowledgeStore(os.path.join(tmp_dir, 'knowledge.db'))
+        assert store.migrate_from_json(json_path) == 2
+        assert store.count() == 2
+        assert store.get('a.txt_QA_1')['metadata']['answer'] == 'A'
+        assert 'content' not in store.get('b.txt_CHUNK_1')
+        print("✓ items.json 迁移正常")
+
+        store.close()
+
+
+if __name__ == "__main__":
+    test_knowledge_store_crud()
+    test_knowledge_store_keyword_search()
+    test_migrate_from_json()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试问答组问题索引和直达答案
+"""
+
+import os
+import json
+import tempfile
+
+from core.knowledge_store import KnowledgeStore
+from core.qa_index import QAQuestionIndex
+
+# 简易词表，按是否包含关键字生成向量
+VOCAB = ['引晶', '功率', '放肩', '拉速', '温度', '设定']
+
+
+def _vector(text):
+    return [float(word in text) for word in VOCAB]
+
+
+class FakeVectorDB:
+    """按关键字生成向量的向量数据库"""
+
+    model = object()
+
+    def check_model_ready(self):
+        return True
+
+    def encode_text(self, text):
+        return _vector(text)
+
+    def encode_texts(self, texts):
+        return [_vector(text) for text in texts]
+
+    def __init__(self):
+        self.deleted = []
+
+    def delete(self, vector_id):
+        self.deleted.append(vector_id)
+        return True
+
+    def save(self):
+        return True
+
+
+def test_split_questions():
+    """测试拆分主问题和相似问"""
+    print("测试问答组问题索引")
+    print("=" * 40)
+
+    assert QAQuestionIndex.split_questions('引晶功率是多少', '引晶功率设定；功率多少|引晶功率是多少\n 放肩拉速 ') == \
+        ['引晶功率是多少', '引晶功率设定', '功率多少', '放肩拉速']
+    assert QAQuestionIndex.split_questions('', '') == []
+    print("✓ 按分号、竖线和换行拆分并去重")
+
+
+def test_max_sim_search_and_delete():
+    """测试按条目取最大相似度、删除条目"""
+    with tempfile.TemporaryDirectory() as tmp:
+        index = QAQuestionIndex(os.path.join(tmp, 'qa_questions.json'))
+        index.add_item('qa_1', ['引晶功率', '放肩拉速'], [_vector('引晶功率'), _vector('放肩拉速')])
+        index.add_item('qa_2', ['引晶温度'], [_vector('引晶温度')])
+
+        hits = index.search(_vector('放肩拉速'), top_k=2)
+        assert [hit['item'] for hit in hits] == ['qa_1', 'qa_2']
+        assert hits[0]['question'] == '放肩拉速' and abs(hits[0]['similarity'] - 1.0) < 1e-6
+        assert len(index) == 3
+        print("✓ 相似问单独命中，按条目取最大相似度")
+
+        # 重新添加会替换该条目原有的问题
+        index.add_item('qa_1', ['引晶功率'], [_vector('引晶功率')])
+        assert index.get_questions('qa_1') == ['引晶功率']
+        assert index.remove_item('qa_1') and not index.remove_item('qa_1')
+        assert [hit['item'] for hit in index.search(_vector('引晶功率'))] == ['qa_2']
+        assert index.save()
+
+        reloaded = QAQuestionIndex(os.path.join(tmp, 'qa_questions.json'))
+        assert reloaded.item_names() == {'qa_2'}
+        print("✓ 删除条目后不再命中")
+
+
+def test_store_backed_index():
+    """测试问题向量逐行写入SQLite存储，并从旧版JSON迁移"""
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'qa_questions.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'rows': [{'item': 'qa_old', 'question': '放肩拉速'}],
+                       'vectors': [_vector('放肩拉速')]}, f, ensure_ascii=False)
+
+        store = KnowledgeStore(os.path.join(tmp, 'knowledge.db'))
+        index = QAQuestionIndex(json_path, store=store)
+        assert index.item_names() == {'qa_old'} and store.count_qa_questions() == 1
+
+        index.add_item('qa_1', ['引晶功率', '功率设定'], [_vector('引晶功率'), _vector('功率设定')])
+        index.remove_item('qa_old')
+        assert store.count_qa_questions() == 2
+
+        # 不写JSON文件，重新打开后从存储加载
+        os.remove(json_path)
+        reloaded = QAQuestionIndex(json_path, store=store)
+        assert reloaded.item_names() == {'qa_1'}
+        assert reloaded.search(_vector('功率设定'))[0]['question'] == '功率设定'
+        assert not os.path.exists(json_path)
+        print("✓ SQLite存储逐行保存问题向量")
+        store.close()
+
+
+def test_direct_answer_threshold():
+    """测试直达答案的相似度阈值"""
+    from core.knowledge_base import KnowledgeBase
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            kb = KnowledgeBase(FakeVectorDB(), None)
+            kb.items['qa_1'] = {'content': '问题: 引晶功率\n答案: 35 kW', 'vector_id': 'v_1', 'metadata': {
+                'type': 'qa_group', 'question': '引晶功率', 'similar_questions': '引晶功率设定', 'answer': '35 kW'}}
+            assert kb.build_qa_index() == 1
+
+            hit = kb.match_direct_answer('引晶功率设定', threshold=0.99)
+            assert hit['answer'] == '35 kW' and hit['question'] == '引晶功率设定'
+            assert kb.match_direct_answer('引晶温度', threshold=0.9) is None
+            print("✓ 低于阈值的问题不直接返回答案")
+
+            kb.delete_item('qa_1')
+            assert kb.match_direct_answer('引晶功率', threshold=0.5) is None
+            kb.store.close()
+        finally:
+            os.chdir(cwd)
+
+
+def _qa_item(question, similar_questions, answer, vector_id):
+    return {'content': f'问题: {question}\n答案: {answer}', 'vector_id': vector_id, 'metadata': {
+        'type': 'qa_group', 'question': question, 'similar_questions': similar_questions, 'answer': answer}}
+
+
+def test_reload_prunes_deleted_items():
+    """测试重新加载时删除文件中已不存在的条目，并同步问答问题索引"""
+    from core.knowledge_base import KnowledgeBase
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            vector_db = FakeVectorDB()
+            kb = KnowledgeBase(vector_db, None)
+            kb.items['qa_1'] = _qa_item('引晶功率', '引晶功率设定', '35 kW', 'v_1')
+            kb.items['qa_2'] = _qa_item('放肩拉速', '', '1.2 mm/min', 'v_2')
+            kb.items['doc_1'] = {'content': '引晶阶段控制温度', 'vector_id': 'v_3', 'metadata': {}}
+            assert kb.build_qa_index() == 2
+
+            # 外部替换文件：删除 qa_2 和 doc_1，修改 qa_1 的相似问
+            items_file = os.path.join(tmp, 'items.json')
+            with open(items_file, 'w', encoding='utf-8') as f:
+                json.dump({'qa_1': _qa_item('引晶功率', '功率多少', '35 kW', 'v_1')}, f, ensure_ascii=False)
+            assert kb.reload_from_disk(items_file)
+
+            assert list(kb.items.keys()) == ['qa_1'] and 'doc_1' not in kb.items
+            assert sorted(vector_db.deleted) == ['v_2', 'v_3']
+            assert kb.qa_index.item_names() == {'qa_1'}
+            assert kb.qa_index.get_questions('qa_1') == ['引晶功率', '功率多少']
+            assert kb.store.count_qa_questions() == 2
+            assert kb.match_direct_answer('放肩拉速', threshold=0.99) is None
+            assert kb.match_direct_answer('引晶功率设定', threshold=0.99) is None
+            print("✓ 重新加载后删除的条目和问题索引被移除")
+            kb.store.close()
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    test_split_questions()
+    test_max_sim_search_and_delete()
+    test_store_backed_index()
+    test_direct_answer_threshold()
+    test_reload_prunes_deleted_items()
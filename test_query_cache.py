@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试知识库检索结果缓存
+"""
+
+from core.query_cache import QueryResultCache, normalize_query
+
+
+def test_query_cache():
+    """测试缓存命中、版本失效和容量淘汰"""
+    print("测试知识库检索结果缓存")
+    print("=" * 40)
+
+    cache = QueryResultCache(max_entries=2)
+    results = [{'content': '引晶功率为60kW', 'similarity': 0.91, 'metadata': {}}]
+
+    key = cache.make_key('什么是 引晶功率？', 5, 0, min_similarity=0.4)
+    assert cache.get(key) is None
+    cache.put(key, results)
+
+    # 规范化后相同的查询命中缓存
+    same_key = cache.make_key('  什么是   引晶功率?', 5, 0, min_similarity=0.4)
+    assert normalize_query('什么是 引晶功率？') == normalize_query('  什么是   引晶功率?')
+    assert cache.get(same_key) == results
+
+    # 返回副本，调用方修改不影响缓存
+    cache.get(same_key)[0]['content'] = '被修改'
+    assert cache.get(same_key)[0]['content'] == '引晶功率为60kW'
+    print("✓ 规范化查询命中缓存")
+
+    # 知识库版本号变化后不再命中
+    assert cache.get(cache.make_key('什么是 引晶功率？', 5, 1, min_similarity=0.4)) is None
+    print("✓ 版本号变化后缓存失效")
+
+    # 超出容量淘汰最久未使用的条目
+    cache.put(cache.make_key('a', 5, 0), [])
+    cache.put(cache.make_key('b', 5, 0), [])
+    assert cache.get(key) is None
+    stats = cache.get_stats()
+    assert stats['size'] == 2 and stats['evictions'] == 1
+    assert stats['hits'] == 3
+    print(f"✓ 容量淘汰正常，统计: {stats}")
+
+
+if __name__ == "__main__":
+    test_query_cache()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试交叉编码器重排序器（使用桩模型，不加载真实模型）
+"""
+
+import os
+import time
+import tempfile
+import threading
+
+from core.reranker import CrossEncoderReranker
+
+CANDIDATES = [
+    {'content': '放肩阶段的拉速控制', 'similarity': 0.9},
+    {'content': '引晶功率的设定方法', 'similarity': 0.8},
+    {'content': '引晶温度与引晶功率', 'similarity': 0.7},
+]
+
+
+class StubModel:
+    """按引晶出现次数打分的桩模型，可设置每次打分的耗时"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def predict(self, pairs, batch_size=None, show_progress_bar=False):
+        self.calls += 1
+        time.sleep(self.delay)
+        return [passage.count('引晶') / 2 for _, passage in pairs]
+
+
+class SlowLoadReranker(CrossEncoderReranker):
+    """加载耗时较长的重排序器"""
+
+    def __init__(self, load_delay, **kwargs):
+        super().__init__('stub-model', **kwargs)
+        self.load_delay = load_delay
+        self.load_threads = []
+
+    def load(self):
+        if self.model is None:
+            self.load_threads.append(threading.current_thread().name)
+            time.sleep(self.load_delay)
+            self.model = StubModel()
+            self.backend = 'sentence_transformers'
+        return True
+
+
+def _reranker(delay=0.0, timeout=2.0):
+    reranker = CrossEncoderReranker('stub-model', timeout=timeout, latency_budget_ms=0)
+    reranker.model = StubModel(delay)
+    reranker.backend = 'sentence_transformers'
+    return reranker
+
+
+def test_rerank_ordering():
+    """测试按重排序得分排序、截断和过滤"""
+    print("测试交叉编码器重排序")
+    print("=" * 40)
+
+    reranker = _reranker()
+    results, reranked = reranker.rerank('引晶功率', CANDIDATES, keep=3, min_score=0.1)
+    assert reranked
+    assert [r['content'] for r in results] == ['引晶温度与引晶功率', '引晶功率的设定方法']
+    assert results[0]['rerank_score'] == 1.0 and results[0]['similarity'] == 0.7
+    assert reranker.rerank('引晶功率', CANDIDATES, keep=1)[0][0]['content'] == '引晶温度与引晶功率'
+    print("✓ 按重排序得分排序并过滤低分结果")
+
+
+def test_timeout_and_busy_fallback():
+    """测试超时回退，以及上一次计算未结束时新查询直接回退"""
+    reranker = _reranker(delay=0.3, timeout=0.05)
+    results, reranked = reranker.rerank('引晶功率', CANDIDATES)
+    assert not reranked and results == CANDIDATES
+
+    # 超时的计算仍在执行，新查询不排队
+    start = time.time()
+    results, reranked = reranker.rerank('引晶功率', CANDIDATES)
+    assert not reranked and time.time() - start < 0.05
+    assert reranker.model.calls == 1 and reranker.fallbacks == 2
+    print("✓ 超时和忙碌时回退到向量排序")
+
+    # 后台计算结束后恢复重排序
+    time.sleep(0.4)
+    reranker.timeout = 2.0
+    assert reranker.rerank('引晶功率', CANDIDATES)[1]
+    print("✓ 后台计算结束后恢复重排序")
+
+
+def test_concurrent_requests_start_one_inference():
+    """测试并发查询只有一个进入模型计算"""
+    reranker = _reranker(delay=0.2)
+    barrier = threading.Barrier(4)
+    outcomes = []
+
+    def worker():
+        barrier.wait()
+        outcomes.append(reranker.rerank('引晶功率', CANDIDATES)[1])
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert reranker.model.calls == 1 and outcomes.count(True) == 1
+    print("✓ 并发查询只启动一次计算")
+
+
+def test_load_runs_in_executor():
+    """测试模型在执行器中加载，首个查询的加载耗时受超时限制"""
+    reranker = SlowLoadReranker(load_delay=0.3, timeout=0.05)
+    start = time.time()
+    results, reranked = reranker.rerank('引晶功率', CANDIDATES)
+    assert not reranked and time.time() - start < 0.25
+    assert reranker.load_threads[0].startswith('reranker')
+
+    time.sleep(0.4)
+    assert reranker.rerank('引晶功率', CANDIDATES)[1]
+
+    # 启动时后台加载
+    reranker = SlowLoadReranker(load_delay=0.1)
+    reranker.start_loading()
+    assert not reranker.rerank('引晶功率', CANDIDATES)[1]
+    time.sleep(0.2)
+    assert reranker.model is not None and reranker.rerank('引晶功率', CANDIDATES)[1]
+    print("✓ 模型在后台加载，加载期间回退")
+
+
+class SearchVectorDB:
+    """返回固定候选、记录检索次数的向量数据库"""
+
+    model = object()
+
+    def __init__(self):
+        self.searches = 0
+
+    def check_model_ready(self):
+        return True
+
+    def search(self, query, top_k=15, min_similarity=0.4):
+        self.searches += 1
+        return [dict(c) for c in CANDIDATES]
+
+
+def test_missing_model_results_are_cached():
+    """测试重排序模型缺失时检索结果照常缓存，超时回退的结果不缓存"""
+    from core.knowledge_base import KnowledgeBase
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            vector_db = SearchVectorDB()
+            kb = KnowledgeBase(vector_db, None)
+            kb.reranker = CrossEncoderReranker(os.path.join(tmp, 'missing-model'))
+            assert len(kb.search('引晶功率', top_k=10)) == 3
+            searches = vector_db.searches
+            assert len(kb.search('引晶功率', top_k=10)) == 3
+            assert vector_db.searches == searches
+            print("✓ 模型缺失时检索结果照常缓存")
+
+            kb.reranker = _reranker(delay=0.3, timeout=0.05)
+            kb.search('放肩拉速', top_k=10)
+            searches = vector_db.searches
+            kb.search('放肩拉速', top_k=10)
+            assert vector_db.searches > searches
+            print("✓ 重排序超时回退的结果不缓存")
+            kb.store.close()
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    test_rerank_ordering()
+    test_timeout_and_busy_fallback()
+    test_concurrent_requests_start_one_inference()
+    test_load_runs_in_executor()
+    test_missing_model_results_are_cached()
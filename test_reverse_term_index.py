@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试常驻反向术语索引（外语→中文）
+"""
+
+from core.reverse_term_index import ReverseTermIndex
+
+
+def _term(target):
+    return {'source_term': '', 'target_term': target, 'metadata': {'source_lang': 'zh', 'target_lang': 'en'}}
+
+
+def test_reverse_index_word_boundary():
+    """测试忽略大小写、多译名和词边界"""
+    print("测试反向术语索引")
+    print("=" * 40)
+
+    index = ReverseTermIndex('en', 'zh')
+    index.rebuild({'引晶': _term('Neck,Crystal neck'), '放肩': _term('Shoulder')}, term_version=1)
+    assert len(index) == 3
+
+    matches = index.find("The crystal NECK forms before necking and shouldering.")
+    assert [(s, e, m['target_term']) for s, e, m in matches] == [(4, 16, '引晶')]
+    assert index.lookup('neck')['priority'] == 0
+    print("✓ 词边界和大小写匹配正常")
+
+
+def test_reverse_index_incremental():
+    """测试随术语库变更增量更新"""
+    index = ReverseTermIndex('en', 'zh')
+    index.rebuild({'引晶': _term('Neck')}, term_version=1)
+
+    index.on_term_changed('add', '放肩', _term('Shoulder'), 2)
+    assert index.term_version == 2
+    assert [m['target_term'] for _, _, m in index.find("neck and shoulder")] == ['引晶', '放肩']
+
+    index.on_term_changed('update', '引晶', _term('Seed neck'), 3)
+    assert index.lookup('neck') is None and index.lookup('seed neck')['target_term'] == '引晶'
+
+    index.on_term_changed('delete', '放肩', None, 4)
+    assert index.find("shoulder") == []
+
+    # 漏掉中间版本时标记为需要重建
+    index.on_term_changed('delete', '引晶', None, 6)
+    assert index.term_version is None
+    print("✓ 增量更新正常")
+
+
+if __name__ == "__main__":
+    test_reverse_index_word_boundary()
+    test_reverse_index_incremental()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试分句翻译流水线
+"""
+
+import os
+import tempfile
+
+from core.segment_pipeline import (SegmentPipeline, assemble_segments, number_segments, parse_numbered,
+                                   split_segments)
+from core.translation_memory import NO_TERMS, TranslationMemory
+
+SOURCE = "  引晶开始。温度 1450 ℃！\n\n  检查泵压 3.5 bar。引晶开始。\n123\n"
+
+
+class FakeModel:
+    """带编号批量翻译的简易模型，记录每次调用的原文"""
+
+    def __init__(self, keep_numbers=True):
+        self.keep_numbers = keep_numbers
+        self.calls = []
+
+    def translate_batch(self, texts, examples):
+        self.calls.append(list(texts))
+        if len(texts) > 1 and not self.keep_numbers:
+            return [None] * len(texts)
+        return [f"EN({text})" for text in texts]
+
+
+def test_split_and_assemble():
+    """测试分句保留原格式"""
+    print("测试分句翻译流水线")
+    print("=" * 40)
+
+    pieces = split_segments(SOURCE)
+    assert ''.join(text for text, _ in pieces) == SOURCE
+    assert [text for text, translate in pieces if translate] == ['引晶开始。', '温度 1450 ℃！', '检查泵压 3.5 bar。', '引晶开始。']
+    assert assemble_segments(pieces, {}, 'en') == SOURCE
+
+    pieces = split_segments("Step 1. Check pump 3.5 bar.  Done!")
+    translations = {index: '句' for index, (_, translate) in enumerate(pieces) if translate}
+    assert assemble_segments(pieces, translations, 'zh') == '句句句'
+    print("✓ 分句和拼接保留换行、缩进和句间空白")
+
+
+def test_numbered_batches():
+    """测试带编号的批量译文解析"""
+    assert number_segments(['a', 'b']) == '<1> a\n<2> b'
+    assert parse_numbered('<1> A\n<2> B\ncontinued', 2) == ['A', 'B continued']
+    assert parse_numbered('<1> A', 2) is None
+    assert parse_numbered('<1> A\n<1> B', 2) is None
+    print("✓ 编号译文解析正确")
+
+
+def test_pipeline_dedupe_and_memory():
+    """测试去重、查记忆库、只翻译未命中的句子并逐句返回"""
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = TranslationMemory(os.path.join(tmp, 'tm.db'))
+        memory.store('温度 1400 ℃！', 'Temperature 1400 ℃!', 'zh', 'en', NO_TERMS, 'm')
+        model = FakeModel()
+        pipeline = SegmentPipeline(model.translate_batch, memory, lambda segment: ('zh', 'en', NO_TERMS, 'm'),
+                                   batch_chars=100, batch_size=8)
+
+        events = list(pipeline.run(SOURCE, 'en'))
+        assert events[0]['event'] == 'start' and events[0]['segments'] == 4 and events[0]['unique'] == 3
+        segments = [event for event in events if event['event'] == 'segment']
+        assert segments[0]['origin'] == 'pattern' and segments[0]['translation'] == 'Temperature 1450 ℃!'
+        assert model.calls == [['引晶开始。', '检查泵压 3.5 bar。']]
+        assert events[-1]['text'] == ("  EN(引晶开始。) Temperature 1450 ℃!\n\n"
+                                      "  EN(检查泵压 3.5 bar。) EN(引晶开始。)\n123\n")
+        assert events[-1]['stats']['memory'] == 1 and events[-1]['stats']['model'] == 2
+        print("✓ 相同句子只翻译一次，记忆库命中的句子不交给模型")
+
+        # 第二次全部命中记忆库
+        model.calls.clear()
+        assert pipeline.translate(SOURCE, 'en') == events[-1]['text']
+        assert model.calls == []
+        print("✓ 译文写入记忆库后再次翻译不调用模型")
+        memory.close()
+
+
+def test_pipeline_failures_keep_source():
+    """测试翻译失败的句子保留原文"""
+    pipeline = SegmentPipeline(FakeModel(keep_numbers=False).translate_batch, batch_size=8)
+    result = list(pipeline.run(SOURCE, 'en'))[-1]
+    assert result['text'] == SOURCE and result['stats']['failed'] == 3
+    print("✓ 翻译失败时保留原文")
+
+
+if __name__ == "__main__":
+    test_split_and_assemble()
+    test_numbered_batches()
+    test_pipeline_dedupe_and_memory()
+    test_pipeline_failures_keep_source()
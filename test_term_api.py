@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试按文件修改时间缓存的术语 API
+"""
+
+import os
+import json
+import tempfile
+from unittest import mock
+
+from utils import term_api
+from utils.term_api import CachedTermStore
+
+
+def _write_terms(path, terms):
+    data = {}
+    for source, target in terms.items():
+        data[source] = {'source_term': source, 'target_term': target, 'definition': target,
+                        'metadata': {'source_lang': 'zh', 'target_lang': 'en'}}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def test_cached_lookup():
+    """测试文件未变化时不重复读取，变化后自动刷新"""
+    print("测试术语 API 缓存")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'terms.json')
+        _write_terms(path, {'引晶': 'Neck', '放肩': 'Shoulder', '引晶速度': 'Neck speed'})
+        store = CachedTermStore(path)
+
+        with mock.patch.object(term_api, 'load_terms', wraps=term_api.load_terms) as loader:
+            for _ in range(1000):
+                assert store.get('引晶')['target_term'] == 'Neck'
+            assert loader.call_count == 1
+            print("✓ 重复查询只读取一次文件")
+
+            assert [item['source_term'] for item in store.search('引晶', prefix=True)] == ['引晶', '引晶速度']
+            assert [item['source_term'] for item in store.search('shoulder')] == ['放肩']
+            matches = store.find_in_text('调整引晶速度后放肩')
+            assert [match['source'] for match in matches] == ['引晶速度', '放肩']
+            print("✓ 精确、前缀、子串和文本匹配正确")
+
+            _write_terms(path, {'引晶': 'Necking'})
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            assert store.get('引晶')['target_term'] == 'Necking'
+            assert store.get('放肩') is None
+            assert store.search('放肩') == []
+            assert loader.call_count == 2
+            print("✓ 文件变化后自动刷新")
+
+
+def test_module_functions():
+    """测试模块级函数使用缓存"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            os.makedirs(os.path.join('data', 'terms'))
+            _write_terms(term_api.get_term_db_path(), {'等径': 'Body'})
+            assert term_api.get_term_definition('等径') == 'Body'
+            assert term_api.get_term_definition('等径', 'en', 'zh') == ''
+            assert term_api.search_terms('等')[0]['target_term'] == 'Body'
+            assert term_api.search_terms_by_prefix('等')[0]['source_term'] == '等径'
+            assert term_api.find_terms_in_text('进入等径阶段')[0]['target'] == 'Body'
+            print("✓ 模块级接口正确")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    test_cached_lookup()
+    test_module_functions()
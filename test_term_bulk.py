@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试术语库批量写入事务
+"""
+
+import os
+import json
+import tempfile
+
+from core.term_base import TermBase
+from core.term_importers import import_term_records
+
+
+class FakeVectorDB:
+    """记录保存次数和编码批次的简易向量库"""
+
+    def __init__(self):
+        self.model = object()
+        self.save_calls = 0
+        self.save_ok = True
+        self.encode_batches = []
+        self.added = []
+        self.deleted = []
+        # 每次保存向量时术语文件中已有向量ID的术语数
+        self.terms_with_vectors_at_save = []
+
+    def encode_texts(self, texts):
+        self.encode_batches.append(list(texts))
+        return [[1.0, 0.0] for _ in texts]
+
+    def add(self, text, vector, metadata=None):
+        self.added.append(text)
+        return f"vec-{len(self.added)}"
+
+    def delete(self, vector_id):
+        self.deleted.append(vector_id)
+        return True
+
+    def save(self):
+        self.save_calls += 1
+        terms_file = os.path.join('data', 'terms', 'terms.json')
+        if os.path.exists(terms_file):
+            with open(terms_file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            self.terms_with_vectors_at_save.append(sum(1 for t in saved.values() if t.get('vector_id')))
+        else:
+            self.terms_with_vectors_at_save.append(0)
+        return self.save_ok
+
+
+def _make_term_base():
+    vector_db = FakeVectorDB()
+    vector_db.model = None  # 初始化时不触发后台补建
+    term_base = TermBase(vector_db, {'term_backfill_batch_size': 4})
+    vector_db.model = object()
+    return term_base, vector_db
+
+
+def test_bulk_commit_once():
+    """测试事务内只保存一次并批量生成向量"""
+    print("测试术语库批量写入事务")
+    print("=" * 40)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            term_base, vector_db = _make_term_base()
+            with term_base.bulk():
+                for i in range(10):
+                    assert term_base.add_term(f"术语{i}", f"term {i}")
+                term_base.save()
+                assert vector_db.save_calls == 0
+
+            assert vector_db.save_calls == 1
+            # 向量先于术语文件写入
+            assert vector_db.terms_with_vectors_at_save == [0]
+            assert [len(batch) for batch in vector_db.encode_batches] == [4, 4, 2]
+            assert all(term_base.terms[f"术语{i}"]['vector_id'] for i in range(10))
+
+            reloaded = TermBase(FakeVectorDB.__new__(FakeVectorDB), {})
+            assert len(reloaded.terms) == 10
+            print("✓ 批量写入只保存一次，向量按批生成")
+        finally:
+            os.chdir(cwd)
+
+
+def test_bulk_rollback():
+    """测试事务内异常时撤销修改且不落盘"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            term_base, vector_db = _make_term_base()
+            term_base.add_term("引晶", "Necking")
+            saves = vector_db.save_calls
+            version = term_base.version
+
+            try:
+                with term_base.bulk():
+                    term_base.add_term("引晶", "Neck")
+                    term_base.add_term("放肩", "Shouldering")
+                    raise ValueError("中途失败")
+            except ValueError:
+                pass
+
+            assert term_base.terms["引晶"]['target_term'] == "Necking"
+            assert "放肩" not in term_base.terms
+            assert vector_db.save_calls == saves
+            assert term_base.version > version
+            print("✓ 异常时撤销修改")
+        finally:
+            os.chdir(cwd)
+
+
+def test_vector_save_failure_keeps_terms_file():
+    """测试向量保存失败时不写入术语文件"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            term_base, vector_db = _make_term_base()
+            vector_db.save_ok = False
+            try:
+                with term_base.bulk():
+                    term_base.add_term("引晶", "Necking")
+                raise AssertionError("向量保存失败时应抛出异常")
+            except RuntimeError:
+                pass
+            assert not os.path.exists(os.path.join('data', 'terms', 'terms.json'))
+            print("✓ 向量保存失败时术语文件不写入")
+        finally:
+            os.chdir(cwd)
+
+
+def test_metadata_survives_reload():
+    """测试导入的分类、描述和更新时间保存后重新加载不丢失"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            term_base, _ = _make_term_base()
+            records = [(2, {'source_term': '引晶', 'target_term': 'Necking', 'source_lang': 'zh',
+                            'target_lang': 'en', 'category': '拉晶工艺', 'description': '籽晶细颈生长'}, None)]
+            assert import_term_records(term_base, iter(records))['imported'] == 1
+            # 与 Web 编辑接口一致，直接记录更新时间后保存
+            updated_time = '2026-10-19T08:00:00'
+            term_base.terms['引晶']['metadata']['updated_time'] = updated_time
+            assert term_base.save()
+
+            reloaded = TermBase(FakeVectorDB.__new__(FakeVectorDB), {})
+            metadata = reloaded.terms['引晶']['metadata']
+            assert metadata['category'] == '拉晶工艺' and metadata['description'] == '籽晶细颈生长'
+            assert metadata['updated_time'] == updated_time
+            assert reloaded.get_statistics().list_categories() == ['拉晶工艺']
+            print("✓ 术语元数据重新加载后保留")
+        finally:
+            os.chdir(cwd)
+
+
+def test_update_fields_and_delete():
+    """测试加锁修改术语字段并通知索引，删除术语时一并删除向量"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            term_base, vector_db = _make_term_base()
+            with term_base.bulk():
+                term_base.add_term('引晶', 'Necking')
+            assert term_base.get_statistics().list_categories() == []
+
+            term_data = term_base.update_term_fields('引晶', target_term='Neck', metadata={'category': '拉晶工艺'})
+            assert term_data['target_term'] == term_data['definition'] == 'Neck'
+            assert term_data['metadata']['updated_time']
+            assert term_base.get_statistics().list_categories() == ['拉晶工艺']
+            assert term_base.update_term_fields('放肩', target_term='Shoulder') is None
+            print("✓ 修改术语字段后索引同步更新")
+
+            vector_id = term_base.terms['引晶']['vector_id']
+            assert term_base.delete_term('引晶') and term_base.save()
+            assert vector_db.deleted == [vector_id]
+            assert TermBase(FakeVectorDB.__new__(FakeVectorDB), {}).terms == {}
+            print("✓ 删除术语时一并删除向量")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    test_bulk_commit_once()
+    test_bulk_rollback()
+    test_vector_save_failure_keeps_terms_file()
+    test_metadata_survives_reload()
+    test_update_fields_and_delete()
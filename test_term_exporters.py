@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试术语库流式导出
+"""
+
+import os
+import csv
+import gzip
+import json
+import tempfile
+from io import StringIO
+
+from core.term_lookup_index import TermLookupIndex
+from core.term_exporters import iter_export_bytes, iter_export_terms
+from core.term_importers import iter_term_records
+
+
+def _build_index(count=1200):
+    terms = {}
+    for i in range(count):
+        terms[f"术语{i:04d}"] = {
+            'target_term': f'term "{i}" <&>',
+            'metadata': {'id': str(i), 'source_lang': 'zh', 'target_lang': 'en' if i % 3 else 'ja',
+                         'category': '拉晶' if i % 2 else ''}
+        }
+    index = TermLookupIndex()
+    index.rebuild(terms, term_version=1)
+    return index
+
+
+def test_paged_iteration():
+    """测试按页读取覆盖全部术语和语言筛选"""
+    print("测试术语库流式导出")
+    print("=" * 40)
+
+    index = _build_index()
+    terms = list(iter_export_terms(index, page_size=100))
+    assert len(terms) == 1200 and terms[0]['source_term'] == '术语0000'
+    assert len(list(iter_export_terms(index, target_lang='ja', page_size=64))) == 400
+    print("✓ 分页读取正常")
+
+
+def test_formats_and_gzip():
+    """测试各格式内容以及 gzip 压缩"""
+    index = _build_index(50)
+
+    chunks = list(iter_export_bytes(iter_export_terms(index), 'csv', chunk_size=256))
+    assert len(chunks) > 1
+    rows = list(csv.DictReader(StringIO(b''.join(chunks).decode('utf-8'))))
+    assert len(rows) == 50 and rows[0]['target_term'] == 'term "0" <&>'
+
+    compressed = b''.join(iter_export_bytes(iter_export_terms(index), 'jsonl', compress=True, chunk_size=128))
+    lines = gzip.decompress(compressed).decode('utf-8').splitlines()
+    assert len(lines) == 50 and json.loads(lines[1])['category'] == '拉晶'
+
+    # 导出的 TBX 可以被导入器重新解析
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'terms.tbx')
+        with open(path, 'wb') as f:
+            for chunk in iter_export_bytes(iter_export_terms(index), 'tbx'):
+                f.write(chunk)
+        records = [record for _, record, _ in iter_term_records(path)]
+    assert len(records) == 50
+    assert records[1] == {'source_term': '术语0001', 'target_term': 'term "1" <&>', 'source_lang': 'zh',
+                          'target_lang': 'en', 'category': '拉晶'}
+    print("✓ CSV/JSONL/TBX 导出和 gzip 压缩正常")
+
+
+if __name__ == "__main__":
+    test_paged_iteration()
+    test_formats_and_gzip()
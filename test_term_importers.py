@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试术语文件流式导入
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+from core.term_importers import iter_term_records, import_term_records
+
+
+class FakeTermBase:
+    """记录批量事务次数的简易术语库"""
+
+    def __init__(self):
+        self.terms = {}
+        self.bulk_calls = 0
+
+    @contextmanager
+    def bulk(self):
+        self.bulk_calls += 1
+        yield self
+
+    def add_term(self, source_term, target_term, source_lang="zh", target_lang="en", metadata=None):
+        self.terms[source_term] = {'target_term': target_term,
+                                   'metadata': dict(metadata or {}, source_lang=source_lang, target_lang=target_lang)}
+        return True
+
+
+def _write(directory, name, content):
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return path
+
+
+def test_csv_and_text_records():
+    """测试 CSV 表头识别、无表头 TSV/TXT 和逐行错误"""
+    print("测试术语文件流式导入")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write(tmp, 'terms.csv', "源术语,译文,分类\n引晶,Necking,拉晶\n放肩,,拉晶\n\n等径,Body growth,\n")
+        rows = list(iter_term_records(path))
+        assert [row[0] for row in rows] == [2, 3, 5]
+        assert rows[0][1] == {'source_term': '引晶', 'target_term': 'Necking', 'category': '拉晶',
+                              'source_lang': 'zh', 'target_lang': 'en'}
+        assert rows[1][1] is None and '第3行' in rows[1][2]
+
+        path = _write(tmp, 'terms.tsv', "Neck\t引晶\ten\tzh\n")
+        record = next(iter_term_records(path))[1]
+        assert (record['source_lang'], record['target_lang']) == ('en', 'zh')
+
+        path = _write(tmp, 'terms.txt', "引晶,Necking, seed\n没有分隔符\n")
+        rows = list(iter_term_records(path))
+        assert rows[0][1]['target_term'] == 'Necking, seed' and rows[1][1] is None
+    print("✓ CSV/TSV/TXT 解析正常")
+
+
+def test_tbx_records():
+    """测试 TBX 条目解析"""
+    tbx = """<?xml version="1.0" encoding="UTF-8"?>
+<martif type="TBX" xml:lang="en"><text><body>
+  <termEntry id="1">
+    <descrip type="subjectField">拉晶</descrip>
+    <langSet xml:lang="zh-CN"><tig><term>引晶</term></tig></langSet>
+    <langSet xml:lang="en"><tig><term>Necking</term></tig><tig><term>Neck</term></tig></langSet>
+  </termEntry>
+  <termEntry id="2"><langSet xml:lang="en"><tig><term>Orphan</term></tig></langSet></termEntry>
+</body></text></martif>"""
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = list(iter_term_records(_write(tmp, 'terms.tbx', tbx)))
+    assert rows[0][1] == {'source_term': '引晶', 'target_term': 'Necking', 'source_lang': 'zh',
+                          'target_lang': 'en', 'category': '拉晶'}
+    assert rows[1][1] is None and rows[1][2]
+    print("✓ TBX 解析正常")
+
+
+def test_import_records_progress():
+    """测试分块导入、进度回调和错误统计"""
+    term_base = FakeTermBase()
+    term_base.terms['引晶'] = {'target_term': 'old'}
+    records = [(1, {'source_term': '引晶', 'target_term': 'Necking', 'source_lang': 'zh', 'target_lang': 'en'}, None),
+               (2, None, "第2行: 源术语或目标术语为空")]
+    records += [(i, {'source_term': f"术语{i}", 'target_term': f"term {i}", 'source_lang': 'zh',
+                     'target_lang': 'en', 'category': '测试'}, None) for i in range(3, 8)]
+    progress = []
+    result = import_term_records(term_base, iter(records), chunk_size=3, progress_callback=progress.append)
+
+    assert term_base.bulk_calls == 1
+    assert (result['processed'], result['imported'], result['updated'], result['failed']) == (7, 5, 1, 1)
+    assert [p['processed'] for p in progress] == [3, 6, 7]
+    assert term_base.terms['术语3']['metadata']['category'] == '测试'
+    print(f"✓ 导入结果: {result}")
+
+
+if __name__ == "__main__":
+    test_csv_and_text_records()
+    test_tbx_records()
+    test_import_records_progress()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试术语列表查询索引（排序、筛选、搜索、游标翻页）
+"""
+
+from core.term_lookup_index import TermLookupIndex
+
+
+def _term(target, added_time, category='', source_lang='zh', target_lang='en'):
+    return {
+        'target_term': target,
+        'metadata': {
+            'id': f"id-{target}",
+            'source_lang': source_lang,
+            'target_lang': target_lang,
+            'added_time': added_time,
+            'category': category
+        }
+    }
+
+
+def _build_terms(count=50):
+    terms = {}
+    for i in range(count):
+        category = 'crystal' if i % 2 else 'furnace'
+        terms[f"术语{i:03d}"] = _term(f"term {i:03d}", f"2024-01-01T00:00:{i:02d}", category)
+    return terms
+
+
+def test_cursor_pagination():
+    """测试游标翻页覆盖全部术语且顺序正确"""
+    print("测试术语列表查询索引")
+    print("=" * 40)
+
+    terms = _build_terms()
+    index = TermLookupIndex()
+    index.rebuild(terms, term_version=1)
+
+    seen, cursor = [], None
+    while True:
+        result = index.query(sort='created_at', cursor=cursor, limit=7)
+        assert result['total'] == 50
+        seen.extend(item['source_term'] for item in result['terms'])
+        cursor = result['next_cursor']
+        if cursor is None:
+            break
+    assert seen == list(terms)
+
+    result = index.query(sort='source_term', descending=True, limit=3)
+    assert [item['source_term'] for item in result['terms']] == ['术语049', '术语048', '术语047']
+    result = index.query(sort='source_term', descending=True, limit=3, cursor=result['next_cursor'])
+    assert result['terms'][0]['source_term'] == '术语046'
+
+    # 页码分页与原先切片结果一致
+    assert [item['source_term'] for item in index.query(offset=20, limit=5)['terms']] == list(terms)[20:25]
+    print("✓ 游标翻页和页码翻页正常")
+
+
+def test_filters_and_search():
+    """测试筛选、子串搜索和前缀搜索"""
+    index = TermLookupIndex()
+    terms = _build_terms()
+    terms['Neck'] = _term('引晶', '2024-01-02T00:00:00', 'crystal', 'en', 'zh')
+    index.rebuild(terms, term_version=1)
+
+    assert index.query(category='crystal', limit=100)['total'] == 26
+    assert index.query(source_lang='en', target_lang='zh')['total'] == 1
+    assert index.query(source_lang='en')['total'] == 1
+    assert index.query(source_lang='en', category='furnace')['total'] == 0
+
+    result = index.query(search='TERM 01', limit=100)
+    assert sorted(item['source_term'] for item in result['terms']) == [f"术语{i:03d}" for i in range(10, 20)]
+    assert [item['source_term'] for item in index.query(search='引晶')['terms']] == ['Neck']
+    assert index.query(search='ne', prefix=True)['terms'][0]['source_term'] == 'Neck'
+    print("✓ 筛选和搜索正常")
+
+
+def test_incremental_updates():
+    """测试随术语库变更增量更新"""
+    index = TermLookupIndex()
+    terms = _build_terms(3)
+    index.rebuild(terms, term_version=1)
+
+    index.on_term_changed('add', '新术语', _term('new term', '2024-02-01T00:00:00', 'crystal'), 2)
+    assert index.find_key('id-new term') == '新术语'
+    assert index.query(search='new')['total'] == 1
+
+    index.on_term_changed('update', '新术语', _term('renamed', '2024-02-01T00:00:00', 'furnace'), 3)
+    assert index.query(search='new')['total'] == 0
+    assert index.query(category='furnace')['total'] == 3
+
+    index.on_term_changed('delete', '术语000', None, 4)
+    assert index.query()['total'] == 3 and index.find_key('id-term 000') is None
+
+    # 漏掉版本号时标记为需要重建
+    index.on_term_changed('delete', '术语001', None, 6)
+    assert index.term_version is None
+    print("✓ 增量更新正常")
+
+
+if __name__ == "__main__":
+    test_cursor_pagination()
+    test_filters_and_search()
+    test_incremental_updates()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试 Aho–Corasick 术语匹配
+"""
+
+from core.term_matcher import (AhoCorasickMatcher, IncrementalTermMatcher, TermMatcherCache, find_source_terms,
+                               merge_edits)
+
+
+def test_leftmost_longest():
+    """测试最左最长、互不重叠的匹配"""
+    print("测试术语匹配自动机")
+    print("=" * 40)
+
+    matcher = AhoCorasickMatcher([('单晶', 1), ('单晶炉', 2), ('晶炉', 3), ('炉压', 4), ('he', 5), ('she', 6), ('hers', 7)])
+    text = "单晶炉压力正常，单晶生长"
+    assert matcher.find(text) == [(0, 3, 2), (8, 10, 1)]
+    # 重叠情况下全部命中都能枚举出来
+    assert {(s, e) for s, e, _ in matcher.iter_all(text)} >= {(0, 2), (0, 3), (1, 3), (2, 4), (8, 10)}
+    assert matcher.find("ushers") == [(1, 4, 6)]
+    print("✓ 最左最长匹配正常")
+
+
+def test_case_insensitive_and_cache():
+    """测试忽略大小写匹配和按版本缓存"""
+    matcher = AhoCorasickMatcher([('Crystal Neck', 'neck')], case_sensitive=False)
+    assert matcher.find("the CRYSTAL neck grows") == [(4, 16, 'neck')]
+
+    cache = TermMatcherCache()
+    terms = {'引晶': {'source_term': '引晶', 'target_term': 'Necking'}}
+    build = lambda t: ((k, k) for k in t)
+    first = cache.get(terms, 'source', build, version=1)
+    assert cache.get(terms, 'source', build, version=1) is first
+    terms['放肩'] = {'source_term': '放肩', 'target_term': 'Shouldering'}
+    assert cache.get(terms, 'source', build, version=2) is not first
+    print("✓ 忽略大小写和缓存失效正常")
+
+
+def test_find_source_terms():
+    """测试术语库匹配结果格式"""
+    terms = {
+        '单晶炉': {'source_term': '单晶炉', 'target_term': 'CZ furnace', 'definition': 'CZ furnace'},
+        '单晶': {'source_term': '单晶', 'target_term': 'monocrystal', 'definition': 'monocrystal'},
+        '无译文': {'source_term': '无译文', 'target_term': ''},
+    }
+    matched = find_source_terms("单晶炉生产单晶，单晶质量好，无译文", terms, version=1)
+    assert [m['source'] for m in matched] == ['单晶炉', '单晶']
+    assert matched[1]['spans'] == [(5, 7), (8, 10)]
+    print(f"✓ 术语匹配结果: {matched}")
+
+
+def test_incremental_matching():
+    """测试增量匹配与整体匹配结果一致"""
+    import random
+    random.seed(7)
+    alphabet = 'abcde'
+    for _ in range(200):
+        patterns = {''.join(random.choice(alphabet) for _ in range(random.randint(1, 5))) for _ in range(12)}
+        matcher = AhoCorasickMatcher([(p, p) for p in patterns])
+        text = ''.join(random.choice(alphabet) for _ in range(random.randint(0, 60)))
+        incremental = IncrementalTermMatcher(matcher, text)
+        for _ in range(8):
+            # 连续几次编辑合并后一次性增量更新
+            edit = None
+            for _ in range(random.randint(1, 3)):
+                position = random.randint(0, len(text))
+                removed = random.randint(0, min(5, len(text) - position))
+                inserted = ''.join(random.choice(alphabet) for _ in range(random.randint(0, 5)))
+                text = text[:position] + inserted + text[position + removed:]
+                edit = merge_edits(edit, position, removed, len(inserted))
+            assert incremental.update(text, *edit) == matcher.find(text)
+
+    # 编辑信息与文本不一致时整体重新匹配
+    matcher = AhoCorasickMatcher([('单晶', 1)])
+    incremental = IncrementalTermMatcher(matcher, "单晶炉")
+    assert incremental.update("单晶炉和单晶", 0, 0, 1) == [(0, 2, 1), (4, 6, 1)]
+    print("✓ 增量匹配结果与整体匹配一致")
+
+
+if __name__ == "__main__":
+    test_leftmost_longest()
+    test_case_insensitive_and_cache()
+    test_find_source_terms()
+    test_incremental_matching()
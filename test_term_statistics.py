@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试增量维护的术语库统计
+"""
+
+from datetime import datetime, timedelta
+
+from core.term_statistics import TermStatistics
+
+
+def _term(added_time, category='', source_lang='zh', target_lang='en', updated_time=None):
+    metadata = {'source_lang': source_lang, 'target_lang': target_lang,
+                'added_time': added_time, 'category': category}
+    if updated_time:
+        metadata['updated_time'] = updated_time
+    return {'target_term': 'x', 'metadata': metadata}
+
+
+def test_snapshot_matches_full_scan():
+    """测试统计结果与遍历计算一致"""
+    print("测试术语库统计")
+    print("=" * 40)
+
+    now = datetime.now()
+    terms = {
+        '引晶': _term((now - timedelta(days=1)).isoformat(), '拉晶'),
+        '放肩': _term((now - timedelta(days=30)).isoformat(), '拉晶', updated_time='2099-01-01T00:00:00'),
+        'Neck': _term((now - timedelta(hours=2)).isoformat(), '', 'en', 'zh'),
+        '旧格式': 'legacy definition',
+    }
+    stats = TermStatistics()
+    stats.rebuild(terms, term_version=1)
+
+    snapshot = stats.snapshot()
+    assert snapshot['total_terms'] == 4
+    assert snapshot['language_pairs'] == {'zh-en': 2, 'en-zh': 1}
+    assert snapshot['categories'] == {'拉晶': 2, '未分类': 1}
+    assert snapshot['recent_additions'] == 2
+    assert snapshot['last_updated'] == '2099-01-01T00:00:00'
+    assert stats.list_categories() == ['拉晶']
+    assert stats.verify(terms) == {}
+    print(f"✓ 统计结果: {snapshot}")
+
+
+def test_incremental_updates_and_verify():
+    """测试增量更新和漂移校验"""
+    now = datetime.now().isoformat()
+    terms = {'引晶': _term(now, '拉晶')}
+    stats = TermStatistics()
+    stats.rebuild(terms, term_version=1)
+
+    terms['放肩'] = _term(now, '热场')
+    stats.on_term_changed('add', '放肩', terms['放肩'], 2)
+    terms['引晶'] = _term(now, '热场', updated_time='2099-01-01T00:00:00')
+    stats.on_term_changed('update', '引晶', terms['引晶'], 3)
+    assert stats.snapshot()['categories'] == {'热场': 2}
+    assert stats.snapshot()['last_updated'] == '2099-01-01T00:00:00'
+
+    del terms['引晶']
+    stats.on_term_changed('delete', '引晶', None, 4)
+    assert stats.snapshot()['last_updated'] == now
+    assert stats.verify(terms) == {}
+
+    # 绕过通知直接修改术语数据后能检测到漂移并重建
+    terms['新术语'] = _term(now, '热场')
+    drift = stats.verify(terms)
+    assert 'total_terms' in drift and 'categories' in drift
+    stats.rebuild(terms, term_version=5)
+    assert stats.verify(terms) == {}
+    print("✓ 增量更新和漂移校验正常")
+
+
+if __name__ == "__main__":
+    test_snapshot_matches_full_scan()
+    test_incremental_updates_and_verify()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试翻译记忆库
+"""
+
+import os
+import sqlite3
+import tempfile
+
+from core.translation_memory import (ANY, NO_TERMS, TranslationMemory, normalize_segment, patch_variables,
+                                     term_fingerprint)
+
+
+def test_exact_match_tiers():
+    """测试内存命中、数据库命中和按术语指纹/模型区分"""
+    print("测试翻译记忆库")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'tm', 'tm.db')
+        fingerprint = term_fingerprint([{'source': '引晶', 'target': 'Neck'}])
+        memory = TranslationMemory(db_path, max_memory_entries=10)
+        assert memory.store('引晶  功率过高', 'Neck power too high', 'zh', 'en', fingerprint, 'qwen|a')
+
+        hit = memory.lookup('引晶 功率过高', 'zh', 'en', fingerprint, 'qwen|a')
+        assert hit == {'target_text': 'Neck power too high', 'origin': 'mt'}
+        assert memory.memory_hits == 1
+        print("✓ 规范化原文后内存命中")
+
+        # 术语译文变化、模型变化或未使用术语库时不命中
+        changed = term_fingerprint([{'source': '引晶', 'target': 'Necking'}])
+        assert memory.lookup('引晶 功率过高', 'zh', 'en', changed, 'qwen|a') is None
+        assert memory.lookup('引晶 功率过高', 'zh', 'en', fingerprint, 'qwen|b') is None
+        assert memory.lookup('引晶 功率过高', 'zh', 'en', NO_TERMS, 'qwen|a') is None
+        print("✓ 术语指纹和模型不同时不命中")
+        memory.close()
+
+        # 重启后从数据库命中
+        memory = TranslationMemory(db_path, max_memory_entries=10)
+        assert memory.lookup('引晶 功率过高', 'zh', 'en', fingerprint, 'qwen|a')['target_text'] == 'Neck power too high'
+        assert memory.lookup('引晶 功率过高', 'zh', 'en', fingerprint, 'qwen|a') is not None
+        stats = memory.get_stats()
+        assert stats['db_hits'] == 1 and stats['memory_hits'] == 1 and stats['entries'] == 1
+        assert stats['hit_rate'] == 1.0
+        print("✓ 重启后数据库命中并写入内存缓存")
+
+        memory.clear()
+        assert memory.count() == 0 and memory.lookup('引晶 功率过高', 'zh', 'en', fingerprint, 'qwen|a') is None
+        memory.close()
+
+
+def test_fingerprint():
+    """测试术语指纹与匹配顺序无关"""
+    a = [{'source': '引晶', 'target': 'Neck'}, {'source': '放肩', 'target': 'Shoulder'}]
+    assert term_fingerprint(a) == term_fingerprint(list(reversed(a)))
+    assert term_fingerprint(None) == NO_TERMS
+    assert term_fingerprint([]) == ''
+    assert normalize_segment('ＡＢＣ\t 1') == 'ABC 1'
+    print("✓ 术语指纹稳定")
+
+
+def test_tmx_round_trip():
+    """测试 TMX 导入导出，人工译文优先于机器译文"""
+    tmx = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<tmx version="1.4"><header srclang="zh-CN" datatype="plaintext" segtype="sentence"/>'
+           '<body>'
+           '<tu><tuv xml:lang="zh-CN"><seg>放肩完成</seg></tuv><tuv xml:lang="en-US"><seg>Shoulder &amp; done</seg></tuv></tu>'
+           '<tu><tuv xml:lang="zh-CN"><seg>只有原文</seg></tuv></tu>'
+           '</body></tmx>')
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = TranslationMemory(os.path.join(tmp, 'tm.db'))
+        memory.store('放肩完成', 'Shoulder finished', 'zh', 'en', NO_TERMS, 'qwen|a')
+        assert memory.lookup('放肩完成', 'zh', 'en', NO_TERMS, 'qwen|a')['origin'] == 'mt'
+
+        tmx_path = os.path.join(tmp, 'in.tmx')
+        with open(tmx_path, 'w', encoding='utf-8') as f:
+            f.write(tmx)
+        assert memory.import_tmx(tmx_path) == {'imported': 1, 'skipped': 1}
+        hit = memory.lookup('放肩完成', 'zh', 'en', NO_TERMS, 'qwen|a')
+        assert hit == {'target_text': 'Shoulder & done', 'origin': 'tmx'}
+        print("✓ 导入的人工译文优先")
+
+        out_path = os.path.join(tmp, 'out.tmx')
+        assert memory.export_tmx(out_path) == 1
+
+        other = TranslationMemory(os.path.join(tmp, 'other.db'))
+        assert other.import_tmx(out_path)['imported'] == 1
+        assert other.lookup('放肩完成', 'zh', 'en', 'abc', 'any-model')['target_text'] == 'Shoulder & done'
+        print("✓ TMX 导出后可重新导入")
+        memory.close()
+        other.close()
+
+        assert ANY == '*'
+
+
+def test_patch_variables():
+    """测试只有数字/占位符不同时直接替换"""
+    assert patch_variables('温度 1450 超过 1420', 'Temperature 1450 exceeds 1420', '温度 1460 超过 1420') == \
+        'Temperature 1460 exceeds 1420'
+    assert patch_variables('[T1] 第 3 步', 'Step 3 of [T1]', '[T2] 第 4 步') == 'Step 4 of [T2]'
+    assert patch_variables('压力 {0} 巴', 'Pressure {0} bar', '压力 {1} 巴') == 'Pressure {1} bar'
+    # 同一旧值对应不同新值、译文改写了数字、文字不同时不替换
+    assert patch_variables('3 台泵 3 巴', '3 pumps at 3 bar', '5 台泵 3 巴') is None
+    assert patch_variables('第 3 步', 'Third step', '第 4 步') is None
+    assert patch_variables('温度 1450', 'Temperature 1450', '压力 1450') is None
+    print("✓ 数字/占位符替换正确")
+
+
+class FakeEncoder:
+    """按字符集合生成向量的简易编码器"""
+
+    def encode_text(self, text):
+        return [float(char in text) for char in '引晶放肩功率温度过高低']
+
+
+def test_pattern_and_fuzzy_match():
+    """测试数字替换命中和相似译文示例"""
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = TranslationMemory(os.path.join(tmp, 'tm.db'), fuzzy_threshold=0.8)
+        memory.store('引晶功率 35 kW 过高', 'Neck power 35 kW too high', 'zh', 'en', NO_TERMS, 'm')
+
+        hit, examples = memory.match('引晶功率 38 kW 过高', 'zh', 'en', NO_TERMS, 'm')
+        assert hit == {'target_text': 'Neck power 38 kW too high', 'origin': 'mt',
+                       'reference': '引晶功率 35 kW 过高', 'match': 'pattern'}
+        assert examples == [] and memory.pattern_hits == 1
+        assert memory.match('引晶功率 38 kW 过高', 'zh', 'en', NO_TERMS, 'other')[0] is None
+        print("✓ 数字不同的句子直接替换")
+
+        if not memory.set_encoder(FakeEncoder()):
+            print("跳过相似译文检索测试（缺少 numpy）")
+            return
+        memory.index_missing()
+        hit, examples = memory.match('引晶功率偏高', 'zh', 'en', NO_TERMS, 'other')
+        assert hit is None
+        assert examples and examples[0]['target_text'] == 'Neck power 35 kW too high'
+        assert memory.find_similar('放肩温度低', 'zh', 'en') == []
+        assert memory.get_stats()['fuzzy_hits'] == 1
+        print("✓ 相似译文作为示例")
+        memory.close()
+
+
+def test_schema_migration():
+    """测试旧版本数据库补充 pattern_key 列"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'tm.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE segments (
+                source_key TEXT NOT NULL, source_lang TEXT NOT NULL, target_lang TEXT NOT NULL,
+                term_fingerprint TEXT NOT NULL, model_id TEXT NOT NULL, source_text TEXT NOT NULL,
+                target_text TEXT NOT NULL, origin TEXT NOT NULL DEFAULT 'mt', updated_at REAL,
+                PRIMARY KEY (source_key, source_lang, target_lang, term_fingerprint, model_id))
+        """)
+        conn.execute("INSERT INTO segments VALUES ('报警 12', 'zh', 'en', '-', 'm', '报警 12', 'Alarm 12', 'mt', 1)")
+        conn.commit()
+        conn.close()
+
+        memory = TranslationMemory(db_path)
+        assert memory.match('报警 13', 'zh', 'en', NO_TERMS, 'm')[0]['target_text'] == 'Alarm 13'
+        print("✓ 旧版本数据库迁移正确")
+        memory.close()
+
+
+if __name__ == "__main__":
+    test_exact_match_tiers()
+    test_fingerprint()
+    test_tmx_round_trip()
+    test_patch_variables()
+    test_pattern_and_fuzzy_match()
+    test_schema_migration()
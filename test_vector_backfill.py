@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试可断点续跑的向量补建任务
+"""
+
+import os
+import tempfile
+
+from core.vector_backfill import VectorBackfillJob
+
+
+def _make_job(items, checkpoint_path, fail_on_save=None):
+    saves = {'count': 0}
+
+    def store(encoded):
+        for key, _, vector in encoded:
+            items[key]['vector_id'] = f"v_{key}"
+        return [key for key, _, _ in encoded]
+
+    def save():
+        saves['count'] += 1
+        if fail_on_save is not None and saves['count'] == fail_on_save:
+            return False
+        return True
+
+    return VectorBackfillJob(
+        '测试',
+        checkpoint_path,
+        list_keys=lambda: list(items.keys()),
+        load_text=lambda key: None if key not in items or items[key]['vector_id'] else items[key]['content'],
+        store_vectors=store,
+        encode_texts=lambda texts: [[float(len(t))] for t in texts],
+        save=save,
+        batch_size=4
+    )
+
+
+def test_backfill_resume_after_failure():
+    """测试中途失败后从检查点继续"""
+    print("测试向量补建断点续跑")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = os.path.join(tmp, 'backfill.json')
+        items = {f"item_{i}": {'content': f"内容{i}", 'vector_id': None} for i in range(10)}
+        items['item_0']['vector_id'] = 'v_existing'
+
+        # 第二批保存失败，模拟进程中途退出
+        job = _make_job(items, checkpoint, fail_on_save=2)
+        assert job.run() is False
+        progress = job.get_progress()
+        assert progress['vectorized'] == 4
+        assert progress['pending'] == 5
+        print(f"✓ 第一次运行中断: {progress}")
+
+        # 重启后从检查点继续，不再全量扫描
+        resumed = _make_job(items, checkpoint)
+        assert resumed.seeded and len(resumed.dirty) == 5
+        assert resumed.run() is True
+        assert all(item['vector_id'] for item in items.values())
+        assert resumed.get_progress()['pending'] == 0
+        print(f"✓ 重启后继续完成: {resumed.get_progress()}")
+
+
+def test_backfill_mark_dirty_background():
+    """测试变更登记和后台运行"""
+    with tempfile.TemporaryDirectory() as tmp:
+        items = {'a': {'content': '术语A', 'vector_id': 'v_a'}}
+        job = _make_job(items, os.path.join(tmp, 'backfill.json'))
+        job.run()
+
+        items['b'] = {'content': '术语B', 'vector_id': None}
+        job.mark_dirty('b')
+        job.flush()
+        assert job.start() is True
+        job.wait(5)
+        assert items['b']['vector_id'] == 'v_b'
+        assert job.get_progress()['vectorized'] == 1
+        print("✓ 登记的条目在后台补建完成")
+
+
+if __name__ == "__main__":
+    test_backfill_resume_after_failure()
+    test_backfill_mark_dirty_background()
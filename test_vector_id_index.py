@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试向量ID→术语反向索引
+"""
+
+import os
+import tempfile
+
+from core.term_base import TermBase
+from core.vector_id_index import VectorIdIndex
+
+
+class FakeVectorDB:
+    """按预设顺序返回检索结果的简易向量库"""
+
+    def __init__(self):
+        self.model = None
+        self.added = []
+        self.hits = []
+
+    def encode_texts(self, texts):
+        return [[1.0, 0.0] for _ in texts]
+
+    def add(self, text, vector, metadata=None):
+        self.added.append(text)
+        return f"vec-{len(self.added)}"
+
+    def delete(self, vector_id):
+        return True
+
+    def check_model_ready(self):
+        return True
+
+    def encode_text(self, text):
+        return [1.0, 0.0]
+
+    def search(self, query, top_k=15, min_similarity=0.3):
+        return [{'vector_id': vector_id, 'content': '', 'similarity': 0.9, 'metadata': {}}
+                for vector_id in self.hits[:top_k]]
+
+    def save(self):
+        return True
+
+
+def test_incremental_updates():
+    """测试增删改后映射保持一致"""
+    print("测试向量ID反向索引")
+    print("=" * 40)
+
+    terms = {
+        '引晶': {'target_term': 'Neck', 'vector_id': 'v1'},
+        '放肩': {'target_term': 'Shoulder', 'vector_id': None},
+        '旧格式': 'legacy definition',
+    }
+    index = VectorIdIndex()
+    index.rebuild(terms, term_version=1)
+    assert len(index) == 1
+    assert index.resolve(['v1', 'v2'], terms) == ['引晶']
+
+    terms['放肩'] = {'target_term': 'Shouldering', 'vector_id': 'v2'}
+    index.on_term_changed('update', '放肩', terms['放肩'], 2)
+    assert index.resolve(['v2', 'v1', 'v2'], terms) == ['放肩', '引晶']
+
+    del terms['引晶']
+    index.on_term_changed('delete', '引晶', None, 3)
+    assert index.get_term('v1') is None
+    assert index.resolve(['v1'], terms) == []
+
+    # 映射未及时更新时按术语数据校验，不返回错误的术语
+    terms['放肩'] = {'target_term': 'Shouldering', 'vector_id': 'v9'}
+    assert index.resolve(['v2'], terms) == []
+    print("✓ 增量更新与失效校验正确")
+
+
+def test_term_base_resolution():
+    """测试 TermBase 生成向量后检索结果可以直接解析"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            vector_db = FakeVectorDB()
+            term_base = TermBase(vector_db, {})
+            vector_db.model = object()
+            term_base.get_vector_id_index()
+
+            with term_base.bulk():
+                for source, target in [('引晶', 'Neck'), ('放肩', 'Shoulder'), ('等径', 'Body')]:
+                    assert term_base.add_term(source, target)
+            assert term_base.terms['放肩']['vector_id'] == 'vec-2'
+
+            vector_db.hits = ['vec-3', 'missing', 'vec-1']
+            assert term_base.resolve_vector_ids(vector_db.hits) == ['等径', '引晶']
+            vector_db.hits = ['vec-3', 'vec-1']
+            assert term_base.search('晶体', top_k=2) == ['等径', '引晶']
+
+            term_base.delete_term('等径')
+            assert term_base.resolve_vector_ids(vector_db.hits) == ['引晶']
+            print("✓ TermBase 向量检索结果解析正确")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    test_incremental_updates()
+    test_term_base_resolution()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试归一化向量矩阵检索
+"""
+
+import numpy as np
+
+from core.vector_matrix import VectorMatrix
+
+
+def test_search_matches_brute_force():
+    """测试矩阵检索结果与逐个计算余弦相似度一致"""
+    print("测试向量矩阵检索")
+    print("=" * 40)
+
+    rng = np.random.default_rng(0)
+    vectors = {f"v{i}": rng.normal(size=16) for i in range(300)}
+    matrix = VectorMatrix()
+    for vector_id, vector in vectors.items():
+        assert matrix.add(vector_id, vector)
+    assert len(matrix) == 300
+
+    query = rng.normal(size=16)
+
+    def brute_force(candidates):
+        scores = {vector_id: float(np.dot(query, vector) / (np.linalg.norm(query) * np.linalg.norm(vector)))
+                  for vector_id, vector in candidates.items()}
+        return sorted(scores, key=scores.get, reverse=True)
+
+    results = matrix.search(query, top_k=10)
+    assert [vector_id for vector_id, _ in results] == brute_force(vectors)[:10]
+    print("✓ 前 k 个结果与逐个计算一致")
+
+    # 删除大部分向量后空位不会出现在结果中，并触发压缩
+    for i in range(0, 250):
+        matrix.remove(f"v{i}")
+        del vectors[f"v{i}"]
+    results = matrix.search(query, top_k=10)
+    assert [vector_id for vector_id, _ in results] == brute_force(vectors)[:10]
+    assert len(matrix) == 50
+    print("✓ 删除与压缩后结果正确")
+
+
+def test_threshold_and_dimension():
+    """测试相似度下限、替换和维度检查"""
+    matrix = VectorMatrix()
+    assert matrix.add('a', [1.0, 0.0])
+    assert matrix.add('b', [0.0, 1.0])
+    assert not matrix.add('c', [1.0, 0.0, 0.0])
+    assert not matrix.add('zero', [0.0, 0.0])
+
+    results = matrix.search([1.0, 0.1], top_k=5, min_similarity=0.5)
+    assert [vector_id for vector_id, _ in results] == ['a']
+
+    matrix.add('b', [1.0, 0.2])
+    results = matrix.search([1.0, 0.2], top_k=1)
+    assert results[0][0] == 'b' and abs(results[0][1] - 1.0) < 1e-6
+    assert matrix.search([1.0, 0.0, 0.0]) == []
+    print("✓ 相似度下限、替换和维度检查正确")
+
+
+if __name__ == "__main__":
+    test_search_matches_brute_force()
+    test_threshold_and_dimension()
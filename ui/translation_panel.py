@@ -4,6 +4,18 @@ from PySide6.QtCore import Qt, Slot
 import threading
 from PySide6.QtCore import QMetaObject, Q_ARG
 from PySide6.QtCore import QTimer
+from PySide6.QtGui import QColor, QTextCursor
+
+from core.term_matcher import (IncrementalTermMatcher, group_matches, iter_source_term_patterns,
+                               matcher_cache, merge_edits)
+
+# 输入停顿多久后刷新术语（毫秒）
+TERM_REFRESH_DELAY_MS = 150
+# 超过该长度的编辑（如大段粘贴）改为后台整体匹配
+INCREMENTAL_EDIT_LIMIT = 20000
+# 原文中最多高亮的术语数
+MAX_HIGHLIGHTS = 2000
+TERM_HIGHLIGHT_COLOR = "#fff2a8"
 
 class TranslationPanel(QWidget):
     """翻译面板"""
@@ -37,8 +49,8 @@ class TranslationPanel(QWidget):
         # 原文输入区域
         layout.addWidget(QLabel(self.i18n.translate("source_text")))
         self.source_text = QTextEdit()
-        # 添加文本变化监听，自动刷新术语
-        self.source_text.textChanged.connect(self.on_source_text_changed)
+        # 监听文本编辑区域，增量刷新术语
+        self.source_text.document().contentsChange.connect(self.on_source_contents_change)
         layout.addWidget(self.source_text)
         
         # 添加术语关键词展示区域
@@ -48,7 +60,7 @@ class TranslationPanel(QWidget):
         
         # 添加刷新按钮
         self.term_refresh_button = QPushButton("刷新术语")
-        self.term_refresh_button.clicked.connect(self.refresh_matched_terms)
+        self.term_refresh_button.clicked.connect(lambda: self.refresh_matched_terms(force=True))
         term_header.addWidget(self.term_refresh_button)
         
         term_layout.addLayout(term_header)
@@ -106,146 +118,135 @@ class TranslationPanel(QWidget):
         self.term_refresh_timer.setSingleShot(True)
         self.term_refresh_timer.timeout.connect(self.refresh_matched_terms)
         self.is_text_changed = False
+        # 增量匹配状态：合并后的待处理编辑、上次的匹配结果、刷新代数（用于丢弃过期结果）
+        self._pending_edit = None
+        self._term_state = None
+        self._term_generation = 0
+        self.matched_terms = []
         
         self.setLayout(layout)
     
-    def on_source_text_changed(self):
-        """文本变化时自动刷新术语"""
+    def on_source_contents_change(self, position, chars_removed, chars_added):
+        """文本变化时记录编辑区域，防抖后增量刷新术语"""
         # 设置标志为已变化
         self.is_text_changed = True
-        # 取消之前未执行的定时器（如果有）
-        if self.term_refresh_timer.isActive():
-            self.term_refresh_timer.stop()
-        # 启动定时器，延迟1秒刷新术语，避免用户快速输入时频繁刷新
-        self.term_refresh_timer.start(1000)  
-    
-    def refresh_matched_terms(self):
-        """刷新匹配到的术语"""
-        # 如果文本未变化，则不执行刷新
-        if hasattr(self, 'is_text_changed') and not self.is_text_changed:
+        self._pending_edit = merge_edits(self._pending_edit, position, chars_removed, chars_added)
+        # 重新计时：连续输入时只在停顿后刷新一次
+        self.term_refresh_timer.start(TERM_REFRESH_DELAY_MS)
+
+    def _get_match_terms(self):
+        """获取用于匹配的术语库及其版本号"""
+        translator = self.assistant.translator
+        term_loader = getattr(translator, 'term_loader', None)
+        if term_loader is not None and getattr(term_loader, 'terms', None):
+            return term_loader.terms, getattr(term_loader, 'version', None)
+        if getattr(translator, 'terms', None):
+            return translator.terms, None
+        # 尝试从AI引擎获取术语库
+        ai_engine = self.assistant.ai_engine
+        return getattr(ai_engine, 'terms', None) or {}, None
+
+    def refresh_matched_terms(self, force=False):
+        """
+        刷新匹配到的术语
+
+        匹配自动机已缓存时只重新扫描编辑区域附近的文本，在界面线程内完成；
+        首次匹配、术语库变化或大段粘贴时在后台线程整体匹配，过期的结果直接丢弃。
+        """
+        self.term_refresh_timer.stop()
+        edit, self._pending_edit = self._pending_edit, None
+        # 新一轮刷新开始，之前尚未完成的后台匹配全部作废
+        self._term_generation += 1
+        generation = self._term_generation
+
+        source_text = self.source_text.toPlainText()
+        terms, version = self._get_match_terms()
+        if not source_text.strip() or not terms:
+            self._term_state = None
+            self._show_matched_terms([], terms)
             return
-        
-        # 重置变化标志
+
+        state = self._term_state
+        matcher = matcher_cache.peek(terms, 'source', version=version)
+        if (not force and state is not None and edit is not None and matcher is state.matcher
+                and edit[1] + edit[2] <= INCREMENTAL_EDIT_LIMIT and state.can_update(source_text, *edit)):
+            try:
+                self._show_matched_terms(state.update(source_text, *edit), terms)
+                return
+            except Exception as e:
+                print(f"[WARNING] 增量术语匹配失败，改为整体匹配: {e}")
+
+        self._term_state = None
+        self.term_display.setText("正在匹配术语...")
+
+        class TermMatchThread(threading.Thread):
+            def __init__(self):
+                super().__init__()
+                self.daemon = True
+                self.state = None
+                self.error = None
+
+            def run(self):
+                try:
+                    matcher = matcher_cache.get(terms, 'source', iter_source_term_patterns, version=version)
+                    self.state = IncrementalTermMatcher(matcher, source_text)
+                except Exception as e:
+                    self.error = str(e)
+                    import traceback
+                    traceback.print_exc()
+
+        term_thread = TermMatchThread()
+        term_thread.start()
+
+        # 使用计时器定期检查线程是否完成
+        def check_term_thread():
+            if term_thread.is_alive():
+                return
+            timer.stop()
+            if generation != self._term_generation:
+                # 匹配期间又有新的刷新，结果已过期
+                return
+            if term_thread.error:
+                self.term_display.setText(f"术语匹配出错：{term_thread.error}")
+                return
+            self._term_state = term_thread.state
+            if self._pending_edit is not None:
+                # 匹配期间文本又有编辑，立即按增量方式补上
+                self.refresh_matched_terms()
+            else:
+                self._show_matched_terms(term_thread.state.matches, terms)
+
+        timer = QTimer(self)
+        timer.timeout.connect(check_term_thread)
+        timer.start(50)
+
+    def _show_matched_terms(self, matches, terms):
+        """高亮原文中的术语并展示匹配列表，保存匹配结果供翻译使用"""
+        self.matched_terms = group_matches(matches, lambda term_key: terms.get(term_key)) if matches else []
         self.is_text_changed = False
-        
-        source_text = self.source_text.toPlainText()
-        if not source_text.strip():
+
+        # 在原文中高亮术语（数量过多时只高亮前一部分）
+        selections = []
+        for start, end, _ in matches[:MAX_HIGHLIGHTS]:
+            selection = QTextEdit.ExtraSelection()
+            selection.format.setBackground(QColor(TERM_HIGHLIGHT_COLOR))
+            cursor = self.source_text.textCursor()
+            cursor.setPosition(start)
+            cursor.setPosition(end, QTextCursor.KeepAnchor)
+            selection.cursor = cursor
+            selections.append(selection)
+        self.source_text.setExtraSelections(selections)
+
+        if not self.source_text.toPlainText().strip():
             self.term_display.setText("")
-            return
-        
-        # 获取源语言和目标语言
-        source_lang = self.source_lang.currentText()
-        target_lang = self.target_lang.currentText()
-        
-        # 规范化语言代码
-        if source_lang == "自动检测":
-            source_lang = None
-        elif source_lang == "中文":
-            source_lang = "zh"
-        elif source_lang == "英文":
-            source_lang = "en"
-        
-        if target_lang == "中文":
-            target_lang = "zh"
-        elif target_lang == "英文":
-            target_lang = "en"
-        
-        try:
-            # 显示进度
-            self.term_display.setText("正在匹配术语...")
-            
-            # 创建术语匹配线程
-            class TermMatchThread(threading.Thread):
-                def __init__(self, parent):
-                    super().__init__()
-                    self.parent = parent
-                    self.daemon = True
-                    self.matched_terms = []
-                    self.error = None
-                    
-                def run(self):
-                    try:
-                        # 直接从translator获取术语匹配结果
-                        translator = self.parent.assistant.translator
-                        
-                        # 优先使用translator中的方法
-                        if hasattr(translator, '_find_matching_terms_in_text'):
-                            # 获取术语库
-                            terms = {}
-                            if hasattr(translator, 'term_loader') and translator.term_loader:
-                                if hasattr(translator.term_loader, 'terms'):
-                                    terms = translator.term_loader.terms
-                            elif hasattr(translator, 'terms'):
-                                terms = translator.terms
-                            
-                            # 确保术语库不为空
-                            if terms:
-                                self.matched_terms = translator._find_matching_terms_in_text(
-                                    source_text, terms, source_lang, target_lang
-                                )
-                            else:
-                                # 尝试从AI引擎获取术语库
-                                ai_engine = self.parent.assistant.ai_engine
-                                if hasattr(ai_engine, 'terms') and ai_engine.terms:
-                                    terms = ai_engine.terms
-                                    
-                                    # 使用translator或engine的匹配方法
-                                    if hasattr(translator, '_find_matching_terms_in_text'):
-                                        self.matched_terms = translator._find_matching_terms_in_text(
-                                            source_text, terms, source_lang, target_lang
-                                        )
-                                    elif hasattr(ai_engine, '_find_matching_terms_in_text'):
-                                        match_result = ai_engine._find_matching_terms_in_text(
-                                            source_text, terms, source_lang, target_lang
-                                        )
-                                        
-                                        # 处理可能的不同返回格式
-                                        if isinstance(match_result, list):
-                                            self.matched_terms = match_result
-                                        elif isinstance(match_result, dict) and 'matched_terms' in match_result:
-                                            # 旧格式返回字典，需要转换
-                                            matched_dict = match_result['matched_terms']
-                                            for term, info in matched_dict.items():
-                                                term_info = info['term_info']
-                                                self.matched_terms.append({
-                                                    'source': term_info.get('source_term', term),
-                                                    'target': term_info.get('target_term', ''),
-                                                    'definition': term_info.get('definition', '')
-                                                })
-                    except Exception as e:
-                        self.error = str(e)
-                        import traceback
-                        traceback.print_exc()
-            
-            # 启动术语匹配线程
-            term_thread = TermMatchThread(self)
-            term_thread.start()
-            
-            # 使用计时器定期检查线程是否完成
-            def check_term_thread():
-                if not term_thread.is_alive():
-                    # 线程已完成
-                    if term_thread.error:
-                        self.term_display.setText(f"术语匹配出错：{term_thread.error}")
-                    elif not term_thread.matched_terms:
-                        self.term_display.setText("未匹配到术语")
-                    else:
-                        # 格式化显示匹配到的术语
-                        term_text = "匹配到的术语关键词：\n"
-                        for term in term_thread.matched_terms:
-                            term_text += f"• {term['source']} => {term['target']}\n"
-                        self.term_display.setText(term_text)
-                        
-                        # 保存匹配到的术语，供翻译使用
-                        self.matched_terms = term_thread.matched_terms
-                    timer.stop()
-            
-            timer = QTimer()
-            timer.timeout.connect(check_term_thread)
-            timer.start(100)  # 每100毫秒检查一次
-            
-        except Exception as e:
-            self.term_display.setText(f"刷新术语出错：{str(e)}")
+        elif not self.matched_terms:
+            self.term_display.setText("未匹配到术语")
+        else:
+            # 格式化显示匹配到的术语
+            term_text = "匹配到的术语关键词：\n"
+            for term in self.matched_terms:
+                term_text += f"• {term['source']} => {term['target']}\n"
+            self.term_display.setText(term_text)
     
     def translate_text(self):
         """翻译文本"""
@@ -412,243 +413,3 @@ class TranslationPanel(QWidget):
         """翻译完成后更新UI状态"""
         self.progress_bar.setVisible(False)
         self.translate_button.setEnabled(True)
-
-    def on_source_text_changed(self):
-        """文本变化时自动刷新术语"""
-        # 设置标志为已变化
-        self.is_text_changed = True
-        # 取消之前未执行的定时器（如果有）
-        if self.term_refresh_timer.isActive():
-            self.term_refresh_timer.stop()
-        # 启动定时器，延迟1秒刷新术语，避免用户快速输入时频繁刷新
-        self.term_refresh_timer.start(1000)  
-
-    def refresh_matched_terms(self):
-        """刷新匹配到的术语"""
-        # 如果文本未变化，则不执行刷新
-        if hasattr(self, 'is_text_changed') and not self.is_text_changed:
-            return
-        
-        # 重置变化标志
-        self.is_text_changed = False
-        
-        source_text = self.source_text.toPlainText()
-        if not source_text.strip():
-            self.term_display.setText("")
-            return
-        
-        # 获取源语言和目标语言
-        source_lang = self.source_lang.currentText()
-        target_lang = self.target_lang.currentText()
-        
-        # 规范化语言代码
-        if source_lang == "自动检测":
-            source_lang = None
-        elif source_lang == "中文":
-            source_lang = "zh"
-        elif source_lang == "英文":
-            source_lang = "en"
-        
-        if target_lang == "中文":
-            target_lang = "zh"
-        elif target_lang == "英文":
-            target_lang = "en"
-        
-        try:
-            # 显示进度
-            self.term_display.setText("正在匹配术语...")
-            
-            # 创建术语匹配线程
-            class TermMatchThread(threading.Thread):
-                def __init__(self, parent):
-                    super().__init__()
-                    self.parent = parent
-                    self.daemon = True
-                    self.matched_terms = []
-                    self.error = None
-                    
-                def run(self):
-                    try:
-                        # 直接从translator获取术语匹配结果
-                        translator = self.parent.assistant.translator
-                        
-                        # 优先使用translator中的方法
-                        if hasattr(translator, '_find_matching_terms_in_text'):
-                            # 获取术语库
-                            terms = {}
-                            if hasattr(translator, 'term_loader') and translator.term_loader:
-                                if hasattr(translator.term_loader, 'terms'):
-                                    terms = translator.term_loader.terms
-                            elif hasattr(translator, 'terms'):
-                                terms = translator.terms
-                            
-                            # 确保术语库不为空
-                            if terms:
-                                self.matched_terms = translator._find_matching_terms_in_text(
-                                    source_text, terms, source_lang, target_lang
-                                )
-                            else:
-                                # 尝试从AI引擎获取术语库
-                                ai_engine = self.parent.assistant.ai_engine
-                                if hasattr(ai_engine, 'terms') and ai_engine.terms:
-                                    terms = ai_engine.terms
-                                    
-                                    # 使用translator或engine的匹配方法
-                                    if hasattr(translator, '_find_matching_terms_in_text'):
-                                        self.matched_terms = translator._find_matching_terms_in_text(
-                                            source_text, terms, source_lang, target_lang
-                                        )
-                                    elif hasattr(ai_engine, '_find_matching_terms_in_text'):
-                                        match_result = ai_engine._find_matching_terms_in_text(
-                                            source_text, terms, source_lang, target_lang
-                                        )
-                                        
-                                        # 处理可能的不同返回格式
-                                        if isinstance(match_result, list):
-                                            self.matched_terms = match_result
-                                        elif isinstance(match_result, dict) and 'matched_terms' in match_result:
-                                            # 旧格式返回字典，需要转换
-                                            matched_dict = match_result['matched_terms']
-                                            for term, info in matched_dict.items():
-                                                term_info = info['term_info']
-                                                self.matched_terms.append({
-                                                    'source': term_info.get('source_term', term),
-                                                    'target': term_info.get('target_term', ''),
-                                                    'definition': term_info.get('definition', '')
-                                                })
-                    except Exception as e:
-                        self.error = str(e)
-                        import traceback
-                        traceback.print_exc()
-            
-            # 启动术语匹配线程
-            term_thread = TermMatchThread(self)
-            term_thread.start()
-            
-            # 使用计时器定期检查线程是否完成
-            def check_term_thread():
-                if not term_thread.is_alive():
-                    # 线程已完成
-                    if term_thread.error:
-                        self.term_display.setText(f"术语匹配出错：{term_thread.error}")
-                    elif not term_thread.matched_terms:
-                        self.term_display.setText("未匹配到术语")
-                    else:
-                        # 格式化显示匹配到的术语
-                        term_text = "匹配到的术语关键词：\n"
-                        for term in term_thread.matched_terms:
-                            term_text += f"• {term['source']} => {term['target']}\n"
-                        self.term_display.setText(term_text)
-                        
-                        # 保存匹配到的术语，供翻译使用
-                        self.matched_terms = term_thread.matched_terms
-                    timer.stop()
-            
-            timer = QTimer()
-            timer.timeout.connect(check_term_thread)
-            timer.start(100)  # 每100毫秒检查一次
-            
-        except Exception as e:
-            self.term_display.setText(f"刷新术语出错：{str(e)}")
-
-    def translate_text(self):
-        """翻译文本"""
-        source_text = self.source_text.toPlainText()
-        if not source_text.strip():
-            return
-        
-        # 获取源语言和目标语言
-        source_lang = self.source_lang.currentText()
-        target_lang = self.target_lang.currentText()
-        
-        # 规范化语言代码
-        if source_lang == "自动检测":
-            source_lang = None
-        elif source_lang == "中文":
-            source_lang = "zh"
-        elif source_lang == "英文":
-            source_lang = "en"
-        
-        if target_lang == "中文":
-            target_lang = "zh"
-        elif target_lang == "英文":
-            target_lang = "en"
-        
-        # 应用术语库
-        use_terms = self.use_terms.isChecked()
-        force_use_terms = self.force_use_terms.isChecked()
-        
-        # 显示进度条
-        self.progress_bar.setRange(0, 0)  # 不确定进度
-        self.progress_bar.setVisible(True)
-        
-        # 禁用翻译按钮
-        self.translate_button.setEnabled(False)
-        
-        # 确保已刷新术语
-        if not hasattr(self, 'matched_terms') or self.is_text_changed:
-            self.refresh_matched_terms()
-        
-        # 创建翻译线程
-        class TranslationThread(threading.Thread):
-            def __init__(self, parent):
-                super().__init__()
-                self.parent = parent
-                self.daemon = True
-                self.result = None
-                self.error = None
-                
-            def run(self):
-                try:
-                    # 准备术语和选项
-                    matched_terms = getattr(self.parent, 'matched_terms', []) if use_terms else []
-                    
-                    # 构建翻译选项
-                    translation_options = {
-                        'use_termbase': use_terms,
-                        'source_lang': source_lang,
-                        'target_lang': target_lang,
-                        'force_terms': force_use_terms
-                    }
-                    
-                    # 如果启用了强制使用术语选项，则传递匹配到的术语列表
-                    if force_use_terms and matched_terms:
-                        translation_options['matched_terms'] = matched_terms
-                    
-                    # 使用提供的选项进行翻译
-                    self.result = self.parent.assistant.translator.translate(
-                        source_text, 
-                        **translation_options
-                    )
-                except Exception as e:
-                    self.error = str(e)
-                    import traceback
-                    traceback.print_exc()
-        
-        # 启动翻译线程
-        translation_thread = TranslationThread(self)
-        translation_thread.start()
-        
-        # 使用计时器定期检查线程是否完成
-        def check_thread():
-            if not translation_thread.is_alive():
-                # 线程已完成
-                if translation_thread.error:
-                    error_msg = f"翻译错误：{translation_thread.error}"
-                    self.target_text.setText(error_msg)
-                    print(f"翻译失败: {translation_thread.error}")
-                elif not translation_thread.result:
-                    self.target_text.setText("翻译结果为空，可能是AI引擎未正确响应")
-                    print("警告: 翻译结果为空")
-                else:
-                    self.target_text.setText(translation_thread.result)
-                    print(f"翻译成功，生成了 {len(translation_thread.result)} 个字符")
-                    
-                # 恢复UI状态
-                self.progress_bar.setVisible(False)
-                self.translate_button.setEnabled(True)
-                timer.stop()
-        
-        timer = QTimer()
-        timer.timeout.connect(check_thread)
-        timer.start(100)  # 每100毫秒检查一次 
\ No newline at end of file
@@ -6,6 +6,7 @@ import json
 from datetime import datetime
 import uuid
 import time
+from contextlib import contextmanager
 
 # 确保模块路径正确
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -16,6 +17,10 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayo
                               QDialog)
 from PySide6.QtCore import Qt, QTimer, QMetaObject, Q_ARG, Slot
 
+class _ImportFailed(Exception):
+    """导入返回失败结果，用于撤销批量导入中已添加的术语"""
+
+
 class EmergencyTermTool(QMainWindow):
     """术语库应急工具，简单直接地操作数据文件"""
     
@@ -34,6 +39,10 @@ class EmergencyTermTool(QMainWindow):
         self.ensure_dir_exists(self.term_path)
         self.ensure_dir_exists(self.vector_path)
         
+        # 批量导入时推迟保存：嵌套深度和是否有待保存的修改
+        self._bulk_depth = 0
+        self._bulk_dirty = False
+        
         # 加载术语数据
         self.terms = self.load_terms()
         
@@ -66,13 +75,47 @@ class EmergencyTermTool(QMainWindow):
             self.log("术语文件不存在，创建空术语库")
             return {}
     
+    @contextmanager
+    def bulk(self):
+        """
+        批量导入：期间的保存推迟到结束时只写一次
+
+        事务内抛出异常时恢复导入前的术语，不写入文件；最终保存失败时抛出 IOError
+        """
+        outermost = self._bulk_depth == 0
+        if outermost:
+            snapshot = dict(self.terms)
+            self._bulk_dirty = False
+        self._bulk_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._bulk_depth -= 1
+            if outermost:
+                self.terms = snapshot
+                self._bulk_dirty = False
+            raise
+        self._bulk_depth -= 1
+        if outermost and self._bulk_dirty:
+            self._bulk_dirty = False
+            if not self.save_terms():
+                self.terms = snapshot
+                raise IOError("批量导入后保存术语数据失败")
+    
     def save_terms(self):
         """保存术语数据"""
+        if self._bulk_depth:
+            self._bulk_dirty = True
+            return True
+        
         terms_file = os.path.join(self.term_path, 'terms.json')
         
         try:
-            with open(terms_file, 'w', encoding='utf-8') as f:
+            # 先写临时文件再替换，避免写到一半损坏术语库
+            temp_file = terms_file + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
                 json.dump(self.terms, f, ensure_ascii=False, indent=2)
+            os.replace(temp_file, terms_file)
             self.log(f"已保存 {len(self.terms)} 个术语")
             return True
         except Exception as e:
@@ -120,6 +163,20 @@ class EmergencyTermTool(QMainWindow):
             return False
     
     def import_terms_from_file(self, filename):
+        """从文件导入术语（整个文件只保存一次，导入失败时不写入）"""
+        try:
+            with self.bulk():
+                result = self._import_terms_from_file(filename)
+                if not result[0]:
+                    raise _ImportFailed(result)
+        except _ImportFailed:
+            self.log("导入失败，已撤销本次导入的术语")
+            return result
+        except IOError as e:
+            return False, str(e)
+        return result
+    
+    def _import_terms_from_file(self, filename):
         """从文件导入术语"""
         try:
             self.log(f"开始导入文件: {os.path.basename(filename)}")
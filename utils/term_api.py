@@ -1,8 +1,16 @@
-"""术语库 API 接口，提供统一的术语功能访问点"""
+"""术语库 API 接口，提供统一的术语功能访问点
+
+术语文件按修改时间和大小缓存在内存中，文件未变化时查询不再读盘和解析 JSON，
+可在循环中高频调用。
+"""
 
 import os
 import sys
 import json
+import threading
+
+from core.term_lookup_index import TermLookupIndex
+from core.term_matcher import find_source_terms
 
 def get_term_db_path():
     """获取术语库文件路径"""
@@ -12,9 +20,9 @@ def get_term_vector_db_path():
     """获取术语向量库文件路径"""
     return os.path.join('data', 'term_vectors', 'vectors.json')
 
-def load_terms():
-    """加载术语库"""
-    term_path = get_term_db_path()
+def load_terms(term_path=None):
+    """从磁盘加载术语库（每次调用都会读取文件，频繁查询请使用 get_term_store）"""
+    term_path = term_path or get_term_db_path()
     if os.path.exists(term_path):
         try:
             with open(term_path, 'r', encoding='utf-8') as f:
@@ -26,40 +34,144 @@ def load_terms():
         print("术语库文件不存在")
         return {}
 
+def _term_target(term_data):
+    if isinstance(term_data, dict):
+        return term_data.get('target_term', term_data.get('definition', ''))
+    return str(term_data)
+
+
+class CachedTermStore:
+    """按文件修改时间和大小自动刷新的只读术语缓存（线程安全）"""
+
+    def __init__(self, term_path=None):
+        self.term_path = term_path or get_term_db_path()
+        self._lock = threading.RLock()
+        # 已加载文件的 (修改时间, 大小)，None 表示尚未加载
+        self._signature = None
+        self._terms = {}
+        # 每次重新加载递增，用作术语匹配器缓存的版本号
+        self.version = 0
+        # 列表查询索引（前缀、子串搜索），首次使用时建立
+        self._lookup_index = None
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.term_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def refresh(self, force=False):
+        """
+        文件修改时间或大小变化时重新加载
+
+        Returns:
+            bool: 是否重新加载了术语
+        """
+        signature = self._file_signature()
+        with self._lock:
+            if not force and self.version and signature == self._signature:
+                return False
+            self._terms = load_terms(self.term_path) if signature is not None else {}
+            self._signature = signature
+            self._lookup_index = None
+            self.version += 1
+            return True
+
+    def get_terms(self):
+        """返回当前术语字典（只读，不要修改）"""
+        with self._lock:
+            self.refresh()
+            return self._terms
+
+    def get(self, term):
+        """精确查找术语条目"""
+        return self.get_terms().get(term)
+
+    def _get_lookup_index(self):
+        with self._lock:
+            terms = self.get_terms()
+            if self._lookup_index is None:
+                index = TermLookupIndex()
+                index.rebuild(terms, self.version)
+                self._lookup_index = index
+            return self._lookup_index
+
+    def search(self, query, max_results=10, prefix=False):
+        """
+        搜索术语
+
+        Args:
+            query (str): 搜索词，匹配源术语或目标术语的子串（prefix=True 时为源术语前缀）
+            max_results (int): 最多返回条数
+
+        Returns:
+            list: [{'source_term', 'target_term', 'metadata'}]，按源术语排序
+        """
+        if not query:
+            return []
+        with self._lock:
+            terms = self.get_terms()
+            page = self._get_lookup_index().query(search=query, sort='source_term', limit=max_results,
+                                                  prefix=prefix)
+            results = []
+            for item in page['terms']:
+                term_data = terms.get(item['source_term'])
+                results.append({
+                    'source_term': item['source_term'],
+                    'target_term': item['target_term'],
+                    'metadata': term_data.get('metadata', {}) if isinstance(term_data, dict) else {}
+                })
+            return results
+
+    def find_in_text(self, text):
+        """用共享的术语匹配自动机查找文本中出现的源术语"""
+        with self._lock:
+            terms = self.get_terms()
+            version = self.version
+        return find_source_terms(text, terms, version=version)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_term_store(term_path=None):
+    """获取指定术语文件的缓存（同一路径共用一个实例）"""
+    key = os.path.abspath(term_path or get_term_db_path())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = CachedTermStore(key)
+            _stores[key] = store
+        return store
+
+
 def get_term_definition(term, source_lang='zh', target_lang='en'):
     """获取术语定义"""
-    terms = load_terms()
-    
-    if term in terms:
-        term_data = terms[term]
-        
+    term_data = get_term_store().get(term)
+
+    if isinstance(term_data, dict):
         # 检查语言匹配
         metadata = term_data.get('metadata', {})
-        if (metadata.get('source_lang') == source_lang and 
+        if (metadata.get('source_lang') == source_lang and
             metadata.get('target_lang') == target_lang):
-            return term_data.get('target_term', term_data.get('definition', ''))
-    
+            return _term_target(term_data)
+
     # 如果未找到或语言不匹配，返回空字符串
     return ""
 
 def search_terms(query, max_results=10):
-    """搜索术语库"""
-    terms = load_terms()
-    results = []
-    
-    query = query.lower()
-    for term, term_data in terms.items():
-        if query in term.lower():
-            results.append({
-                'source_term': term,
-                'target_term': term_data.get('target_term', term_data.get('definition', '')),
-                'metadata': term_data.get('metadata', {})
-            })
-            
-            if len(results) >= max_results:
-                break
-    
-    return results
+    """搜索术语库（源术语或目标术语包含查询词）"""
+    return get_term_store().search(query, max_results)
+
+def search_terms_by_prefix(prefix, max_results=10):
+    """按源术语前缀搜索术语库"""
+    return get_term_store().search(prefix, max_results, prefix=True)
+
+def find_terms_in_text(text):
+    """查找文本中出现的术语"""
+    return get_term_store().find_in_text(text)
 
 def launch_term_tool():
     """启动术语工具"""
@@ -10,6 +10,8 @@ import requests
 import subprocess
 from datetime import datetime
 
+from core.context_packer import pack_knowledge_context, knowledge_results_to_chunks
+
 chat_bp = Blueprint('chat', __name__)
 
 # 全局变量存储聊天历史（生产环境应使用数据库）
@@ -297,32 +299,13 @@ def _generate_knowledge_assisted_response(assistant, user_message, history=None)
             current_app.logger.info("未找到相关知识条目，返回标准回复")
             return "知识库中没有相关的答案"
 
-        # 使用PC端相同的结果处理逻辑
-        knowledge_items = []
-        for result in knowledge_results:
-            if isinstance(result, dict):
-                # 处理字典类型的结果
-                content = result.get('content', '')
-                metadata = result.get('metadata', {})
-
-                # 如果是问答对类型，格式化显示
-                if metadata.get('type') == 'qa_group':
-                    question = metadata.get('question', '')
-                    answer = metadata.get('answer', '')
-                    knowledge_items.append(f"问题：{question}\n答案：{answer}")
-                else:
-                    knowledge_items.append(content)
-            else:
-                # 处理字符串类型的结果
-                knowledge_items.append(str(result))
+        # 按token预算打包知识片段
+        knowledge_text, context_report = _pack_knowledge_results(assistant, knowledge_results, user_message)
 
-        if not knowledge_items:
+        if not knowledge_text:
             current_app.logger.info("知识库搜索结果处理后为空，返回标准回复")
             return "知识库中没有相关的答案"
 
-        # 使用PC端相同的知识文本构建方式
-        knowledge_text = "\n\n".join(knowledge_items[:3])  # PC端最多使用3个知识条目
-
         # 使用严格的知识库问答提示格式
         enhanced_message = f"""请严格按照以下知识库内容回答问题，不要添加任何额外的解释、扩展或补充说明：
 
@@ -350,6 +333,18 @@ def _generate_knowledge_assisted_response(assistant, user_message, history=None)
         # 出错时回退到普通模式
         return assistant.chat(message=user_message, history=history)
 
+def _pack_knowledge_results(assistant, knowledge_results, query=None):
+    """压缩并按token预算打包知识库检索结果 - 与PC端chat_with_knowledge一致"""
+    tokenizer = assistant._get_llm_tokenizer() if hasattr(assistant, '_get_llm_tokenizer') else None
+    settings = getattr(assistant, 'settings', None)
+    token_budget = settings.get('kb_context_token_budget', 1024) if settings else 1024
+    compressor = getattr(getattr(assistant, 'knowledge_base', None), 'compressor', None)
+    knowledge_text, report = pack_knowledge_context(knowledge_results, tokenizer, token_budget,
+                                                    query=query, compressor=compressor)
+    current_app.logger.info(f"知识上下文打包: {report['original_tokens']} -> {report['packed_tokens']} tokens，"
+                            f"节省 {report['tokens_saved']} tokens")
+    return knowledge_text, report
+
 def _process_knowledge_results(results, message):
     """处理知识库搜索结果，提取相关上下文 - 与PC端策略一致"""
     if not results or len(results) == 0:
@@ -765,6 +760,66 @@ def get_chat_status():
         current_app.logger.error(f"获取聊天状态失败: {e}")
         return jsonify({'error': f'获取聊天状态失败: {str(e)}'}), 500
 
+@chat_bp.route('/answer-cache', methods=['GET'])
+def get_answer_cache():
+    """查看知识库问答语义答案缓存"""
+    try:
+        assistant = current_app.config.get('AI_ASSISTANT')
+        answer_cache = getattr(assistant, 'answer_cache', None) if assistant else None
+        if not answer_cache:
+            return jsonify({'error': '语义答案缓存未初始化'}), 500
+
+        limit = request.args.get('limit', 100, type=int)
+        return jsonify({
+            'success': True,
+            'stats': answer_cache.get_stats(),
+            'entries': answer_cache.list_entries(limit)
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"获取语义答案缓存失败: {e}")
+        return jsonify({'error': f'获取语义答案缓存失败: {str(e)}'}), 500
+
+@chat_bp.route('/answer-cache', methods=['DELETE'])
+def clear_answer_cache():
+    """清空知识库问答语义答案缓存"""
+    try:
+        assistant = current_app.config.get('AI_ASSISTANT')
+        answer_cache = getattr(assistant, 'answer_cache', None) if assistant else None
+        if not answer_cache:
+            return jsonify({'error': '语义答案缓存未初始化'}), 500
+
+        answer_cache.clear()
+        return jsonify({
+            'success': True,
+            'message': '语义答案缓存已清空'
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"清空语义答案缓存失败: {e}")
+        return jsonify({'error': f'清空语义答案缓存失败: {str(e)}'}), 500
+
+@chat_bp.route('/answer-cache/<int:entry_id>', methods=['DELETE'])
+def delete_answer_cache_entry(entry_id):
+    """删除一条语义答案缓存"""
+    try:
+        assistant = current_app.config.get('AI_ASSISTANT')
+        answer_cache = getattr(assistant, 'answer_cache', None) if assistant else None
+        if not answer_cache:
+            return jsonify({'error': '语义答案缓存未初始化'}), 500
+
+        if not answer_cache.remove(entry_id):
+            return jsonify({'error': '缓存条目不存在'}), 404
+
+        return jsonify({
+            'success': True,
+            'message': '缓存条目已删除'
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"删除语义答案缓存失败: {e}")
+        return jsonify({'error': f'删除语义答案缓存失败: {str(e)}'}), 500
+
 @chat_bp.route('/knowledge-qa', methods=['POST'])
 def knowledge_qa():
     """专门的知识库问答接口"""
@@ -862,6 +917,7 @@ def knowledge_qa():
                 'knowledge_items': [],  # PC端方法不返回具体的知识条目
                 'search_time': time.time() - start_time,
                 'question': question,
+                'context_report': getattr(assistant, 'last_context_report', None),
                 'method': 'pc_chat_with_knowledge'
             })
 
@@ -878,26 +934,10 @@ def knowledge_qa():
                 'question': question
             })
 
-        # 使用PC端相同的结果处理逻辑
-        knowledge_items = []
-        for result in knowledge_results:
-            if isinstance(result, dict):
-                # 处理字典类型的结果
-                content = result.get('content', '')
-                metadata = result.get('metadata', {})
-
-                # 如果是问答对类型，格式化显示
-                if metadata.get('type') == 'qa_group':
-                    question_text = metadata.get('question', '')
-                    answer_text = metadata.get('answer', '')
-                    knowledge_items.append(f"问题：{question_text}\n答案：{answer_text}")
-                else:
-                    knowledge_items.append(content)
-            else:
-                # 处理字符串类型的结果
-                knowledge_items.append(str(result))
+        # 按token预算打包知识片段
+        knowledge_text, context_report = _pack_knowledge_results(assistant, knowledge_results, question)
 
-        if not knowledge_items:
+        if not knowledge_text:
             return jsonify({
                 'success': True,
                 'answer': '知识库中没有相关的答案',
@@ -907,9 +947,6 @@ def knowledge_qa():
                 'method': 'pc_fallback'
             })
 
-        # 使用PC端相同的知识文本构建方式
-        knowledge_text = "\n\n".join(knowledge_items[:3])  # PC端最多使用3个知识条目
-
         # 使用严格的知识库问答提示格式
         enhanced_message = f"""请严格按照以下知识库内容回答问题，不要添加任何额外的解释、扩展或补充说明：
 
@@ -948,6 +985,7 @@ def knowledge_qa():
 
         # 简化知识条目格式化
         formatted_knowledge = []
+        knowledge_items = [chunk['text'] for chunk in knowledge_results_to_chunks(knowledge_results)]
         for i, item in enumerate(knowledge_items[:5]):  # 最多显示5个条目
             formatted_knowledge.append({
                 'id': f"item_{i}",
@@ -963,6 +1001,7 @@ def knowledge_qa():
             'question': question,
             'total_items': len(formatted_knowledge),
             'model_used': selected_model,
+            'context_report': context_report,
             'method': 'pc_compatible'
         })
 
@@ -970,6 +1009,12 @@ def knowledge_qa():
         current_app.logger.error(f"知识库问答失败: {e}")
         return jsonify({'error': f'知识库问答失败: {str(e)}'}), 500
 
+# 外部模型调用失败时返回的提示前缀，这类回答不写入语义答案缓存
+_EXTERNAL_MODEL_ERROR_PREFIXES = (
+    'Ollama模型调用超时', '无法连接到Ollama服务', '调用Ollama模型失败', '模型调用出错',
+    '调用OpenAI兼容API失败', 'API调用出错', '抱歉，模型返回了空响应', '不支持的模型类型'
+)
+
 def _generate_external_model_knowledge_response(assistant, user_message, model_name, model_type, history=None):
     """使用外部模型生成知识库辅助的回答"""
     try:
@@ -988,6 +1033,24 @@ def _generate_external_model_knowledge_response(assistant, user_message, model_n
         # 使用PC端相同的简洁搜索策略
         knowledge_base = assistant.knowledge_base
 
+        # 问题向量由直达答案和语义答案缓存共用
+        question_embedding = assistant._encode_question(user_message) if hasattr(assistant, '_encode_question') else None
+
+        # 问答组高置信度命中时直接返回标准答案
+        if hasattr(knowledge_base, 'match_direct_answer'):
+            direct = knowledge_base.match_direct_answer(user_message, question_embedding)
+            if direct:
+                current_app.logger.info(f"问答组直达答案命中: {direct['item']} (相似度: {direct['similarity']:.4f})")
+                return direct['answer']
+
+        # 单轮问答查语义答案缓存，按外部模型区分缓存条目
+        cache_model_id = f"{model_type}|{model_name}"
+        use_answer_cache = not history and hasattr(assistant, '_lookup_answer_cache')
+        if use_answer_cache:
+            cached_answer = assistant._lookup_answer_cache(question_embedding, cache_model_id)
+            if cached_answer:
+                return cached_answer
+
         # PC端相同的搜索参数
         knowledge_results = knowledge_base.search(user_message, top_k=5)
         current_app.logger.info(f"知识库搜索完成，找到 {len(knowledge_results) if knowledge_results else 0} 条结果")
@@ -996,32 +1059,13 @@ def _generate_external_model_knowledge_response(assistant, user_message, model_n
             current_app.logger.info("未找到相关知识条目，返回标准回复")
             return "知识库中没有相关的答案"
 
-        # 使用PC端相同的结果处理逻辑
-        knowledge_items = []
-        for result in knowledge_results:
-            if isinstance(result, dict):
-                # 处理字典类型的结果
-                content = result.get('content', '')
-                metadata = result.get('metadata', {})
-
-                # 如果是问答对类型，格式化显示
-                if metadata.get('type') == 'qa_group':
-                    question_text = metadata.get('question', '')
-                    answer_text = metadata.get('answer', '')
-                    knowledge_items.append(f"问题：{question_text}\n答案：{answer_text}")
-                else:
-                    knowledge_items.append(content)
-            else:
-                # 处理字符串类型的结果
-                knowledge_items.append(str(result))
+        # 按token预算打包知识片段
+        knowledge_text, context_report = _pack_knowledge_results(assistant, knowledge_results, user_message)
 
-        if not knowledge_items:
+        if not knowledge_text:
             current_app.logger.info("知识库搜索结果处理后为空，返回标准回复")
             return "知识库中没有相关的答案"
 
-        # 使用PC端相同的知识文本构建方式
-        knowledge_text = "\n\n".join(knowledge_items[:3])  # PC端最多使用3个知识条目
-
         # 使用严格的知识库问答提示格式
         enhanced_message = f"""请严格按照以下知识库内容回答问题，不要添加任何额外的解释、扩展或补充说明：
 
@@ -1048,6 +1092,10 @@ def _generate_external_model_knowledge_response(assistant, user_message, model_n
             response = "不支持的模型类型"
 
         current_app.logger.info(f"外部模型知识库问答完成，回答长度: {len(response) if response else 0}")
+
+        # 仅缓存外部模型的正常回答
+        if use_answer_cache and response and not response.startswith(_EXTERNAL_MODEL_ERROR_PREFIXES):
+            assistant._store_answer_cache(user_message, question_embedding, response, cache_model_id)
         return response
 
     except Exception as e:
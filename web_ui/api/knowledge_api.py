@@ -80,7 +80,7 @@ def get_knowledge_items():
         # 获取知识条目 - 直接从knowledge_base.items获取，与PC端一致
         if search_query:
             # 执行搜索，返回条目名称列表
-            search_results = knowledge_base.search(search_query, top_k=per_page * 2)
+            search_results = knowledge_base.search(search_query, top_k=per_page * 2, rerank=False)
             # 确保搜索结果是条目名称列表
             if search_results and isinstance(search_results[0], str):
                 item_names = search_results
@@ -343,8 +343,8 @@ def search_knowledge():
 
         knowledge_base = assistant.knowledge_base
 
-        # 执行搜索 - 修复参数名称
-        results = knowledge_base.search(query, top_k=limit)
+        # 执行搜索 - 修复参数名称；重排序只用于精简提示词，管理搜索按 limit 返回
+        results = knowledge_base.search(query, top_k=limit, rerank=False)
 
         # 格式化搜索结果 - 确保ID有效且可查询
         formatted_results = []
@@ -514,6 +514,10 @@ def get_knowledge_status():
             except:
                 status['total_items'] = 0
 
+            # 重排序器状态
+            reranker = getattr(assistant.knowledge_base, 'reranker', None)
+            status['reranker'] = reranker.get_stats() if reranker else None
+
             # 检查向量数据库
             if hasattr(assistant.knowledge_base, 'vector_db') and assistant.knowledge_base.vector_db:
                 status['vector_db_available'] = True
@@ -540,3 +544,74 @@ def get_knowledge_status():
     except Exception as e:
         current_app.logger.error(f"获取知识库状态失败: {e}")
         return jsonify({'error': f'获取知识库状态失败: {str(e)}'}), 500
+
+@knowledge_bp.route('/search-cache', methods=['GET'])
+def get_search_cache_stats():
+    """获取知识库检索结果缓存统计"""
+    try:
+        assistant = current_app.config.get('AI_ASSISTANT')
+        if not assistant or not getattr(assistant, 'knowledge_base', None):
+            return jsonify({'error': '知识库未初始化'}), 500
+
+        return jsonify({
+            'success': True,
+            'stats': assistant.knowledge_base.get_search_cache_stats()
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"获取检索缓存统计失败: {e}")
+        return jsonify({'error': f'获取检索缓存统计失败: {str(e)}'}), 500
+
+@knowledge_bp.route('/search-cache/clear', methods=['POST'])
+def clear_search_cache():
+    """清空知识库检索结果缓存"""
+    try:
+        assistant = current_app.config.get('AI_ASSISTANT')
+        if not assistant or not getattr(assistant, 'knowledge_base', None):
+            return jsonify({'error': '知识库未初始化'}), 500
+
+        assistant.knowledge_base.clear_search_cache()
+        return jsonify({
+            'success': True,
+            'message': '检索缓存已清空'
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"清空检索缓存失败: {e}")
+        return jsonify({'error': f'清空检索缓存失败: {str(e)}'}), 500
+
+@knowledge_bp.route('/vector-backfill', methods=['GET'])
+def get_vector_backfill_progress():
+    """获取知识库后台向量补建进度"""
+    try:
+        assistant = current_app.config.get('AI_ASSISTANT')
+        if not assistant or not getattr(assistant, 'knowledge_base', None):
+            return jsonify({'error': '知识库未初始化'}), 500
+
+        return jsonify({
+            'success': True,
+            'progress': assistant.knowledge_base.get_vector_backfill_progress()
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"获取向量补建进度失败: {e}")
+        return jsonify({'error': f'获取向量补建进度失败: {str(e)}'}), 500
+
+@knowledge_bp.route('/vector-backfill', methods=['POST'])
+def start_vector_backfill():
+    """启动知识库后台向量补建，rescan=true 时重新扫描全部条目"""
+    try:
+        assistant = current_app.config.get('AI_ASSISTANT')
+        if not assistant or not getattr(assistant, 'knowledge_base', None):
+            return jsonify({'error': '知识库未初始化'}), 500
+
+        data = request.get_json(silent=True) or {}
+        started = assistant.knowledge_base.ensure_vectors(rescan=bool(data.get('rescan', False)))
+        return jsonify({
+            'success': bool(started),
+            'progress': assistant.knowledge_base.get_vector_backfill_progress()
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"启动向量补建失败: {e}")
+        return jsonify({'error': f'启动向量补建失败: {str(e)}'}), 500
@@ -3,25 +3,49 @@
 提供术语库管理相关的RESTful API接口
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from werkzeug.utils import secure_filename
 import os
 import json
-import csv
+import uuid
+from contextlib import nullcontext
 from datetime import datetime
-from io import StringIO
+
+from core.term_importers import STREAMING_EXTENSIONS, import_term_file
+from core.term_exporters import EXPORT_FORMATS, iter_export_bytes, iter_export_terms
 
 terminology_bp = Blueprint('terminology', __name__)
 
+# 进程启动标识，与术语库版本号一起组成 ETag，避免重启后版本号重复导致误用缓存
+_ETAG_TOKEN = uuid.uuid4().hex[:8]
+
+
+def _find_term_key(term_base, term_id):
+    """按术语 ID 查找术语键"""
+    if hasattr(term_base, 'get_lookup_index'):
+        return term_base.get_lookup_index().find_key(term_id)
+    for source_term, term_data in term_base.terms.items():
+        if isinstance(term_data, dict):
+            metadata = term_data.get('metadata', {})
+            if metadata.get('id') == term_id or str(hash(source_term)) == term_id:
+                return source_term
+    return None
+
+
 @terminology_bp.route('/terms', methods=['GET'])
 def get_terms():
-    """获取术语列表"""
+    """获取术语列表（支持页码分页和游标分页）"""
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
+        cursor = request.args.get('cursor', '').strip()
         search_query = request.args.get('q', '').strip()
+        prefix = request.args.get('prefix', 'false').lower() == 'true'
         source_lang = request.args.get('source_lang', '')
         target_lang = request.args.get('target_lang', '')
+        category = request.args.get('category')
+        sort = request.args.get('sort', 'created_at')
+        descending = request.args.get('order', 'asc').lower() == 'desc'
 
         # 获取松瓷机电AI助手实例
         assistant = current_app.config.get('AI_ASSISTANT')
@@ -30,75 +54,43 @@ def get_terms():
 
         term_base = assistant.term_base
 
-        # 获取所有术语
+        # 术语库未变化时直接返回 304
+        etag = f"terms-{_ETAG_TOKEN}-{term_base.version}"
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
         try:
-            all_terms = term_base.terms if hasattr(term_base, 'terms') else {}
-        except:
-            all_terms = {}
-
-        # 转换为列表格式
-        terms_list = []
-        for source_term, term_data in all_terms.items():
-            if isinstance(term_data, dict):
-                metadata = term_data.get('metadata', {})
-                term_item = {
-                    'id': metadata.get('id', str(hash(source_term))),
-                    'source_term': source_term,
-                    'target_term': term_data.get('target_term', term_data.get('definition', '')),
-                    'source_lang': metadata.get('source_lang', 'zh'),
-                    'target_lang': metadata.get('target_lang', 'en'),
-                    'type': metadata.get('type', 'term'),
-                    'created_at': metadata.get('added_time', ''),
-                    'updated_at': metadata.get('updated_time', ''),
-                    'category': metadata.get('category', ''),
-                    'description': metadata.get('description', ''),
-                    'usage_count': metadata.get('usage_count', 0)
-                }
-            else:
-                # 兼容旧格式
-                term_item = {
-                    'id': str(hash(source_term)),
-                    'source_term': source_term,
-                    'target_term': str(term_data),
-                    'source_lang': 'zh',
-                    'target_lang': 'en',
-                    'type': 'term',
-                    'created_at': '',
-                    'updated_at': '',
-                    'category': '',
-                    'description': '',
-                    'usage_count': 0
-                }
-            terms_list.append(term_item)
-
-        # 过滤术语
-        filtered_terms = terms_list
-        if search_query:
-            filtered_terms = [
-                term for term in filtered_terms
-                if search_query.lower() in term['source_term'].lower() or
-                   search_query.lower() in term['target_term'].lower()
-            ]
-        if source_lang:
-            filtered_terms = [term for term in filtered_terms if term['source_lang'] == source_lang]
-        if target_lang:
-            filtered_terms = [term for term in filtered_terms if term['target_lang'] == target_lang]
-
-        # 分页处理
-        start = (page - 1) * per_page
-        end = start + per_page
-        paginated_terms = filtered_terms[start:end]
+            result = term_base.get_lookup_index().query(
+                search=search_query,
+                source_lang=source_lang,
+                target_lang=target_lang,
+                category=category,
+                sort=sort,
+                descending=descending,
+                cursor=cursor or None,
+                offset=0 if cursor else (page - 1) * per_page,
+                limit=per_page,
+                prefix=prefix
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
-        return jsonify({
+        start = (page - 1) * per_page
+        response = jsonify({
             'success': True,
-            'terms': paginated_terms,
-            'total': len(filtered_terms),
+            'terms': result['terms'],
+            'total': result['total'],
             'page': page,
             'per_page': per_page,
-            'has_next': end < len(filtered_terms),
-            'has_prev': start > 0,
+            'has_next': result['next_cursor'] is not None,
+            'has_prev': bool(cursor) or start > 0,
+            'next_cursor': result['next_cursor'],
             'search_query': search_query
         })
+        response.set_etag(etag)
+        return response
 
     except Exception as e:
         current_app.logger.error(f"获取术语列表失败: {e}")
@@ -133,25 +125,17 @@ def add_term():
         if hasattr(term_base, 'terms') and source_term in term_base.terms:
             return jsonify({'error': '术语已存在'}), 400
 
-        # 添加术语
+        # 添加术语，分类和描述随术语一起写入
+        extra = {key: value for key, value in (('category', category), ('description', description)) if value}
         success = term_base.add_term(
             source_term=source_term,
             target_term=target_term,
             source_lang=source_lang,
-            target_lang=target_lang
+            target_lang=target_lang,
+            metadata=extra or None
         )
 
         if success:
-            # 如果有额外的元数据，更新术语
-            if category or description:
-                if hasattr(term_base, 'terms') and source_term in term_base.terms:
-                    term_data = term_base.terms[source_term]
-                    if isinstance(term_data, dict) and 'metadata' in term_data:
-                        term_data['metadata']['category'] = category
-                        term_data['metadata']['description'] = description
-                        term_data['metadata']['updated_time'] = datetime.now().isoformat()
-                        term_base.save()
-
             return jsonify({
                 'success': True,
                 'message': '术语添加成功',
@@ -187,61 +171,33 @@ def update_term(term_id):
         term_base = assistant.term_base
 
         # 查找要更新的术语
-        target_source_term = None
-        if hasattr(term_base, 'terms'):
-            for source_term, term_data in term_base.terms.items():
-                if isinstance(term_data, dict):
-                    metadata = term_data.get('metadata', {})
-                    if metadata.get('id') == term_id or str(hash(source_term)) == term_id:
-                        target_source_term = source_term
-                        break
+        target_source_term = _find_term_key(term_base, term_id)
 
         if not target_source_term:
             return jsonify({'error': '术语不存在'}), 404
 
-        # 更新术语数据
-        term_data = term_base.terms[target_source_term]
-        if isinstance(term_data, dict):
-            # 更新基本信息
-            if 'target_term' in data:
-                term_data['target_term'] = data['target_term']
-                term_data['definition'] = data['target_term']  # 兼容旧版
+        # 在术语库写入锁内更新术语数据并保存
+        metadata_updates = {key: data[key] for key in ('source_lang', 'target_lang', 'category', 'description')
+                            if key in data}
+        term_data = term_base.update_term_fields(target_source_term, target_term=data.get('target_term'),
+                                                 metadata=metadata_updates)
+        if term_data is None:
+            return jsonify({'error': '保存术语失败'}), 500
 
-            # 更新元数据
-            metadata = term_data.get('metadata', {})
-            if 'source_lang' in data:
-                metadata['source_lang'] = data['source_lang']
-            if 'target_lang' in data:
-                metadata['target_lang'] = data['target_lang']
-            if 'category' in data:
-                metadata['category'] = data['category']
-            if 'description' in data:
-                metadata['description'] = data['description']
-
-            metadata['updated_time'] = datetime.now().isoformat()
-            term_data['metadata'] = metadata
-
-            # 保存更新
-            success = term_base.save()
-
-            if success:
-                return jsonify({
-                    'success': True,
-                    'message': '术语更新成功',
-                    'term': {
-                        'id': term_id,
-                        'source_term': target_source_term,
-                        'target_term': term_data.get('target_term', ''),
-                        'source_lang': metadata.get('source_lang', 'zh'),
-                        'target_lang': metadata.get('target_lang', 'en'),
-                        'category': metadata.get('category', ''),
-                        'description': metadata.get('description', '')
-                    }
-                })
-            else:
-                return jsonify({'error': '保存术语失败'}), 500
-        else:
-            return jsonify({'error': '术语数据格式错误'}), 500
+        metadata = term_data.get('metadata', {})
+        return jsonify({
+            'success': True,
+            'message': '术语更新成功',
+            'term': {
+                'id': term_id,
+                'source_term': target_source_term,
+                'target_term': term_data.get('target_term', ''),
+                'source_lang': metadata.get('source_lang', 'zh'),
+                'target_lang': metadata.get('target_lang', 'en'),
+                'category': metadata.get('category', ''),
+                'description': metadata.get('description', '')
+            }
+        })
 
     except Exception as e:
         current_app.logger.error(f"更新术语失败: {e}")
@@ -259,21 +215,13 @@ def delete_term(term_id):
         term_base = assistant.term_base
 
         # 查找要删除的术语
-        target_source_term = None
-        if hasattr(term_base, 'terms'):
-            for source_term, term_data in term_base.terms.items():
-                if isinstance(term_data, dict):
-                    metadata = term_data.get('metadata', {})
-                    if metadata.get('id') == term_id or str(hash(source_term)) == term_id:
-                        target_source_term = source_term
-                        break
+        target_source_term = _find_term_key(term_base, term_id)
 
         if not target_source_term:
             return jsonify({'error': '术语不存在'}), 404
 
-        # 删除术语
-        del term_base.terms[target_source_term]
-        success = term_base.save()
+        # 删除术语（同时删除其向量）并保存
+        success = term_base.delete_term(target_source_term) and term_base.save()
 
         if success:
             return jsonify({
@@ -377,6 +325,33 @@ def search_terms():
         current_app.logger.error(f"搜索术语失败: {e}")
         return jsonify({'error': f'搜索术语失败: {str(e)}'}), 500
 
+def _import_terms_streaming(term_base, file, file_ext):
+    """把上传的表格/TBX 文件保存为临时文件，逐行流式导入"""
+    upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
+    os.makedirs(upload_folder, exist_ok=True)
+    file_path = os.path.join(upload_folder, f"terms_{uuid.uuid4().hex}.{file_ext}")
+    file.save(file_path)
+    try:
+        result = import_term_file(term_base, file_path)
+    except Exception as e:
+        return jsonify({'error': f'文件解析失败: {str(e)}'}), 400
+    finally:
+        # 清理临时文件
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    errors = result['errors']
+    return jsonify({
+        'success': True,
+        'message': '术语导入完成',
+        'imported_count': result['imported'] + result['updated'],
+        'updated_count': result['updated'],
+        'failed_count': result['failed'],
+        'total_count': result['processed'],
+        'errors': errors[:10],  # 只返回前10个错误
+        'has_more_errors': result['failed'] > 10
+    })
+
 @terminology_bp.route('/import', methods=['POST'])
 def import_terms():
     """导入术语库"""
@@ -389,10 +364,10 @@ def import_terms():
             return jsonify({'error': '没有选择文件'}), 400
 
         # 检查文件类型
-        allowed_extensions = {'csv', 'json', 'txt'}
+        allowed_extensions = {'csv', 'tsv', 'json', 'txt', 'xlsx', 'tbx', 'xml'}
         file_ext = file.filename.rsplit('.', 1)[1].lower() if '.' in file.filename else ''
         if file_ext not in allowed_extensions:
-            return jsonify({'error': f'不支持的文件类型，支持的类型: {", ".join(allowed_extensions)}'}), 400
+            return jsonify({'error': f'不支持的文件类型，支持的类型: {", ".join(sorted(allowed_extensions))}'}), 400
 
         # 获取松瓷机电AI助手实例
         assistant = current_app.config.get('AI_ASSISTANT')
@@ -401,6 +376,10 @@ def import_terms():
 
         term_base = assistant.term_base
 
+        # 表格和 TBX 文件保存到临时文件后逐行流式导入
+        if f'.{file_ext}' in STREAMING_EXTENSIONS:
+            return _import_terms_streaming(term_base, file, file_ext)
+
         # 读取文件内容
         file_content = file.read().decode('utf-8')
         imported_count = 0
@@ -408,132 +387,59 @@ def import_terms():
         errors = []
 
         try:
-            if file_ext == 'csv':
-                # 处理CSV文件
-                csv_reader = csv.DictReader(StringIO(file_content))
-                for row_num, row in enumerate(csv_reader, 1):
-                    try:
-                        source_term = row.get('source_term', '').strip()
-                        target_term = row.get('target_term', '').strip()
-                        source_lang = row.get('source_lang', 'zh')
-                        target_lang = row.get('target_lang', 'en')
-
-                        if source_term and target_term:
-                            success = term_base.add_term(
-                                source_term=source_term,
-                                target_term=target_term,
-                                source_lang=source_lang,
-                                target_lang=target_lang
-                            )
-                            if success:
-                                imported_count += 1
-                            else:
-                                failed_count += 1
-                                errors.append(f"第{row_num}行: 添加术语失败")
-                        else:
-                            failed_count += 1
-                            errors.append(f"第{row_num}行: 源术语或目标术语为空")
-                    except Exception as e:
-                        failed_count += 1
-                        errors.append(f"第{row_num}行: {str(e)}")
-
-            elif file_ext == 'json':
-                # 处理JSON文件
-                data = json.loads(file_content)
-                if isinstance(data, list):
-                    for idx, item in enumerate(data, 1):
-                        try:
-                            source_term = item.get('source_term', '').strip()
-                            target_term = item.get('target_term', '').strip()
-                            source_lang = item.get('source_lang', 'zh')
-                            target_lang = item.get('target_lang', 'en')
-
-                            if source_term and target_term:
-                                success = term_base.add_term(
-                                    source_term=source_term,
-                                    target_term=target_term,
-                                    source_lang=source_lang,
-                                    target_lang=target_lang
-                                )
-                                if success:
-                                    imported_count += 1
-                                else:
-                                    failed_count += 1
-                                    errors.append(f"第{idx}项: 添加术语失败")
-                            else:
-                                failed_count += 1
-                                errors.append(f"第{idx}项: 源术语或目标术语为空")
-                        except Exception as e:
-                            failed_count += 1
-                            errors.append(f"第{idx}项: {str(e)}")
-                elif isinstance(data, dict):
-                    # 处理字典格式
-                    for source_term, target_term in data.items():
-                        try:
-                            if source_term and target_term:
-                                success = term_base.add_term(
-                                    source_term=source_term,
-                                    target_term=str(target_term),
-                                    source_lang='zh',
-                                    target_lang='en'
-                                )
-                                if success:
-                                    imported_count += 1
+            # 批量写入：整个文件只保存一次，向量按批生成
+            with term_base.bulk() if hasattr(term_base, 'bulk') else nullcontext():
+                if file_ext == 'json':
+                    # 处理JSON文件
+                    data = json.loads(file_content)
+                    if isinstance(data, list):
+                        for idx, item in enumerate(data, 1):
+                            try:
+                                source_term = item.get('source_term', '').strip()
+                                target_term = item.get('target_term', '').strip()
+                                source_lang = item.get('source_lang', 'zh')
+                                target_lang = item.get('target_lang', 'en')
+
+                                if source_term and target_term:
+                                    success = term_base.add_term(
+                                        source_term=source_term,
+                                        target_term=target_term,
+                                        source_lang=source_lang,
+                                        target_lang=target_lang
+                                    )
+                                    if success:
+                                        imported_count += 1
+                                    else:
+                                        failed_count += 1
+                                        errors.append(f"第{idx}项: 添加术语失败")
                                 else:
                                     failed_count += 1
-                                    errors.append(f"术语'{source_term}': 添加失败")
-                            else:
+                                    errors.append(f"第{idx}项: 源术语或目标术语为空")
+                            except Exception as e:
                                 failed_count += 1
-                                errors.append(f"术语'{source_term}': 源术语或目标术语为空")
-                        except Exception as e:
-                            failed_count += 1
-                            errors.append(f"术语'{source_term}': {str(e)}")
-
-            elif file_ext == 'txt':
-                # 处理文本文件（每行一个术语对，用制表符或逗号分隔）
-                lines = file_content.strip().split('\n')
-                for line_num, line in enumerate(lines, 1):
-                    try:
-                        line = line.strip()
-                        if not line:
-                            continue
-
-                        # 尝试用制表符分隔
-                        if '\t' in line:
-                            parts = line.split('\t', 1)
-                        # 尝试用逗号分隔
-                        elif ',' in line:
-                            parts = line.split(',', 1)
-                        else:
-                            failed_count += 1
-                            errors.append(f"第{line_num}行: 格式错误，需要用制表符或逗号分隔")
-                            continue
-
-                        if len(parts) >= 2:
-                            source_term = parts[0].strip()
-                            target_term = parts[1].strip()
-
-                            if source_term and target_term:
-                                success = term_base.add_term(
-                                    source_term=source_term,
-                                    target_term=target_term,
-                                    source_lang='zh',
-                                    target_lang='en'
-                                )
-                                if success:
-                                    imported_count += 1
+                                errors.append(f"第{idx}项: {str(e)}")
+                    elif isinstance(data, dict):
+                        # 处理字典格式
+                        for source_term, target_term in data.items():
+                            try:
+                                if source_term and target_term:
+                                    success = term_base.add_term(
+                                        source_term=source_term,
+                                        target_term=str(target_term),
+                                        source_lang='zh',
+                                        target_lang='en'
+                                    )
+                                    if success:
+                                        imported_count += 1
+                                    else:
+                                        failed_count += 1
+                                        errors.append(f"术语'{source_term}': 添加失败")
                                 else:
                                     failed_count += 1
-                                    errors.append(f"第{line_num}行: 添加术语失败")
-                            else:
+                                    errors.append(f"术语'{source_term}': 源术语或目标术语为空")
+                            except Exception as e:
                                 failed_count += 1
-                                errors.append(f"第{line_num}行: 源术语或目标术语为空")
-                        else:
-                            failed_count += 1
-                            errors.append(f"第{line_num}行: 格式错误")
-                    except Exception as e:
-                        failed_count += 1
-                        errors.append(f"第{line_num}行: {str(e)}")
+                                errors.append(f"术语'{source_term}': {str(e)}")
 
             return jsonify({
                 'success': True,
@@ -553,96 +459,37 @@ def import_terms():
         return jsonify({'error': f'导入术语失败: {str(e)}'}), 500
 
 @terminology_bp.route('/export', methods=['GET'])
-def export_terms():
-    """导出术语库"""
+@terminology_bp.route('/export/stream', methods=['GET'])
+def export_terms_stream():
+    """流式导出术语库（csv/jsonl/txt/tbx，可选gzip），逐块传输，内存占用与术语库大小无关"""
     try:
         format_type = request.args.get('format', 'csv').lower()
+        # 兼容旧版 format=json，按行输出 JSON 避免整库序列化
+        if format_type == 'json':
+            format_type = 'jsonl'
         source_lang = request.args.get('source_lang', '')
         target_lang = request.args.get('target_lang', '')
+        compress = request.args.get('gzip', 'false').lower() == 'true'
 
-        if format_type not in ['csv', 'json', 'txt']:
-            return jsonify({'error': '不支持的导出格式'}), 400
+        if format_type not in EXPORT_FORMATS:
+            return jsonify({'error': f'不支持的导出格式，支持的格式: {", ".join(EXPORT_FORMATS)}'}), 400
 
         # 获取松瓷机电AI助手实例
         assistant = current_app.config.get('AI_ASSISTANT')
         if not assistant or not hasattr(assistant, 'term_base'):
             return jsonify({'error': '术语库未初始化'}), 500
 
-        term_base = assistant.term_base
-
-        # 获取术语数据
-        terms_data = []
-        if hasattr(term_base, 'terms'):
-            for source_term, term_data in term_base.terms.items():
-                if isinstance(term_data, dict):
-                    metadata = term_data.get('metadata', {})
-
-                    # 语言过滤
-                    if source_lang and metadata.get('source_lang') != source_lang:
-                        continue
-                    if target_lang and metadata.get('target_lang') != target_lang:
-                        continue
+        lookup_index = assistant.term_base.get_lookup_index()
+        content_type, extension = EXPORT_FORMATS[format_type]
+        filename = f'terminology_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}'
+        if compress:
+            content_type, filename = 'application/gzip', filename + '.gz'
 
-                    term_item = {
-                        'source_term': source_term,
-                        'target_term': term_data.get('target_term', term_data.get('definition', '')),
-                        'source_lang': metadata.get('source_lang', 'zh'),
-                        'target_lang': metadata.get('target_lang', 'en'),
-                        'category': metadata.get('category', ''),
-                        'description': metadata.get('description', ''),
-                        'created_at': metadata.get('added_time', ''),
-                        'updated_at': metadata.get('updated_time', '')
-                    }
-                else:
-                    # 兼容旧格式
-                    term_item = {
-                        'source_term': source_term,
-                        'target_term': str(term_data),
-                        'source_lang': 'zh',
-                        'target_lang': 'en',
-                        'category': '',
-                        'description': '',
-                        'created_at': '',
-                        'updated_at': ''
-                    }
-                terms_data.append(term_item)
-
-        if not terms_data:
-            return jsonify({'error': '没有术语数据可导出'}), 400
-
-        # 生成导出内容
-        if format_type == 'csv':
-            output = StringIO()
-            fieldnames = ['source_term', 'target_term', 'source_lang', 'target_lang', 'category', 'description']
-            writer = csv.DictWriter(output, fieldnames=fieldnames)
-            writer.writeheader()
-            for term in terms_data:
-                writer.writerow({k: term.get(k, '') for k in fieldnames})
-            content = output.getvalue()
-            content_type = 'text/csv'
-            filename = f'terminology_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-
-        elif format_type == 'json':
-            content = json.dumps(terms_data, ensure_ascii=False, indent=2)
-            content_type = 'application/json'
-            filename = f'terminology_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
-
-        elif format_type == 'txt':
-            lines = []
-            for term in terms_data:
-                lines.append(f"{term['source_term']}\t{term['target_term']}")
-            content = '\n'.join(lines)
-            content_type = 'text/plain'
-            filename = f'terminology_{datetime.now().strftime("%Y%m%d_%H%M%S")}.txt'
-
-        return jsonify({
-            'success': True,
-            'content': content,
-            'content_type': content_type,
-            'filename': filename,
-            'total_terms': len(terms_data),
-            'exported_at': datetime.now().isoformat()
-        })
+        terms = iter_export_terms(lookup_index, source_lang, target_lang)
+        response = Response(stream_with_context(iter_export_bytes(terms, format_type, compress)),
+                            mimetype=content_type)
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
     except Exception as e:
         current_app.logger.error(f"导出术语失败: {e}")
@@ -659,17 +506,8 @@ def get_categories():
 
         term_base = assistant.term_base
 
-        # 收集所有分类
-        categories = set()
-        if hasattr(term_base, 'terms'):
-            for term_data in term_base.terms.values():
-                if isinstance(term_data, dict):
-                    metadata = term_data.get('metadata', {})
-                    category = metadata.get('category', '').strip()
-                    if category:
-                        categories.add(category)
-
-        categories_list = sorted(list(categories))
+        # 分类列表由术语库增量维护
+        categories_list = term_base.get_statistics().list_categories()
 
         return jsonify({
             'success': True,
@@ -692,51 +530,8 @@ def get_statistics():
 
         term_base = assistant.term_base
 
-        # 统计信息
-        stats = {
-            'total_terms': 0,
-            'language_pairs': {},
-            'categories': {},
-            'recent_additions': 0,
-            'last_updated': None
-        }
-
-        if hasattr(term_base, 'terms'):
-            stats['total_terms'] = len(term_base.terms)
-
-            # 统计语言对和分类
-            for term_data in term_base.terms.values():
-                if isinstance(term_data, dict):
-                    metadata = term_data.get('metadata', {})
-
-                    # 语言对统计
-                    source_lang = metadata.get('source_lang', 'zh')
-                    target_lang = metadata.get('target_lang', 'en')
-                    lang_pair = f"{source_lang}-{target_lang}"
-                    stats['language_pairs'][lang_pair] = stats['language_pairs'].get(lang_pair, 0) + 1
-
-                    # 分类统计
-                    category = metadata.get('category', '未分类')
-                    if not category:
-                        category = '未分类'
-                    stats['categories'][category] = stats['categories'].get(category, 0) + 1
-
-                    # 最近添加统计（7天内）
-                    added_time = metadata.get('added_time', '')
-                    if added_time:
-                        try:
-                            from datetime import datetime, timedelta
-                            added_date = datetime.fromisoformat(added_time.replace('Z', '+00:00'))
-                            if added_date > datetime.now() - timedelta(days=7):
-                                stats['recent_additions'] += 1
-                        except:
-                            pass
-
-                    # 最后更新时间
-                    updated_time = metadata.get('updated_time', metadata.get('added_time', ''))
-                    if updated_time:
-                        if not stats['last_updated'] or updated_time > stats['last_updated']:
-                            stats['last_updated'] = updated_time
+        # 统计信息由术语库在增删改时增量维护
+        stats = term_base.get_statistics().snapshot()
 
         return jsonify({
             'success': True,
@@ -747,6 +542,33 @@ def get_statistics():
         current_app.logger.error(f"获取术语库统计失败: {e}")
         return jsonify({'error': f'获取术语库统计失败: {str(e)}'}), 500
 
+@terminology_bp.route('/statistics/verify', methods=['POST'])
+def verify_statistics():
+    """校验增量统计是否与术语数据一致，可选重建"""
+    try:
+        data = request.get_json(silent=True) or {}
+        rebuild = bool(data.get('rebuild', False))
+
+        # 获取松瓷机电AI助手实例
+        assistant = current_app.config.get('AI_ASSISTANT')
+        if not assistant or not hasattr(assistant, 'term_base'):
+            return jsonify({'error': '术语库未初始化'}), 500
+
+        term_base = assistant.term_base
+        drift = term_base.verify_statistics(rebuild=rebuild)
+
+        return jsonify({
+            'success': True,
+            'consistent': not drift,
+            'drift': sorted(drift),
+            'rebuilt': bool(drift) and rebuild,
+            'statistics': term_base.get_statistics().snapshot()
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"校验术语库统计失败: {e}")
+        return jsonify({'error': f'校验术语库统计失败: {str(e)}'}), 500
+
 @terminology_bp.route('/status', methods=['GET'])
 def get_terminology_status():
     """获取术语库状态"""
@@ -774,6 +596,10 @@ def get_terminology_status():
             if hasattr(assistant.term_base, 'vector_db') and assistant.term_base.vector_db:
                 status['vector_db_available'] = True
 
+            # 术语向量后台补建进度
+            if hasattr(assistant.term_base, 'get_vector_backfill_progress'):
+                status['vector_backfill'] = assistant.term_base.get_vector_backfill_progress()
+
         return jsonify({
             'success': True,
             'status': status
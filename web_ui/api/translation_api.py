@@ -3,10 +3,17 @@
 提供文本翻译相关的RESTful API接口
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from datetime import datetime
+import os
 import json
 import time
+import uuid
+
+from core.term_matcher import matcher_cache, group_matches
+from core.reverse_term_index import parse_multiple_terms, build_reverse_entries, is_word_boundary
+from core.translation_memory import term_fingerprint, format_examples
+from core.segment_pipeline import SegmentPipeline
 
 translation_bp = Blueprint('translation', __name__)
 
@@ -62,101 +69,116 @@ def translate_text():
 
         try:
             # 如果使用术语库，先进行术语匹配
-            if use_termbase and hasattr(assistant, 'term_base') and assistant.term_base:
-                try:
-                    # 获取术语库
-                    terms = {}
-                    if hasattr(assistant.term_base, 'terms'):
-                        terms = assistant.term_base.terms
-
-                    # 查找匹配的术语 - 使用我们的增强术语匹配逻辑
-                    if terms:
-                        matched_terms = _find_matching_terms(source_text, terms, source_lang, target_lang)
-                        current_app.logger.info(f"找到 {len(matched_terms)} 个匹配术语")
-                except Exception as e:
-                    current_app.logger.warning(f"术语匹配失败: {e}")
-
-            # 执行翻译 - 根据选择的模型
-            placeholder_map = None
-            if selected_model == 'local_default':
-                # 使用本地模型翻译
-                if use_termbase and matched_terms:
-                    # 使用占位符策略进行本地翻译
-                    processed_text, placeholder_map = _replace_terms_with_placeholders(source_text, matched_terms)
-
-                    if hasattr(assistant.translator, 'translate_text'):
-                        temp_result = assistant.translator.translate_text(
-                            text=processed_text,
-                            source_lang=source_lang,
-                            target_lang=target_lang,
-                            use_termbase=False  # 关闭内置术语库，使用我们的占位符
-                        )
+            if use_termbase:
+                matched_terms = _match_text_terms(assistant, source_text, source_lang, target_lang)
+
+            # 先查翻译记忆库，命中时跳过生成
+            translation_memory = _get_translation_memory(assistant) if data.get('use_memory', True) else None
+            memory_key = None
+            memory_hit = None
+            examples = []
+            if translation_memory:
+                memory_key = (source_lang, target_lang,
+                              term_fingerprint(matched_terms if use_termbase else None),
+                              _translation_model_id(assistant, selected_model))
+                memory_hit, examples = translation_memory.match(source_text, *memory_key)
+
+            if memory_hit:
+                current_app.logger.info(f"翻译记忆库命中 ({memory_hit['match']}, {memory_hit['origin']})")
+                translation_result = memory_hit['target_text']
+            else:
+                if examples:
+                    current_app.logger.info(f"使用 {len(examples)} 条翻译记忆库相似译文作为示例")
+                # 执行翻译 - 根据选择的模型
+                placeholder_map = None
+                if selected_model == 'local_default':
+                    # 使用本地模型翻译
+                    if use_termbase and matched_terms:
+                        # 使用占位符策略进行本地翻译
+                        processed_text, placeholder_map = _replace_terms_with_placeholders(source_text, matched_terms)
+
+                        if hasattr(assistant.translator, 'translate_text'):
+                            temp_result = assistant.translator.translate_text(
+                                text=processed_text,
+                                source_lang=source_lang,
+                                target_lang=target_lang,
+                                use_termbase=False  # 关闭内置术语库，使用我们的占位符
+                            )
+                        else:
+                            temp_result = assistant.translator.translate(
+                                text=processed_text,
+                                source_lang=source_lang,
+                                target_lang=target_lang,
+                                use_termbase=False,  # 关闭内置术语库，使用我们的占位符
+                                use_memory=False,
+                                examples=examples
+                            )
+
+                        # 恢复占位符
+                        translation_result = _restore_placeholders(temp_result, placeholder_map)
                     else:
-                        temp_result = assistant.translator.translate(
-                            text=processed_text,
-                            source_lang=source_lang,
-                            target_lang=target_lang,
-                            use_termbase=False  # 关闭内置术语库，使用我们的占位符
-                        )
-
-                    # 恢复占位符
-                    translation_result = _restore_placeholders(temp_result, placeholder_map)
+                        # 普通翻译
+                        if hasattr(assistant.translator, 'translate_text'):
+                            translation_result = assistant.translator.translate_text(
+                                text=source_text,
+                                source_lang=source_lang,
+                                target_lang=target_lang,
+                                use_termbase=use_termbase
+                            )
+                        else:
+                            translation_result = assistant.translator.translate(
+                                text=source_text,
+                                source_lang=source_lang,
+                                target_lang=target_lang,
+                                use_termbase=use_termbase,
+                                use_memory=False,
+                                examples=examples
+                            )
                 else:
-                    # 普通翻译
-                    if hasattr(assistant.translator, 'translate_text'):
-                        translation_result = assistant.translator.translate_text(
-                            text=source_text,
-                            source_lang=source_lang,
-                            target_lang=target_lang,
-                            use_termbase=use_termbase
-                        )
+                    # 使用外部模型翻译（Ollama或OpenAI）
+                    result_data = _translate_with_external_model(
+                        source_text, source_lang, target_lang, selected_model, use_termbase, matched_terms,
+                        examples
+                    )
+                    if isinstance(result_data, tuple):
+                        translation_result, placeholder_map = result_data
                     else:
-                        translation_result = assistant.translator.translate(
-                            text=source_text,
-                            source_lang=source_lang,
-                            target_lang=target_lang,
-                            use_termbase=use_termbase
-                        )
-            else:
-                # 使用外部模型翻译（Ollama或OpenAI）
-                result_data = _translate_with_external_model(
-                    source_text, source_lang, target_lang, selected_model, use_termbase, matched_terms
-                )
-                if isinstance(result_data, tuple):
-                    translation_result, placeholder_map = result_data
-                else:
-                    translation_result = result_data
+                        translation_result = result_data
 
-            if not translation_result:
-                return jsonify({'error': '翻译失败，请稍后重试'}), 500
-
-            # 翻译质量验证和修复
-            current_app.logger.info("开始翻译质量验证...")
-            quality_issues = _validate_translation_quality(
-                source_text, translation_result, source_lang, target_lang,
-                placeholder_map, matched_terms
-            )
+                if not translation_result:
+                    return jsonify({'error': '翻译失败，请稍后重试'}), 500
 
-            if quality_issues:
-                current_app.logger.warning(f"发现翻译质量问题: {quality_issues}")
-                # 尝试修复问题
-                translation_result = _fix_translation_issues(
-                    source_text, translation_result, quality_issues,
-                    source_lang, target_lang, placeholder_map, matched_terms
-                )
-
-                # 再次验证修复结果
-                remaining_issues = _validate_translation_quality(
+                # 翻译质量验证和修复
+                current_app.logger.info("开始翻译质量验证...")
+                quality_issues = _validate_translation_quality(
                     source_text, translation_result, source_lang, target_lang,
                     placeholder_map, matched_terms
                 )
 
-                if remaining_issues:
-                    current_app.logger.warning(f"修复后仍存在问题: {remaining_issues}")
+                if quality_issues:
+                    current_app.logger.warning(f"发现翻译质量问题: {quality_issues}")
+                    # 尝试修复问题
+                    translation_result = _fix_translation_issues(
+                        source_text, translation_result, quality_issues,
+                        source_lang, target_lang, placeholder_map, matched_terms
+                    )
+
+                    # 再次验证修复结果
+                    remaining_issues = _validate_translation_quality(
+                        source_text, translation_result, source_lang, target_lang,
+                        placeholder_map, matched_terms
+                    )
+
+                    if remaining_issues:
+                        current_app.logger.warning(f"修复后仍存在问题: {remaining_issues}")
+                    else:
+                        current_app.logger.info("翻译质量问题已修复")
                 else:
-                    current_app.logger.info("翻译质量问题已修复")
-            else:
-                current_app.logger.info("翻译质量验证通过")
+                    current_app.logger.info("翻译质量验证通过")
+
+                # 通过质量验证（或问题已修复）的译文写入翻译记忆库
+                if translation_memory and (not quality_issues or not remaining_issues):
+                    translation_memory.store(source_text, translation_result, *memory_key)
 
         except Exception as e:
             current_app.logger.error(f"翻译执行失败: {e}")
@@ -172,7 +194,10 @@ def translate_text():
             'timestamp': datetime.now().isoformat(),
             'character_count': len(source_text),
             'use_termbase': use_termbase,
-            'matched_terms_count': len(matched_terms)
+            'matched_terms_count': len(matched_terms),
+            'from_memory': bool(memory_hit),
+            'memory_match': memory_hit['match'] if memory_hit else None,
+            'memory_examples': len(examples)
         }
         translation_history.append(translation_record)
 
@@ -193,6 +218,90 @@ def translate_text():
         current_app.logger.error(f"翻译请求处理失败: {e}")
         return jsonify({'error': f'翻译请求处理失败: {str(e)}'}), 500
 
+@translation_bp.route('/translate/stream', methods=['POST'])
+def translate_text_stream():
+    """分句流式翻译长文本，以 NDJSON 逐句返回进度"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': '请求数据不能为空'}), 400
+
+        source_text = data.get('text', '').strip()
+        source_lang = data.get('source_lang', 'auto')
+        target_lang = data.get('target_lang', 'zh')
+        use_termbase = data.get('use_termbase', True)
+        selected_model = data.get('selected_model', 'local_default')
+
+        if not source_text:
+            return jsonify({'error': '翻译文本不能为空'}), 400
+
+        if target_lang not in SUPPORTED_LANGUAGES:
+            return jsonify({'error': f'不支持的目标语言: {target_lang}'}), 400
+
+        assistant = current_app.config.get('AI_ASSISTANT')
+        if not assistant:
+            return jsonify({'error': '松瓷机电AI助手未初始化'}), 500
+
+        if not hasattr(assistant, 'translator') or not assistant.translator:
+            return jsonify({'error': '翻译引擎未初始化'}), 500
+
+        translation_memory = _get_translation_memory(assistant) if data.get('use_memory', True) else None
+        if selected_model == 'local_default':
+            events = assistant.translator.iter_translate_segments(
+                source_text, use_termbase, source_lang, target_lang, use_memory=translation_memory is not None)
+        else:
+            # 外部模型逐句翻译，每句单独匹配术语
+            term_cache = {}
+
+            def segment_terms(segment):
+                if not use_termbase:
+                    return None
+                if segment not in term_cache:
+                    term_cache[segment] = _match_text_terms(assistant, segment, source_lang, target_lang)
+                return term_cache[segment]
+
+            def memory_key(segment):
+                return source_lang, target_lang, term_fingerprint(segment_terms(segment)), selected_model
+
+            def translate_batch(texts, examples):
+                results = []
+                for text in texts:
+                    result = _translate_with_external_model(text, source_lang, target_lang, selected_model,
+                                                            use_termbase, segment_terms(text) or [], examples)
+                    results.append(result[0] if isinstance(result, tuple) else result)
+                return results
+
+            events = SegmentPipeline(translate_batch, translation_memory, memory_key,
+                                     batch_size=1).run(source_text, target_lang)
+
+        def generate():
+            try:
+                for event in events:
+                    if event['event'] == 'done':
+                        # 记录翻译历史
+                        translation_history.append({
+                            'id': len(translation_history) + 1,
+                            'source_text': source_text,
+                            'translated_text': event['text'],
+                            'source_lang': source_lang,
+                            'target_lang': target_lang,
+                            'timestamp': datetime.now().isoformat(),
+                            'character_count': len(source_text),
+                            'use_termbase': use_termbase,
+                            'segment_stats': event['stats']
+                        })
+                        event = dict(event, translation=translation_history[-1])
+                    yield json.dumps(event, ensure_ascii=False) + '\n'
+            except Exception as e:
+                current_app.logger.error(f"分句翻译失败: {e}")
+                yield json.dumps({'event': 'error', 'error': f'分句翻译失败: {str(e)}'}, ensure_ascii=False) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    except Exception as e:
+        current_app.logger.error(f"翻译请求处理失败: {e}")
+        return jsonify({'error': f'翻译请求处理失败: {str(e)}'}), 500
+
 @translation_bp.route('/history', methods=['GET'])
 def get_translation_history():
     """获取翻译历史"""
@@ -397,6 +506,9 @@ def match_terms():
         if not assistant or not hasattr(assistant, 'term_base'):
             return jsonify({'error': '术语库未初始化'}), 500
 
+        # 是否启用模糊匹配，未指定时使用设置
+        fuzzy = bool(data.get('fuzzy', _fuzzy_matching_enabled(assistant)))
+
         term_base = assistant.term_base
         matched_terms = []
 
@@ -408,12 +520,16 @@ def match_terms():
 
             # 查找匹配的术语 - 使用我们的增强术语匹配逻辑
             if terms:
-                matched_terms = _find_matching_terms(text, terms, source_lang, target_lang)
+                matched_terms = _find_matching_terms(text, terms, source_lang, target_lang,
+                                                     version=getattr(term_base, 'version', None),
+                                                     term_base=term_base,
+                                                     fuzzy=fuzzy)
 
             return jsonify({
                 'success': True,
                 'matched_terms': matched_terms,
                 'total_matches': len(matched_terms),
+                'fuzzy_matches': sum(1 for term in matched_terms if term.get('match_type') == 'fuzzy'),
                 'text': text,
                 'source_lang': source_lang,
                 'target_lang': target_lang
@@ -427,8 +543,117 @@ def match_terms():
         current_app.logger.error(f"术语匹配请求处理失败: {e}")
         return jsonify({'error': f'术语匹配请求处理失败: {str(e)}'}), 500
 
-def _build_translation_prompt(source_text, source_lang, target_lang, use_termbase, matched_terms):
-    """构建翻译提示词"""
+@translation_bp.route('/memory/stats', methods=['GET'])
+def get_translation_memory_stats():
+    """获取翻译记忆库统计"""
+    try:
+        translation_memory = _get_translation_memory(current_app.config.get('AI_ASSISTANT'))
+        if not translation_memory:
+            return jsonify({'error': '翻译记忆库未启用'}), 404
+
+        return jsonify({
+            'success': True,
+            'stats': translation_memory.get_stats()
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"获取翻译记忆库统计失败: {e}")
+        return jsonify({'error': f'获取翻译记忆库统计失败: {str(e)}'}), 500
+
+@translation_bp.route('/memory/import', methods=['POST'])
+def import_translation_memory():
+    """导入 TMX 文件到翻译记忆库"""
+    try:
+        translation_memory = _get_translation_memory(current_app.config.get('AI_ASSISTANT'))
+        if not translation_memory:
+            return jsonify({'error': '翻译记忆库未启用'}), 404
+
+        if 'file' not in request.files:
+            return jsonify({'error': '没有选择文件'}), 400
+
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({'error': '没有选择文件'}), 400
+
+        file_ext = file.filename.rsplit('.', 1)[1].lower() if '.' in file.filename else ''
+        if file_ext not in {'tmx', 'xml'}:
+            return jsonify({'error': '不支持的文件类型，支持的类型: tmx, xml'}), 400
+
+        # 保存为临时文件后流式解析
+        upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
+        os.makedirs(upload_folder, exist_ok=True)
+        file_path = os.path.join(upload_folder, f"tm_{uuid.uuid4().hex}.{file_ext}")
+        file.save(file_path)
+        try:
+            result = translation_memory.import_tmx(
+                file_path,
+                source_lang=request.form.get('source_lang') or None,
+                target_lang=request.form.get('target_lang') or None
+            )
+        except Exception as e:
+            return jsonify({'error': f'文件解析失败: {str(e)}'}), 400
+        finally:
+            # 清理临时文件
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+        return jsonify({
+            'success': True,
+            'message': '翻译记忆库导入完成',
+            'imported_count': result['imported'],
+            'skipped_count': result['skipped']
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"导入翻译记忆库失败: {e}")
+        return jsonify({'error': f'导入翻译记忆库失败: {str(e)}'}), 500
+
+@translation_bp.route('/memory/export', methods=['GET'])
+def export_translation_memory():
+    """流式导出翻译记忆库为 TMX 文件"""
+    try:
+        translation_memory = _get_translation_memory(current_app.config.get('AI_ASSISTANT'))
+        if not translation_memory:
+            return jsonify({'error': '翻译记忆库未启用'}), 404
+
+        source_lang = request.args.get('source_lang') or None
+        target_lang = request.args.get('target_lang') or None
+        chunks = (chunk.encode('utf-8') for chunk in translation_memory.iter_tmx(source_lang, target_lang))
+        filename = f"translation_memory_{datetime.now().strftime('%Y%m%d_%H%M%S')}.tmx"
+        response = Response(stream_with_context(chunks), mimetype='application/x-tmx+xml')
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    except Exception as e:
+        current_app.logger.error(f"导出翻译记忆库失败: {e}")
+        return jsonify({'error': f'导出翻译记忆库失败: {str(e)}'}), 500
+
+@translation_bp.route('/memory', methods=['DELETE'])
+def clear_translation_memory():
+    """清空翻译记忆库"""
+    try:
+        translation_memory = _get_translation_memory(current_app.config.get('AI_ASSISTANT'))
+        if not translation_memory:
+            return jsonify({'error': '翻译记忆库未启用'}), 404
+
+        translation_memory.clear()
+        return jsonify({
+            'success': True,
+            'message': '翻译记忆库已清空'
+        })
+
+    except Exception as e:
+        current_app.logger.error(f"清空翻译记忆库失败: {e}")
+        return jsonify({'error': f'清空翻译记忆库失败: {str(e)}'}), 500
+
+def _build_translation_prompt(source_text, source_lang, target_lang, use_termbase, matched_terms, examples=None):
+    """构建翻译提示词（有翻译记忆库相似译文时作为示例放在前面）"""
+    prompt, placeholder_map = _build_base_translation_prompt(
+        source_text, source_lang, target_lang, use_termbase, matched_terms)
+    return format_examples(examples) + prompt, placeholder_map
+
+def _build_base_translation_prompt(source_text, source_lang, target_lang, use_termbase, matched_terms):
+    """构建不含示例的翻译提示词"""
     # 获取语言全名
     source_lang_name = SUPPORTED_LANGUAGES.get(source_lang, source_lang)
     target_lang_name = SUPPORTED_LANGUAGES.get(target_lang, target_lang)
@@ -463,6 +688,61 @@ def _build_translation_prompt(source_text, source_lang, target_lang, use_termbas
 
         return prompt, None
 
+def _fuzzy_matching_enabled(assistant):
+    """读取是否启用模糊术语匹配的设置"""
+    settings = getattr(assistant, 'settings', None)
+    if settings is not None and hasattr(settings, 'get'):
+        try:
+            return bool(settings.get('term_fuzzy_match_enabled', True))
+        except Exception:
+            return True
+    return True
+
+def _match_text_terms(assistant, text, source_lang, target_lang):
+    """
+    匹配文本中用于翻译替换的术语，术语库不可用或匹配失败时返回空列表
+
+    只使用精确匹配：匹配结果会被替换为术语占位符强制使用术语译文，模糊匹配只是猜测
+    （如 header 与 heater），只在 /match_terms 中附带置信度报告，不参与翻译。
+    """
+    term_base = getattr(assistant, 'term_base', None)
+    terms = getattr(term_base, 'terms', None) if term_base else None
+    if not terms:
+        return []
+    try:
+        # 使用增强术语匹配逻辑
+        matched_terms = _find_matching_terms(text, terms, source_lang, target_lang,
+                                             version=getattr(term_base, 'version', None),
+                                             term_base=term_base)
+        current_app.logger.info(f"找到 {len(matched_terms)} 个匹配术语")
+        return matched_terms
+    except Exception as e:
+        current_app.logger.warning(f"术语匹配失败: {e}")
+        return []
+
+def _get_translation_memory(assistant):
+    """获取翻译记忆库，未初始化或设置中关闭时返回 None"""
+    translation_memory = getattr(assistant, 'translation_memory', None)
+    if translation_memory is None:
+        return None
+    settings = getattr(assistant, 'settings', None)
+    if settings is not None and hasattr(settings, 'get'):
+        try:
+            if not settings.get('tm_enabled', True):
+                return None
+        except Exception:
+            pass
+    return translation_memory
+
+def _translation_model_id(assistant, selected_model):
+    """翻译记忆库的模型标识：本地模型与 Translator 使用相同的标识"""
+    if selected_model == 'local_default' and hasattr(assistant, '_get_answer_model_id'):
+        try:
+            return assistant._get_answer_model_id()
+        except Exception:
+            pass
+    return selected_model
+
 def _replace_terms_with_placeholders(text, matched_terms):
     """使用固定格式占位符替换术语 - 简化版"""
     placeholder_map = {}
@@ -470,6 +750,19 @@ def _replace_terms_with_placeholders(text, matched_terms):
 
     current_app.logger.info(f"开始术语替换，共 {len(matched_terms)} 个术语")
 
+    # 匹配结果带有位置时按位置从后往前替换，避免大小写不同或子串重叠导致漏替换
+    if matched_terms and all(term.get('spans') for term in matched_terms):
+        replacements = []
+        for i, term in enumerate(matched_terms, 1):
+            placeholder = f"[T{i}]"
+            placeholder_map[placeholder] = term['target']
+            replacements.extend((start, end, placeholder) for start, end in term['spans'])
+        for start, end, placeholder in sorted(replacements, reverse=True):
+            processed_text = processed_text[:start] + placeholder + processed_text[end:]
+        current_app.logger.info(f"术语替换完成，创建 {len(placeholder_map)} 个占位符")
+        current_app.logger.info(f"处理后文本: {processed_text}")
+        return processed_text, placeholder_map
+
     # 使用固定的简单格式：[T1], [T2], [T3]...
     for i, term in enumerate(matched_terms, 1):
         placeholder = f"[T{i}]"  # 极简格式，避免复杂变形
@@ -774,12 +1067,7 @@ def _parse_multiple_terms(term_string):
     Returns:
         list: 术语列表，按优先级排序 ["Neck", "Crystal neck", "Growth neck"]
     """
-    if not term_string:
-        return []
-
-    # 按英文逗号分割并去除空白
-    terms = [term.strip() for term in term_string.split(',') if term.strip()]
-    return terms
+    return parse_multiple_terms(term_string)
 
 def _create_reverse_term_cache(terms, source_lang, target_lang):
     """创建反向术语库缓存（用于外语→中文翻译）
@@ -792,47 +1080,19 @@ def _create_reverse_term_cache(terms, source_lang, target_lang):
     - 匹配：外语术语（原术语库的值，支持多个）
     - 替换：中文术语（原术语库的键）
     - 优先级：第一个术语享有最高翻译权限
+
+    有术语库实例时应使用 TermBase.get_reverse_index()，该函数仅用于独立的术语字典。
     """
     reverse_terms = {}
 
     if not terms:
         return reverse_terms
 
-    current_app.logger.info(f"创建反向术语库缓存: {source_lang} → {target_lang}")
-
     for chinese_term, term_data in terms.items():  # chinese_term是键（中文）
-        if isinstance(term_data, dict):
-            metadata = term_data.get('metadata', {})
-            # 检查原始术语的语言方向
-            original_source_lang = metadata.get('source_lang', 'zh')  # 原始：中文
-            original_target_lang = metadata.get('target_lang', 'en')  # 原始：外语
-
-            # 如果当前翻译是外语→中文，且原术语库是中文→外语
-            if (source_lang == original_target_lang and target_lang == original_source_lang):
-                foreign_term_string = term_data.get('target_term', term_data.get('definition', ''))  # 外语术语字符串
-                if foreign_term_string:
-                    # 解析多个外语术语
-                    foreign_terms = _parse_multiple_terms(foreign_term_string)
-
-                    for i, foreign_term in enumerate(foreign_terms):
-                        # 创建反向映射：外语术语（小写作为查找键） → 中文术语
-                        reverse_terms[foreign_term.lower()] = {
-                            'source_term': foreign_term,      # 在文本中匹配的外语术语
-                            'target_term': chinese_term,      # 要替换成的中文术语
-                            'definition': chinese_term,
-                            'priority': i,                     # 优先级（0最高）
-                            'primary_term': foreign_terms[0] if foreign_terms else foreign_term,  # 主要术语（用于恢复）
-                            'all_terms': foreign_terms,       # 所有术语
-                            'metadata': {
-                                'source_lang': source_lang,           # 当前翻译：外语
-                                'target_lang': target_lang,           # 当前翻译：中文
-                                'original_source_lang': original_source_lang,  # 原始：中文
-                                'original_target_lang': original_target_lang   # 原始：外语
-                            }
-                        }
-                        current_app.logger.info(f"反向术语映射: '{foreign_term}' → '{chinese_term}' (优先级: {i})")
-
-    current_app.logger.info(f"反向术语库缓存创建完成，共 {len(reverse_terms)} 个术语")
+        for foreign_term_lower, entry in build_reverse_entries(chinese_term, term_data, source_lang, target_lang):
+            reverse_terms[foreign_term_lower] = entry
+
+    current_app.logger.info(f"反向术语库缓存创建完成 ({source_lang} → {target_lang})，共 {len(reverse_terms)} 个术语")
     return reverse_terms
 
 def _normalize_language_code(lang_code, text_sample=""):
@@ -851,12 +1111,16 @@ def _normalize_language_code(lang_code, text_sample=""):
             return 'zh'
     return lang_code
 
-def _find_matching_terms(source_text, terms, source_lang, target_lang):
-    """查找文本中匹配的术语"""
-    matched_terms = []
+def _find_matching_terms(source_text, terms, source_lang, target_lang, version=None, term_base=None, fuzzy=False):
+    """查找文本中匹配的术语
 
+    使用按术语库版本缓存的 Aho–Corasick 自动机一次扫描文本，
+    返回最左最长、互不重叠的匹配（不区分大小写）。
+    提供 term_base 时，外语→中文方向直接使用其常驻的反向术语索引；
+    fuzzy=True 时再在未匹配的部分查找词形变化和拼写相近的术语，附带置信度。
+    """
     if not terms:
-        return matched_terms
+        return []
 
     # 规范化语言代码
     normalized_source_lang = _normalize_language_code(source_lang, source_text)
@@ -867,100 +1131,115 @@ def _find_matching_terms(source_text, terms, source_lang, target_lang):
     # 检查是否需要使用反向术语库
     if normalized_source_lang == 'en' and normalized_target_lang == 'zh':
         # EN→ZH翻译，使用反向术语库
-        reverse_terms = _create_reverse_term_cache(terms, normalized_source_lang, normalized_target_lang)
-        current_app.logger.info(f"使用反向术语库进行EN→ZH翻译，术语数量: {len(reverse_terms)}")
-
-        # 在反向术语库中查找匹配
         # 反向术语库结构：外语术语(小写) → {source_term: 外语术语, target_term: 中文术语}
-        source_text_lower = source_text.lower()
-        for foreign_term_lower, term_data in reverse_terms.items():
-            # 检查外语术语是否在文本中（不区分大小写）
-            if foreign_term_lower in source_text_lower:
-                # 获取术语信息
-                foreign_term = term_data['source_term']  # 外语术语（原始大小写）
-                chinese_term = term_data['target_term']  # 中文术语
-                position = source_text_lower.find(foreign_term_lower)
-
-                matched_terms.append({
-                    'source': foreign_term,   # 在文本中匹配到的外语术语
-                    'target': chinese_term,   # 要替换成的中文术语
-                    'position': position,
-                    'length': len(foreign_term)
-                })
-                current_app.logger.info(f"找到反向术语匹配: '{foreign_term}' → '{chinese_term}'")
-            else:
-                # 尝试更灵活的匹配（处理单词边界）
-                import re
-                # 创建单词边界匹配模式
-                pattern = r'\b' + re.escape(foreign_term_lower) + r'\b'
-                match = re.search(pattern, source_text_lower)
-                if match:
-                    foreign_term = term_data['source_term']
-                    chinese_term = term_data['target_term']
-                    position = match.start()
-
-                    matched_terms.append({
-                        'source': foreign_term,
-                        'target': chinese_term,
-                        'position': position,
-                        'length': len(foreign_term)
-                    })
-                    current_app.logger.info(f"找到反向术语匹配（单词边界）: '{foreign_term}' → '{chinese_term}'")
+        if term_base is not None and hasattr(term_base, 'get_reverse_index') and term_base.terms is terms:
+            # 术语库常驻的反向索引，随术语增删改增量维护
+            reverse_index = term_base.get_reverse_index(normalized_source_lang, normalized_target_lang)
+            current_app.logger.info(f"使用反向术语索引进行EN→ZH翻译，术语数量: {len(reverse_index)}")
+            matches = reverse_index.find(source_text)
+        else:
+            def build_patterns(term_dict):
+                reverse_terms = _create_reverse_term_cache(term_dict, normalized_source_lang, normalized_target_lang)
+                return reverse_terms.items()
+
+            matcher = matcher_cache.get(terms, ('reverse', normalized_source_lang, normalized_target_lang),
+                                        build_patterns, version=version, case_sensitive=False)
+            current_app.logger.info(f"使用反向术语库进行EN→ZH翻译，术语数量: {matcher.pattern_count}")
+            matches = matcher.find(source_text, accept=lambda text, start, end, _: is_word_boundary(text, start, end))
+        matched_terms = group_matches(matches, lambda term_data: term_data)
+        for term in matched_terms:
+            current_app.logger.info(f"找到反向术语匹配: '{term['source']}' → '{term['target']}'")
     else:
         # 正向翻译（ZH→EN等），使用原始术语库
         current_app.logger.info(f"使用正向术语库进行翻译: {normalized_source_lang} → {normalized_target_lang}")
 
-        for source_term, term_data in terms.items():
-            if source_term.lower() in source_text.lower():
+        def build_patterns(term_dict):
+            for source_term, term_data in term_dict.items():
                 if isinstance(term_data, dict):
                     metadata = term_data.get('metadata', {})
                     # 检查语言匹配（使用规范化后的语言代码）
                     term_source_lang = metadata.get('source_lang', 'zh')
                     term_target_lang = metadata.get('target_lang', 'en')
-
-                    current_app.logger.debug(f"检查术语 '{source_term}': 术语语言 {term_source_lang}→{term_target_lang}, 翻译语言 {normalized_source_lang}→{normalized_target_lang}")
-
-                    if (term_source_lang == normalized_source_lang and term_target_lang == normalized_target_lang):
-                        target_term_string = term_data.get('target_term', term_data.get('definition', ''))
-                        if target_term_string:
-                            # 解析多个外语术语，选择第一个（最高优先级）
-                            target_terms = _parse_multiple_terms(target_term_string)
-                            primary_target = target_terms[0] if target_terms else target_term_string
-
-                            matched_terms.append({
-                                'source': source_term,
-                                'target': primary_target,  # 使用最高优先级的术语
-                                'all_targets': target_terms,  # 保存所有可选术语
-                                'position': source_text.lower().find(source_term.lower()),
-                                'length': len(source_term)
-                            })
-                            current_app.logger.info(f"正向术语匹配: '{source_term}' → '{primary_target}' (备选: {target_terms[1:] if len(target_terms) > 1 else '无'})")
-                elif isinstance(term_data, str):
+                    if (term_source_lang == normalized_source_lang and term_target_lang == normalized_target_lang
+                            and term_data.get('target_term', term_data.get('definition', ''))):
+                        yield source_term, source_term
+                elif isinstance(term_data, str) and term_data:
                     # 简单的字符串映射（假设是ZH→EN）
                     if normalized_source_lang == 'zh' and normalized_target_lang == 'en':
-                        target_terms = _parse_multiple_terms(term_data)
-                        primary_target = target_terms[0] if target_terms else term_data
-
-                        matched_terms.append({
-                            'source': source_term,
-                            'target': primary_target,
-                            'all_targets': target_terms,
-                            'position': source_text.lower().find(source_term.lower()),
-                            'length': len(source_term)
-                        })
-                        current_app.logger.info(f"正向术语匹配（简单映射）: '{source_term}' → '{primary_target}'")
+                        yield source_term, source_term
+
+        def resolve(source_term):
+            term_data = terms.get(source_term)
+            if isinstance(term_data, dict):
+                target_term_string = term_data.get('target_term', term_data.get('definition', ''))
+            else:
+                target_term_string = term_data
+            if not target_term_string:
+                return None
+            # 解析多个外语术语，选择第一个（最高优先级）
+            target_terms = _parse_multiple_terms(target_term_string)
+            return {
+                'source_term': source_term,
+                'target_term': target_terms[0] if target_terms else target_term_string,
+                'all_targets': target_terms
+            }
+
+        matcher = matcher_cache.get(terms, ('forward', normalized_source_lang, normalized_target_lang),
+                                    build_patterns, version=version, case_sensitive=False)
+        matched_terms = group_matches(matcher.find(source_text), resolve)
+        for term in matched_terms:
+            current_app.logger.info(f"正向术语匹配: '{term['source']}' → '{term['target']}' (备选: {term['all_targets'][1:] if len(term['all_targets']) > 1 else '无'})")
+
+    for term in matched_terms:
+        term.setdefault('match_type', 'exact')
+        term.setdefault('confidence', 1.0)
+
+    if fuzzy and term_base is not None and hasattr(term_base, 'get_fuzzy_index') and term_base.terms is terms:
+        matched_terms.extend(_find_fuzzy_terms(source_text, term_base, normalized_source_lang,
+                                               normalized_target_lang, matched_terms))
 
     current_app.logger.info(f"术语匹配完成，共匹配到 {len(matched_terms)} 个术语")
     return matched_terms
 
-def _translate_with_external_model(source_text, source_lang, target_lang, selected_model, use_termbase, matched_terms):
+def _find_fuzzy_terms(source_text, term_base, source_lang, target_lang, exact_terms):
+    """在精确匹配之外查找模糊匹配的术语（词形变化、大小写/连字符差异、少量拼写错误）"""
+    fuzzy_index = term_base.get_fuzzy_index(source_lang, target_lang)
+    exclude_spans = [span for term in exact_terms for span in term.get('spans', [])]
+
+    fuzzy_terms = {}
+    for start, end, entry, confidence, term_text in fuzzy_index.find(source_text, exclude_spans=exclude_spans):
+        surface = source_text[start:end]
+        key = (surface.lower(), entry['target_term'])
+        if key in fuzzy_terms:
+            fuzzy_terms[key]['spans'].append((start, end))
+            fuzzy_terms[key]['confidence'] = min(fuzzy_terms[key]['confidence'], confidence)
+            continue
+        fuzzy_terms[key] = {
+            'source': surface,                # 原文中实际出现的写法
+            'target': entry['target_term'],
+            'definition': entry.get('definition', ''),
+            'matched_term': term_text,        # 术语库中的标准写法
+            'position': start,
+            'length': end - start,
+            'spans': [(start, end)],
+            'match_type': 'fuzzy',
+            'confidence': confidence
+        }
+        if 'all_targets' in entry:
+            fuzzy_terms[key]['all_targets'] = entry['all_targets']
+        current_app.logger.info(f"模糊术语匹配: '{surface}' ≈ '{term_text}' → '{entry['target_term']}' (置信度: {confidence})")
+    return list(fuzzy_terms.values())
+
+def _translate_with_external_model(source_text, source_lang, target_lang, selected_model, use_termbase, matched_terms,
+                                   examples=None):
     """使用外部模型进行翻译"""
     try:
         # 导入聊天API中的模型调用函数
         from web_ui.api.chat_api import _call_ollama_model, _call_openai_model, _detect_ollama_models
 
         # 构建翻译提示（可能包含占位符）
-        prompt_result = _build_translation_prompt(source_text, source_lang, target_lang, use_termbase, matched_terms)
+        prompt_result = _build_translation_prompt(source_text, source_lang, target_lang, use_termbase, matched_terms,
+                                                  examples)
 
         if isinstance(prompt_result, tuple):
             translation_prompt, placeholder_map = prompt_result